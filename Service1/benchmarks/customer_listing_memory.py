@@ -0,0 +1,98 @@
+"""
+Memory benchmark for listing every customer.
+
+This script seeds customers into an in-process SQLite database, then reads the
+whole table through ``GET /api/customers/all`` in three ways and reports the
+peak Python heap allocation (tracemalloc) and duration of each:
+
+- full: the former behaviour, one ``select("*")`` dumped into a single JSON array.
+- pages: following ``next_after`` cursors one page at a time.
+- stream: one NDJSON response, paged from the database lazily.
+
+Usage:
+    python benchmarks/customer_listing_memory.py --customers 200000 --page-size 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_BACKEND"] = "sqlite"
+
+from app import create_app  # noqa: E402
+from routes import customer_service  # noqa: E402
+from serializers.customer_serializer import customers_schema  # noqa: E402
+
+
+def seed(count):
+    """
+    Insert ``count`` customers in batches.
+    """
+    for start in range(0, count, 5000):
+        rows = [
+            {
+                "full_name": "Benchmark Customer",
+                "username": f"bench_{i}",
+                "password": "benchmark-password-hash",
+                "age": 30,
+                "address": "Beirut",
+                "gender": "Other",
+            }
+            for i in range(start, min(start + 5000, count))
+        ]
+        customer_service.supabase.table("customer").insert(rows).execute()
+
+
+def read_full(client, page_size):
+    customers = customer_service.get_all_customers()
+    return len(customers_schema.dump(customers))
+
+
+def read_pages(client, page_size):
+    url = f"/api/customers/all?limit={page_size}"
+    total = 0
+    while url:
+        body = client.get(url).json
+        total += len(body["customers"])
+        url = body["next_after"] and f"{url.split('&')[0]}&after={body['next_after']}"
+    return total
+
+
+def read_stream(client, page_size):
+    response = client.get(f"/api/customers/all?stream=true&limit={page_size}")
+    return sum(chunk.count(b"\n") for chunk in response.response)
+
+
+def main():
+    """
+    Parse the command line arguments and measure each way of listing customers.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--customers", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    seed(args.customers)
+    client = create_app().test_client()
+    for label, read in [
+        ("full", read_full),
+        ("pages", read_pages),
+        ("stream", read_stream),
+    ]:
+        tracemalloc.start()
+        started = time.perf_counter()
+        total = read(client, args.page_size)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{label:<6} customers={total} peak={peak / 2**20:.1f}MiB "
+            f"time={elapsed:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Point lookup latency benchmark for the data-access backends.
+
+This script times ``CustomerService.get_customer_by_username`` on every backend
+that can be built from the configuration and reports the latency percentiles of
+each one, so the PostgREST HTTP hop can be compared with direct SQL over the
+psycopg2 connection pool.
+
+Usage:
+    python benchmarks/point_lookup_latency.py --username johndoe123 --requests 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from customer_service import CustomerService  # noqa: E402
+from database_utils.connect import DatabaseConnection  # noqa: E402
+
+
+def main():
+    """
+    Parse the command line arguments and time the lookup on each backend.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    backends = {
+        "supabase": DatabaseConnection._create_supabase_client,
+        "postgres": DatabaseConnection._create_postgres_client,
+    }
+    for label, create in backends.items():
+        service = CustomerService()
+        service.supabase = create()
+        service.get_customer_by_username(args.username)  # open the connection
+
+        latencies = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            service.get_customer_by_username(args.username)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{label:<9} requests={args.requests} "
+            f"mean={statistics.fmean(latencies):.2f}ms "
+            f"p50={quantiles[49]:.2f}ms p99={quantiles[98]:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
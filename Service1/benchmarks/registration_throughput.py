@@ -0,0 +1,126 @@
+"""
+Registration throughput benchmark for inline and pooled password hashing.
+
+This script serves the customer app on a local threaded WSGI server backed by an
+in-process SQLite database and, for each hashing mode, registers customers from
+concurrent callers while another caller keeps polling ``GET /health``. It
+reports the registration throughput and latency, and the health check latency,
+which shows how much the hashing starves the other routes:
+
+- inline: ``generate_password_hash`` runs in the request thread.
+- pooled: hashing runs in the ``PasswordHasher`` process pool.
+
+Usage:
+    python benchmarks/registration_throughput.py --callers 8 --registrations 200 \\
+        --method scrypt:32768:8:1 --workers 2
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+os.environ["DATABASE_BACKEND"] = "sqlite"
+
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import create_app  # noqa: E402
+from password_hasher import PasswordHasher  # noqa: E402
+from routes import customer_service  # noqa: E402
+
+
+def percentile(latencies, p):
+    return statistics.quantiles(latencies, n=100)[p - 1] if len(latencies) > 1 else 0
+
+
+def run(base_url, label, callers, registrations):
+    """
+    Register customers concurrently while polling the health check.
+
+    Returns:
+        tuple: The registration latencies, the wall-clock duration and the
+        health check latencies, in milliseconds and seconds.
+    """
+    health = []
+    done = threading.Event()
+    limits = httpx.Limits(max_connections=callers + 1)
+
+    with httpx.Client(base_url=base_url, limits=limits, timeout=60) as http:
+
+        def poll():
+            while not done.is_set():
+                start = time.perf_counter()
+                http.get("/health")
+                health.append((time.perf_counter() - start) * 1000)
+                time.sleep(0.01)
+
+        def register(i):
+            start = time.perf_counter()
+            response = http.post(
+                "/api/customers/register",
+                json={
+                    "full_name": "Benchmark Customer",
+                    "username": f"{label}_{i}",
+                    "password": "benchmark-password",
+                    "age": 30,
+                },
+            )
+            response.raise_for_status()
+            return (time.perf_counter() - start) * 1000
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=callers) as pool:
+            latencies = list(pool.map(register, range(registrations)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        poller.join()
+    return latencies, elapsed, health
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark both hashing modes.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--registrations", type=int, default=200)
+    parser.add_argument("--method", default="scrypt:32768:8:1")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    modes = {"inline": 0, "pooled": args.workers}
+    for label, workers in modes.items():
+        hasher = PasswordHasher(method=args.method, workers=workers)
+        customer_service.password_hasher = hasher
+        if workers:
+            hasher.hash("warm-up")  # start the worker processes
+        latencies, elapsed, health = run(
+            base_url, label, args.callers, args.registrations
+        )
+        hasher.shutdown()
+        print(
+            f"{label:<6} workers={workers} registrations={args.registrations} "
+            f"rps={args.registrations / elapsed:.1f} "
+            f"p50={percentile(latencies, 50):.0f}ms "
+            f"p99={percentile(latencies, 99):.0f}ms "
+            f"health_p99={percentile(health, 99):.1f}ms"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Batch wallet operations benchmark for the customer app.
+
+This script serves the customer app on a local threaded WSGI server, creates
+throwaway customers and tops up every wallet twice, to compare:
+
+- loop: one ``POST /api/customers/charge/<username>`` per customer, sent by
+  ``--callers`` concurrent callers.
+- batch: ``POST /api/customers/wallet/batch`` with ``--batch-size`` entries per
+  request, each applied by a single database function call.
+
+It reports the wall-clock duration and the throughput of each mode, and checks
+that every wallet ends up with the expected balance.
+
+Usage:
+    python benchmarks/wallet_batch.py --customers 2000 --callers 8 --batch-size 1000
+
+The benchmark runs against the database configured for the service (set
+``DATABASE_BACKEND=sqlite`` for an in-process database) and deletes the
+customers it created when done.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import create_app  # noqa: E402
+from routes import customer_service  # noqa: E402
+
+
+def charge_loop(http, usernames, amount, callers):
+    """
+    Charge every wallet with one request per customer.
+
+    Returns:
+        float: The wall-clock duration in seconds.
+    """
+
+    def charge(username):
+        response = http.post(
+            f"/api/customers/charge/{username}", json={"amount": amount}
+        )
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(pool.map(charge, usernames))
+    return time.perf_counter() - start
+
+
+def charge_batch(http, usernames, amount, batch_size):
+    """
+    Charge every wallet with batch requests of ``batch_size`` entries.
+
+    Returns:
+        float: The wall-clock duration in seconds.
+    """
+    start = time.perf_counter()
+    for offset in range(0, len(usernames), batch_size):
+        entries = [
+            {"username": username, "amount": amount, "op": "charge"}
+            for username in usernames[offset : offset + batch_size]
+        ]
+        response = http.post("/api/customers/wallet/batch", json=entries)
+        response.raise_for_status()
+        assert response.json()["failed"] == 0, response.json()
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark both modes.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    prefix = f"bench_{uuid.uuid4().hex[:8]}"
+    usernames = [f"{prefix}_{i}" for i in range(args.customers)]
+    for offset in range(0, len(usernames), 1000):
+        customer_service.supabase.table(customer_service.table_name).insert(
+            [
+                {
+                    "full_name": "Benchmark Customer",
+                    "username": username,
+                    "password": "not-a-real-hash",
+                    "age": 30,
+                }
+                for username in usernames[offset : offset + 1000]
+            ]
+        ).execute()
+
+    limits = httpx.Limits(max_connections=args.callers)
+    try:
+        with httpx.Client(base_url=base_url, limits=limits, timeout=300) as http:
+            loop = charge_loop(http, usernames, 1.0, args.callers)
+            batch = charge_batch(http, usernames, 2.0, args.batch_size)
+
+        # In ledger mode the snapshots only hold the balances once compacted
+        if customer_service.wallet_mode == "ledger":
+            customer_service.wallet_ledger.compact()
+        wrong = 0
+        for offset in range(0, len(usernames), 1000):
+            rows = (
+                customer_service.supabase.table(customer_service.table_name)
+                .select("wallet_balance")
+                .in_("username", usernames[offset : offset + 1000])
+                .execute()
+                .data
+            )
+            wrong += sum(row["wallet_balance"] != 3.0 for row in rows)
+        print(
+            f"customers={args.customers} mode={customer_service.wallet_mode}\n"
+            f"loop   callers={args.callers:<5} {loop:7.2f}s "
+            f"{args.customers / loop:8.0f} ops/s\n"
+            f"batch  size={args.batch_size:<7} {batch:7.2f}s "
+            f"{args.customers / batch:8.0f} ops/s ({loop / batch:.1f}x)\n"
+            f"wrong balances={wrong}"
+        )
+    finally:
+        for offset in range(0, len(usernames), 1000):
+            table = customer_service.supabase.table(customer_service.table_name)
+            table.delete().in_("username", usernames[offset : offset + 1000]).execute()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Wallet contention benchmark for the CustomerService.
+
+This script hammers a single customer's wallet from many threads and compares
+the legacy read-modify-write implementation (one SELECT followed by one UPDATE)
+with the atomic ``charge_wallet``/``deduct_wallet`` database functions.
+
+For every strategy it reports the per-call latency percentiles, the throughput
+and the number of lost updates (the difference between the expected and the
+final balance, read from the database rather than the customer cache). A second
+phase fires more deductions than the balance can cover and checks that the wallet
+is never overdrawn.
+
+Usage:
+    python benchmarks/wallet_contention.py --threads 32 --ops 25
+
+The benchmark runs against the database configured for the service, creates a
+throwaway customer and deletes it when done.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from customer_service import CustomerService  # noqa: E402
+
+
+def legacy_charge(service, username, amount):
+    """
+    Charge a wallet the way the service did before the atomic RPC existed.
+
+    The balance is read from the database, not the customer cache, so every call
+    pays the read round trip and races on the row as the legacy code did.
+
+    Args:
+        service (CustomerService): The customer service under test.
+        username (str): The username of the customer to charge.
+        amount (float): The amount to add to the wallet.
+
+    Returns:
+        float: The balance written back to the database.
+    """
+    customer = service._select_customer(username)
+    new_balance = customer["wallet_balance"] + amount
+    service.supabase.table(service.table_name).update(
+        {"wallet_balance": new_balance}
+    ).eq("username", username).execute()
+    return new_balance
+
+
+def legacy_deduct(service, username, amount):
+    """
+    Deduct from a wallet the way the service did before the atomic RPC existed.
+
+    Like ``legacy_charge``, the balance is read from the database.
+
+    Args:
+        service (CustomerService): The customer service under test.
+        username (str): The username of the customer to charge.
+        amount (float): The amount to deduct from the wallet.
+
+    Returns:
+        float: The balance written back to the database.
+
+    Raises:
+        ValueError: If the balance read does not cover the amount.
+    """
+    customer = service._select_customer(username)
+    if customer["wallet_balance"] < amount:
+        raise ValueError("Insufficient funds")
+    new_balance = customer["wallet_balance"] - amount
+    service.supabase.table(service.table_name).update(
+        {"wallet_balance": new_balance}
+    ).eq("username", username).execute()
+    return new_balance
+
+
+def set_balance(service, username, balance):
+    """
+    Reset the wallet balance of the benchmark customer.
+
+    In ledger mode the customer's ledger entries are compacted first, so the
+    snapshot written is the whole balance and no older delta is added to it.
+
+    Args:
+        service (CustomerService): The customer service under test.
+        username (str): The username of the benchmark customer.
+        balance (float): The balance to set.
+    """
+    if service.wallet_mode == "ledger":
+        customer = service._select_customer(username)
+        service.wallet_ledger.compact([customer["customer_id"]])
+    service.supabase.table(service.table_name).update({"wallet_balance": balance}).eq(
+        "username", username
+    ).execute()
+    service.cache.invalidate(username)
+
+
+def hammer(operation, threads, ops):
+    """
+    Run ``operation`` ``threads * ops`` times from ``threads`` concurrent threads.
+
+    Args:
+        operation (callable): A zero-argument callable performing one wallet call.
+        threads (int): The number of concurrent threads.
+        ops (int): The number of calls each thread performs.
+
+    Returns:
+        tuple: The list of per-call latencies in milliseconds, the number of
+        calls that raised, and the wall-clock duration in seconds.
+    """
+
+    def worker():
+        latencies, failures = [], 0
+        for _ in range(ops):
+            start = time.perf_counter()
+            try:
+                operation()
+            except ValueError:
+                failures += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies, failures
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: worker(), range(threads)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for result in results for latency in result[0]]
+    failures = sum(result[1] for result in results)
+    return latencies, failures, elapsed
+
+
+def report(label, latencies, elapsed, **extra):
+    """
+    Print one result line.
+
+    Args:
+        label (str): The name of the strategy being reported.
+        latencies (list[float]): The per-call latencies in milliseconds.
+        elapsed (float): The wall-clock duration in seconds.
+        **extra: Additional ``key=value`` pairs to print.
+    """
+    quantiles = statistics.quantiles(latencies, n=100)
+    details = " ".join(f"{key}={value}" for key, value in extra.items())
+    print(
+        f"{label:<16} calls={len(latencies):<6} "
+        f"p50={quantiles[49]:.1f}ms p95={quantiles[94]:.1f}ms p99={quantiles[98]:.1f}ms "
+        f"throughput={len(latencies) / elapsed:.0f}/s {details}"
+    )
+
+
+def main():
+    """
+    Parse the command line arguments and run both benchmark phases.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=25)
+    parser.add_argument("--amount", type=float, default=1.0)
+    args = parser.parse_args()
+
+    service = CustomerService()
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    service.register_customer(
+        {
+            "full_name": "Wallet Benchmark",
+            "username": username,
+            "password": "benchmark-password",
+            "age": 30,
+        }
+    )
+    total = args.threads * args.ops
+
+    try:
+        print(f"Charging one wallet {total} times from {args.threads} threads")
+        strategies = {
+            "read-modify-write": lambda: legacy_charge(service, username, args.amount),
+            "atomic rpc": lambda: service.charge_wallet(username, args.amount),
+        }
+        for label, operation in strategies.items():
+            set_balance(service, username, 0)
+            latencies, _, elapsed = hammer(operation, args.threads, args.ops)
+            final = service._select_customer(username)["wallet_balance"]
+            lost = round((total * args.amount - final) / args.amount)
+            report(label, latencies, elapsed, final_balance=final, lost_updates=lost)
+
+        print(f"Deducting {total} times from a wallet that covers {total // 2}")
+        strategies = {
+            "read-modify-write": lambda: legacy_deduct(service, username, args.amount),
+            "atomic rpc": lambda: service.deduct_wallet(username, args.amount),
+        }
+        for label, operation in strategies.items():
+            set_balance(service, username, (total // 2) * args.amount)
+            latencies, failures, elapsed = hammer(operation, args.threads, args.ops)
+            final = service._select_customer(username)["wallet_balance"]
+            report(
+                label,
+                latencies,
+                elapsed,
+                successful=total - failures,
+                final_balance=final,
+                overdrawn=final < 0 or total - failures > total // 2,
+            )
+    finally:
+        service.delete_customer(username)
+
+
+if __name__ == "__main__":
+    main()
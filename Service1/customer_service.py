@@ -1,11 +1,26 @@
-from werkzeug.security import generate_password_hash
+from config import Config
+from database_utils.cache import TTLCache
 from database_utils.connect import get_supabase_client
+from database_utils.pagination import iter_pages
+from password_hasher import PasswordHasher
+from username_filter import UsernameFilter
+from wallet_ledger_service import WalletLedgerService
 
 
 class CustomerService:
     """
     A service class to handle customer-related operations.
 
+    Customers looked up by username are kept in a bounded LRU cache with a TTL
+    (``Config.CACHE``), which is invalidated whenever the service changes a customer.
+    The cache is per process: a wallet changed by another replica, or debited by a
+    sales checkout, shows its old balance in lookups for up to the TTL.
+    Passwords are hashed in a bounded process pool (``Config.PASSWORD``) so slow key
+    derivation does not hold the request thread. A Bloom filter of the registered
+    usernames lets registration skip the uniqueness lookup for new usernames.
+    With ``Config.WALLET.MODE`` set to "ledger", wallet operations append to the
+    wallet ledger (``WalletLedgerService``) instead of updating the balance in place.
+
     Methods
     -------
     __init__():
@@ -14,12 +29,24 @@ class CustomerService:
     register_customer(customer_data):
         Registers a new customer with the provided data.
 
+    import_customers(customers):
+        Registers a batch of validated customers, returning the errors of the rejected rows.
+
     get_customer_by_username(username):
         Retrieves a customer by their username.
 
     get_all_customers():
         Retrieves all customers.
 
+    get_customers_page(after=None, limit=100, columns=None):
+        Retrieves one page of customers ordered by ID, starting after the given ID.
+
+    iter_customer_pages(after=None, columns=None, page_size=1000):
+        Yields every page of customers after the given ID, reading the table lazily.
+
+    iter_customers(after=None, columns=None, page_size=1000):
+        Yields every customer after the given ID, reading the table lazily one page at a time.
+
     update_customer(username, update_data):
         Updates customer information based on the provided username and update data.
 
@@ -31,49 +58,185 @@ class CustomerService:
 
     deduct_wallet(username, amount):
         Deducts money from a customer's wallet based on the provided username and amount.
+
+    apply_wallet_batch(entries):
+        Applies a batch of wallet charges and deductions in one transaction.
+
+    get_wallet_history(username, before=None, limit=100):
+        Retrieves one page of a customer's wallet ledger entries, newest first.
+
+    cache_stats():
+        Returns the size and hit/miss counters of the customer cache.
+
+    hashing_stats():
+        Returns the queue depth and counters of the password hasher.
+
+    username_filter_stats():
+        Returns the state and counters of the username Bloom filter.
+
+    wallet_ledger_stats():
+        Returns the compaction counters of the wallet ledger.
     """
 
     def __init__(self):
         """
         Initializes the CustomerService class.
 
-        Sets up the Supabase client and specifies the table name for customer data.
+        Sets up the Supabase client, specifies the table name for customer data and
+        creates the customer cache, the password hasher, the username filter and
+        the wallet ledger.
         """
         self.supabase = get_supabase_client()
         self.table_name = "customer"
+        self.public_columns = (
+            "customer_id",
+            "full_name",
+            "username",
+            "age",
+            "address",
+            "gender",
+            "wallet_balance",
+            "created_at",
+        )
+        self.insert_columns = (
+            "full_name",
+            "username",
+            "password",
+            "age",
+            "address",
+            "gender",
+        )
+        self.cache = TTLCache(Config.CACHE.CUSTOMER_MAX_SIZE, Config.CACHE.CUSTOMER_TTL)
+        self.password_hasher = PasswordHasher()
+        self.username_filter = UsernameFilter(
+            lambda: self.iter_customer_pages(columns=["username"])
+        )
+        self.wallet_mode = Config.WALLET.MODE
+        self.wallet_ledger = WalletLedgerService(self.supabase)
 
     def register_customer(self, customer_data):
         """
         Register a new customer
         """
-        # Check if username already exists
-        existing_user = self.get_customer_by_username(customer_data["username"])
-        if existing_user:
-            raise ValueError("Username already exists")
+        username = customer_data["username"]
+
+        # Check if username already exists, unless the filter knows it is new
+        if self.username_filter.might_exist(username):
+            if self.get_customer_by_username(username):
+                raise ValueError("Username already exists")
 
         # Hash the password
-        customer_data["password"] = generate_password_hash(customer_data["password"])
+        customer_data["password"] = self.password_hasher.hash(customer_data["password"])
 
-        # Insert customer
+        # Insert customer; the unique index on username is the final check
         try:
             response = (
                 self.supabase.table(self.table_name).insert(customer_data).execute()
             )
-            return response.data[0] if response.data else None
         except Exception as e:
+            if getattr(e, "code", None) == "23505":
+                raise ValueError("Username already exists")
             raise ValueError(f"Error registering customer: {str(e)}")
+        customer = response.data[0] if response.data else None
+        self.cache.invalidate(username)
+        self.username_filter.add(username)
+        return customer
+
+    def import_customers(self, customers):
+        """
+        Register a batch of validated customers
+
+        Usernames already taken, in the table or earlier in the batch, are rejected
+        with a single query, the passwords are hashed in parallel and the batch is
+        inserted with one multi-row insert. If the database rejects the batch, its
+        rows are inserted one by one so only the failing rows are rejected.
+
+        Returns a dict with the number of customers inserted and the error message
+        of each rejected customer, by its position in the batch.
+        """
+        if not customers:
+            return {"inserted": 0, "errors": {}}
+
+        errors = {}
+        usernames = set()
+        for index, customer in enumerate(customers):
+            if customer["username"] in usernames:
+                errors[index] = "Username already exists"
+            usernames.add(customer["username"])
+
+        try:
+            response = (
+                self.supabase.table(self.table_name)
+                .select("username")
+                .in_("username", list(usernames))
+                .execute()
+            )
+        except Exception as e:
+            raise ValueError(f"Error importing customers: {str(e)}")
+        taken = {row["username"] for row in response.data}
+
+        pending = []
+        for index, customer in enumerate(customers):
+            if index in errors:
+                continue
+            if customer["username"] in taken:
+                errors[index] = "Username already exists"
+                continue
+            row = {column: customer.get(column) for column in self.insert_columns}
+            pending.append((index, row))
+
+        hashes = self.password_hasher.hash_many([row["password"] for _, row in pending])
+        for (_, row), password_hash in zip(pending, hashes):
+            row["password"] = password_hash
+
+        inserted = []
+        try:
+            rows = [row for _, row in pending]
+            if rows:
+                self.supabase.table(self.table_name).insert(rows).execute()
+            inserted = rows
+        except Exception:
+            for index, row in pending:
+                try:
+                    self.supabase.table(self.table_name).insert(row).execute()
+                    inserted.append(row)
+                except Exception as e:
+                    if getattr(e, "code", None) == "23505":
+                        errors[index] = "Username already exists"
+                    else:
+                        errors[index] = f"Error registering customer: {str(e)}"
+
+        for row in inserted:
+            self.username_filter.add(row["username"])
+        self.cache.invalidate(*(row["username"] for row in inserted))
+        return {"inserted": len(inserted), "errors": errors}
 
     def get_customer_by_username(self, username):
         """
-        Retrieve a customer by username
+        Retrieve a customer by username, from the cache when possible
+
+        The wallet balance may be up to ``Config.CACHE.CUSTOMER_TTL`` seconds old
+        when the wallet was changed outside this process.
         """
+        customer = self.cache.get_or_load(
+            username, lambda: self._select_customer(username)
+        )
+        return dict(customer) if customer else None
+
+    def _select_customer(self, username):
         response = (
             self.supabase.table(self.table_name)
             .select("*")
             .eq("username", username)
             .execute()
         )
-        return response.data[0] if response.data else None
+        customer = response.data[0] if response.data else None
+        if customer and self.wallet_mode == "ledger":
+            # The stored balance is only the last compacted snapshot
+            customer["wallet_balance"] = self.wallet_ledger.get_balance(
+                customer["customer_id"]
+            )
+        return customer
 
     def get_all_customers(self):
         """
@@ -82,6 +245,51 @@ class CustomerService:
         response = self.supabase.table(self.table_name).select("*").execute()
         return response.data
 
+    def get_customers_page(self, after=None, limit=100, columns=None):
+        """
+        Retrieve one page of customers ordered by customer_id, after the given ID
+
+        In ledger mode the wallet balances of the page are read from the ledger in
+        one query, so they match the balance of a lookup by username.
+        """
+        columns = list(columns or self.public_columns)
+        if "customer_id" not in columns:
+            columns.insert(0, "customer_id")
+        try:
+            query = self.supabase.table(self.table_name).select(",".join(columns))
+            if after is not None:
+                query = query.gt("customer_id", after)
+            response = query.order("customer_id").limit(limit).execute()
+        except Exception as e:
+            raise ValueError(f"Error retrieving customers: {str(e)}")
+        customers = response.data
+        if customers and self.wallet_mode == "ledger" and "wallet_balance" in columns:
+            # The stored balances are only the last compacted snapshots
+            balances = self.wallet_ledger.get_balances(
+                [customer["customer_id"] for customer in customers]
+            )
+            for customer in customers:
+                customer["wallet_balance"] = balances[customer["customer_id"]]
+        return customers
+
+    def iter_customer_pages(self, after=None, columns=None, page_size=1000):
+        """
+        Yield every page of customers after the given ID, reading them lazily
+        """
+        return iter_pages(
+            lambda after, limit: self.get_customers_page(after, limit, columns),
+            lambda customer: customer["customer_id"],
+            after,
+            page_size,
+        )
+
+    def iter_customers(self, after=None, columns=None, page_size=1000):
+        """
+        Yield every customer after the given ID, reading one page from the database at a time
+        """
+        for page in self.iter_customer_pages(after, columns, page_size):
+            yield from page
+
     def update_customer(self, username, update_data):
         """
         Update customer information
@@ -96,9 +304,13 @@ class CustomerService:
                 .eq("username", username)
                 .execute()
             )
+            if response.data and "username" in update_data:
+                self.username_filter.add(update_data["username"])
             return response.data[0] if response.data else None
         except Exception as e:
             raise ValueError(f"Error updating customer: {str(e)}")
+        finally:
+            self.cache.invalidate(username, update_data.get("username"))
 
     def delete_customer(self, username):
         """
@@ -111,60 +323,116 @@ class CustomerService:
                 .eq("username", username)
                 .execute()
             )
+            for customer in response.data or []:
+                self.username_filter.remove(customer["username"])
             return True
         except Exception as e:
             raise ValueError(f"Error deleting customer: {str(e)}")
+        finally:
+            self.cache.invalidate(username)
 
     def charge_wallet(self, username, amount):
         """
         Add money to customer's wallet
+
+        The balance is updated by the ``charge_wallet`` database function in a
+        single round trip, so concurrent charges can never overwrite each other. In
+        ledger mode the charge is appended to the wallet ledger instead.
         """
+        if self.wallet_mode == "ledger":
+            try:
+                return self.wallet_ledger.charge(username, amount)
+            finally:
+                self.cache.invalidate(username)
         try:
-            # First, get current balance
-            current_customer = self.get_customer_by_username(username)
-            if not current_customer:
-                raise ValueError("Customer not found")
-
-            new_balance = current_customer["wallet_balance"] + amount
-
-            # Update wallet balance
-            response = (
-                self.supabase.table(self.table_name)
-                .update({"wallet_balance": new_balance})
-                .eq("username", username)
-                .execute()
-            )
-
-            return new_balance
+            response = self.supabase.rpc(
+                "charge_wallet", {"p_username": username, "p_amount": amount}
+            ).execute()
+            return response.data
         except Exception as e:
             raise ValueError(f"Error charging wallet: {str(e)}")
+        finally:
+            self.cache.invalidate(username)
 
     def deduct_wallet(self, username, amount):
         """
         Deduct money from customer's wallet
+
+        The balance check and the update are one conditional ``UPDATE`` inside the
+        ``deduct_wallet`` database function, so the wallet can never be overdrawn
+        by concurrent deductions. In ledger mode the debit is appended to the wallet
+        ledger instead.
         """
+        if self.wallet_mode == "ledger":
+            try:
+                return self.wallet_ledger.deduct(username, amount)
+            finally:
+                self.cache.invalidate(username)
         try:
-            # First, get current balance
-            current_customer = self.get_customer_by_username(username)
-            if not current_customer:
-                raise ValueError("Customer not found")
+            response = self.supabase.rpc(
+                "deduct_wallet", {"p_username": username, "p_amount": amount}
+            ).execute()
+            return response.data
+        except Exception as e:
+            raise ValueError(f"Error deducting from wallet: {str(e)}")
+        finally:
+            self.cache.invalidate(username)
 
-            current_balance = current_customer["wallet_balance"]
+    def apply_wallet_batch(self, entries):
+        """
+        Apply a batch of wallet charges and deductions in one transaction
 
-            # Check if sufficient funds
-            if current_balance < amount:
-                raise ValueError("Insufficient funds")
+        The whole batch is one database function call, so a payroll or refund run
+        costs a single round trip instead of one request per customer. Entries are
+        applied in order and each result holds the new balance, or the error of an
+        entry that could not be applied (an unknown customer or insufficient funds)
+        without failing the rest of the batch.
+        """
+        if not entries:
+            return []
+        try:
+            if self.wallet_mode == "ledger":
+                return self.wallet_ledger.apply_batch(entries)
+            response = self.supabase.rpc(
+                "apply_wallet_batch", {"p_entries": entries}
+            ).execute()
+            return response.data
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error applying wallet batch: {str(e)}")
+        finally:
+            self.cache.invalidate(*{entry["username"] for entry in entries})
 
-            new_balance = current_balance - amount
+    def get_wallet_history(self, username, before=None, limit=100):
+        """
+        Retrieve one page of a customer's wallet ledger entries, newest first
+        """
+        customer = self.get_customer_by_username(username)
+        if not customer:
+            raise ValueError("Customer not found")
+        return self.wallet_ledger.get_history(customer["customer_id"], before, limit)
 
-            # Update wallet balance
-            response = (
-                self.supabase.table(self.table_name)
-                .update({"wallet_balance": new_balance})
-                .eq("username", username)
-                .execute()
-            )
+    def cache_stats(self):
+        """
+        Return the size and hit/miss counters of the customer cache
+        """
+        return self.cache.stats()
 
-            return new_balance
-        except Exception as e:
-            raise ValueError(f"Error deducting from wallet: {str(e)}")
+    def hashing_stats(self):
+        """
+        Return the queue depth and counters of the password hasher
+        """
+        return self.password_hasher.stats()
+
+    def username_filter_stats(self):
+        """
+        Return the state and counters of the username Bloom filter
+        """
+        return self.username_filter.stats()
+
+    def wallet_ledger_stats(self):
+        """
+        Return the compaction counters of the wallet ledger
+        """
+        return self.wallet_ledger.stats()
@@ -0,0 +1,90 @@
+import hashlib
+import math
+import threading
+
+
+class CountingBloomFilter:
+    """
+    A thread-safe counting Bloom filter of strings.
+
+    Membership tests never give false negatives: a key that was added and not
+    removed is always reported as present, while a key that was never added is
+    reported as present with a probability close to ``error_rate`` as long as at
+    most ``capacity`` keys are stored. A negative answer can therefore be trusted
+    to skip a database lookup, and a positive answer only means "maybe".
+
+    Each slot holds an 8-bit counter rather than a bit, so keys can be removed. A
+    counter that reaches 255 stays saturated and is never decremented, which can
+    only cause false positives. Only remove keys that are known to have been added.
+
+    Attributes:
+        capacity (int): The number of keys the filter is sized for.
+        error_rate (float): The target false positive rate at capacity.
+        size (int): The number of counters.
+        hashes (int): The number of counters each key maps to.
+        count (int): The number of keys currently stored.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            1, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._counters = bytearray(self.size)
+        self._lock = threading.Lock()
+
+    def _slots(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """
+        Add a key to the filter.
+        """
+        slots = self._slots(key)
+        with self._lock:
+            for slot in slots:
+                if self._counters[slot] < 255:
+                    self._counters[slot] += 1
+            self.count += 1
+
+    def remove(self, key):
+        """
+        Remove a key that was previously added.
+        """
+        slots = self._slots(key)
+        with self._lock:
+            if not all(self._counters[slot] for slot in slots):
+                return
+            for slot in slots:
+                if self._counters[slot] < 255:
+                    self._counters[slot] -= 1
+            self.count -= 1
+
+    def __contains__(self, key):
+        slots = self._slots(key)
+        with self._lock:
+            return all(self._counters[slot] for slot in slots)
+
+    def stats(self):
+        """
+        Return the size, load and estimated false positive rate of the filter.
+
+        Returns:
+            dict: The filter statistics.
+        """
+        with self._lock:
+            fill_ratio = (self.size - self._counters.count(0)) / self.size
+            return {
+                "capacity": self.capacity,
+                "count": self.count,
+                "size": self.size,
+                "hashes": self.hashes,
+                "fill_ratio": fill_ratio,
+                "false_positive_rate": fill_ratio**self.hashes,
+            }
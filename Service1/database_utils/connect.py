@@ -1,42 +1,147 @@
-from supabase import create_client
+import os
+import threading
+
+from httpx import Limits, Timeout
+from postgrest.utils import SyncClient
+from supabase import ClientOptions, create_client
 from config import Config
+from database_utils.postgres import PostgresClient
+from database_utils.sqlite import SQLiteClient
 
 
 class DatabaseConnection:
     """
     A singleton class to manage the database connection using Supabase.
 
-    This class ensures that only one instance of the database connection 
+    This class ensures that only one instance of the database connection
     is created and reused throughout the application.
+    ``Config.DATABASE.BACKEND`` selects the client: ``"supabase"`` (the
+    default) talks to PostgREST over HTTP, ``"postgres"`` runs SQL
+    directly over a psycopg2 connection pool, and ``"sqlite"`` runs the
+    schema in an in-process SQLite database for local benchmarks.
+
+    The instance is safe to share between the threads of a multi-threaded
+    WSGI server: it is created under a lock, and its PostgREST HTTP session
+    is a single thread-safe connection pool. After a fork (for example in a
+    pre-forking WSGI server) the child process builds its own instance
+    instead of sharing the parent's sockets.
 
     :ivar _instance: The single instance of the database connection.
     :type _instance: SupabaseClient
+    :ivar _lock: Guards the creation of the instance.
+    :type _lock: threading.Lock
     """
 
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         """
         Returns the single instance of the database connection.
 
-        If the instance does not exist, it creates one using the Supabase 
-        URL and KEY from the configuration.
+        If the instance does not exist, it creates one for the configured
+        backend: a Supabase client using the URL and KEY from the configuration,
+        with the HTTP connection pool, HTTP/2 and timeouts configured from
+        ``Config.SUPABASE``, or a ``PostgresClient`` or ``SQLiteClient`` using
+        ``Config.DATABASE``.
 
         :return: The Supabase client instance
         :rtype: SupabaseClient
         :raises ValueError: If Supabase URL or KEY is not found in environment variables
         """
         if cls._instance is None:
-            url = Config.SUPABASE.URL
-            key = Config.SUPABASE.KEY
-            if not url or not key:
-                raise ValueError(
-                    "Supabase URL or KEY not found in environment variables"
-                )
-            cls._instance = create_client(url, key)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls._create_client()
         return cls._instance
 
+    @classmethod
+    def reset(cls):
+        """
+        Drops the current instance so the next call to ``get_instance``
+        creates a new one.
+        """
+        cls._instance = None
+        cls._lock = threading.Lock()
+
+    @staticmethod
+    def _create_client():
+        """
+        Creates the client of the configured backend.
+
+        :return: The database client instance
+        :rtype: SupabaseClient, PostgresClient or SQLiteClient
+        """
+        if Config.DATABASE.BACKEND == "postgres":
+            return DatabaseConnection._create_postgres_client()
+        if Config.DATABASE.BACKEND == "sqlite":
+            return SQLiteClient(Config.DATABASE.SQLITE_PATH)
+        return DatabaseConnection._create_supabase_client()
+
+    @staticmethod
+    def _create_postgres_client():
+        """
+        Creates a client running SQL over a psycopg2 connection pool.
+
+        :return: The Postgres client instance
+        :rtype: PostgresClient
+        """
+        return PostgresClient(
+            {
+                "host": Config.DATABASE.HOST,
+                "port": Config.DATABASE.PORT,
+                "database": Config.DATABASE.NAME,
+                "user": Config.DATABASE.USER,
+                "password": Config.DATABASE.PASSWORD,
+            },
+            min_connections=Config.DATABASE.POOL_MIN_CONNECTIONS,
+            max_connections=Config.DATABASE.POOL_MAX_CONNECTIONS,
+        )
+
+    @staticmethod
+    def _create_supabase_client():
+        """
+        Creates a Supabase client whose PostgREST session uses the configured pool.
+
+        :return: The Supabase client instance
+        :rtype: SupabaseClient
+        :raises ValueError: If Supabase URL or KEY is not found in environment variables
+        """
+        url = Config.SUPABASE.URL
+        key = Config.SUPABASE.KEY
+        if not url or not key:
+            raise ValueError("Supabase URL or KEY not found in environment variables")
+
+        timeout = Timeout(
+            Config.SUPABASE.TIMEOUT, connect=Config.SUPABASE.CONNECT_TIMEOUT
+        )
+        client = create_client(
+            url, key, options=ClientOptions(postgrest_client_timeout=timeout)
+        )
+
+        # Replace the default PostgREST session with one using the configured pool
+        postgrest = client.postgrest
+        default_session = postgrest.session
+        postgrest.session = SyncClient(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=timeout,
+            limits=Limits(
+                max_connections=Config.SUPABASE.POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.SUPABASE.POOL_MAX_KEEPALIVE,
+                keepalive_expiry=Config.SUPABASE.KEEPALIVE_EXPIRY,
+            ),
+            http2=Config.SUPABASE.HTTP2,
+            follow_redirects=True,
+        )
+        default_session.close()
+        return client
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DatabaseConnection.reset)
+
 
 def get_supabase_client():
     """
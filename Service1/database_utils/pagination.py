@@ -0,0 +1,25 @@
+def iter_pages(fetch_page, key, after=None, page_size=1000):
+    """
+    Yield every page of a keyset-paginated listing, reading one page at a time.
+
+    Keyset pagination reads the rows after the key of the last row of the previous
+    page instead of skipping an offset, so each page is an index range scan on the
+    key and costs the same however deep the listing goes.
+
+    Args:
+        fetch_page (callable): Called with the cursor and the page size; returns the
+            rows after the cursor, in key order.
+        key (callable): Returns the cursor of a row.
+        after: The cursor to start after, or None to start from the first row.
+        page_size (int): The number of rows read per call.
+
+    Yields:
+        list: The non-empty pages of rows, until a page comes back short.
+    """
+    while True:
+        page = fetch_page(after, page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = key(page[-1])
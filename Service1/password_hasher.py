@@ -0,0 +1,148 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from werkzeug.security import generate_password_hash
+
+from config import Config
+
+
+class PasswordHasher:
+    """
+    Hashes passwords in a bounded pool of worker processes.
+
+    Key derivation is deliberately slow, and running it in the request thread holds a
+    WSGI worker (and the GIL) for the whole computation. The hasher runs
+    werkzeug's ``generate_password_hash`` in a ``ProcessPoolExecutor`` instead, so
+    request threads only wait on the result, and at most ``max_pending`` hashes are
+    handed to the pool at once: further callers block until a slot frees up, which
+    bounds the work queued behind a burst of registrations.
+
+    The pool is started lazily on the first hash and again in a forked child
+    process. With ``workers`` set to 0 passwords are hashed inline.
+
+    Attributes:
+        method (str): The werkzeug hashing method and cost, e.g. "scrypt:32768:8:1".
+        workers (int): The number of worker processes; 0 hashes in the calling thread.
+        max_pending (int): The maximum number of hashes submitted to the pool at once.
+    """
+
+    def __init__(self, method=None, workers=None, max_pending=None):
+        self.method = method or Config.PASSWORD.HASH_METHOD
+        self.workers = Config.PASSWORD.HASH_WORKERS if workers is None else workers
+        self.max_pending = max_pending or Config.PASSWORD.HASH_MAX_PENDING
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending = 0
+        self._waiting = 0
+        self._hashed = 0
+
+    def hash(self, password):
+        """
+        Hash a password with the configured method.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The salted hash, as produced by ``generate_password_hash``.
+        """
+        if self.workers <= 0:
+            password_hash = generate_password_hash(password, method=self.method)
+            self._count(hashed=1)
+            return password_hash
+
+        self._count(waiting=1)
+        with self._slots:
+            self._count(waiting=-1, pending=1)
+            try:
+                future = self._get_executor().submit(
+                    generate_password_hash, password, self.method
+                )
+                return future.result()
+            finally:
+                self._count(pending=-1, hashed=1)
+
+    def hash_many(self, passwords):
+        """
+        Hash several passwords, spreading them over the worker processes.
+
+        The batch takes a single slot of the pool's queue bound and is sent to the
+        workers in chunks, so a bulk import keeps every worker busy.
+
+        Args:
+            passwords (list[str]): The plain-text passwords.
+
+        Returns:
+            list[str]: The hashes, in the order of the passwords.
+        """
+        passwords = list(passwords)
+        if self.workers <= 0 or len(passwords) <= 1:
+            return [self.hash(password) for password in passwords]
+
+        self._count(waiting=1)
+        with self._slots:
+            self._count(waiting=-1, pending=len(passwords))
+            try:
+                chunksize = max(1, len(passwords) // (self.workers * 4))
+                return list(
+                    self._get_executor().map(
+                        generate_password_hash,
+                        passwords,
+                        repeat(self.method),
+                        chunksize=chunksize,
+                    )
+                )
+            finally:
+                self._count(pending=-len(passwords), hashed=len(passwords))
+
+    def stats(self):
+        """
+        Return the queue depth and counters of the hasher.
+
+        Returns:
+            dict: The hashing method, the number of workers, the hashes running or
+            queued in the pool ("pending"), the callers waiting for a slot
+            ("waiting"), their sum ("queue_depth") and the number of hashes computed.
+        """
+        with self._lock:
+            return {
+                "method": self.method,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "waiting": self._waiting,
+                "queue_depth": self._pending + self._waiting,
+                "hashed": self._hashed,
+            }
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
+
+    def _count(self, pending=0, waiting=0, hashed=0):
+        with self._lock:
+            self._pending += pending
+            self._waiting += waiting
+            self._hashed += hashed
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # Workers are spawned, not forked, as forking a multi-threaded
+                # server can copy locks held by other threads into the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pid = os.getpid()
+            return self._executor
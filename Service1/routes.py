@@ -1,8 +1,21 @@
+import json
+
 from customer_service import CustomerService
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from marshmallow import ValidationError
 
-from serializers.customer_serializer import customer_schema, customers_schema
+from serializers.customer_serializer import CustomerSchema, customer_schema
+from serializers.wallet_serializer import wallet_operations_schema
+
+# Page sizes accepted by the customer listing
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Number of customers accepted by one bulk import request
+MAX_BULK_ROWS = 5000
+
+# Number of wallet operations accepted by one batch request
+MAX_WALLET_BATCH = 10000
 
 # Create a blueprint for customer routes
 customer_bp = Blueprint("customer", __name__)
@@ -34,6 +47,62 @@ def register_customer():
         return jsonify({"error": "Registration Error", "message": str(err)}), 409
 
 
+@customer_bp.route("/bulk", methods=["POST"])
+def import_customers():
+    """
+    Register a batch of customers, reporting the rejected rows without aborting
+    """
+    rows = request.json
+    if isinstance(rows, dict):
+        rows = rows.get("customers")
+    if not isinstance(rows, list) or len(rows) > MAX_BULK_ROWS:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Request",
+                    "message": "Expected a list of at most "
+                    f"{MAX_BULK_ROWS} customers",
+                }
+            ),
+            400,
+        )
+
+    # Validate the whole batch, keeping the rows that passed
+    try:
+        loaded = [vars(customer) for customer in CustomerSchema(many=True).load(rows)]
+        validation_errors = {}
+    except ValidationError as err:
+        loaded = err.valid_data
+        validation_errors = err.messages
+    valid = [index for index in range(len(rows)) if index not in validation_errors]
+
+    try:
+        result = customer_service.import_customers([loaded[index] for index in valid])
+    except ValueError as err:
+        return jsonify({"error": "Import Error", "message": str(err)}), 500
+
+    errors = [
+        {"index": index, "messages": messages}
+        for index, messages in validation_errors.items()
+    ]
+    errors += [
+        {"index": valid[position], "messages": [message]}
+        for position, message in result["errors"].items()
+    ]
+    errors.sort(key=lambda error: error["index"])
+    return (
+        jsonify(
+            {
+                "received": len(rows),
+                "inserted": result["inserted"],
+                "failed": len(errors),
+                "errors": errors,
+            }
+        ),
+        200,
+    )
+
+
 @customer_bp.route("/delete/<username>", methods=["DELETE"])
 def delete_customer(username):
     """
@@ -72,18 +141,194 @@ def update_customer(username):
         return jsonify({"error": "Update Error", "message": str(err)}), 404
 
 
+def _parse_listing_args(args):
+    """
+    Validate the pagination, projection and streaming query parameters
+    """
+    after = args.get("after", type=int)
+    limit = args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if after is not None and after < 0:
+        raise ValueError("after must be a non-negative customer ID")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    fields = None
+    if args.get("fields"):
+        fields = [name.strip() for name in args["fields"].split(",") if name.strip()]
+        unknown = set(fields) - set(customer_service.public_columns)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    stream = args.get("stream", "").lower() in ("1", "true") or (
+        request.accept_mimetypes.best == "application/x-ndjson"
+    )
+    return after, limit, fields, stream
+
+
 @customer_bp.route("/all", methods=["GET"])
 def get_all_customers():
     """
-    Retrieve all customers
+    Retrieve customers one page at a time, or stream all of them as NDJSON
+
+    Query parameters:
+        after: Only return customers whose ID is greater (the previous page's next_after).
+        limit: The page size, at most MAX_PAGE_SIZE.
+        fields: A comma-separated list of the columns to return.
+        stream: When true (or with ``Accept: application/x-ndjson``), stream every
+            customer after ``after`` as newline-delimited JSON, reading ``limit``
+            customers from the database at a time.
     """
     try:
-        customers = customer_service.get_all_customers()
-        return jsonify({"customers": customers_schema.dump(customers)}), 200
+        after, limit, fields, stream = _parse_listing_args(request.args)
+    except ValueError as err:
+        return jsonify({"error": "Invalid Query", "message": str(err)}), 400
+
+    if stream:
+        schema = CustomerSchema(many=True, only=fields)
+
+        def generate():
+            # One chunk per database page keeps memory bounded by the page size
+            pages = customer_service.iter_customer_pages(after, fields, limit)
+            for page in pages:
+                yield "".join(json.dumps(row) + "\n" for row in schema.dump(page))
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    try:
+        customers = customer_service.get_customers_page(after, limit, fields)
+        next_after = customers[-1]["customer_id"] if len(customers) == limit else None
+        schema = CustomerSchema(many=True, only=fields)
+        return (
+            jsonify({"customers": schema.dump(customers), "next_after": next_after}),
+            200,
+        )
     except Exception as err:
         return jsonify({"error": "Retrieval Error", "message": str(err)}), 500
 
 
+@customer_bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """
+    Retrieve the hit/miss counters of the customer cache
+    """
+    return jsonify({"cache": customer_service.cache_stats()}), 200
+
+
+@customer_bp.route("/hashing/stats", methods=["GET"])
+def get_hashing_stats():
+    """
+    Retrieve the queue depth and counters of the password hasher
+    """
+    return jsonify({"hashing": customer_service.hashing_stats()}), 200
+
+
+@customer_bp.route("/username-filter/stats", methods=["GET"])
+def get_username_filter_stats():
+    """
+    Retrieve the state and counters of the username Bloom filter
+    """
+    return jsonify({"username_filter": customer_service.username_filter_stats()}), 200
+
+
+@customer_bp.route("/wallet/batch", methods=["POST"])
+def apply_wallet_batch():
+    """
+    Apply a batch of wallet charges and deductions, reporting each entry's result
+    """
+    entries = request.json
+    if isinstance(entries, dict):
+        entries = entries.get("entries")
+    if not isinstance(entries, list) or len(entries) > MAX_WALLET_BATCH:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Request",
+                    "message": "Expected a list of at most "
+                    f"{MAX_WALLET_BATCH} wallet operations",
+                }
+            ),
+            400,
+        )
+
+    # Validate the whole batch, applying only the entries that passed
+    try:
+        loaded = wallet_operations_schema.load(entries)
+        validation_errors = {}
+    except ValidationError as err:
+        loaded = err.valid_data
+        validation_errors = err.messages
+    valid = [index for index in range(len(entries)) if index not in validation_errors]
+
+    try:
+        applied = customer_service.apply_wallet_batch([loaded[i] for i in valid])
+    except ValueError as err:
+        return jsonify({"error": "Batch Error", "message": str(err)}), 500
+
+    results = [
+        {"index": index, "error": "Validation Error", "messages": messages}
+        for index, messages in validation_errors.items()
+    ]
+    for result in applied:
+        index = valid[result["entry_index"]]
+        entry = {"index": index, "username": loaded[index]["username"]}
+        if result["error"]:
+            entry["error"] = result["error"]
+        else:
+            entry["new_balance"] = result["new_balance"]
+        results.append(entry)
+    results.sort(key=lambda result: result["index"])
+
+    failed = sum("error" in result for result in results)
+    return (
+        jsonify(
+            {
+                "applied": len(results) - failed,
+                "failed": failed,
+                "results": results,
+            }
+        ),
+        200,
+    )
+
+
+@customer_bp.route("/wallet-ledger/stats", methods=["GET"])
+def get_wallet_ledger_stats():
+    """
+    Get the compaction counters of the wallet ledger
+    """
+    return jsonify({"wallet_ledger": customer_service.wallet_ledger_stats()}), 200
+
+
+@customer_bp.route("/wallet/<username>/history", methods=["GET"])
+def get_wallet_history(username):
+    """
+    Retrieve a customer's wallet ledger entries one page at a time, newest first
+
+    Query parameters:
+        before: Only return entries whose ID is smaller (the previous page's next_before).
+        limit: The page size, at most MAX_PAGE_SIZE.
+    """
+    before = request.args.get("before", type=int)
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Query",
+                    "message": f"limit must be between 1 and {MAX_PAGE_SIZE}",
+                }
+            ),
+            400,
+        )
+
+    try:
+        entries = customer_service.get_wallet_history(username, before, limit)
+    except ValueError as err:
+        return jsonify({"error": "Retrieval Error", "message": str(err)}), 404
+    next_before = entries[-1]["entry_id"] if len(entries) == limit else None
+    return jsonify({"entries": entries, "next_before": next_before}), 200
+
+
 @customer_bp.route("/<username>", methods=["GET"])
 def get_customer_by_username(username):
     """
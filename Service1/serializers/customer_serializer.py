@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields, post_load, validate
+from datetime import datetime
+
+from marshmallow import Schema, fields, post_load, pre_dump, validate
 from marshmallow.validate import OneOf
 
 from models.customer import Customer
@@ -21,6 +23,7 @@ class CustomerSchema(Schema):
         created_at (datetime): The timestamp when the customer was created. This field is read-only.
 
     Methods:
+        parse_created_at(data, **kwargs): Parses the ISO 8601 created_at string returned by the database.
         make_customer(data, **kwargs): Creates a Customer instance from the deserialized data.
     """
     customer_id = fields.Int(dump_only=True)
@@ -65,6 +68,12 @@ class CustomerSchema(Schema):
     wallet_balance = fields.Float(dump_only=True)
     created_at = fields.DateTime(dump_only=True)
 
+    @pre_dump
+    def parse_created_at(self, data, **kwargs):
+        if isinstance(data, dict) and isinstance(data.get("created_at"), str):
+            data = {**data, "created_at": datetime.fromisoformat(data["created_at"])}
+        return data
+
     @post_load
     def make_customer(self, data, **kwargs):
         return Customer(**data)
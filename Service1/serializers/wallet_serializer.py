@@ -0,0 +1,29 @@
+from marshmallow import Schema, fields, validate
+from marshmallow.validate import OneOf
+
+
+class WalletOperationSchema(Schema):
+    """
+    WalletOperationSchema is a Marshmallow schema for deserializing the entries of a batch of wallet operations.
+
+    Attributes:
+        username (str): The username of the customer whose wallet is changed.
+        amount (float): The amount to charge or deduct. Must be greater than 0.
+        op (str): The operation to apply. Must be "charge" or "deduct".
+    """
+
+    username = fields.Str(required=True)
+    amount = fields.Float(
+        required=True,
+        validate=validate.Range(min=0, min_inclusive=False),
+        error_messages={"validator_failed": "Amount must be a positive number"},
+    )
+    op = fields.Str(
+        required=True,
+        validate=OneOf(["charge", "deduct"]),
+        error_messages={"validator_failed": "Operation must be charge or deduct"},
+    )
+
+
+# Create schema instances
+wallet_operations_schema = WalletOperationSchema(many=True)
@@ -0,0 +1,54 @@
+from database_utils.bloom import CountingBloomFilter
+
+
+def test_added_keys_are_always_found():
+    """
+    Test that the filter has no false negatives.
+
+    Asserts:
+        - Every added key is reported as present.
+        - The number of stored keys is tracked.
+    """
+    bloom = CountingBloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"user{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert bloom.count == 1000
+
+
+def test_false_positive_rate_at_capacity():
+    """
+    Test that the false positive rate stays near the target at capacity.
+
+    Asserts:
+        - Fewer than 3% of never-added keys are reported as present for a 1% target.
+        - The estimated false positive rate is close to the target.
+    """
+    bloom = CountingBloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"user{i}")
+    false_positives = sum(f"other{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    assert bloom.stats()["false_positive_rate"] < 0.02
+
+
+def test_remove_key():
+    """
+    Test removing keys from the filter.
+
+    Asserts:
+        - A removed key is no longer reported as present.
+        - Other keys are still present.
+        - Removing a key that was never added leaves the filter unchanged.
+    """
+    bloom = CountingBloomFilter(capacity=100, error_rate=0.01)
+    bloom.add("alice")
+    bloom.add("bob")
+    bloom.remove("alice")
+    assert "alice" not in bloom
+    assert "bob" in bloom
+
+    bloom.remove("carol")
+    assert "bob" in bloom
+    assert bloom.count == 1
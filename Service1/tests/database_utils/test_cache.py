@@ -0,0 +1,249 @@
+from database_utils.cache import TTLCache
+
+
+class FakeClock:
+    """
+    A manually advanced clock for testing expiry.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_or_load_caches_value():
+    """
+    Test that a loaded value is served from the cache on the next lookup.
+
+    Asserts:
+        - The loader is only called on the first lookup.
+        - The hit and miss counters are updated.
+    """
+    cache = TTLCache(max_size=10, ttl=30)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"username": "johndoe"}
+
+    assert cache.get_or_load("johndoe", loader) == {"username": "johndoe"}
+    assert cache.get_or_load("johndoe", loader) == {"username": "johndoe"}
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_missing_values_are_not_cached():
+    """
+    Test that a loader returning None is called again on the next lookup.
+
+    Asserts:
+        - Both lookups miss and nothing is cached.
+    """
+    cache = TTLCache(max_size=10, ttl=30)
+    assert cache.get_or_load("ghost", lambda: None) is None
+    assert cache.get_or_load("ghost", lambda: None) is None
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_expire_after_ttl():
+    """
+    Test that an entry is reloaded once its time-to-live has passed.
+
+    Asserts:
+        - The entry is served until the TTL expires, then reloaded.
+    """
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=5, clock=clock)
+    cache.set("key", "old")
+    clock.now = 4.9
+    assert cache.get("key") == "old"
+    clock.now = 5.0
+    assert cache.get_or_load("key", lambda: "new") == "new"
+
+
+def test_least_recently_used_entry_is_evicted():
+    """
+    Test that the least recently used entry is evicted when the cache is full.
+
+    Asserts:
+        - The entry that was not read recently is evicted.
+        - The eviction counter is updated.
+    """
+    cache = TTLCache(max_size=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidation_during_load_is_not_overwritten():
+    """
+    Test that a value loaded before an invalidation is not cached after it.
+
+    Asserts:
+        - The loaded value is returned but not cached.
+    """
+    cache = TTLCache(max_size=10, ttl=30)
+
+    def loader():
+        cache.invalidate("key")  # a concurrent write
+        return "stale"
+
+    assert cache.get_or_load("key", loader) == "stale"
+    assert cache.get("key") is None
+
+
+class FakeSharedTier:
+    """
+    An in-memory stand-in for a shared cache tier.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return (self.values[key], 2.0) if key in self.values else None
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def stats(self):
+        return {"size": len(self.values)}
+
+
+def test_write_through_caches_written_row():
+    """
+    Test that the row returned by a write replaces the cached row.
+
+    Asserts:
+        - The written row is returned and served from the cache afterwards.
+        - A write returning None drops the key.
+    """
+    cache = TTLCache(max_size=10, ttl=30)
+    cache.set("1", {"stock_count": 5})
+    assert cache.write_through("1", lambda: {"stock_count": 4}) == {"stock_count": 4}
+    assert cache.get("1") == {"stock_count": 4}
+
+    assert cache.write_through("1", lambda: None) is None
+    assert cache.get("1") is None
+
+
+def test_failed_write_drops_key():
+    """
+    Test that a write raising an exception drops the cached row.
+
+    Asserts:
+        - The exception is re-raised and the key is no longer cached.
+    """
+    cache = TTLCache(max_size=10, ttl=30)
+    cache.set("1", {"stock_count": 5})
+
+    def writer():
+        raise RuntimeError("Not enough stock")
+
+    try:
+        cache.write_through("1", writer)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("The write error was swallowed")
+    assert cache.get("1") is None
+
+
+def test_load_started_before_write_is_not_cached():
+    """
+    Test that a row read before a write is not cached after the write.
+
+    Asserts:
+        - The row written during the load is cached, not the one the load read.
+        - The dropped load is counted as a stale drop.
+    """
+    cache = TTLCache(max_size=10, ttl=30)
+
+    def loader():
+        cache.write_through("1", lambda: {"stock_count": 4})  # a concurrent write
+        return {"stock_count": 5}
+
+    assert cache.get_or_load("1", loader) == {"stock_count": 5}
+    assert cache.get("1") == {"stock_count": 4}
+    assert cache.stats()["stale_drops"] == 1
+
+
+def test_racing_writes_drop_key():
+    """
+    Test that the key is dropped when two writes of it overlap.
+
+    Asserts:
+        - Neither written row is cached, since their order is unknown.
+    """
+    cache = TTLCache(max_size=10, ttl=30)
+
+    def writer():
+        cache.write_through("1", lambda: {"stock_count": 3})  # a concurrent write
+        return {"stock_count": 4}
+
+    cache.write_through("1", writer)
+    assert cache.get("1") is None
+
+
+def test_shared_tier_is_used_on_local_miss():
+    """
+    Test that a local miss is answered from the shared tier before the loader.
+
+    Asserts:
+        - A value loaded by one cache is served to another through the shared tier.
+        - Writes and invalidations update the shared tier.
+        - The shared hits and their age are reported in the statistics.
+    """
+    shared = FakeSharedTier()
+    first = TTLCache(max_size=10, ttl=30, shared=shared)
+    second = TTLCache(max_size=10, ttl=30, shared=shared)
+
+    assert first.get_or_load("1", lambda: {"stock_count": 5}) == {"stock_count": 5}
+    assert shared.values["1"] == {"stock_count": 5}
+    assert second.get_or_load("1", lambda: None) == {"stock_count": 5}
+
+    second.write_through("1", lambda: {"stock_count": 4})
+    assert shared.values["1"] == {"stock_count": 4}
+    first.invalidate("1")
+    assert "1" not in shared.values
+
+    stats = second.stats()
+    assert stats["shared_hits"] == 1
+    assert stats["misses"] == 0
+    assert stats["served_age_max"] == 2.0
+    assert stats["shared"] == {"size": 0}
+
+
+def test_stats_report_served_age():
+    """
+    Test that the statistics report the age of the values served from the cache.
+
+    Asserts:
+        - The mean and maximum age of the served values are reported.
+    """
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=30, clock=clock)
+    cache.set("key", "value")
+    clock.now = 1.0
+    cache.get_or_load("key", lambda: None)
+    clock.now = 3.0
+    cache.get_or_load("key", lambda: None)
+
+    stats = cache.stats()
+    assert stats["served_age_mean"] == 2.0
+    assert stats["served_age_max"] == 3.0
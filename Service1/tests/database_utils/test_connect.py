@@ -1,24 +1,43 @@
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from config import Config
 from database_utils.connect import DatabaseConnection, get_supabase_client
+from database_utils.postgres import PostgresClient
+from database_utils.sqlite import SQLiteClient
 
 
 @pytest.fixture
-def mock_create_client():
+def mock_session_class():
+    """
+    Fixture to mock the `SyncClient` HTTP session class used by the `database_utils.connect` module.
+
+    Yields:
+        unittest.mock.MagicMock: A mock object that replaces the `SyncClient` class.
+    """
+    with patch("database_utils.connect.SyncClient") as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_create_client(mock_session_class):
     """
     Fixture to mock the `create_client` function from the `database_utils.connect` module.
 
     This fixture uses the `patch` function from the `unittest.mock` module to replace the
     `create_client` function with a mock object for the duration of the test. The mock object
     is yielded to the test function, allowing it to be used and inspected within the test.
+    The singleton is reset before and after the test so every test builds its own client.
 
     Yields:
         unittest.mock.MagicMock: A mock object that replaces the `create_client` function.
     """
+    DatabaseConnection.reset()
     with patch("database_utils.connect.create_client") as mock:
         yield mock
+    DatabaseConnection.reset()
 
 
 def test_get_instance_creates_client(mock_create_client):
@@ -73,3 +92,125 @@ def test_get_supabase_client(mock_create_client):
     mock_create_client.return_value = MagicMock()
     client = get_supabase_client()
     assert client is not None
+
+
+def test_get_instance_configures_connection_pool(
+    mock_create_client, mock_session_class
+):
+    """
+    Test that the PostgREST session of the client uses the pool settings from the configuration.
+
+    Args:
+        mock_create_client (MagicMock): A mock object for the client creation method.
+        mock_session_class (MagicMock): A mock object for the HTTP session class.
+
+    Asserts:
+        - The PostgREST session is replaced by the configured session.
+        - The session is created with HTTP/2 and the configured connection limits.
+        - The default session is closed.
+    """
+    client = MagicMock()
+    default_session = client.postgrest.session
+    mock_create_client.return_value = client
+
+    DatabaseConnection.get_instance()
+
+    kwargs = mock_session_class.call_args.kwargs
+    assert client.postgrest.session is mock_session_class.return_value
+    assert kwargs["http2"] == Config.SUPABASE.HTTP2
+    assert kwargs["limits"].max_connections == Config.SUPABASE.POOL_MAX_CONNECTIONS
+    assert (
+        kwargs["limits"].max_keepalive_connections == Config.SUPABASE.POOL_MAX_KEEPALIVE
+    )
+    default_session.close.assert_called_once()
+
+
+def test_get_instance_is_thread_safe(mock_create_client):
+    """
+    Test that concurrent calls to `DatabaseConnection.get_instance` create a single client.
+
+    Args:
+        mock_create_client (MagicMock): A mock object for the client creation method.
+
+    Asserts:
+        - Every thread receives the same client instance.
+        - The client is created exactly once.
+    """
+    mock_create_client.return_value = MagicMock()
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def worker():
+        barrier.wait()
+        clients.append(DatabaseConnection.get_instance())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(client is clients[0] for client in clients)
+    mock_create_client.assert_called_once()
+
+
+def test_reset_creates_new_client(mock_create_client):
+    """
+    Test that `DatabaseConnection.reset` makes the next call create a new client,
+    as happens in a child process after a fork.
+
+    Args:
+        mock_create_client (MagicMock): A mock object for the client creation method.
+
+    Asserts:
+        The client created after the reset is a different instance.
+    """
+    mock_create_client.side_effect = [MagicMock(), MagicMock()]
+    first_client = DatabaseConnection.get_instance()
+    DatabaseConnection.reset()
+    second_client = DatabaseConnection.get_instance()
+    assert first_client is not second_client
+
+
+def test_get_instance_uses_postgres_backend(mock_create_client, monkeypatch):
+    """
+    Test that the "postgres" backend makes `get_instance` return a PostgresClient
+    instead of creating a Supabase client.
+
+    Args:
+        mock_create_client (MagicMock): A mock object for the client creation method.
+        monkeypatch: A pytest fixture used to override the configured backend.
+
+    Asserts:
+        - The client is a PostgresClient.
+        - No Supabase client is created.
+    """
+    monkeypatch.setattr(Config.DATABASE, "BACKEND", "postgres")
+
+    client = DatabaseConnection.get_instance()
+
+    assert isinstance(client, PostgresClient)
+    mock_create_client.assert_not_called()
+
+
+def test_get_instance_uses_sqlite_backend(mock_create_client, monkeypatch):
+    """
+    Test that the "sqlite" backend makes `get_instance` return a SQLiteClient
+    on the configured database file instead of creating a Supabase client.
+
+    Args:
+        mock_create_client (MagicMock): A mock object for the client creation method.
+        monkeypatch: A pytest fixture used to override the configured backend.
+
+    Asserts:
+        - The client is a SQLiteClient using the configured path.
+        - No Supabase client is created.
+    """
+    monkeypatch.setattr(Config.DATABASE, "BACKEND", "sqlite")
+    monkeypatch.setattr(Config.DATABASE, "SQLITE_PATH", ":memory:")
+
+    client = DatabaseConnection.get_instance()
+
+    assert isinstance(client, SQLiteClient)
+    assert client.path == ":memory:"
+    mock_create_client.assert_not_called()
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from database_utils.cache import TTLCache
+from database_utils.shared_cache import SharedCacheClient, SharedCacheServer
+
+
+@pytest.fixture
+def server():
+    """
+    Fixture serving a shared cache server on a free local port.
+
+    Yields:
+        SharedCacheServer: The running server.
+    """
+    server = SharedCacheServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    """
+    Fixture providing a client of the shared cache server.
+
+    Yields:
+        SharedCacheClient: The client under test.
+    """
+    client = SharedCacheClient(
+        f"http://127.0.0.1:{server.server_port}", "product", timeout=5
+    )
+    yield client
+    client.close()
+
+
+def test_set_get_delete(client):
+    """
+    Test storing, reading and dropping a value.
+
+    Asserts:
+        - A stored value is returned with its age.
+        - A missing or dropped key is a miss.
+    """
+    assert client.get("1") is None
+    client.set("1", {"product_id": 1, "price": 9.99})
+    value, age = client.get("1")
+    assert value == {"product_id": 1, "price": 9.99}
+    assert 0 <= age < 5
+
+    client.delete("1")
+    assert client.get("1") is None
+    assert client.stats()["errors"] == 0
+
+
+def test_keys_are_namespaced(server, client):
+    """
+    Test that the keys of different namespaces do not collide.
+
+    Asserts:
+        - A key stored in one namespace is a miss in another.
+    """
+    other = SharedCacheClient(f"http://127.0.0.1:{server.server_port}", "customer")
+    client.set("1", "product")
+    assert other.get("1") is None
+    other.close()
+
+
+def test_unavailable_server_is_a_miss():
+    """
+    Test that requests to an unavailable server are counted errors, not failures.
+
+    Asserts:
+        - Reads miss, writes are ignored and the errors are counted.
+    """
+    client = SharedCacheClient("http://127.0.0.1:1", "product", timeout=0.5)
+    assert client.get("1") is None
+    client.set("1", "value")
+    client.delete("1")
+    assert client.stats()["errors"] == 3
+    client.close()
+
+
+def test_shared_tier_of_ttl_cache(client):
+    """
+    Test two caches sharing their lookups through the server.
+
+    Asserts:
+        - A value loaded by one cache is served to the other without loading.
+    """
+    first = TTLCache(max_size=10, ttl=30, shared=client)
+    second = TTLCache(max_size=10, ttl=30, shared=client)
+    first.get_or_load("1", lambda: {"stock_count": 5})
+    assert second.get_or_load("1", lambda: None) == {"stock_count": 5}
+    assert second.stats()["shared_hits"] == 1
@@ -160,3 +160,28 @@ def test_optional_fields(valid_customer_data):
     assert result.address is None
     assert result.gender is None
     assert result.marital_status is None
+
+
+def test_dump_database_row():
+    """
+    Test dumping a customer row as returned by the database.
+
+    The database returns the creation timestamp as an ISO 8601 string, which the
+    schema must accept when dumping the customer.
+
+    Asserts:
+        The 'created_at' field is dumped as an ISO 8601 timestamp.
+        The 'password' field is not dumped.
+    """
+    row = {
+        "customer_id": 1,
+        "full_name": "John Doe",
+        "username": "johndoe",
+        "password": "hashed",
+        "age": 30,
+        "wallet_balance": 10.5,
+        "created_at": "2024-11-01T12:30:00.123456",
+    }
+    result = CustomerSchema().dump(row)
+    assert result["created_at"] == "2024-11-01T12:30:00.123456"
+    assert "password" not in result
@@ -0,0 +1,45 @@
+import pytest
+from marshmallow import ValidationError
+
+from serializers.wallet_serializer import WalletOperationSchema
+
+
+def test_valid_wallet_operations():
+    """
+    Test that a batch of valid wallet operations is deserialized.
+
+    Asserts:
+        - The entries are loaded as dictionaries with a float amount.
+    """
+    entries = WalletOperationSchema(many=True).load(
+        [
+            {"username": "johndoe", "amount": 10, "op": "charge"},
+            {"username": "janedoe", "amount": "2.5", "op": "deduct"},
+        ]
+    )
+    assert entries[0] == {"username": "johndoe", "amount": 10.0, "op": "charge"}
+    assert entries[1]["amount"] == 2.5
+
+
+def test_invalid_wallet_operations():
+    """
+    Test that invalid wallet operations are reported by their position.
+
+    Asserts:
+        - A non-positive amount, an unknown operation and a missing username are rejected.
+        - The valid entry is kept in the valid data.
+    """
+    with pytest.raises(ValidationError) as excinfo:
+        WalletOperationSchema(many=True).load(
+            [
+                {"username": "johndoe", "amount": 0, "op": "charge"},
+                {"username": "johndoe", "amount": 5, "op": "refund"},
+                {"amount": 5, "op": "charge"},
+                {"username": "janedoe", "amount": 5, "op": "charge"},
+            ]
+        )
+    assert set(excinfo.value.messages) == {0, 1, 2}
+    assert "amount" in excinfo.value.messages[0]
+    assert "op" in excinfo.value.messages[1]
+    assert "username" in excinfo.value.messages[2]
+    assert excinfo.value.valid_data[3]["username"] == "janedoe"
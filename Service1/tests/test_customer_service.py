@@ -2,6 +2,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 from customer_service import CustomerService
+from postgrest.exceptions import APIError
 
 
 @pytest.fixture
@@ -52,6 +53,7 @@ def test_register_customer_success(customer_service, mock_supabase):
         3. Assert: Verify that the result of the method call matches the provided customer data.
     Asserts:
         - The result of the `register_customer` method should be equal to the provided customer data.
+        - The password is hashed by the password hasher before it is stored.
     """
     # Arrange
     customer_data = {
@@ -63,10 +65,15 @@ def test_register_customer_success(customer_service, mock_supabase):
     mock_supabase.table().select().eq().execute.return_value.data = []
 
     # Act
-    result = customer_service.register_customer(customer_data)
+    with patch.object(
+        customer_service.password_hasher, "hash", return_value="hashed"
+    ) as mock_hash:
+        result = customer_service.register_customer(customer_data)
 
     # Assert
     assert result == customer_data
+    mock_hash.assert_called_once_with("password123")
+    assert customer_data["password"] == "hashed"
 
 
 def test_register_customer_existing_username(customer_service, mock_supabase):
@@ -182,48 +189,93 @@ def test_charge_wallet_success(customer_service, mock_supabase):
     """
     Test the successful charging of a customer's wallet.
     This test verifies that the `charge_wallet` method of the `customer_service`
-    correctly updates the wallet balance when a valid amount is charged.
+    charges the wallet through the atomic `charge_wallet` database function and
+    returns the new balance it reports.
     Args:
         customer_service (CustomerService): The customer service instance to be tested.
         mock_supabase (Mock): A mock instance of the Supabase client.
     Arrange:
         - Set the current wallet balance to 100.
         - Set the amount to be charged to 50.
-        - Mock the Supabase `select` method to return the current wallet balance.
-        - Mock the Supabase `update` method to return the updated wallet balance.
+        - Mock the Supabase `rpc` call to return the updated wallet balance.
     Act:
         - Call the `charge_wallet` method with the test user and the amount to be charged.
     Assert:
         - Verify that the result of the `charge_wallet` method is the updated wallet balance.
+        - Verify that the RPC was called with the username and amount, in a single round trip.
     """
     # Arrange
     current_balance = 100
     amount = 50
-    mock_supabase.table().select().eq().execute.return_value.data = [
-        {"wallet_balance": current_balance}
-    ]
-    mock_supabase.table().update().eq().execute.return_value.data = [
-        {"wallet_balance": current_balance + amount}
-    ]
+    mock_supabase.rpc.return_value.execute.return_value.data = current_balance + amount
 
     # Act
     result = customer_service.charge_wallet("testuser", amount)
 
     # Assert
     assert result == current_balance + amount
+    mock_supabase.rpc.assert_called_once_with(
+        "charge_wallet", {"p_username": "testuser", "p_amount": amount}
+    )
+    mock_supabase.table.assert_not_called()
+
+
+def test_charge_wallet_customer_not_found(customer_service, mock_supabase):
+    """
+    Test charging the wallet of a customer that does not exist.
+    This test verifies that an error raised by the `charge_wallet` database function
+    is surfaced as a `ValueError` carrying the database message.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - A `ValueError` is raised with the message "Customer not found".
+    """
+    # Arrange
+    mock_supabase.rpc.return_value.execute.side_effect = Exception("Customer not found")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Customer not found"):
+        customer_service.charge_wallet("missinguser", 50)
+
+
+def test_deduct_wallet_success(customer_service, mock_supabase):
+    """
+    Test the successful deduction from a customer's wallet.
+    This test verifies that the `deduct_wallet` method of the `customer_service`
+    deducts through the atomic `deduct_wallet` database function and returns the
+    new balance it reports.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - The result of the `deduct_wallet` method is the updated wallet balance.
+        - The RPC was called with the username and amount.
+    """
+    # Arrange
+    mock_supabase.rpc.return_value.execute.return_value.data = 30
+
+    # Act
+    result = customer_service.deduct_wallet("testuser", 20)
+
+    # Assert
+    assert result == 30
+    mock_supabase.rpc.assert_called_once_with(
+        "deduct_wallet", {"p_username": "testuser", "p_amount": 20}
+    )
 
 
 def test_deduct_wallet_insufficient_funds(customer_service, mock_supabase):
     """
     Test case for deducting an amount from the customer's wallet when there are insufficient funds.
     This test verifies that the `deduct_wallet` method of the `customer_service` raises a `ValueError`
-    with the message "Insufficient funds" when attempting to deduct an amount greater than the available
-    wallet balance.
+    with the message "Insufficient funds" when the `deduct_wallet` database function rejects the
+    deduction because the wallet balance does not cover it.
     Args:
         customer_service: An instance of the customer service being tested.
         mock_supabase: A mock object for the Supabase client.
     Setup:
-        - Mocks the Supabase client's response to return a wallet balance of 10 for the user.
+        - Mocks the Supabase RPC call to raise the "Insufficient funds" database error.
     Test Steps:
         1. Attempt to deduct 20 from the wallet balance of the user "testuser".
         2. Assert that a `ValueError` is raised with the message "Insufficient funds".
@@ -231,10 +283,327 @@ def test_deduct_wallet_insufficient_funds(customer_service, mock_supabase):
         ValueError: If the wallet balance is insufficient to cover the deduction amount.
     """
     # Arrange
-    mock_supabase.table().select().eq().execute.return_value.data = [
-        {"wallet_balance": 10}
-    ]
+    mock_supabase.rpc.return_value.execute.side_effect = Exception("Insufficient funds")
 
     # Act & Assert
     with pytest.raises(ValueError, match="Insufficient funds"):
         customer_service.deduct_wallet("testuser", 20)
+
+
+def test_get_customer_by_username_uses_cache(customer_service, mock_supabase):
+    """
+    Test that repeated lookups of a username are served from the customer cache.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - Both lookups return the customer.
+        - The database is queried only once.
+        - The cache statistics record one miss and one hit.
+    """
+    # Arrange
+    customer = {"username": "testuser", "wallet_balance": 100}
+    execute = mock_supabase.table().select().eq().execute
+    execute.return_value.data = [customer]
+
+    # Act
+    first = customer_service.get_customer_by_username("testuser")
+    second = customer_service.get_customer_by_username("testuser")
+
+    # Assert
+    assert first == second == customer
+    execute.assert_called_once()
+    stats = customer_service.cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_changes_invalidate_cached_customer(customer_service, mock_supabase):
+    """
+    Test that updating a customer or changing their wallet drops the cached customer.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - The customer is read from the database again after each change.
+    """
+    # Arrange
+    execute = mock_supabase.table().select().eq().execute
+    execute.return_value.data = [{"username": "testuser", "wallet_balance": 100}]
+    mock_supabase.rpc.return_value.execute.return_value.data = 150
+    mock_supabase.table().update().eq().execute.return_value.data = []
+    mock_supabase.table().delete().eq().execute.return_value.data = []
+    customer_service.get_customer_by_username("testuser")
+
+    # Act & Assert
+    customer_service.charge_wallet("testuser", 50)
+    customer_service.get_customer_by_username("testuser")
+    assert execute.call_count == 2
+
+    customer_service.update_customer("testuser", {"age": 31})
+    customer_service.get_customer_by_username("testuser")
+    assert execute.call_count == 3
+
+    customer_service.delete_customer("testuser")
+    customer_service.get_customer_by_username("testuser")
+    assert execute.call_count == 4
+
+
+def test_get_customers_page(customer_service, mock_supabase):
+    """
+    Test reading one page of customers after a cursor.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - The customer ID is always selected with the requested columns.
+        - Customers are filtered after the cursor, ordered by ID and limited to the page size.
+    """
+    # Arrange
+    query = mock_supabase.table().select()
+    query.gt().order().limit().execute.return_value.data = [{"customer_id": 11}]
+
+    # Act
+    result = customer_service.get_customers_page(10, 50, ["username"])
+
+    # Assert
+    assert result == [{"customer_id": 11}]
+    mock_supabase.table().select.assert_called_with("customer_id,username")
+    query.gt.assert_called_with("customer_id", 10)
+    query.gt().order.assert_called_with("customer_id")
+    query.gt().order().limit.assert_called_with(50)
+
+
+def test_iter_customers_reads_pages_lazily(customer_service):
+    """
+    Test that iterating over customers reads one page at a time until a short page.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+    Asserts:
+        - Every customer of every page is yielded in order.
+        - Each page starts after the last customer of the previous page.
+    """
+    pages = [
+        [{"customer_id": 1}, {"customer_id": 2}],
+        [{"customer_id": 3}, {"customer_id": 4}],
+        [{"customer_id": 5}],
+    ]
+    with patch.object(
+        customer_service, "get_customers_page", side_effect=pages
+    ) as mock_page:
+        customers = customer_service.iter_customers(page_size=2)
+        assert next(customers) == {"customer_id": 1}
+        assert mock_page.call_count == 1
+        assert [c["customer_id"] for c in customers] == [2, 3, 4, 5]
+
+    assert [call.args[0] for call in mock_page.call_args_list] == [None, 2, 4]
+
+
+def test_register_new_username_skips_lookup(customer_service, mock_supabase):
+    """
+    Test that a username the filter knows is new is registered without a lookup.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - The customer is inserted without querying the username first.
+        - The username is added to the filter.
+    """
+    # Arrange
+    customer_data = {"username": "newuser", "password": "password123"}
+    mock_supabase.table().insert().execute.return_value.data = [customer_data]
+    customer_service.username_filter.ready.set()
+
+    # Act
+    with patch.object(customer_service.password_hasher, "hash", return_value="x"):
+        result = customer_service.register_customer(customer_data)
+
+    # Assert
+    assert result == customer_data
+    mock_supabase.table().select().eq().execute.assert_not_called()
+    assert customer_service.username_filter.might_exist("newuser")
+
+
+def test_register_customer_unique_violation(customer_service, mock_supabase):
+    """
+    Test that the unique index on username rejects a duplicate the filter missed.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - A unique violation (23505) raises "Username already exists".
+    """
+    # Arrange
+    customer_service.username_filter.ready.set()
+    mock_supabase.table().insert().execute.side_effect = APIError(
+        {"message": "duplicate key value", "code": "23505"}
+    )
+
+    # Act & Assert
+    with patch.object(customer_service.password_hasher, "hash", return_value="x"):
+        with pytest.raises(ValueError, match="^Username already exists$"):
+            customer_service.register_customer(
+                {"username": "raceuser", "password": "password123"}
+            )
+
+
+def test_import_customers(customer_service, mock_supabase):
+    """
+    Test importing a batch of customers with taken and repeated usernames.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - Taken usernames are looked up with a single query.
+        - A taken username and a username repeated in the batch are rejected.
+        - The other customers are hashed and inserted with one multi-row insert.
+    """
+    # Arrange
+    customers = [
+        {"full_name": "New User", "username": "newuser", "password": "pw1"},
+        {"full_name": "Old User", "username": "olduser", "password": "pw2"},
+        {"full_name": "New Again", "username": "newuser", "password": "pw3"},
+    ]
+    mock_supabase.table().select().in_().execute.return_value.data = [
+        {"username": "olduser"}
+    ]
+
+    # Act
+    with patch.object(
+        customer_service.password_hasher, "hash_many", return_value=["hash1"]
+    ) as mock_hash_many:
+        result = customer_service.import_customers(customers)
+
+    # Assert
+    assert result == {
+        "inserted": 1,
+        "errors": {1: "Username already exists", 2: "Username already exists"},
+    }
+    assert list(mock_hash_many.call_args.args[0]) == ["pw1"]
+    inserted_rows = mock_supabase.table().insert.call_args.args[0]
+    assert [row["password"] for row in inserted_rows] == ["hash1"]
+    assert customer_service.username_filter.bloom.count == 1
+
+
+def test_import_customers_isolates_failing_rows(customer_service, mock_supabase):
+    """
+    Test that a rejected batch is retried row by row.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - Only the row rejected by the database is reported, with its error.
+        - The other rows are inserted.
+    """
+    # Arrange
+    customers = [
+        {"username": "user1", "password": "pw1"},
+        {"username": "user2", "password": "pw2"},
+    ]
+    mock_supabase.table().select().in_().execute.return_value.data = []
+    duplicate = APIError({"message": "duplicate key value", "code": "23505"})
+    mock_supabase.table().insert().execute.side_effect = [duplicate, None, duplicate]
+
+    # Act
+    with patch.object(
+        customer_service.password_hasher, "hash_many", return_value=["h1", "h2"]
+    ):
+        result = customer_service.import_customers(customers)
+
+    # Assert
+    assert result == {"inserted": 1, "errors": {1: "Username already exists"}}
+
+
+def test_ledger_mode_appends_to_wallet_ledger(customer_service, mock_supabase):
+    """
+    Test that wallet operations go to the wallet ledger in ledger mode.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - Charges and deductions are appended through the ledger service.
+        - The balance update functions are not called.
+        - Looked up customers carry the exact ledger balance.
+    """
+    # Arrange
+    customer_service.wallet_mode = "ledger"
+    ledger = customer_service.wallet_ledger
+    mock_supabase.table().select().eq().execute.return_value.data = [
+        {"customer_id": 1, "username": "testuser", "wallet_balance": 10.0}
+    ]
+
+    # Act
+    with patch.object(ledger, "charge", return_value=60.0) as mock_charge, patch.object(
+        ledger, "deduct", return_value=40.0
+    ) as mock_deduct, patch.object(ledger, "get_balance", return_value=40.0):
+        charged = customer_service.charge_wallet("testuser", 50.0)
+        deducted = customer_service.deduct_wallet("testuser", 20.0)
+        customer = customer_service.get_customer_by_username("testuser")
+
+    # Assert
+    assert (charged, deducted) == (60.0, 40.0)
+    mock_charge.assert_called_once_with("testuser", 50.0)
+    mock_deduct.assert_called_once_with("testuser", 20.0)
+    mock_supabase.rpc.assert_not_called()
+    assert customer["wallet_balance"] == 40.0
+
+
+def test_ledger_mode_lists_ledger_balances(customer_service, mock_supabase):
+    """
+    Test that listed customers carry their ledger balance in ledger mode.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - The balances of the page are read from the ledger in one call.
+        - The snapshot balance is replaced by the ledger balance.
+        - Pages without the wallet balance column do not read the ledger.
+    """
+    # Arrange
+    customer_service.wallet_mode = "ledger"
+    ledger = customer_service.wallet_ledger
+    query = mock_supabase.table().select()
+    query.order().limit().execute.return_value.data = [
+        {"customer_id": 1, "wallet_balance": 10.0},
+        {"customer_id": 2, "wallet_balance": 0.0},
+    ]
+
+    # Act
+    with patch.object(
+        ledger, "get_balances", return_value={1: 25.0, 2: 5.0}
+    ) as mock_get_balances:
+        customers = customer_service.get_customers_page()
+        customer_service.get_customers_page(columns=["username"])
+
+    # Assert
+    mock_get_balances.assert_called_once_with([1, 2])
+    assert [customer["wallet_balance"] for customer in customers] == [25.0, 5.0]
+
+
+def test_apply_wallet_batch(customer_service, mock_supabase):
+    """
+    Test applying a batch of wallet operations with a single database call.
+    Args:
+        customer_service (CustomerService): The customer service instance to be tested.
+        mock_supabase (Mock): A mock instance of the Supabase client.
+    Asserts:
+        - The batch is sent to the apply_wallet_batch function in one call.
+        - The cached customers of the batch are invalidated.
+    """
+    # Arrange
+    entries = [
+        {"username": "user1", "amount": 10.0, "op": "charge"},
+        {"username": "user2", "amount": 5.0, "op": "deduct"},
+    ]
+    results = [{"entry_index": 0, "new_balance": 10.0, "error": None}]
+    mock_supabase.rpc.return_value.execute.return_value.data = results
+    customer_service.cache.set("user1", {"username": "user1"})
+
+    # Act
+    result = customer_service.apply_wallet_batch(entries)
+
+    # Assert
+    assert result == results
+    mock_supabase.rpc.assert_called_once_with(
+        "apply_wallet_batch", {"p_entries": entries}
+    )
+    assert customer_service.cache.get("user1") is None
@@ -0,0 +1,141 @@
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from password_hasher import PasswordHasher
+
+# A cheap method keeps the tests fast
+FAST_METHOD = "pbkdf2:sha256:1000"
+
+
+@pytest.fixture
+def mock_executor_class():
+    """
+    Fixture replacing the ProcessPoolExecutor with a mock.
+
+    Yields:
+        MagicMock: The mock executor class.
+    """
+    with patch("password_hasher.ProcessPoolExecutor") as executor_class:
+        yield executor_class
+
+
+def test_hash_inline():
+    """
+    Test hashing in the calling thread when no workers are configured.
+
+    Asserts:
+        - The hash uses the configured method and verifies the password.
+        - The hash is counted.
+    """
+    hasher = PasswordHasher(method=FAST_METHOD, workers=0)
+    password_hash = hasher.hash("password123")
+    assert password_hash.startswith("pbkdf2:sha256:1000$")
+    assert check_password_hash(password_hash, "password123")
+    assert hasher.stats()["hashed"] == 1
+
+
+def test_hash_in_worker_process():
+    """
+    Test hashing in a real worker process.
+
+    Asserts:
+        - The hash computed by the worker verifies the password.
+    """
+    hasher = PasswordHasher(method=FAST_METHOD, workers=1)
+    try:
+        assert check_password_hash(hasher.hash("password123"), "password123")
+    finally:
+        hasher.shutdown()
+
+
+def test_hash_submits_to_pool(mock_executor_class):
+    """
+    Test that the hasher submits werkzeug's hashing function to the pool.
+
+    Args:
+        mock_executor_class (MagicMock): The mock executor class.
+
+    Asserts:
+        - The pool is created once with the configured number of workers.
+        - The password and method are submitted and the result is returned.
+        - The queue is empty once the hash is done.
+    """
+    future = Future()
+    future.set_result("hashed")
+    executor = mock_executor_class.return_value
+    executor.submit.return_value = future
+    hasher = PasswordHasher(method=FAST_METHOD, workers=3)
+
+    assert hasher.hash("password123") == "hashed"
+    assert hasher.hash("password123") == "hashed"
+
+    mock_executor_class.assert_called_once()
+    assert mock_executor_class.call_args.kwargs["max_workers"] == 3
+    executor.submit.assert_called_with(
+        generate_password_hash, "password123", FAST_METHOD
+    )
+    stats = hasher.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["hashed"] == 2
+
+
+def test_pending_hashes_are_bounded(mock_executor_class):
+    """
+    Test that callers wait once max_pending hashes are in the pool.
+
+    Args:
+        mock_executor_class (MagicMock): The mock executor class.
+
+    Asserts:
+        - Only max_pending hashes are submitted; the other caller waits.
+        - The queue depth counts both.
+        - The waiting caller is submitted once a slot frees up.
+    """
+    futures = [Future(), Future()]
+    executor = mock_executor_class.return_value
+    executor.submit.side_effect = futures
+    hasher = PasswordHasher(method=FAST_METHOD, workers=1, max_pending=1)
+
+    threads = [
+        threading.Thread(target=hasher.hash, args=("password123",)) for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while hasher.stats()["queue_depth"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stats = hasher.stats()
+    assert (stats["pending"], stats["waiting"], stats["queue_depth"]) == (1, 1, 2)
+    assert executor.submit.call_count == 1
+
+    futures[0].set_result("first")
+    futures[1].set_result("second")
+    for thread in threads:
+        thread.join(timeout=5)
+    assert executor.submit.call_count == 2
+    assert hasher.stats()["queue_depth"] == 0
+
+
+def test_hash_many_in_worker_processes():
+    """
+    Test hashing a batch of passwords in real worker processes.
+
+    Asserts:
+        - Every hash verifies its own password, in order.
+        - The batch is counted and nothing is left pending.
+    """
+    hasher = PasswordHasher(method=FAST_METHOD, workers=2)
+    passwords = [f"password{i}" for i in range(10)]
+    try:
+        hashes = hasher.hash_many(passwords)
+    finally:
+        hasher.shutdown()
+    assert all(map(check_password_hash, hashes, passwords))
+    stats = hasher.stats()
+    assert (stats["hashed"], stats["pending"]) == (10, 0)
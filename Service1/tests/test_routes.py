@@ -1,3 +1,4 @@
+import json
 from unittest.mock import patch
 
 import pytest
@@ -113,7 +114,7 @@ def test_delete_customer_not_found(client):
     Test case for deleting a customer that does not exist.
 
     This test simulates the scenario where an attempt is made to delete a customer
-    who is not found in the system. It mocks the `delete_customer` method of the 
+    who is not found in the system. It mocks the `delete_customer` method of the
     `customer_service` to raise a `ValueError` indicating that the customer is not found.
     The test then verifies that the response status code is 404 and the error message
     in the response JSON is "Deletion Error".
@@ -137,7 +138,7 @@ def test_update_customer(client):
     Test the update_customer route.
 
     This test mocks the customer_service.update_customer method to simulate
-    updating a customer's information. It sends a PUT request to the 
+    updating a customer's information. It sends a PUT request to the
     /update/testuser endpoint with a JSON payload containing the updated email.
     The test verifies that the response status code is 200 and that the response
     message indicates the customer was updated successfully.
@@ -146,7 +147,7 @@ def test_update_customer(client):
         client (FlaskClient): The test client used to make requests to the application.
 
     Mocks:
-        routes.customer_service.update_customer: Mocked to return a predefined 
+        routes.customer_service.update_customer: Mocked to return a predefined
         response indicating the customer was updated.
 
     Assertions:
@@ -189,7 +190,7 @@ def test_get_all_customers(client):
     """
     Test the endpoint to get all customers.
 
-    This test mocks the `get_all_customers` method from the `customer_service` module
+    This test mocks the `get_customers_page` method from the `customer_service` module
     to return a predefined list of customers. It then sends a GET request to the `/all`
     endpoint and verifies that the response status code is 200 and that the response
     contains the key "customers".
@@ -200,12 +201,92 @@ def test_get_all_customers(client):
     Assertions:
         - The response status code should be 200.
         - The response JSON should contain the key "customers".
+        - The first page is requested with the default page size.
+        - There is no next page when the page is not full.
     """
-    with patch("routes.customer_service.get_all_customers") as mock_get_all:
-        mock_get_all.return_value = [{"username": "testuser"}]
+    with patch("routes.customer_service.get_customers_page") as mock_get_page:
+        mock_get_page.return_value = [{"customer_id": 1, "username": "testuser"}]
         response = client.get("/all")
         assert response.status_code == 200
         assert "customers" in response.json
+        assert response.json["next_after"] is None
+        mock_get_page.assert_called_once_with(None, 100, None)
+
+
+def test_get_all_customers_next_page(client):
+    """
+    Test keyset pagination and column projection on the endpoint to get all customers.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Assertions:
+        - The cursor, page size and fields are passed to the service.
+        - Only the requested fields are returned.
+        - A full page returns the ID of its last customer as the next cursor.
+    """
+    with patch("routes.customer_service.get_customers_page") as mock_get_page:
+        mock_get_page.return_value = [
+            {"customer_id": 11, "username": "first"},
+            {"customer_id": 12, "username": "second"},
+        ]
+        response = client.get("/all?after=10&limit=2&fields=username")
+        assert response.status_code == 200
+        assert response.json["customers"] == [
+            {"username": "first"},
+            {"username": "second"},
+        ]
+        assert response.json["next_after"] == 12
+        mock_get_page.assert_called_once_with(10, 2, ["username"])
+
+
+def test_get_all_customers_invalid_query(client):
+    """
+    Test that invalid pagination and projection parameters are rejected.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Assertions:
+        - A page size above the maximum returns a 400 status code.
+        - Requesting the password column returns a 400 status code.
+    """
+    response = client.get("/all?limit=5000")
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid Query"
+
+    response = client.get("/all?fields=username,password")
+    assert response.status_code == 400
+    assert "password" in response.json["message"]
+
+
+def test_stream_all_customers(client):
+    """
+    Test streaming every customer as newline-delimited JSON.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Assertions:
+        - The response is NDJSON with one customer per line.
+        - The customers are read lazily, one page of the requested size at a time.
+    """
+    with patch("routes.customer_service.iter_customer_pages") as mock_iter:
+        mock_iter.return_value = iter(
+            [
+                [{"customer_id": 1, "username": "a"}],
+                [{"customer_id": 2, "username": "b"}],
+            ]
+        )
+        response = client.get("/all?stream=true&limit=500&fields=customer_id")
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"customer_id": 1},
+            {"customer_id": 2},
+        ]
+        mock_iter.assert_called_once_with(None, ["customer_id"], 500)
 
 
 def test_get_customer_by_username(client):
@@ -214,7 +295,7 @@ def test_get_customer_by_username(client):
 
     This test mocks the `get_customer_by_username` method from the `customer_service` module
     to return a predefined customer dictionary. It then sends a GET request to the route
-    with a test username and asserts that the response status code is 200 and that the 
+    with a test username and asserts that the response status code is 200 and that the
     response JSON contains the key "customer".
 
     Args:
@@ -344,3 +425,235 @@ def test_deduct_customer_wallet_invalid_amount(client):
     response = client.post("/deduct/testuser", json={"amount": -50})
     assert response.status_code == 400
     assert response.json["error"] == "Invalid Amount"
+
+
+def test_get_cache_stats(client):
+    """
+    Test the customer cache statistics endpoint.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Mocks:
+        routes.customer_service.cache_stats: Mocked to return predefined counters.
+
+    Asserts:
+        - The response status code is 200.
+        - The response JSON contains the cache counters.
+    """
+    with patch("routes.customer_service.cache_stats") as mock_stats:
+        mock_stats.return_value = {"hits": 3, "misses": 1, "hit_ratio": 0.75}
+        response = client.get("/cache/stats")
+        assert response.status_code == 200
+        assert response.json["cache"]["hits"] == 3
+        assert response.json["cache"]["hit_ratio"] == 0.75
+
+
+def test_get_hashing_stats(client):
+    """
+    Test the password hashing statistics endpoint.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Mocks:
+        routes.customer_service.hashing_stats: Mocked to return a predefined queue depth.
+
+    Asserts:
+        - The response status code is 200.
+        - The response JSON contains the queue depth.
+    """
+    with patch("routes.customer_service.hashing_stats") as mock_stats:
+        mock_stats.return_value = {"queue_depth": 4, "pending": 2, "waiting": 2}
+        response = client.get("/hashing/stats")
+        assert response.status_code == 200
+        assert response.json["hashing"]["queue_depth"] == 4
+
+
+def test_get_username_filter_stats(client):
+    """
+    Test the username filter statistics endpoint.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Mocks:
+        routes.customer_service.username_filter_stats: Mocked to return predefined counters.
+
+    Asserts:
+        - The response status code is 200.
+        - The response JSON contains the skipped lookups.
+    """
+    with patch("routes.customer_service.username_filter_stats") as mock_stats:
+        mock_stats.return_value = {"ready": True, "skipped_lookups": 7}
+        response = client.get("/username-filter/stats")
+        assert response.status_code == 200
+        assert response.json["username_filter"]["skipped_lookups"] == 7
+
+
+def test_import_customers(client):
+    """
+    Test the bulk customer import endpoint.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Asserts:
+        - Only the valid rows are passed to the service.
+        - Validation errors and service errors are reported by row index.
+        - The response counts the received, inserted and failed rows.
+    """
+    customers = [
+        {
+            "username": "user1",
+            "full_name": "User One",
+            "age": 25,
+            "password": "pw123456",
+        },
+        {
+            "username": "user2",
+            "full_name": "User Two",
+            "age": 5,
+            "password": "pw123456",
+        },
+        {"username": "user3", "full_name": "User 3", "age": 30, "password": "pw123456"},
+    ]
+    with patch("routes.customer_service.import_customers") as mock_import:
+        mock_import.return_value = {
+            "inserted": 1,
+            "errors": {1: "Username already exists"},
+        }
+        response = client.post("/bulk", json={"customers": customers})
+
+        assert response.status_code == 200
+        imported = mock_import.call_args.args[0]
+        assert [customer["username"] for customer in imported] == ["user1", "user3"]
+        assert response.json["received"] == 3
+        assert response.json["inserted"] == 1
+        assert response.json["failed"] == 2
+        assert [error["index"] for error in response.json["errors"]] == [1, 2]
+        assert response.json["errors"][1]["messages"] == ["Username already exists"]
+
+
+def test_import_customers_invalid_request(client):
+    """
+    Test that the bulk import endpoint rejects a body that is not a list.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Asserts:
+        - The response status code is 400.
+    """
+    response = client.post("/bulk", json={"customers": "user1"})
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid Request"
+
+
+def test_get_wallet_history(client):
+    """
+    Test the wallet history endpoint.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Mocks:
+        routes.customer_service.get_wallet_history: Mocked to return a full page of entries.
+
+    Asserts:
+        - The response status code is 200.
+        - The page parameters are passed to the service.
+        - The response JSON contains the entries and the cursor of the next page.
+    """
+    with patch("routes.customer_service.get_wallet_history") as mock_history:
+        mock_history.return_value = [
+            {"entry_id": 9, "amount": -5.0},
+            {"entry_id": 4, "amount": 20.0},
+        ]
+        response = client.get("/wallet/testuser/history?before=10&limit=2")
+        assert response.status_code == 200
+        mock_history.assert_called_once_with("testuser", 10, 2)
+        assert len(response.json["entries"]) == 2
+        assert response.json["next_before"] == 4
+
+
+def test_get_wallet_history_not_found(client):
+    """
+    Test the wallet history endpoint for a customer that does not exist.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Asserts:
+        - The response status code is 404.
+        - An invalid page size is rejected with status code 400.
+    """
+    with patch("routes.customer_service.get_wallet_history") as mock_history:
+        mock_history.side_effect = ValueError("Customer not found")
+        response = client.get("/wallet/nobody/history")
+        assert response.status_code == 404
+
+    response = client.get("/wallet/testuser/history?limit=0")
+    assert response.status_code == 400
+
+
+def test_get_wallet_ledger_stats(client):
+    """
+    Test the wallet ledger statistics endpoint.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Asserts:
+        - The response status code is 200.
+        - The response JSON contains the compaction counters.
+    """
+    with patch("routes.customer_service.wallet_ledger_stats") as mock_stats:
+        mock_stats.return_value = {"pending_customers": 3, "compactions": 1}
+        response = client.get("/wallet-ledger/stats")
+        assert response.status_code == 200
+        assert response.json["wallet_ledger"]["pending_customers"] == 3
+
+
+def test_apply_wallet_batch(client):
+    """
+    Test the batch wallet operations endpoint.
+
+    Args:
+        client (FlaskClient): The test client used to make requests to the application.
+
+    Mocks:
+        routes.customer_service.apply_wallet_batch: Mocked to return one applied
+        entry and one entry with insufficient funds.
+
+    Asserts:
+        - Only the valid entries are passed to the service.
+        - Each entry's result is reported at its position in the request.
+        - The response counts the applied and failed entries.
+    """
+    entries = [
+        {"username": "user1", "amount": 10, "op": "charge"},
+        {"username": "user2", "amount": -1, "op": "charge"},
+        {"username": "user3", "amount": 5, "op": "deduct"},
+    ]
+    with patch("routes.customer_service.apply_wallet_batch") as mock_batch:
+        mock_batch.return_value = [
+            {"entry_index": 0, "customer_id": 1, "new_balance": 10.0, "error": None},
+            {
+                "entry_index": 1,
+                "customer_id": 3,
+                "new_balance": None,
+                "error": "Insufficient funds",
+            },
+        ]
+        response = client.post("/wallet/batch", json={"entries": entries})
+
+        assert response.status_code == 200
+        applied = mock_batch.call_args.args[0]
+        assert [entry["username"] for entry in applied] == ["user1", "user3"]
+        assert response.json["applied"] == 1
+        assert response.json["failed"] == 2
+        results = response.json["results"]
+        assert results[0] == {"index": 0, "username": "user1", "new_balance": 10.0}
+        assert results[1]["error"] == "Validation Error"
+        assert results[2]["error"] == "Insufficient funds"
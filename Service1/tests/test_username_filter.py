@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from username_filter import UsernameFilter
+
+
+def test_usernames_might_exist_until_warmed():
+    """
+    Test that every username might exist until the filter has been warmed.
+
+    Asserts:
+        - The first check reports the username as possibly existing.
+        - The check starts the warm-up.
+    """
+    username_filter = UsernameFilter(lambda: [], capacity=100)
+    with patch.object(username_filter, "start_warming") as mock_start:
+        assert username_filter.might_exist("newuser") is True
+        mock_start.assert_called_once()
+
+
+def test_warmed_filter_skips_new_usernames():
+    """
+    Test checking usernames once the filter holds the customer table.
+
+    Asserts:
+        - Existing and added usernames might exist.
+        - New usernames definitely do not exist and are counted as skipped lookups.
+    """
+    pages = [[{"username": "alice"}, {"username": "bob"}], [{"username": "carol"}]]
+    username_filter = UsernameFilter(lambda: iter(pages), capacity=100)
+    username_filter.warm()
+    username_filter.add("dave")
+
+    assert username_filter.ready.is_set()
+    assert username_filter.might_exist("alice")
+    assert username_filter.might_exist("dave")
+    assert not username_filter.might_exist("erin")
+    stats = username_filter.stats()
+    assert (stats["checked"], stats["skipped_lookups"]) == (3, 1)
+
+
+def test_remove_is_ignored_before_warm_up():
+    """
+    Test that usernames are only removed once the filter has been warmed.
+
+    Asserts:
+        - A username removed during the warm-up is still reported as possibly existing.
+        - A username removed after the warm-up is reported as new.
+    """
+    username_filter = UsernameFilter(lambda: [[{"username": "alice"}]], capacity=100)
+    username_filter.remove("alice")
+    username_filter.warm()
+    assert username_filter.might_exist("alice")
+
+    username_filter.remove("alice")
+    assert not username_filter.might_exist("alice")
+
+
+def test_failed_warm_up_keeps_lookups():
+    """
+    Test that a failed warm-up leaves the filter answering "might exist".
+
+    Asserts:
+        - The filter is not ready after the failure.
+        - Every username might exist.
+    """
+
+    def load_pages():
+        raise ConnectionError("database unavailable")
+
+    username_filter = UsernameFilter(load_pages, capacity=100)
+    username_filter.warm()
+    assert not username_filter.ready.is_set()
+    with patch.object(username_filter, "start_warming"):
+        assert username_filter.might_exist("anyone")
+
+
+def test_disabled_filter():
+    """
+    Test that a zero capacity disables the filter.
+
+    Asserts:
+        - Every username might exist.
+    """
+    username_filter = UsernameFilter(lambda: [], capacity=0)
+    assert username_filter.might_exist("anyone")
+    assert username_filter.stats()["enabled"] is False
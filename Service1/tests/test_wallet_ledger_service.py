@@ -0,0 +1,146 @@
+import pytest
+
+from database_utils.sqlite import SQLiteClient
+from wallet_ledger_service import WalletLedgerService
+
+
+@pytest.fixture
+def client():
+    """
+    Fixture providing a SQLiteClient holding one customer with an empty wallet.
+
+    Yields:
+        SQLiteClient: The database client.
+    """
+    client = SQLiteClient()
+    client.table("customer").insert(
+        {
+            "full_name": "John Doe",
+            "username": "johndoe",
+            "password": "hashed_password",
+            "age": 30,
+        }
+    ).execute()
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def ledger(client):
+    """
+    Fixture providing a WalletLedgerService without background compaction.
+
+    Returns:
+        WalletLedgerService: The service under test.
+    """
+    return WalletLedgerService(client, compact_interval=0)
+
+
+def test_charge_and_deduct_append_entries(client, ledger):
+    """
+    Test that credits and debits are appended to the ledger.
+
+    Asserts:
+        - Each operation returns the new balance.
+        - The Customer row is not updated until the ledger is compacted.
+        - A debit larger than the balance is rejected with "Insufficient funds".
+    """
+    assert ledger.charge("johndoe", 50) == 50.0
+    assert ledger.deduct("johndoe", 20.5) == 29.5
+
+    customer = client.table("customer").select("*").execute().data[0]
+    assert customer["wallet_balance"] == 0.0
+    assert ledger.get_balance(customer["customer_id"]) == 29.5
+
+    with pytest.raises(ValueError, match="Insufficient funds"):
+        ledger.deduct("johndoe", 100)
+    with pytest.raises(ValueError, match="Customer not found"):
+        ledger.charge("nobody", 10)
+
+
+def test_compaction_moves_snapshot(client, ledger):
+    """
+    Test that compaction folds the new entries into the balance snapshot.
+
+    Asserts:
+        - The written customer is compacted once and the snapshot holds the balance.
+        - The balance is unchanged by compaction and by later entries.
+        - A compaction with nothing new to fold moves no snapshot.
+    """
+    ledger.charge("johndoe", 10)
+    ledger.charge("johndoe", 5)
+    assert ledger.stats()["pending_customers"] == 1
+
+    assert ledger.compact() == 1
+    customer = client.table("customer").select("*").execute().data[0]
+    assert customer["wallet_balance"] == 15.0
+    assert customer["wallet_ledger_position"] == 2
+
+    ledger.deduct("johndoe", 2.5)
+    assert ledger.get_balance(customer["customer_id"]) == 12.5
+    assert ledger.compact([customer["customer_id"]]) == 1
+    assert ledger.compact([customer["customer_id"]]) == 0
+    assert ledger.get_balance(customer["customer_id"]) == 12.5
+
+
+def test_get_balances(client, ledger):
+    """
+    Test reading the balances of several customers in one call.
+
+    Asserts:
+        - Each balance is the snapshot plus the entries appended since, before and
+          after compaction.
+        - A customer without ledger entries has the balance of its snapshot.
+    """
+    client.table("customer").insert(
+        {
+            "full_name": "Jane Doe",
+            "username": "janedoe",
+            "password": "hashed_password",
+            "age": 28,
+        }
+    ).execute()
+    ledger.charge("johndoe", 10)
+    assert ledger.get_balances([1, 2]) == {1: 10.0, 2: 0.0}
+
+    ledger.compact()
+    ledger.deduct("johndoe", 4)
+    assert ledger.get_balances([1, 2]) == {1: 6.0, 2: 0.0}
+    assert ledger.get_balances([]) == {}
+
+
+def test_history_pages_newest_first(ledger):
+    """
+    Test reading the ledger history with keyset pagination.
+
+    Asserts:
+        - Entries are returned newest first, debits as negative amounts.
+        - The next page starts before the last entry of the previous page.
+    """
+    for amount in (1, 2, 3):
+        ledger.charge("johndoe", amount)
+    ledger.deduct("johndoe", 4)
+
+    first = ledger.get_history(1, limit=3)
+    assert [entry["amount"] for entry in first] == [-4.0, 3.0, 2.0]
+    second = ledger.get_history(1, before=first[-1]["entry_id"], limit=3)
+    assert [entry["amount"] for entry in second] == [1.0]
+
+
+def test_apply_batch(ledger):
+    """
+    Test appending a batch of credits and debits.
+
+    Asserts:
+        - Each entry reports its new balance or its error.
+        - The customers written to are pending compaction.
+    """
+    results = ledger.apply_batch(
+        [
+            {"username": "johndoe", "amount": 10, "op": "charge"},
+            {"username": "johndoe", "amount": 20, "op": "deduct"},
+        ]
+    )
+    assert results[0]["new_balance"] == 10.0
+    assert results[1]["error"] == "Insufficient funds"
+    assert ledger.stats()["pending_customers"] == 1
@@ -0,0 +1,128 @@
+import logging
+import threading
+
+from config import Config
+from database_utils.bloom import CountingBloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class UsernameFilter:
+    """
+    A Bloom filter of the usernames in the customer table.
+
+    The filter answers "might this username exist?" without a database round trip:
+    registration skips the uniqueness lookup for usernames the filter has not
+    seen, while a positive answer still needs the lookup. The unique index on
+    ``Customer.username`` remains the final authority, which also covers usernames
+    registered by other processes.
+
+    The filter is warmed in a background thread from the customer table, paging by
+    customer ID, the first time it is queried. Until the warm-up has finished every
+    username is reported as possibly existing, and usernames are only removed once
+    it has finished. Within one process the filter gives no false negative, but
+    removing a username registered by another replica after the warm-up
+    decrements counters shared with other usernames, which can then be reported
+    as new; the unique index still rejects them as duplicates.
+
+    Attributes:
+        load_pages (callable): Returns an iterable of pages of customer rows with a
+            "username" key, used to warm the filter.
+        bloom (CountingBloomFilter): The filter of usernames, or None when disabled.
+        ready (threading.Event): Set once the filter holds every existing username.
+        skipped (int): The number of lookups answered by the filter alone.
+        checked (int): The number of usernames checked against the filter.
+    """
+
+    def __init__(self, load_pages, capacity=None, error_rate=None):
+        if capacity is None:
+            capacity = Config.CACHE.USERNAME_FILTER_CAPACITY
+        if error_rate is None:
+            error_rate = Config.CACHE.USERNAME_FILTER_ERROR_RATE
+        self.load_pages = load_pages
+        self.bloom = CountingBloomFilter(capacity, error_rate) if capacity > 0 else None
+        self.ready = threading.Event()
+        self.skipped = 0
+        self.checked = 0
+        self._warming = False
+        self._lock = threading.Lock()
+
+    def might_exist(self, username):
+        """
+        Tell whether a username might already be registered.
+
+        Args:
+            username (str): The username to check.
+
+        Returns:
+            bool: False only if the username is definitely not registered.
+        """
+        if self.bloom is None:
+            return True
+        if not self.ready.is_set():
+            self.start_warming()
+            return True
+        exists = username in self.bloom
+        with self._lock:
+            self.checked += 1
+            self.skipped += not exists
+        return exists
+
+    def add(self, username):
+        """
+        Record a registered username.
+        """
+        if self.bloom is not None:
+            self.bloom.add(username)
+
+    def remove(self, username):
+        """
+        Forget a deleted username.
+        """
+        # Before the warm-up has finished the username may not have been added yet
+        if self.bloom is not None and self.ready.is_set():
+            self.bloom.remove(username)
+
+    def start_warming(self):
+        """
+        Start warming the filter in a background thread, unless already started.
+        """
+        with self._lock:
+            if self._warming or self.ready.is_set():
+                return
+            self._warming = True
+        threading.Thread(target=self.warm, daemon=True).start()
+
+    def warm(self):
+        """
+        Add every username of the customer table to the filter.
+        """
+        try:
+            for page in self.load_pages():
+                for row in page:
+                    self.bloom.add(row["username"])
+            self.ready.set()
+        except Exception:
+            logger.exception("Warming the username filter failed")
+        finally:
+            with self._lock:
+                self._warming = False
+
+    def stats(self):
+        """
+        Return the state and counters of the filter.
+
+        Returns:
+            dict: Whether the filter is ready, the lookups it answered and the
+            statistics of the Bloom filter.
+        """
+        with self._lock:
+            stats = {
+                "enabled": self.bloom is not None,
+                "ready": self.ready.is_set(),
+                "checked": self.checked,
+                "skipped_lookups": self.skipped,
+            }
+        if self.bloom is not None:
+            stats.update(self.bloom.stats())
+        return stats
@@ -0,0 +1,223 @@
+import logging
+import threading
+
+from config import Config
+from database_utils.connect import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class WalletLedgerService:
+    """
+    A service class for the append-only wallet ledger.
+
+    Every credit and debit is a new row of the ``WalletLedger`` table instead of an
+    update of ``Customer.wallet_balance``, which keeps an audit trail and removes
+    the row lock concurrent wallet calls used to queue on. A customer's balance is
+    the snapshot in ``Customer.wallet_balance`` plus the ledger entries after
+    ``Customer.wallet_ledger_position``; a background thread periodically compacts
+    the new entries into the snapshot so this delta stays short.
+
+    Credits never wait for each other. Debits of the same customer are serialised
+    by an advisory lock in the ``ledger_deduct_wallet`` database function, so the
+    balance check cannot be raced and the wallet can never be overdrawn.
+
+    The customers to compact are the ones this process wrote to. Compaction only
+    shortens the delta, so customers whose writes were not compacted (e.g. when a
+    process stopped) still have exact balances and are compacted on their next write.
+
+    Attributes:
+        supabase: The database client.
+        table_name (str): The name of the ledger table.
+        compact_interval (float): Seconds between two compactions; 0 disables the
+            background compaction.
+        compact_batch_size (int): The maximum number of customers per compaction call.
+    """
+
+    def __init__(self, supabase=None, compact_interval=None, compact_batch_size=None):
+        if compact_interval is None:
+            compact_interval = Config.WALLET.COMPACT_INTERVAL
+        if compact_batch_size is None:
+            compact_batch_size = Config.WALLET.COMPACT_BATCH_SIZE
+        self.supabase = supabase if supabase is not None else get_supabase_client()
+        self.table_name = "walletledger"
+        self.compact_interval = compact_interval
+        self.compact_batch_size = compact_batch_size
+        self.compactions = 0
+        self.compacted = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._compactor = None
+
+    def charge(self, username, amount):
+        """
+        Append a credit to the customer's ledger and return the new balance
+        """
+        try:
+            response = self.supabase.rpc(
+                "ledger_charge_wallet", {"p_username": username, "p_amount": amount}
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error charging wallet: {str(e)}")
+        return self._applied(response.data[0])
+
+    def deduct(self, username, amount):
+        """
+        Append a debit to the customer's ledger if the balance covers it and return
+        the new balance
+        """
+        try:
+            response = self.supabase.rpc(
+                "ledger_deduct_wallet", {"p_username": username, "p_amount": amount}
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error deducting from wallet: {str(e)}")
+        return self._applied(response.data[0])
+
+    def apply_batch(self, entries):
+        """
+        Append a batch of credits and debits in one transaction, returning the
+        result of each entry
+
+        Entries are applied in order; a debit the balance does not cover is
+        reported in its result instead of failing the batch.
+        """
+        try:
+            response = self.supabase.rpc(
+                "ledger_apply_wallet_batch", {"p_entries": entries}
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error applying wallet batch: {str(e)}")
+        applied = {
+            result["customer_id"] for result in response.data if not result["error"]
+        }
+        if applied:
+            with self._lock:
+                self._pending.update(applied)
+            self.start_compacting()
+        return response.data
+
+    def get_balance(self, customer_id):
+        """
+        Return the exact balance of a customer: the snapshot plus the new entries
+        """
+        try:
+            response = self.supabase.rpc(
+                "wallet_ledger_balance", {"p_customer_id": customer_id}
+            ).execute()
+            return response.data
+        except Exception as e:
+            raise ValueError(f"Error retrieving wallet balance: {str(e)}")
+
+    def get_balances(self, customer_ids):
+        """
+        Return the exact balances of some customers, by customer ID, in one query
+        """
+        if not customer_ids:
+            return {}
+        try:
+            response = self.supabase.rpc(
+                "wallet_ledger_balances", {"p_customer_ids": list(customer_ids)}
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error retrieving wallet balances: {str(e)}")
+        return {row["customer_id"]: row["wallet_balance"] for row in response.data}
+
+    def get_history(self, customer_id, before=None, limit=100):
+        """
+        Retrieve one page of a customer's ledger entries, newest first, before the given entry ID
+        """
+        try:
+            query = (
+                self.supabase.table(self.table_name)
+                .select("entry_id, amount, created_at")
+                .eq("customer_id", customer_id)
+            )
+            if before is not None:
+                query = query.lt("entry_id", before)
+            response = query.order("entry_id", desc=True).limit(limit).execute()
+            return response.data
+        except Exception as e:
+            raise ValueError(f"Error retrieving wallet history: {str(e)}")
+
+    def compact(self, customer_ids=None):
+        """
+        Fold the new ledger entries of some customers into their balance snapshot
+
+        Defaults to the customers written to since the last compaction. Returns the
+        number of customers whose snapshot moved.
+        """
+        if customer_ids is None:
+            with self._lock:
+                customer_ids, self._pending = sorted(self._pending), set()
+        customer_ids = list(customer_ids)
+
+        compacted = 0
+        for start in range(0, len(customer_ids), self.compact_batch_size):
+            batch = customer_ids[start : start + self.compact_batch_size]
+            try:
+                response = self.supabase.rpc(
+                    "compact_wallet_ledger", {"p_customer_ids": batch}
+                ).execute()
+            except Exception as e:
+                # Keep the remaining customers for the next compaction
+                with self._lock:
+                    self._pending.update(customer_ids[start:])
+                raise ValueError(f"Error compacting wallet ledger: {str(e)}")
+            compacted += response.data or 0
+
+        with self._lock:
+            self.compactions += 1
+            self.compacted += compacted
+        return compacted
+
+    def start_compacting(self):
+        """
+        Start compacting the ledger in a background thread, unless already started.
+        """
+        if self.compact_interval <= 0:
+            return
+        with self._lock:
+            if self._compactor is not None:
+                return
+            self._compactor = threading.Thread(target=self._run, daemon=True)
+        self._compactor.start()
+
+    def stop(self):
+        """
+        Stop the background compaction after compacting the pending customers.
+        """
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        self.compact()
+
+    def stats(self):
+        """
+        Return the compaction counters of the ledger.
+
+        Returns:
+            dict: The number of customers waiting for compaction, the number of
+            compactions run and the number of customer snapshots they moved.
+        """
+        with self._lock:
+            return {
+                "pending_customers": len(self._pending),
+                "compactions": self.compactions,
+                "compacted_customers": self.compacted,
+                "compact_interval": self.compact_interval,
+            }
+
+    def _applied(self, row):
+        with self._lock:
+            self._pending.add(row["customer_id"])
+        self.start_compacting()
+        return row["wallet_balance"]
+
+    def _run(self):
+        while not self._stop.wait(self.compact_interval):
+            try:
+                self.compact()
+            except Exception:
+                logger.exception("Compacting the wallet ledger failed")
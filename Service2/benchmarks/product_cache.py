@@ -0,0 +1,234 @@
+"""
+Product cache benchmark for the inventory service.
+
+This script simulates ``--workers`` service processes, each an ``InventoryService``
+with its own product cache, serving a skewed (Zipf) mix of product lookups and
+price updates from ``--threads`` threads each. It compares three configurations:
+
+- off: no product cache, every lookup reads the database.
+- local: a bounded LRU + TTL cache per worker, written through by the updates.
+- shared: the per-worker caches plus a shared tier, served by a local
+  ``SharedCacheServer`` process standing in for a shared cache.
+
+For each configuration it reports the throughput, the hit ratio, the number of
+database reads, the mean and maximum age of the values served from a cache and
+the share of lookups that returned a price older than one already written when
+the lookup started (a worker only writes through its own cache, so the other
+workers can serve a stale price until the TTL expires).
+
+Usage:
+    python benchmarks/product_cache.py --products 2000 --workers 4 --lookups 20000
+
+The benchmark runs against the database configured for the service (set
+``DATABASE_BACKEND=sqlite`` for an in-process database) and deletes the
+products it created when done.
+"""
+
+import argparse
+import itertools
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+
+from config import Config  # noqa: E402
+from inventory_service import InventoryService  # noqa: E402
+
+
+class Workload:
+    """
+    The product lookups and updates of one benchmark run, with the latest price
+    written to each product.
+    """
+
+    def __init__(self, product_ids, skew, write_ratio):
+        self.product_ids = product_ids
+        self.weights = list(
+            itertools.accumulate(
+                1 / rank**skew for rank in range(1, len(product_ids) + 1)
+            )
+        )
+        self.write_ratio = write_ratio
+        self.latest = {}
+        self.stale = 0
+        self._prices = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def run(self, service, lookups, seed):
+        """
+        Run ``lookups`` operations against one worker's service.
+        """
+        rng = random.Random(seed)
+        stale = 0
+        chosen = rng.choices(self.product_ids, cum_weights=self.weights, k=lookups)
+        for product_id in chosen:
+            if rng.random() < self.write_ratio:
+                # Prices only grow, so an older price is always a smaller one
+                with self._write_lock:
+                    price = float(next(self._prices))
+                    service.update_goods(product_id, {"price": price})
+                    self.latest[product_id] = price
+                continue
+            expected = self.latest.get(product_id, 0.0)
+            product = service.get_product_by_id(product_id)
+            stale += product["price"] < expected
+        with self._lock:
+            self.stale += stale
+
+
+def start_shared_cache(ttl):
+    """
+    Start a shared cache server process on a free local port.
+
+    Returns:
+        tuple: The server process and its URL.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "database_utils.shared_cache"]
+        + ["--port", str(port), "--ttl", str(ttl)],
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{url}/ping")
+            return server, url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("The shared cache server did not start")
+
+
+def run_mode(mode, product_ids, args, shared_url):
+    """
+    Benchmark one cache configuration.
+
+    Returns:
+        dict: The duration, the number of lookups and the merged cache statistics.
+    """
+    Config.CACHE.PRODUCT_MAX_SIZE = 0 if mode == "off" else args.cache_size
+    Config.CACHE.PRODUCT_TTL = args.ttl
+    Config.CACHE.SHARED_URL = shared_url if mode == "shared" else ""
+    services = [InventoryService() for _ in range(args.workers)]
+    workload = Workload(product_ids, args.skew, args.write_ratio)
+    per_thread = args.lookups // (args.workers * args.threads)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers * args.threads) as pool:
+        futures = [
+            pool.submit(workload.run, service, per_thread, seed)
+            for seed, service in enumerate(
+                service for service in services for _ in range(args.threads)
+            )
+        ]
+        for future in futures:
+            future.result()
+    duration = time.perf_counter() - start
+
+    stats = [service.cache_stats() for service in services]
+    for service in services:
+        if service.cache.shared is not None:
+            service.cache.shared.close()
+    served = sum(s["hits"] + s.get("shared_hits", 0) for s in stats)
+    misses = sum(s["misses"] for s in stats)
+    age_total = sum(
+        s["served_age_mean"] * (s["hits"] + s.get("shared_hits", 0)) for s in stats
+    )
+    return {
+        "duration": duration,
+        "operations": per_thread * args.workers * args.threads,
+        "hit_ratio": served / (served + misses) if served + misses else 0.0,
+        "shared_hits": sum(s.get("shared_hits", 0) for s in stats),
+        "db_reads": misses,
+        "age_mean": age_total / served if served else 0.0,
+        "age_max": max(s["served_age_max"] for s in stats),
+        "stale": workload.stale / (served + misses) if served + misses else 0.0,
+    }
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark every cache configuration.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--write-ratio", type=float, default=0.01)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--cache-size", type=int, default=500)
+    parser.add_argument("--ttl", type=float, default=30.0)
+    parser.add_argument(
+        "--modes", nargs="+", default=["off", "local", "shared"], metavar="MODE"
+    )
+    args = parser.parse_args()
+
+    setup = InventoryService()
+    product_ids = []
+    for offset in range(0, args.products, 1000):
+        rows = (
+            setup.supabase.table(setup.table_name)
+            .insert(
+                [
+                    {
+                        "name": f"Benchmark Product {i}",
+                        "category": "benchmark",
+                        "price": 0.0,
+                        "stock_count": 100,
+                    }
+                    for i in range(offset, min(offset + 1000, args.products))
+                ]
+            )
+            .execute()
+            .data
+        )
+        product_ids.extend(row["product_id"] for row in rows)
+
+    try:
+        print(
+            f"products={args.products} workers={args.workers} threads={args.threads} "
+            f"write_ratio={args.write_ratio} skew={args.skew} "
+            f"cache_size={args.cache_size} ttl={args.ttl}"
+        )
+        for mode in args.modes:
+            # Every mode starts from a cold shared tier
+            server, shared_url = start_shared_cache(args.ttl)
+            try:
+                result = run_mode(mode, product_ids, args, shared_url)
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{mode:<7}{result['duration']:7.2f}s "
+                f"{result['operations'] / result['duration']:8.0f} ops/s  "
+                f"hit_ratio={result['hit_ratio']:.3f} "
+                f"shared_hits={result['shared_hits']:<6} "
+                f"db_reads={result['db_reads']:<6} "
+                f"age_mean={result['age_mean']:.3f}s "
+                f"age_max={result['age_max']:.3f}s "
+                f"stale={result['stale']:.4f}"
+            )
+    finally:
+        for offset in range(0, len(product_ids), 1000):
+            table = setup.supabase.table(setup.table_name)
+            table.delete().in_(
+                "product_id", product_ids[offset : offset + 1000]
+            ).execute()
+
+
+if __name__ == "__main__":
+    main()
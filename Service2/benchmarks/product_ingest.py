@@ -0,0 +1,118 @@
+"""
+Catalogue ingest benchmark for the inventory service.
+
+This script writes a JSONL catalogue feed of ``--products`` generated products
+to a temporary file and ingests it with ``ingest.py``, once with validation and
+upserts run one after the other (``--pipeline-depth 0``) and once pipelined. Each
+mode ingests the feed twice: the first pass inserts every product and the second
+updates them all through their SKU. For comparison, it also adds the first
+``--single`` products one at a time with ``InventoryService.add_goods``, as
+``POST /api/inventory/add`` does.
+
+For each run it reports the duration and the throughput in rows per second.
+
+Usage:
+    python benchmarks/product_ingest.py --products 200000 --chunk-size 1000
+
+The benchmark runs against the database configured for the service and deletes
+the products it created when done.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from ingest import ingest_products, read_products  # noqa: E402
+from inventory_service import InventoryService  # noqa: E402
+
+SKU_PREFIX = "ingest-bench-"
+
+
+def write_feed(path, products, seed):
+    """
+    Write a JSONL feed of generated products, with one invalid row in a thousand.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as feed:
+        for i in range(products):
+            product = {
+                "sku": f"{SKU_PREFIX}{i:08d}",
+                "name": f"Ingested Product {i}",
+                "category": f"bench-{rng.randrange(100)}",
+                "price": round(rng.uniform(1, 1000), 2),
+                "description": "Generated by the catalogue ingest benchmark",
+                "stock_count": rng.randrange(100),
+            }
+            if i % 1000 == 999:
+                product["price"] = -1
+            feed.write(json.dumps(product) + "\n")
+
+
+def delete_products(service):
+    """
+    Delete the products created by the benchmark.
+    """
+    service.supabase.table(service.table_name).delete().gte("sku", SKU_PREFIX).lt(
+        "sku", SKU_PREFIX[:-1] + "."
+    ).execute()
+
+
+def main():
+    """
+    Parse the command line arguments, generate the feed and benchmark each ingest
+    mode.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--pipeline-depth", type=int, default=4)
+    parser.add_argument("--single", type=int, default=2000)
+    args = parser.parse_args()
+
+    service = InventoryService()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.jsonl")
+        write_feed(path, args.products, seed=42)
+        print(
+            f"products={args.products} chunk_size={args.chunk_size} "
+            f"pipeline_depth={args.pipeline_depth}"
+        )
+        try:
+            start = time.perf_counter()
+            for row in list(itertools.islice(read_products(path), args.single)):
+                if row["price"] >= 0:
+                    service.add_goods(row)
+            duration = time.perf_counter() - start
+            print(
+                f"{'one at a time':<24}{'insert':<8}{duration:8.2f}s "
+                f"{args.single / duration:9.0f} rows/s"
+            )
+            delete_products(service)
+
+            for name, depth in (
+                ("sequential", 0),
+                ("pipelined", args.pipeline_depth),
+            ):
+                for phase in ("insert", "update"):
+                    totals = ingest_products(
+                        read_products(path), service, args.chunk_size, depth
+                    )
+                    print(
+                        f"{name:<24}{phase:<8}{totals['seconds']:8.2f}s "
+                        f"{totals['received'] / totals['seconds']:9.0f} rows/s "
+                        f"({totals['upserted']} upserted, {totals['failed']} failed)"
+                    )
+                delete_products(service)
+        finally:
+            delete_products(service)
+
+
+if __name__ == "__main__":
+    main()
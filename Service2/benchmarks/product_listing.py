@@ -0,0 +1,175 @@
+"""
+Product listing benchmark for the inventory service.
+
+This script fills the Product table with ``--products`` generated products and
+measures the latency of ``InventoryService.list_products`` for typical listing
+queries (first and deep pages, category filters with a price order, price ranges,
+in-stock filters) and of a low-stock lookup on ``stock_count``, first with the
+Product indexes created by ``create_Tables.py`` and then without them.
+
+For each query it reports the median and 99th percentile latency over
+``--repeat`` runs.
+
+Usage:
+    python benchmarks/product_listing.py --products 1000000 --repeat 200
+
+The benchmark needs the Postgres backend (it generates the products and drops
+and recreates the indexes with SQL) and deletes the products it created when done.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from config import Config  # noqa: E402
+from database_utils.schema import TABLES  # noqa: E402
+from inventory_service import InventoryService  # noqa: E402
+
+INDEXES = ("product_category_price", "product_price", "product_stock_count")
+
+
+def queries(service, first_id, products):
+    """
+    Build the benchmarked queries.
+
+    Returns:
+        list: (name, callable) pairs, each running one query.
+    """
+    deep_id = first_id + products * 9 // 10
+    middle = service.list_products(category="bench-7", sort="price", limit=1000)[-1]
+    table = service.supabase.table(service.table_name)
+    return [
+        ("first page", lambda: service.list_products()),
+        ("deep page", lambda: service.list_products(after=(None, deep_id))),
+        (
+            "category, by price",
+            lambda: service.list_products(category="bench-7", sort="price"),
+        ),
+        (
+            "category, by price, deep",
+            lambda: service.list_products(
+                category="bench-7",
+                sort="price",
+                after=(middle["price"], middle["product_id"]),
+            ),
+        ),
+        (
+            "price range, by price",
+            lambda: service.list_products(min_price=500, max_price=510, sort="price"),
+        ),
+        (
+            "in stock, by -price",
+            lambda: service.list_products(in_stock=True, sort="-price"),
+        ),
+        (
+            "category, in stock, by -price",
+            lambda: service.list_products(
+                category="bench-7", in_stock=True, sort="-price"
+            ),
+        ),
+        (
+            "low stock (stock_count <= 1)",
+            lambda: table.select("*")
+            .lte("stock_count", 1)
+            .order("stock_count")
+            .limit(100)
+            .execute(),
+        ),
+    ]
+
+
+def measure(query, repeat):
+    """
+    Run a query ``repeat`` times.
+
+    Returns:
+        tuple: The median and 99th percentile latency in milliseconds.
+    """
+    query()  # warm up
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    """
+    Parse the command line arguments, generate the products and benchmark the
+    listing queries with and without the Product indexes.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=1000000)
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    Config.DATABASE.BACKEND = "postgres"
+    connection = psycopg2.connect(
+        host=Config.DATABASE.HOST,
+        port=Config.DATABASE.PORT,
+        dbname=Config.DATABASE.NAME,
+        user=Config.DATABASE.USER,
+        password=Config.DATABASE.PASSWORD,
+    )
+    connection.autocommit = True
+    cursor = connection.cursor()
+
+    start = time.perf_counter()
+    cursor.execute(
+        """
+        INSERT INTO Product (name, category, price, description, stock_count)
+        SELECT
+            'Benchmark Product ' || i,
+            'bench-' || (i %% %(categories)s),
+            ROUND((random() * 1000)::numeric, 2),
+            'Generated by the product listing benchmark',
+            (random() * 100)::int
+        FROM generate_series(1, %(products)s) AS i
+        RETURNING product_id
+        """,
+        {"products": args.products, "categories": args.categories},
+    )
+    product_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("ANALYZE Product")
+    print(
+        f"inserted {args.products} products in {time.perf_counter() - start:.1f}s "
+        f"({args.categories} categories, {args.repeat} runs per query)"
+    )
+
+    service = InventoryService()
+    try:
+        results = {}
+        for indexed in (True, False):
+            if not indexed:
+                cursor.execute(f"DROP INDEX {', '.join(INDEXES)}")
+            for name, query in queries(service, min(product_ids), args.products):
+                results.setdefault(name, []).extend(measure(query, args.repeat))
+
+        print(f"{'query':<32}{'indexed p50/p99 ms':>22}{'no index p50/p99 ms':>24}")
+        for name, (p50, p99, bare_p50, bare_p99) in results.items():
+            print(
+                f"{name:<32}{p50:>11.2f} / {p99:>7.2f}"
+                f"{bare_p50:>13.2f} / {bare_p99:>7.2f}"
+            )
+    finally:
+        for statement in TABLES:
+            if "INDEX" in statement:
+                cursor.execute(statement)
+        cursor.execute(
+            "DELETE FROM Product WHERE product_id BETWEEN %s AND %s",
+            (min(product_ids), max(product_ids)),
+        )
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Product lookup throughput benchmark for the InventoryService.
+
+This script calls ``InventoryService.get_product_by_id`` from many concurrent
+threads and reports the requests per second and latency percentiles for two
+clients:
+
+- default: a plain ``create_client`` with the stock httpx settings.
+- pooled: the client built by ``DatabaseConnection`` with the connection pool,
+  keep-alive, HTTP/2 and timeouts taken from ``Config.SUPABASE``.
+
+Usage:
+    python benchmarks/product_lookup_rps.py --product-id 1 --callers 50 --requests 2000
+
+The benchmark runs against the database configured for the service and only
+reads the given product.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from supabase import create_client  # noqa: E402
+
+from config import Config  # noqa: E402
+from database_utils.connect import DatabaseConnection  # noqa: E402
+from inventory_service import InventoryService  # noqa: E402
+
+
+def run(service, product_id, callers, requests):
+    """
+    Look up one product ``requests`` times from ``callers`` concurrent threads.
+
+    Args:
+        service (InventoryService): The inventory service under test.
+        product_id (int): The ID of the product to look up.
+        callers (int): The number of concurrent callers.
+        requests (int): The total number of lookups.
+
+    Returns:
+        tuple: The list of per-call latencies in milliseconds and the wall-clock
+        duration in seconds.
+    """
+
+    def lookup(_):
+        start = time.perf_counter()
+        service.get_product_by_id(product_id)
+        return (time.perf_counter() - start) * 1000
+
+    # Warm up so connection establishment is not part of the measurement
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(pool.map(lookup, range(callers)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        latencies = list(pool.map(lookup, range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark both clients.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--product-id", type=int, default=1)
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    clients = {
+        "default": create_client(Config.SUPABASE.URL, Config.SUPABASE.KEY),
+        "pooled": DatabaseConnection.get_instance(),
+    }
+    for label, client in clients.items():
+        service = InventoryService()
+        service.supabase = client
+        latencies, elapsed = run(service, args.product_id, args.callers, args.requests)
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{label:<8} callers={args.callers} requests={args.requests} "
+            f"rps={args.requests / elapsed:.0f} "
+            f"p50={quantiles[49]:.1f}ms p99={quantiles[98]:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
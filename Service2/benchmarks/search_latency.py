@@ -0,0 +1,172 @@
+"""
+Product search benchmark for the inventory service.
+
+This script fills the Product table with ``--products`` generated products, whose
+names, categories and descriptions are drawn from a fixed vocabulary with a skewed
+word frequency, and measures the latency of ``InventoryService.search_products``
+for rare, common and multi-word searches, on the first page and on the page after
+it. It reports the median and 99th percentile latency of each search and checks
+the 99th percentile against ``--budget-ms`` (50 ms by default, the budget
+documented by ``GET /api/inventory/search``); the exit status is 1 when a search
+exceeds it.
+
+Usage:
+    python benchmarks/search_latency.py --products 1000000 --repeat 200
+
+The benchmark runs against the database configured for the service (with
+``DATABASE_BACKEND=sqlite`` the searches are served by the in-process index)
+and deletes the products it created when done.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from inventory_service import InventoryService  # noqa: E402
+
+ADJECTIVES = (
+    "wireless compact portable premium classic smart digital vintage ergonomic "
+    "waterproof lightweight heavy-duty organic stainless leather wooden ceramic "
+    "rechargeable foldable adjustable"
+).split()
+NOUNS = (
+    "laptop keyboard mouse monitor headphones speaker charger cable camera lens "
+    "tripod backpack wallet watch bottle mug kettle blender toaster lamp chair "
+    "desk shelf pillow blanket towel jacket sneakers boots gloves scarf hat tent "
+    "lantern bicycle helmet skateboard racket ball dumbbell mat guitar piano "
+    "drum violin microphone printer router tablet phone drone projector"
+).split()
+CATEGORIES = (
+    "Electronics Computers Audio Photography Travel Kitchen Home Furniture "
+    "Bedding Clothing Footwear Outdoors Sports Fitness Music Office Toys Garden "
+    "Beauty Books"
+).split()
+# Description words: a long tail of filler words plus the product vocabulary
+DESCRIPTION_WORDS = [f"feature{i}" for i in range(2000)] + ADJECTIVES + NOUNS
+
+SEARCHES = [
+    ("rare word", "feature1999"),
+    ("product noun", "drone"),
+    ("adjective + noun", "wireless headphones"),
+    ("phrase", '"portable speaker"'),
+    ("category", "kitchen"),
+    ("common word", "feature0"),
+    ("either word", "violin or piano"),
+    ("exclusion", "camera -tripod"),
+    ("no match", "spaceship"),
+]
+
+
+def generate_products(count, rng):
+    """
+    Yield generated product rows.
+    """
+    weights = [1 / rank for rank in range(1, len(DESCRIPTION_WORDS) + 1)]
+    for _ in range(count):
+        yield {
+            "name": f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()}",
+            "category": rng.choice(CATEGORIES),
+            "price": round(rng.uniform(1, 1000), 2),
+            "description": " ".join(rng.choices(DESCRIPTION_WORDS, weights, k=12)),
+            "stock_count": rng.randrange(100),
+        }
+
+
+def measure(search, repeat):
+    """
+    Run a search ``repeat`` times.
+
+    Returns:
+        tuple: The median and 99th percentile latency in milliseconds.
+    """
+    search()  # warm up
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    """
+    Parse the command line arguments, generate the products and benchmark the
+    searches against the latency budget.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    service = InventoryService()
+    table = service.supabase.table(service.table_name)
+    rng = random.Random(42)
+    product_ids = []
+    batch = []
+    start = time.perf_counter()
+    for product in generate_products(args.products, rng):
+        batch.append(product)
+        if len(batch) == 5000:
+            product_ids.extend(
+                row["product_id"] for row in table.insert(batch).execute().data
+            )
+            batch = []
+    if batch:
+        product_ids.extend(
+            row["product_id"] for row in table.insert(batch).execute().data
+        )
+    print(f"inserted {args.products} products in {time.perf_counter() - start:.1f}s")
+
+    try:
+        if service.search_index is not None:
+            start = time.perf_counter()
+            service.search_index.warm()
+            print(f"built the in-process index in {time.perf_counter() - start:.1f}s")
+
+        over_budget = False
+        print(
+            f"{'search':<18}{'query':<24}{'page 1 p50/p99 ms':>20}"
+            f"{'page 2 p50/p99 ms':>22}"
+        )
+        for name, query in SEARCHES:
+            first_page = service.search_products(query, limit=args.limit)
+            after = None
+            if len(first_page) == args.limit:
+                after = (first_page[-1]["rank"], first_page[-1]["product_id"])
+            p50, p99 = measure(
+                lambda: service.search_products(query, limit=args.limit), args.repeat
+            )
+            line = f"{name:<18}{query:<24}{p50:>11.2f} / {p99:>6.2f}"
+            if after is not None:
+                next_p50, next_p99 = measure(
+                    lambda: service.search_products(query, after, args.limit),
+                    args.repeat,
+                )
+                line += f"{next_p50:>13.2f} / {next_p99:>6.2f}"
+                p99 = max(p99, next_p99)
+            if p99 > args.budget_ms:
+                over_budget = True
+                line += "  over budget"
+            print(line)
+        print(
+            f"p99 budget {args.budget_ms:.0f} ms: {'exceeded' if over_budget else 'met'}"
+        )
+    finally:
+        for offset in range(0, len(product_ids), 5000):
+            table = service.supabase.table(service.table_name)
+            table.delete().in_(
+                "product_id", product_ids[offset : offset + 5000]
+            ).execute()
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Bulk stock adjustment benchmark for the inventory service.
+
+This script creates ``--products`` throwaway products with 100 units each and
+adjusts the stock of every product, to compare:
+
+- loop: one ``InventoryService.update_goods`` call per product, as a client
+  sending ``PUT /api/inventory/update/<product_id>`` for each SKU does, from
+  ``--callers`` concurrent callers.
+- bulk: ``InventoryService.adjust_stock_bulk`` with ``--batch-size`` items per
+  call, as ``POST /api/inventory/stock/bulk`` does, each batch applied by one
+  set-based statement.
+
+It reports the wall-clock duration and the throughput of each mode, and checks
+that every product ends up with the expected stock.
+
+Usage:
+    python benchmarks/stock_bulk.py --products 20000 --callers 8 --batch-size 10000
+
+The benchmark runs against the database configured for the service (set
+``DATABASE_BACKEND=sqlite`` for an in-process database) and deletes the
+products it created when done.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from inventory_service import InventoryService  # noqa: E402
+
+
+def adjust_loop(service, product_ids, stock, callers):
+    """
+    Set the stock of every product with one update per product.
+
+    Returns:
+        float: The wall-clock duration in seconds.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(
+            pool.map(
+                lambda product_id: service.update_goods(
+                    product_id, {"stock_count": stock}
+                ),
+                product_ids,
+            )
+        )
+    return time.perf_counter() - start
+
+
+def adjust_bulk(service, product_ids, delta, batch_size):
+    """
+    Adjust the stock of every product with batches of ``batch_size`` items.
+
+    Returns:
+        float: The wall-clock duration in seconds.
+    """
+    start = time.perf_counter()
+    for offset in range(0, len(product_ids), batch_size):
+        results = service.adjust_stock_bulk(
+            [
+                {"product_id": product_id, "delta": delta}
+                for product_id in product_ids[offset : offset + batch_size]
+            ]
+        )
+        assert not any(result["error"] for result in results), results
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark both modes.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    service = InventoryService()
+    product_ids = []
+    for offset in range(0, args.products, 1000):
+        table = service.supabase.table(service.table_name)
+        rows = table.insert(
+            [
+                {
+                    "name": f"Benchmark Product {i}",
+                    "category": "bench",
+                    "stock_count": 100,
+                }
+                for i in range(offset, min(offset + 1000, args.products))
+            ]
+        ).execute()
+        product_ids.extend(row["product_id"] for row in rows.data)
+
+    try:
+        loop = adjust_loop(service, product_ids, 90, args.callers)
+        bulk = adjust_bulk(service, product_ids, -5, args.batch_size)
+
+        wrong = 0
+        for offset in range(0, len(product_ids), 1000):
+            rows = (
+                service.supabase.table(service.table_name)
+                .select("stock_count")
+                .in_("product_id", product_ids[offset : offset + 1000])
+                .execute()
+                .data
+            )
+            wrong += sum(row["stock_count"] != 85 for row in rows)
+        print(
+            f"products={args.products}\n"
+            f"loop  callers={args.callers:<6} {loop:7.2f}s "
+            f"{args.products / loop:8.0f} items/s\n"
+            f"bulk  size={args.batch_size:<9} {bulk:7.2f}s "
+            f"{args.products / bulk:8.0f} items/s ({loop / bulk:.1f}x)\n"
+            f"wrong stock counts={wrong}"
+        )
+    finally:
+        for offset in range(0, len(product_ids), 1000):
+            table = service.supabase.table(service.table_name)
+            table.delete().in_(
+                "product_id", product_ids[offset : offset + 1000]
+            ).execute()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A bounded, thread-safe LRU cache whose entries expire after a time-to-live.
+
+    The cache is meant for read-through caching of database rows: ``get_or_load``
+    returns the cached value or calls a loader and caches its result. Values that
+    are ``None`` (rows that do not exist) are never cached, so a row created
+    elsewhere is seen on the next lookup. ``write_through`` runs a database write
+    and caches the row it returns.
+
+    Every key with a load or a write in flight carries a version stamp, which each
+    write and invalidation of the key bumps. A load or a write only stores its
+    value if the stamp it started with is still current: a row read before a write
+    can never be stored after the write, and when two writes of the same key race,
+    the key is dropped rather than risk keeping the older row.
+
+    An optional shared tier (e.g. a ``SharedCacheClient``) is consulted on a local
+    miss before calling the loader, receives the values loaded and written, and is
+    invalidated along with the local entries, so several processes can share loads.
+
+    Attributes:
+        max_size (int): The maximum number of entries; the least recently used entry
+            is evicted when it is exceeded.
+        ttl (float): The number of seconds an entry stays valid.
+        shared: The shared cache tier, or None.
+        hits (int): The number of lookups answered from the cache.
+        shared_hits (int): The number of lookups answered from the shared tier.
+        misses (int): The number of lookups that had to call the loader.
+        evictions (int): The number of entries evicted to respect max_size.
+        stale_drops (int): The number of loaded or written values not stored because
+            the key was written or invalidated meanwhile.
+    """
+
+    def __init__(self, max_size=1024, ttl=30.0, clock=time.monotonic, shared=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_drops = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        # Version stamp and number of operations in flight, per key being loaded
+        # or written; a key is forgotten once its last operation has finished
+        self._versions = {}
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value of a key, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            return entry[2] if entry else None
+
+    def set(self, key, value):
+        """
+        Cache a value, evicting the least recently used entries if the cache is full.
+        """
+        with self._lock:
+            self._bump(key)
+            if value is not None and self.max_size > 0:
+                self._set(key, value)
+        if self.shared is not None and value is not None:
+            self.shared.set(key, value)
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value of a key, calling the loader on a miss.
+
+        Args:
+            key: The cache key.
+            loader (callable): Called with no arguments to read the value on a miss.
+
+        Returns:
+            The cached or loaded value.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                self._served(self._clock() - entry[1])
+                return entry[2]
+            version = self._begin(key)
+
+        try:
+            cached = self.shared.get(key) if self.shared is not None else None
+            if cached is not None:
+                value, age = cached
+            else:
+                value = loader()
+        except BaseException:
+            with self._lock:
+                self._end(key)
+            raise
+
+        with self._lock:
+            if cached is not None:
+                self.shared_hits += 1
+                self._served(age)
+            else:
+                self.misses += 1
+            stored = self._store(key, version, value)
+        if stored and cached is None and self.shared is not None:
+            self.shared.set(key, value)
+        return value
+
+    def write_through(self, key, writer):
+        """
+        Run a write and cache the value it returns.
+
+        Args:
+            key: The cache key of the written row.
+            writer (callable): Called with no arguments to write the row; returns the
+                written row, or None to drop the key.
+
+        Returns:
+            The value returned by the writer.
+
+        Raises:
+            Exception: Whatever the writer raises, after dropping the key.
+        """
+        with self._lock:
+            version = self._begin(key)
+        try:
+            value = writer()
+        except BaseException:
+            with self._lock:
+                self._bump(key)
+                self._entries.pop(key, None)
+                self._end(key)
+            if self.shared is not None:
+                self.shared.delete(key)
+            raise
+
+        with self._lock:
+            # Loads that started before this write must not store what they read
+            stored = self._store(key, version, value, bump=True)
+        if self.shared is not None:
+            if stored:
+                self.shared.set(key, value)
+            else:
+                self.shared.delete(key)
+        return value
+
+    def invalidate(self, *keys):
+        """
+        Drop the given keys from the cache.
+        """
+        with self._lock:
+            for key in keys:
+                self._bump(key)
+                self._entries.pop(key, None)
+        if self.shared is not None and keys:
+            self.shared.delete(*keys)
+
+    def clear(self):
+        """
+        Drop every entry from the local cache.
+        """
+        with self._lock:
+            for key in self._versions:
+                self._bump(key)
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return the size, the counters and the staleness of the cache.
+
+        Returns:
+            dict: The cache statistics, including the hit ratio of all lookups and the
+            mean and maximum age, in seconds, of the values served from the cache.
+        """
+        with self._lock:
+            served = self.hits + self.shared_hits
+            lookups = served + self.misses
+            stats = {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale_drops": self.stale_drops,
+                "hit_ratio": served / lookups if lookups else 0.0,
+                "served_age_mean": self._served_age_total / served if served else 0.0,
+                "served_age_max": self._served_age_max,
+            }
+        if self.shared is not None:
+            stats["shared_hits"] = self.shared_hits
+            stats["shared"] = self.shared.stats()
+        return stats
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _begin(self, key):
+        version = self._versions.setdefault(key, [0, 0])
+        version[1] += 1
+        return version[0]
+
+    def _bump(self, key):
+        if key in self._versions:
+            self._versions[key][0] += 1
+
+    def _end(self, key):
+        version = self._versions[key]
+        version[1] -= 1
+        if not version[1]:
+            del self._versions[key]
+
+    def _store(self, key, version, value, bump=False):
+        current = self._versions[key][0] == version
+        if bump:
+            # A write replaces the entry; when another write raced it, keep neither
+            self._bump(key)
+            self._entries.pop(key, None)
+        self._end(key)
+        if not current:
+            self.stale_drops += value is not None
+            return False
+        if value is None or self.max_size <= 0:
+            return False
+        self._set(key, value)
+        return True
+
+    def _served(self, age):
+        self._served_age_total += age
+        self._served_age_max = max(self._served_age_max, age)
+
+    def _set(self, key, value):
+        now = self._clock()
+        self._entries[key] = (now + self.ttl, now, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
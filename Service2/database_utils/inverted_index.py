@@ -0,0 +1,148 @@
+import heapq
+import math
+import re
+import threading
+
+# Words too common to be worth indexing, as in the Postgres "english" configuration
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be but by for from has have in into is it its of on or
+    that the their then there these they this to was were will with
+    """.split()
+)
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Split a text into its indexed terms.
+
+    Terms are lowercased words without stop words; a trailing plural "s" is
+    stripped, so "laptops" matches "laptop" like the Postgres English stemmer.
+
+    Args:
+        text (str): The text to split, or None.
+
+    Returns:
+        list: The terms of the text, in order.
+    """
+    terms = []
+    for word in _WORD.findall((text or "").lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+class InvertedIndex:
+    """
+    A thread-safe in-memory inverted index of documents made of weighted text fields.
+
+    A search returns the documents containing every term of the query, best match
+    first. The score of a document is the sum, over the query terms, of the weight
+    of each field the term appears in times ``1 + log`` of its number of
+    occurrences there, so a match in a heavier field (e.g. a product name) ranks
+    above a match in a lighter one (e.g. a description). Ties are broken by
+    document ID, which makes ``(rank, doc_id)`` a stable cursor for pagination.
+    A search capped to ``max_matches`` ranks the matches with the lowest document
+    IDs, so every page of the search ranks the same documents.
+
+    Attributes:
+        weights (dict): The weight of each indexed field, by field name.
+    """
+
+    def __init__(self, weights):
+        self.weights = dict(weights)
+        # term -> {doc_id: score of the term in the document}
+        self._postings = {}
+        # doc_id -> terms of the document, to remove it
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._documents)
+
+    def add(self, doc_id, fields):
+        """
+        Index a document, replacing its previous version.
+
+        Args:
+            doc_id: The document ID.
+            fields (dict): The text of the document's fields, by field name; fields
+                without a weight are ignored.
+        """
+        scores = {}
+        for field, weight in self.weights.items():
+            counts = {}
+            for term in tokenize(fields.get(field)):
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                scores[term] = scores.get(term, 0.0) + weight * (1 + math.log(count))
+        with self._lock:
+            self._remove(doc_id)
+            for term, score in scores.items():
+                self._postings.setdefault(term, {})[doc_id] = score
+            self._documents[doc_id] = tuple(scores)
+
+    def remove(self, doc_id):
+        """
+        Remove a document from the index.
+        """
+        with self._lock:
+            self._remove(doc_id)
+
+    def search(self, query, after=None, limit=20, max_matches=None):
+        """
+        Find the documents matching every term of a query, best match first.
+
+        Args:
+            query (str): The search text.
+            after (tuple): The (rank, doc_id) of the last result of the previous page.
+            limit (int): The maximum number of results.
+            max_matches (int): The maximum number of matches ranked; a query matching
+                more documents only ranks those with the lowest IDs. None ranks them all.
+
+        Returns:
+            tuple: The (rank, doc_id) pairs, by decreasing rank then increasing doc_id,
+            and whether the query matched more than max_matches documents.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return [], False
+        with self._lock:
+            postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+            # Walk the rarest term's documents and look the others up
+            matches = []
+            for doc_id, score in postings[0].items():
+                scores = [score]
+                for other in postings[1:]:
+                    if doc_id not in other:
+                        break
+                    scores.append(other[doc_id])
+                else:
+                    # fsum is exact, so a rank does not depend on the term order
+                    matches.append((math.fsum(scores), doc_id))
+
+        truncated = max_matches is not None and len(matches) > max_matches
+        if truncated:
+            matches = heapq.nsmallest(max_matches, matches, key=lambda match: match[1])
+        if after is not None:
+            after_rank, after_id = after
+            matches = [
+                (rank, doc_id)
+                for rank, doc_id in matches
+                if rank < after_rank or (rank == after_rank and doc_id > after_id)
+            ]
+        page = heapq.nsmallest(limit, matches, key=lambda match: (-match[0], match[1]))
+        return page, truncated
+
+    def _remove(self, doc_id):
+        for term in self._documents.pop(doc_id, ()):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
@@ -0,0 +1,188 @@
+"""
+A shared tier for the in-process caches, and a local stand-in server for it.
+
+The in-process ``TTLCache`` of each service process only saves that process's
+reads. With a shared tier, a row loaded by one process is served to the others
+from the shared cache, and the writes of every process update or invalidate it.
+``SharedCacheServer`` is a small HTTP key-value cache standing in for a shared
+cache such as Redis or memcached, so the tier can be run and measured locally:
+
+    python -m database_utils.shared_cache --port 6390
+
+and pointed at by the services with ``CACHE_SHARED_URL=http://127.0.0.1:6390``.
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlsplit
+
+from database_utils.cache import TTLCache
+
+
+class SharedCacheClient:
+    """
+    A client of a shared cache server, used as the shared tier of a ``TTLCache``.
+
+    Values are JSON documents stored under ``<namespace>:<key>``. Every thread keeps
+    its own keep-alive connection to the server, so a lookup is one round trip with
+    no connection pool to contend on. The tier is only an optimisation: a request
+    that fails or times out is counted as an error and treated as a miss, or
+    ignored for writes, so an unavailable server costs at most its timeout and
+    never fails a lookup.
+
+    Attributes:
+        url (str): The base URL of the shared cache server.
+        namespace (str): The prefix of the keys, e.g. the name of the table.
+        errors (int): The number of failed requests.
+    """
+
+    def __init__(self, url, namespace, timeout=0.1):
+        self.url = url.rstrip("/")
+        self.namespace = namespace
+        self.timeout = timeout
+        self.errors = 0
+        self._address = urlsplit(self.url)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the value of a key and its age in seconds, or None on a miss.
+        """
+        status, body = self._request("GET", key)
+        if status != 200:
+            return None
+        body = json.loads(body)
+        return body["value"], body["age"]
+
+    def set(self, key, value):
+        """
+        Store the value of a key.
+        """
+        self._request("PUT", key, json.dumps(value).encode())
+
+    def delete(self, *keys):
+        """
+        Drop the given keys.
+        """
+        for key in keys:
+            self._request("DELETE", key)
+
+    def stats(self):
+        """
+        Return the address and the error counter of the shared tier.
+        """
+        with self._lock:
+            return {"url": self.url, "namespace": self.namespace, "errors": self.errors}
+
+    def close(self):
+        """
+        Close the connections to the server.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+    def _request(self, method, key, body=None):
+        path = "/" + quote(f"{self.namespace}:{key}", safe="")
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(
+                self._address.hostname, self._address.port, timeout=self.timeout
+            )
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        try:
+            connection.request(method, path, body)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            # The next request of this thread reconnects
+            connection.close()
+            with self._lock:
+                self.errors += 1
+            return None, None
+
+
+class _SharedCacheHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Keep-alive replies are small writes; do not hold them back for an ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        entry = self.server.cache.get(self.path)
+        if entry is None:
+            self._reply(404)
+            return
+        value, stored_at = entry
+        self._reply(200, {"value": value, "age": time.time() - stored_at})
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        value = json.loads(self.rfile.read(length))
+        self.server.cache.set(self.path, (value, time.time()))
+        self._reply(204)
+
+    def do_DELETE(self):
+        self.server.cache.invalidate(self.path)
+        self._reply(204)
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SharedCacheServer(ThreadingHTTPServer):
+    """
+    A local stand-in for a shared cache: an HTTP key-value store with LRU eviction
+    and a time-to-live, backed by a ``TTLCache``.
+
+    ``GET /<key>`` returns ``{"value": ..., "age": ...}`` or 404, ``PUT /<key>``
+    stores the JSON request body and ``DELETE /<key>`` drops the key.
+
+    Attributes:
+        cache (TTLCache): The stored values and the time they were stored.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 6390), max_size=100000, ttl=30.0):
+        super().__init__(address, _SharedCacheHandler)
+        self.cache = TTLCache(max_size, ttl)
+
+
+def main():
+    """
+    Run a shared cache server until interrupted.
+    """
+    parser = argparse.ArgumentParser(description="Run a local shared cache server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--max-size", type=int, default=100000)
+    parser.add_argument("--ttl", type=float, default=30.0)
+    args = parser.parse_args()
+
+    server = SharedCacheServer((args.host, args.port), args.max_size, args.ttl)
+    print(f"Shared cache listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Streaming catalogue ingest for the inventory service.
+
+This script loads a supplier catalogue feed (a JSONL or CSV file of any size)
+into the Product table, matching products on their SKU: a product whose SKU is
+already in the table is updated, any other product is inserted.
+
+The file is read lazily and processed in chunks of ``--chunk-size`` rows, so it
+is ingested in constant memory. Validation and database writes are pipelined: a
+producer thread parses and validates each chunk with ``ProductSchema(many=True)``
+while the calling thread upserts the previous chunks, so the CPU-bound validation
+overlaps the database round trips (which release the GIL). At most
+``--pipeline-depth`` validated chunks wait for their upsert, which bounds memory
+and lets a slow database throttle the reader. Rejected rows are reported on
+stderr with their row number without aborting the ingest. A SKU repeated within
+a chunk is written once, from its last row; the earlier rows are counted as
+superseded rather than upserted.
+
+Usage:
+    python ingest.py catalog.jsonl --chunk-size 1000 --pipeline-depth 4
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+
+from marshmallow import ValidationError
+
+from inventory_service import InventoryService
+from serializers.product_serializer import ProductSchema
+
+
+def read_products(path, file_format="auto"):
+    """
+    Stream the products of a JSONL or CSV file, one row at a time.
+
+    Empty CSV cells are read as missing values, and blank JSONL lines are skipped.
+
+    Args:
+        path (str): The path of the file.
+        file_format (str): "jsonl", "csv", or "auto" to pick from the file extension.
+
+    Yields:
+        dict: The product of each row.
+    """
+    if file_format == "auto":
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    with open(path, newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value != ""}
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def validate_products(rows):
+    """
+    Validate a chunk of rows with ProductSchema(many=True).
+
+    Args:
+        rows (list): The raw rows of the chunk.
+
+    Returns:
+        tuple: The valid products as (position, product) pairs, and the validation
+        messages of each rejected row by its position in the chunk.
+    """
+    try:
+        loaded = [vars(product) for product in ProductSchema(many=True).load(rows)]
+        errors = {}
+    except ValidationError as err:
+        loaded = err.valid_data
+        errors = err.messages
+    valid = [
+        (position, loaded[position])
+        for position in range(len(rows))
+        if position not in errors
+    ]
+    return valid, errors
+
+
+def ingest_products(
+    rows,
+    service,
+    chunk_size=1000,
+    pipeline_depth=4,
+    on_error=None,
+    on_progress=None,
+):
+    """
+    Validate and upsert a stream of products in chunks.
+
+    With a ``pipeline_depth`` of 0, each chunk is validated and then upserted in
+    the calling thread; otherwise a producer thread validates the chunks ahead of
+    the upserts, keeping at most ``pipeline_depth`` of them waiting.
+
+    Args:
+        rows (Iterable[dict]): The raw product rows, read lazily.
+        service (InventoryService): The service writing the products.
+        chunk_size (int): The number of rows validated and upserted together.
+        pipeline_depth (int): The number of validated chunks waiting to be upserted.
+        on_error (callable): Called with the row number (from 1) and the error
+            messages of each rejected row.
+        on_progress (callable): Called with the running totals after each chunk.
+
+    Returns:
+        dict: The number of rows received, upserted, superseded by a later row of
+        their chunk with the same SKU, and rejected, and the duration of the ingest
+        in seconds.
+    """
+    totals = {
+        "received": 0,
+        "upserted": 0,
+        "superseded": 0,
+        "failed": 0,
+        "seconds": 0.0,
+    }
+    start = time.perf_counter()
+    chunks = _validated_chunks(iter(rows), chunk_size, pipeline_depth)
+    try:
+        for offset, size, valid, errors in chunks:
+            result = service.upsert_products([product for _, product in valid])
+            for position, message in result["errors"].items():
+                errors[valid[position][0]] = [message]
+            if on_error is not None:
+                for position in sorted(errors):
+                    on_error(offset + position + 1, errors[position])
+            totals["received"] += size
+            totals["upserted"] += result["upserted"]
+            totals["superseded"] += len(result["superseded"])
+            totals["failed"] += len(errors)
+            totals["seconds"] = time.perf_counter() - start
+            if on_progress is not None:
+                on_progress(dict(totals))
+    finally:
+        chunks.close()
+    totals["seconds"] = time.perf_counter() - start
+    return totals
+
+
+def _validated_chunks(rows, chunk_size, pipeline_depth):
+    """
+    Yield (offset, size, valid, errors) for each chunk of rows, validating the
+    chunks in a producer thread when pipeline_depth is positive.
+    """
+
+    def validate_chunks():
+        for offset in itertools.count(0, chunk_size):
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield (offset, len(chunk), *validate_products(chunk))
+
+    if pipeline_depth <= 0:
+        yield from validate_chunks()
+        return
+
+    done = object()
+    ready = queue.Queue(maxsize=pipeline_depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up when the consumer has stopped, instead of blocking forever
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for chunk in validate_chunks():
+                if not put(chunk):
+                    return
+            put(done)
+        except Exception as e:
+            put(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while (item := ready.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+def main(argv=None):
+    """
+    Parse the command line arguments and ingest the file, printing the progress
+    in rows per second and the rejected rows on stderr.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--pipeline-depth", type=int, default=4)
+    parser.add_argument(
+        "--format", dest="file_format", choices=["auto", "jsonl", "csv"], default="auto"
+    )
+    args = parser.parse_args(argv)
+
+    def report_error(row, messages):
+        print(json.dumps({"row": row, "messages": messages}), file=sys.stderr)
+
+    def report_progress(totals):
+        print(
+            f"{totals['received']} rows, {totals['upserted']} upserted, "
+            f"{totals['superseded']} superseded, {totals['failed']} failed, "
+            f"{totals['received'] / totals['seconds']:.0f} rows/s"
+        )
+
+    totals = ingest_products(
+        read_products(args.path, args.file_format),
+        InventoryService(),
+        args.chunk_size,
+        args.pipeline_depth,
+        on_error=report_error,
+        on_progress=report_progress,
+    )
+    seconds = totals["seconds"]
+    print(
+        f"Ingested {totals['upserted']} of {totals['received']} products in "
+        f"{seconds:.1f}s ({totals['received'] / seconds if seconds else 0:.0f} "
+        f"rows/s), {totals['superseded']} superseded by a later row with the same "
+        f"SKU, {totals['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,37 @@
+from config import Config
+from database_utils.cache import TTLCache
 from database_utils.connect import get_supabase_client
+from database_utils.pagination import iter_pages
+from database_utils.shared_cache import SharedCacheClient
+from product_search import ProductSearchIndex
+from reservation_service import ReservationService
+from stock_watcher import LowStockWatcher
 
 
 class InventoryService:
     """
     InventoryService class to manage inventory operations such as adding, deducting, updating, and retrieving products.
 
+    Products looked up by ID are kept in a bounded LRU cache with a TTL. The writes
+    of this service go through the cache: the row each write returns replaces the
+    cached one, and a per-product version stamp keeps a lookup that read the row
+    before a write from caching it afterwards. Writes made elsewhere are seen once
+    the TTL expires. When ``Config.CACHE.SHARED_URL`` is set, a shared cache tier
+    lets several service processes share their lookups and writes.
+
+    Product search runs on the full-text index of ``Product.search_vector`` on
+    Postgres. With the local SQLite backend, an in-process ``ProductSearchIndex``
+    answers searches instead, kept up to date by the writes of this service.
+
+    Carts hold stock through expiring reservations (``ReservationService``): the
+    held units leave the stock at once and come back when the hold is released or
+    expires, so checkout needs no lock on the product.
+
+    The stock counts returned by the writes of this service feed a
+    ``LowStockWatcher``, which keeps the low-stock products in a sorted set and
+    records an event each time a stock count crosses one of
+    ``Config.LOW_STOCK.THRESHOLDS``.
+
     Methods:
         __init__():
             Initializes the InventoryService class with a Supabase client and table name.
@@ -18,14 +45,34 @@ class InventoryService:
             Raises:
                 ValueError: If there is an error adding the product.
 
-        deduct_goods(product_id):
-            Deducts a product from the inventory by decreasing its stock count.
+        deduct_goods(product_id, quantity=1):
+            Deducts a quantity of a product from the inventory by decreasing its stock count.
             Args:
                 product_id (str): The ID of the product to be deducted.
+                quantity (int): The number of units to deduct. Defaults to 1.
             Returns:
                 dict: The updated product data if successful, None otherwise.
             Raises:
-                ValueError: If the product is not found, stock count is zero, or there is an error deducting the product.
+                ValueError: If the product is not found, there is not enough stock, or there is an error deducting the product.
+
+        adjust_stock_bulk(adjustments):
+            Adds or removes stock for a batch of products in one database call.
+            Args:
+                adjustments (list): The {"product_id", "delta"} items to apply.
+            Returns:
+                list: The result of each item, by its position: the new stock count,
+                or the error of an item that could not be applied.
+            Raises:
+                ValueError: If there is an error applying the batch.
+
+        upsert_products(products):
+            Inserts or updates a batch of products, matched on their SKU.
+            Args:
+                products (list): The validated products, each with a "sku".
+            Returns:
+                dict: The number of products written, the positions of the rows
+                superseded by a later row with the same SKU, and the error message of
+                each rejected product, by its position in the batch.
 
         update_goods(product_id, update_data):
             Updates fields related to a specific product.
@@ -43,6 +90,75 @@ class InventoryService:
                 product_id (str): The ID of the product to be retrieved.
             Returns:
                 dict: The product data if found, None otherwise.
+
+        list_products(category=None, min_price=None, max_price=None, in_stock=False, sort="product_id", after=None, limit=100):
+            Retrieves one page of the products matching the filters, in the given sort order.
+            Args:
+                sort (str): One of sort_orders; a leading "-" sorts in descending order.
+                after (tuple): The (price, product_id) of the last product of the previous page.
+            Returns:
+                list: The products of the page.
+            Raises:
+                ValueError: If there is an error retrieving the products.
+
+        iter_product_pages(page_size=1000):
+            Yields every page of products ordered by ID, reading the table lazily.
+
+        search_products(query, after=None, limit=20):
+            Retrieves one page of the products matching a full-text search, best match first.
+            Args:
+                query (str): The search text.
+                after (tuple): The (rank, product_id) of the last result of the previous page.
+            Returns:
+                list: The matching products, each with its "rank".
+            Raises:
+                ValueError: If there is an error searching the products.
+
+        reserve_stock(product_id, quantity, ttl=None):
+            Holds units of a product until the reservation is confirmed, released or expires.
+            Args:
+                ttl (float): The lifetime of the hold in seconds; defaults to Config.RESERVATION.DEFAULT_TTL.
+            Returns:
+                dict: The reservation.
+            Raises:
+                ValueError: If the product is not found or there is not enough stock.
+
+        confirm_reservation(reservation_id):
+            Confirms a hold that has not expired.
+            Raises:
+                ValueError: If the reservation is not found, expired, or no longer held.
+
+        release_reservation(reservation_id):
+            Releases a hold, returning its units to the stock.
+            Raises:
+                ValueError: If the reservation is not found or no longer held.
+
+        low_stock(threshold=None, after=None, limit=100):
+            Retrieves one page of the products at or below a stock threshold, lowest stock first.
+            Args:
+                after (tuple): The (stock_count, product_id) of the last product of the previous page.
+            Returns:
+                list: The {"product_id", "stock_count"} of the products.
+            Raises:
+                ValueError: If the threshold is above the watched thresholds, or the low-stock products cannot be loaded.
+
+        low_stock_events(after=0, limit=100):
+            Retrieves the threshold-crossing events after a sequence number, oldest first.
+
+        iter_low_stock_pages(threshold, page_size=1000):
+            Yields every page of the products at or below a stock threshold, ordered by ID.
+
+        cache_stats():
+            Returns the size, hit ratio and staleness of the product cache.
+
+        search_stats():
+            Returns the state of the in-process search index.
+
+        reservation_stats():
+            Returns the sweeper counters of the reservations.
+
+        low_stock_stats():
+            Returns the state and counters of the low-stock watcher.
     """
 
     def __init__(self):
@@ -52,9 +168,46 @@ class InventoryService:
         Attributes:
             supabase (SupabaseClient): The client used to interact with the Supabase database.
             table_name (str): The name of the table in the database where product information is stored.
+            upsert_columns (tuple): The columns written by upsert_products.
+            cache (TTLCache): The product cache, keyed by product ID.
+            sort_orders (tuple): The sort orders accepted by list_products.
+            search_index (ProductSearchIndex): The in-process search index, used with
+                the SQLite backend only.
+            search_max_matches (int): The number of matches ranked per search
+                (Config.SEARCH.MAX_MATCHES).
+            stock_watcher (LowStockWatcher): The low-stock products and the threshold
+                crossings of their stock counts.
+            reservations (ReservationService): The stock holds of carts.
         """
         self.supabase = get_supabase_client()
         self.table_name = "product"
+        self.upsert_columns = (
+            "sku",
+            "name",
+            "category",
+            "price",
+            "description",
+            "stock_count",
+        )
+        self.sort_orders = ("product_id", "-product_id", "price", "-price")
+        shared = None
+        if Config.CACHE.SHARED_URL:
+            shared = SharedCacheClient(
+                Config.CACHE.SHARED_URL,
+                self.table_name,
+                timeout=Config.CACHE.SHARED_TIMEOUT,
+            )
+        self.cache = TTLCache(
+            Config.CACHE.PRODUCT_MAX_SIZE, Config.CACHE.PRODUCT_TTL, shared=shared
+        )
+        self.search_max_matches = Config.SEARCH.MAX_MATCHES
+        self.search_index = None
+        if Config.DATABASE.BACKEND == "sqlite":
+            self.search_index = ProductSearchIndex(self.iter_product_pages)
+        self.stock_watcher = LowStockWatcher(self.iter_low_stock_pages)
+        self.reservations = ReservationService(
+            self.supabase, self.cache, stock_watcher=self.stock_watcher
+        )
 
     def add_goods(self, product_data):
         """
@@ -65,60 +218,353 @@ class InventoryService:
             response = (
                 self.supabase.table(self.table_name).insert(product_data).execute()
             )
-            return response.data[0] if response.data else None
         except Exception as e:
             raise ValueError(f"Error adding product: {str(e)}")
+        product = response.data[0] if response.data else None
+        if product:
+            self.cache.set(str(product["product_id"]), dict(product))
+            if self.search_index is not None:
+                self.search_index.add(product)
+            self._watch_stock(product)
+        return product
 
-    def deduct_goods(self, product_id):
+    def deduct_goods(self, product_id, quantity=1):
         """
-        Deduct a product from inventory (decrease stock count)
+        Deduct a quantity of a product from inventory (decrease stock count)
+
+        The stock check and the decrement are one conditional ``UPDATE`` inside the
+        ``deduct_stock`` database function, so a multi-unit order is a single round
+        trip and concurrent orders can never oversell.
         """
         try:
-            # Get the current product
-            product = self.get_product_by_id(product_id)
-            if not product:
-                raise ValueError("Product not found")
+            product = self.cache.write_through(
+                str(product_id),
+                lambda: self._first(
+                    self.supabase.rpc(
+                        "deduct_stock",
+                        {"p_product_id": product_id, "p_quantity": quantity},
+                    ).execute()
+                ),
+            )
+        except Exception as e:
+            raise ValueError(f"Error deducting product: {str(e)}")
+        self._watch_stock(product)
+        return product
 
-            if product["stock_count"] <= 0:
-                raise ValueError("Stock count is already zero")
+    def adjust_stock_bulk(self, adjustments):
+        """
+        Add or remove stock for a batch of products in one database call
 
-            updated_stock = product["stock_count"] - 1
+        The ``adjust_stock_bulk`` database function sums the deltas of each product
+        and applies them all with one set-based ``UPDATE`` that skips the products
+        whose stock would go negative, so a warehouse reconciliation costs a single
+        round trip. Each result holds the new stock count, or the error of an item
+        whose product is unknown or does not have enough stock; every item of such
+        a product fails, without failing the rest of the batch.
+        """
+        if not adjustments:
+            return []
+        try:
+            response = self.supabase.rpc(
+                "adjust_stock_bulk", {"p_adjustments": adjustments}
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error adjusting stock: {str(e)}")
+        finally:
+            self.cache.invalidate(*{str(item["product_id"]) for item in adjustments})
+        self._watch_stock(*(result for result in response.data if not result["error"]))
+        return response.data
 
-            # Update stock count
-            response = (
-                self.supabase.table(self.table_name)
-                .update({"stock_count": updated_stock})
-                .eq("product_id", product_id)
-                .execute()
+    def upsert_products(self, products):
+        """
+        Insert or update a batch of validated products, matched on their SKU
+
+        The batch is written with one multi-row upsert on the unique ``sku`` column;
+        a SKU repeated in the batch keeps its last row. If the database rejects the
+        batch, its rows are written one by one so only the failing rows are
+        rejected. Written products are dropped from the cache and re-indexed.
+
+        Returns a dict with the number of products written, the positions of the
+        rows superseded by a later row with the same SKU (which are not written),
+        and the error message of each rejected product, by its position in the
+        batch.
+        """
+        errors = {}
+        superseded = []
+        rows = {}
+        for index, product in enumerate(products):
+            if not product.get("sku"):
+                errors[index] = "SKU is required"
+                continue
+            if product["sku"] in rows:
+                superseded.append(rows.pop(product["sku"])[0])
+            rows[product["sku"]] = (
+                index,
+                {column: product.get(column) for column in self.upsert_columns},
             )
+        pending = list(rows.values())
 
-            return response.data[0] if response.data else None
-        except Exception as e:
-            raise ValueError(f"Error deducting product: {str(e)}")
+        written = []
+        try:
+            if pending:
+                written = (
+                    self.supabase.table(self.table_name)
+                    .upsert([row for _, row in pending], on_conflict="sku")
+                    .execute()
+                    .data
+                )
+        except Exception:
+            for index, row in pending:
+                try:
+                    written.extend(
+                        self.supabase.table(self.table_name)
+                        .upsert(row, on_conflict="sku")
+                        .execute()
+                        .data
+                    )
+                except Exception as e:
+                    errors[index] = f"Error upserting product: {str(e)}"
+
+        self.cache.invalidate(*(str(product["product_id"]) for product in written))
+        if self.search_index is not None:
+            for product in written:
+                self.search_index.add(product)
+        self._watch_stock(*written)
+        return {
+            "upserted": len(written),
+            "superseded": sorted(superseded),
+            "errors": errors,
+        }
 
     def update_goods(self, product_id, update_data):
         """
         Update fields related to a specific product
         """
         try:
-            response = (
-                self.supabase.table(self.table_name)
-                .update(update_data)
-                .eq("product_id", product_id)
-                .execute()
+            product = self.cache.write_through(
+                str(product_id),
+                lambda: self._first(
+                    self.supabase.table(self.table_name)
+                    .update(update_data)
+                    .eq("product_id", product_id)
+                    .execute()
+                ),
             )
-            return response.data[0] if response.data else None
         except Exception as e:
             raise ValueError(f"Error updating product: {str(e)}")
+        if product and self.search_index is not None:
+            self.search_index.add(product)
+        self._watch_stock(product)
+        return product
 
     def get_product_by_id(self, product_id):
         """
-        Retrieve a product by its ID
+        Retrieve a product by its ID, from the cache when possible
+        """
+        product = self.cache.get_or_load(
+            str(product_id), lambda: self._select_product(product_id)
+        )
+        return dict(product) if product else None
+
+    def list_products(
+        self,
+        category=None,
+        min_price=None,
+        max_price=None,
+        in_stock=False,
+        sort="product_id",
+        after=None,
+        limit=100,
+    ):
+        """
+        Retrieve one page of the products matching the filters, after the given
+        ``(price, product_id)`` cursor in the sort order
+        """
+        after_price, after_id = after if after is not None else (None, None)
+        try:
+            response = self.supabase.rpc(
+                "list_products",
+                {
+                    "p_category": category,
+                    "p_min_price": min_price,
+                    "p_max_price": max_price,
+                    "p_in_stock": in_stock,
+                    "p_sort": sort,
+                    "p_after_price": after_price,
+                    "p_after_id": after_id,
+                    "p_limit": limit,
+                },
+            ).execute()
+            return response.data
+        except Exception as e:
+            raise ValueError(f"Error retrieving products: {str(e)}")
+
+    def iter_product_pages(self, page_size=1000):
+        """
+        Yield every page of products ordered by product_id, reading them lazily
+        """
+        return iter_pages(
+            lambda after, limit: self.list_products(after=after, limit=limit),
+            lambda product: (None, product["product_id"]),
+            page_size=page_size,
+        )
+
+    def iter_low_stock_pages(self, threshold, page_size=1000):
+        """
+        Yield every page of the products at or below a stock threshold, ordered by
+        product_id
+
+        Each page is a range scan of the ``product_stock_count`` index.
+        """
+
+        def fetch_page(after, limit):
+            return (
+                self.supabase.table(self.table_name)
+                .select("product_id", "stock_count")
+                .lte("stock_count", threshold)
+                .gt("product_id", after)
+                .order("product_id")
+                .limit(limit)
+                .execute()
+                .data
+            )
+
+        return iter_pages(
+            fetch_page, lambda product: product["product_id"], 0, page_size
+        )
+
+    def low_stock(self, threshold=None, after=None, limit=100):
+        """
+        Retrieve one page of the products at or below a stock threshold, lowest
+        stock first
+
+        The page is read from the low-stock watcher's sorted set, without reading
+        the product table; ``after`` is the ``(stock_count, product_id)`` of the
+        last product of the previous page.
+        """
+        try:
+            return self.stock_watcher.low_stock(threshold, after, limit)
+        except Exception as e:
+            raise ValueError(f"Error retrieving low-stock products: {str(e)}")
+
+    def low_stock_events(self, after=0, limit=100):
+        """
+        Retrieve the threshold-crossing events after a sequence number, oldest first
+        """
+        return self.stock_watcher.events(after, limit)
+
+    def search_products(self, query, after=None, limit=20):
+        """
+        Retrieve one page of the products matching a full-text search, best match first
+
+        Results are ordered by decreasing rank then product_id, and ``after`` is the
+        ``(rank, product_id)`` of the last result of the previous page. Each result
+        says whether the search was truncated to the ``search_max_matches`` products
+        with the lowest IDs.
+        """
+        if self.search_index is not None:
+            result = self.search_index.search(
+                query, after, limit, self.search_max_matches
+            )
+            if result is not None:
+                matches, truncated = result
+                return self._select_ranked(matches, truncated)
+
+        after_rank, after_id = after if after is not None else (None, None)
+        try:
+            response = self.supabase.rpc(
+                "search_products",
+                {
+                    "p_query": query,
+                    "p_after_rank": after_rank,
+                    "p_after_id": after_id,
+                    "p_limit": limit,
+                    "p_max_matches": self.search_max_matches,
+                },
+            ).execute()
+            return response.data
+        except Exception as e:
+            raise ValueError(f"Error searching products: {str(e)}")
+
+    def reserve_stock(self, product_id, quantity, ttl=None):
+        """
+        Hold units of a product until the reservation is confirmed, released or expires
+        """
+        return self.reservations.reserve(product_id, quantity, ttl)
+
+    def confirm_reservation(self, reservation_id):
+        """
+        Confirm a hold that has not expired
+        """
+        return self.reservations.confirm(reservation_id)
+
+    def release_reservation(self, reservation_id):
+        """
+        Release a hold, returning its units to the stock
+        """
+        return self.reservations.release(reservation_id)
+
+    def cache_stats(self):
+        """
+        Return the size, hit ratio and staleness of the product cache
+        """
+        return self.cache.stats()
+
+    def search_stats(self):
+        """
+        Return the state of the in-process search index
         """
-        response = (
+        if self.search_index is None:
+            return {"index": "database"}
+        return dict(self.search_index.stats(), index="in-process")
+
+    def reservation_stats(self):
+        """
+        Return the sweeper counters of the reservations
+        """
+        return self.reservations.stats()
+
+    def low_stock_stats(self):
+        """
+        Return the state and counters of the low-stock watcher
+        """
+        return self.stock_watcher.stats()
+
+    def _watch_stock(self, *products):
+        for product in products:
+            if product:
+                self.stock_watcher.observe(
+                    product["product_id"], product.get("stock_count")
+                )
+
+    def _select_ranked(self, matches, truncated):
+        if not matches:
+            return []
+        try:
+            response = (
+                self.supabase.table(self.table_name)
+                .select("*")
+                .in_("product_id", [product_id for _, product_id in matches])
+                .execute()
+            )
+        except Exception as e:
+            raise ValueError(f"Error searching products: {str(e)}")
+        products = {product["product_id"]: product for product in response.data}
+        # A product deleted since it was indexed is left out
+        return [
+            dict(products[product_id], rank=rank, truncated=truncated)
+            for rank, product_id in matches
+            if product_id in products
+        ]
+
+    def _select_product(self, product_id):
+        return self._first(
             self.supabase.table(self.table_name)
             .select("*")
             .eq("product_id", product_id)
             .execute()
         )
+
+    @staticmethod
+    def _first(response):
         return response.data[0] if response.data else None
@@ -15,14 +15,23 @@ class Product:
         Description of the product (default is None).
     stock_count : int, optional
         Number of items available in stock (default is 0).
+    sku : str, optional
+        Supplier stock keeping unit, unique across products (default is None).
 
     Methods:
-    __init__(self, name, category, price, description=None, stock_count=0, product_id=None):
+    __init__(self, name, category, price, description=None, stock_count=0, product_id=None, sku=None):
         Initializes the Product with the given attributes.
     """
 
     def __init__(
-        self, name, category, price, description=None, stock_count=0, product_id=None
+        self,
+        name,
+        category,
+        price,
+        description=None,
+        stock_count=0,
+        product_id=None,
+        sku=None,
     ):
         """
         Initialize a new Product instance.
@@ -34,6 +43,7 @@ class Product:
             description (str, optional): A brief description of the product. Defaults to None.
             stock_count (int, optional): The number of items available in stock. Defaults to 0.
             product_id (int, optional): The unique identifier for the product. Defaults to None.
+            sku (str, optional): The supplier stock keeping unit. Defaults to None.
         """
         self.product_id = product_id
         self.name = name
@@ -41,3 +51,4 @@ class Product:
         self.price = price
         self.description = description
         self.stock_count = stock_count
+        self.sku = sku
@@ -0,0 +1,107 @@
+import logging
+import threading
+
+from database_utils.inverted_index import InvertedIndex
+from database_utils.sqlite_functions import PRODUCT_SEARCH_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+
+class ProductSearchIndex:
+    """
+    An in-process full-text index of the product catalogue.
+
+    On Postgres, product search uses the GIN index of ``Product.search_vector``.
+    The local SQLite backend has no such index, so its ``search_products`` function
+    ranks every product on each search; this index answers searches from memory
+    instead, with the same ranking.
+
+    The index is warmed in a background thread from the product table, paging by
+    product ID, the first time it is searched. Until the warm-up has finished,
+    ``search`` returns None and the caller falls back to the database function.
+    The inventory service adds the products it creates and updates; products
+    written by other processes are only seen after a restart, which is fine for a
+    local development backend.
+
+    Attributes:
+        load_pages (callable): Returns an iterable of pages of product rows, used to
+            warm the index.
+        index (InvertedIndex): The index of product names, categories and descriptions.
+        ready (threading.Event): Set once the index holds every existing product.
+        searches (int): The number of searches answered by the index.
+    """
+
+    def __init__(self, load_pages):
+        self.load_pages = load_pages
+        self.index = InvertedIndex(PRODUCT_SEARCH_WEIGHTS)
+        self.ready = threading.Event()
+        self.searches = 0
+        self._warming = False
+        self._lock = threading.Lock()
+
+    def search(self, query, after=None, limit=20, max_matches=None):
+        """
+        Find the products matching a search, best match first.
+
+        Args:
+            query (str): The search text.
+            after (tuple): The (rank, product_id) of the last result of the previous page.
+            limit (int): The maximum number of results.
+            max_matches (int): The maximum number of matches ranked.
+
+        Returns:
+            tuple: The (rank, product_id) pairs and whether the search matched more
+            than max_matches products, or None while the index is not ready.
+        """
+        if not self.ready.is_set():
+            self.start_warming()
+            return None
+        with self._lock:
+            self.searches += 1
+        return self.index.search(query, after, limit, max_matches)
+
+    def add(self, product):
+        """
+        Index a created or updated product.
+        """
+        self.index.add(product["product_id"], product)
+
+    def start_warming(self):
+        """
+        Start warming the index in a background thread, unless already started.
+        """
+        with self._lock:
+            if self._warming or self.ready.is_set():
+                return
+            self._warming = True
+        threading.Thread(target=self.warm, daemon=True).start()
+
+    def warm(self):
+        """
+        Add every product of the product table to the index.
+        """
+        try:
+            for page in self.load_pages():
+                for product in page:
+                    self.add(product)
+            self.ready.set()
+        except Exception:
+            logger.exception("Warming the product search index failed")
+        finally:
+            with self._lock:
+                self._warming = False
+
+    def stats(self):
+        """
+        Return the state and counters of the index.
+
+        Returns:
+            dict: Whether the index is ready, the number of products it holds and
+            the number of searches it answered.
+        """
+        with self._lock:
+            return {
+                "ready": self.ready.is_set(),
+                "products": len(self.index),
+                "searches": self.searches,
+            }
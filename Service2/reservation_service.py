@@ -0,0 +1,226 @@
+import logging
+import threading
+
+from config import Config
+from database_utils.connect import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationService:
+    """
+    A service class for stock reservations: expiring holds on units of a product.
+
+    A hold takes its units out of ``Product.stock_count`` at once, with the same
+    conditional ``UPDATE`` as a deduction, so carts holding stock can never oversell
+    a product and no lock is held while the customer checks out. A confirmed hold
+    keeps its units; a released hold gives them back. A hold that is neither
+    confirmed nor released before its TTL runs out expires: a background sweeper
+    claims the expired holds in batches, oldest first, and returns their units to
+    the stock with one set-based update per batch.
+
+    The sweeper claims holds with ``FOR UPDATE SKIP LOCKED``, so several service
+    processes can sweep side by side, and a hold confirmed or released while it
+    is swept is only settled once.
+
+    Attributes:
+        supabase: The database client.
+        table_name (str): The name of the reservation table.
+        cache (TTLCache): The product cache to invalidate when a stock count changes,
+            or None.
+        stock_watcher (LowStockWatcher): Told the stock count left by each hold,
+            release and sweep, or None.
+        default_ttl (float): The lifetime of a hold, in seconds, when none is given.
+        sweep_interval (float): Seconds between two sweeps; 0 disables the background
+            sweeper.
+        sweep_batch_size (int): The maximum number of holds expired per database call.
+    """
+
+    def __init__(
+        self,
+        supabase=None,
+        cache=None,
+        default_ttl=None,
+        sweep_interval=None,
+        sweep_batch_size=None,
+        stock_watcher=None,
+    ):
+        if default_ttl is None:
+            default_ttl = Config.RESERVATION.DEFAULT_TTL
+        if sweep_interval is None:
+            sweep_interval = Config.RESERVATION.SWEEP_INTERVAL
+        if sweep_batch_size is None:
+            sweep_batch_size = Config.RESERVATION.SWEEP_BATCH_SIZE
+        self.supabase = supabase if supabase is not None else get_supabase_client()
+        self.table_name = "reservation"
+        self.cache = cache
+        self.stock_watcher = stock_watcher
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+        self.sweep_batch_size = sweep_batch_size
+        self.sweeps = 0
+        self.expired = 0
+        self.restocked = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper = None
+
+    def reserve(self, product_id, quantity, ttl=None):
+        """
+        Hold units of a product for ``ttl`` seconds and return the reservation
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        try:
+            response = self.supabase.rpc(
+                "reserve_stock",
+                {
+                    "p_product_id": product_id,
+                    "p_quantity": quantity,
+                    "p_ttl_seconds": int(ttl),
+                },
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error reserving stock: {str(e)}")
+        finally:
+            self._invalidate(product_id)
+        self._watch_stock(product_id)
+        self.start_sweeping()
+        return response.data[0]
+
+    def confirm(self, reservation_id):
+        """
+        Confirm a hold that has not expired, keeping its units out of the stock
+        """
+        try:
+            response = self.supabase.rpc(
+                "confirm_reservation", {"p_reservation_id": reservation_id}
+            ).execute()
+            return response.data[0]
+        except Exception as e:
+            raise ValueError(f"Error confirming reservation: {str(e)}")
+
+    def release(self, reservation_id):
+        """
+        Release a hold, returning its units to the stock
+        """
+        try:
+            response = self.supabase.rpc(
+                "release_reservation", {"p_reservation_id": reservation_id}
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error releasing reservation: {str(e)}")
+        reservation = response.data[0]
+        self._invalidate(reservation["product_id"])
+        self._watch_stock(reservation["product_id"])
+        return reservation
+
+    def get_reservation(self, reservation_id):
+        """
+        Retrieve a reservation by its ID
+        """
+        response = (
+            self.supabase.table(self.table_name)
+            .select("*")
+            .eq("reservation_id", reservation_id)
+            .execute()
+        )
+        return response.data[0] if response.data else None
+
+    def sweep(self):
+        """
+        Expire the holds whose TTL has run out, in batches, returning their units to
+        the stock
+
+        Batches are swept until one comes back short, so a backlog of expired holds
+        is cleared in one sweep. Returns the number of holds expired.
+        """
+        expired = 0
+        restocked = 0
+        while True:
+            try:
+                response = self.supabase.rpc(
+                    "expire_reservations", {"p_limit": self.sweep_batch_size}
+                ).execute()
+            except Exception as e:
+                raise ValueError(f"Error expiring reservations: {str(e)}")
+            rows = response.data or []
+            self._invalidate(*(row["product_id"] for row in rows))
+            if self.stock_watcher is not None:
+                self.stock_watcher.observe_rows(rows)
+            holds = sum(row["holds"] for row in rows)
+            expired += holds
+            restocked += sum(row["quantity"] for row in rows)
+            if holds < self.sweep_batch_size:
+                break
+
+        with self._lock:
+            self.sweeps += 1
+            self.expired += expired
+            self.restocked += restocked
+        return expired
+
+    def start_sweeping(self):
+        """
+        Start sweeping the expired holds in a background thread, unless already started.
+        """
+        if self.sweep_interval <= 0:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._run, daemon=True)
+        self._sweeper.start()
+
+    def stop(self):
+        """
+        Stop the background sweeper.
+        """
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+
+    def stats(self):
+        """
+        Return the sweeper counters of the reservations.
+
+        Returns:
+            dict: The number of sweeps run, the number of holds they expired and
+            the number of units they returned to the stock.
+        """
+        with self._lock:
+            return {
+                "sweeps": self.sweeps,
+                "expired_holds": self.expired,
+                "restocked_units": self.restocked,
+                "sweep_interval": self.sweep_interval,
+                "default_ttl": self.default_ttl,
+            }
+
+    def _invalidate(self, *product_ids):
+        if self.cache is not None and product_ids:
+            self.cache.invalidate(*(str(product_id) for product_id in product_ids))
+
+    def _watch_stock(self, product_id):
+        # The reservation functions return the hold, not the stock count it left,
+        # so it is read back; a failed read is caught up by the watcher's refresh
+        if self.stock_watcher is None:
+            return
+        try:
+            response = (
+                self.supabase.table("product")
+                .select("product_id", "stock_count")
+                .eq("product_id", product_id)
+                .execute()
+            )
+        except Exception:
+            logger.exception("Reading the stock count of product %s failed", product_id)
+            return
+        self.stock_watcher.observe_rows(response.data)
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Sweeping the expired reservations failed")
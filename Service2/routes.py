@@ -2,7 +2,24 @@ from flask import Blueprint, jsonify, request
 from inventory_service import InventoryService
 from marshmallow import ValidationError
 
-from serializers.product_serializer import product_schema
+from serializers.product_serializer import product_list_schema, product_schema
+from serializers.reservation_serializer import reservation_schema
+from serializers.stock_serializer import stock_adjustments_schema
+
+# Page sizes accepted by the product listing
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Page sizes accepted by the product search
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+# Page sizes accepted by the low-stock listing and its events
+DEFAULT_LOW_STOCK_PAGE_SIZE = 100
+MAX_LOW_STOCK_PAGE_SIZE = 1000
+
+# Number of items accepted by one bulk stock adjustment
+MAX_STOCK_BATCH = 50000
 
 # Create a blueprint for inventory routes
 inventory_bp = Blueprint("inventory", __name__)
@@ -39,10 +56,23 @@ def add_goods():
 @inventory_bp.route("/deduct/<int:product_id>", methods=["POST"])
 def deduct_goods(product_id):
     """
-    Deduct a product from inventory
+    Deduct a quantity of a product from inventory
     """
     try:
-        updated_product = inventory_service.deduct_goods(product_id)
+        body = request.get_json(silent=True) or {}
+        quantity = body.get("quantity", 1)
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+            return (
+                jsonify(
+                    {
+                        "error": "Invalid Quantity",
+                        "message": "Quantity must be a positive integer",
+                    }
+                ),
+                400,
+            )
+
+        updated_product = inventory_service.deduct_goods(product_id, quantity)
         return (
             jsonify(
                 {
@@ -78,3 +108,419 @@ def update_goods(product_id):
         return jsonify({"error": "Validation Error", "messages": err.messages}), 400
     except ValueError as err:
         return jsonify({"error": "Update Error", "message": str(err)}), 400
+
+
+@inventory_bp.route("/stock/bulk", methods=["POST"])
+def adjust_stock_bulk():
+    """
+    Add or remove stock for a batch of products, reporting each item's result
+    """
+    items = request.json
+    if isinstance(items, dict):
+        items = items.get("adjustments")
+    if not isinstance(items, list) or len(items) > MAX_STOCK_BATCH:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Request",
+                    "message": "Expected a list of at most "
+                    f"{MAX_STOCK_BATCH} stock adjustments",
+                }
+            ),
+            400,
+        )
+
+    # Validate the whole batch, applying only the items that passed
+    try:
+        loaded = stock_adjustments_schema.load(items)
+        validation_errors = {}
+    except ValidationError as err:
+        loaded = err.valid_data
+        validation_errors = err.messages
+    valid = [index for index in range(len(items)) if index not in validation_errors]
+
+    try:
+        applied = inventory_service.adjust_stock_bulk([loaded[i] for i in valid])
+    except ValueError as err:
+        return jsonify({"error": "Adjustment Error", "message": str(err)}), 500
+
+    results = [
+        {"index": index, "error": "Validation Error", "messages": messages}
+        for index, messages in validation_errors.items()
+    ]
+    for result in applied:
+        index = valid[result["item_index"]]
+        item = {"index": index, "product_id": result["product_id"]}
+        if result["error"]:
+            item["error"] = result["error"]
+        else:
+            item["stock_count"] = result["stock_count"]
+        results.append(item)
+    results.sort(key=lambda result: result["index"])
+
+    failed = sum("error" in result for result in results)
+    return (
+        jsonify(
+            {
+                "applied": len(results) - failed,
+                "failed": failed,
+                "results": results,
+            }
+        ),
+        200,
+    )
+
+
+@inventory_bp.route("/reservations", methods=["POST"])
+def reserve_stock():
+    """
+    Hold units of a product for a cart until the hold is confirmed, released or expires
+    """
+    try:
+        data = reservation_schema.load(request.get_json(silent=True) or {})
+        reservation = inventory_service.reserve_stock(
+            data["product_id"], data["quantity"], data.get("ttl")
+        )
+        return (
+            jsonify(
+                {
+                    "message": "Stock reserved successfully",
+                    "reservation": reservation_schema.dump(reservation),
+                }
+            ),
+            201,
+        )
+    except ValidationError as err:
+        return jsonify({"error": "Validation Error", "messages": err.messages}), 400
+    except ValueError as err:
+        return jsonify({"error": "Reservation Error", "message": str(err)}), 400
+
+
+@inventory_bp.route("/reservations/<int:reservation_id>/confirm", methods=["POST"])
+def confirm_reservation(reservation_id):
+    """
+    Confirm a hold that has not expired
+    """
+    try:
+        reservation = inventory_service.confirm_reservation(reservation_id)
+        return (
+            jsonify(
+                {
+                    "message": "Reservation confirmed successfully",
+                    "reservation": reservation_schema.dump(reservation),
+                }
+            ),
+            200,
+        )
+    except ValueError as err:
+        return jsonify({"error": "Confirmation Error", "message": str(err)}), 400
+
+
+@inventory_bp.route("/reservations/<int:reservation_id>/release", methods=["POST"])
+def release_reservation(reservation_id):
+    """
+    Release a hold, returning its units to the stock
+    """
+    try:
+        reservation = inventory_service.release_reservation(reservation_id)
+        return (
+            jsonify(
+                {
+                    "message": "Reservation released successfully",
+                    "reservation": reservation_schema.dump(reservation),
+                }
+            ),
+            200,
+        )
+    except ValueError as err:
+        return jsonify({"error": "Release Error", "message": str(err)}), 400
+
+
+@inventory_bp.route("/reservations/stats", methods=["GET"])
+def get_reservation_stats():
+    """
+    Retrieve the sweeper counters of the stock reservations
+    """
+    return jsonify({"reservations": inventory_service.reservation_stats()}), 200
+
+
+def _parse_listing_args(args):
+    """
+    Validate the filter, sort and pagination query parameters
+    """
+    min_price = args.get("min_price", type=float)
+    max_price = args.get("max_price", type=float)
+    if "min_price" in args and min_price is None:
+        raise ValueError("min_price must be a number")
+    if "max_price" in args and max_price is None:
+        raise ValueError("max_price must be a number")
+
+    sort = args.get("sort", "product_id")
+    if sort not in inventory_service.sort_orders:
+        raise ValueError(
+            f"sort must be one of {', '.join(inventory_service.sort_orders)}"
+        )
+
+    after = None
+    if args.get("after"):
+        # The cursor is "<product_id>", or "<price>,<product_id>" for price orders
+        try:
+            *price, product_id = args["after"].split(",")
+            if len(price) != (sort.lstrip("-") == "price"):
+                raise ValueError
+            after = (float(price[0]) if price else None, int(product_id))
+        except ValueError:
+            raise ValueError("after must be the next_after of the previous page")
+
+    limit = args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    return {
+        "category": args.get("category") or None,
+        "min_price": min_price,
+        "max_price": max_price,
+        "in_stock": args.get("in_stock", "").lower() in ("1", "true"),
+        "sort": sort,
+        "after": after,
+        "limit": limit,
+    }
+
+
+@inventory_bp.route("/products", methods=["GET"])
+def list_products():
+    """
+    Retrieve the products matching the filters one page at a time
+
+    Query parameters:
+        category: Only return products of this category.
+        min_price, max_price: Only return products in this price range.
+        in_stock: When true, only return products with units in stock.
+        sort: product_id (the default), price, or -product_id / -price for
+            descending order.
+        after: The previous page's next_after.
+        limit: The page size, at most MAX_PAGE_SIZE.
+    """
+    try:
+        query = _parse_listing_args(request.args)
+    except ValueError as err:
+        return jsonify({"error": "Invalid Query", "message": str(err)}), 400
+
+    try:
+        products = inventory_service.list_products(**query)
+    except ValueError as err:
+        return jsonify({"error": "Retrieval Error", "message": str(err)}), 500
+
+    next_after = None
+    if len(products) == query["limit"]:
+        last = products[-1]
+        next_after = str(last["product_id"])
+        if query["sort"].lstrip("-") == "price":
+            next_after = f"{last['price']},{next_after}"
+    return (
+        jsonify(
+            {"products": product_list_schema.dump(products), "next_after": next_after}
+        ),
+        200,
+    )
+
+
+@inventory_bp.route("/low-stock", methods=["GET"])
+def list_low_stock():
+    """
+    Retrieve the products at or below a stock threshold, lowest stock first
+
+    The page is answered from the low-stock watcher's sorted set, in time
+    proportional to the page size, without scanning the product table.
+
+    Query parameters:
+        threshold: The stock threshold, at most the highest of
+            Config.LOW_STOCK.THRESHOLDS (the default).
+        after: The previous page's next_after.
+        limit: The page size, at most MAX_LOW_STOCK_PAGE_SIZE.
+    """
+    thresholds = inventory_service.stock_watcher.thresholds
+    threshold = request.args.get("threshold", type=int)
+    if "threshold" in request.args and threshold is None:
+        return (
+            jsonify(
+                {"error": "Invalid Query", "message": "threshold must be an integer"}
+            ),
+            400,
+        )
+    if threshold is None:
+        threshold = thresholds[-1]
+    if threshold > thresholds[-1]:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Query",
+                    "message": f"threshold must be at most {thresholds[-1]}",
+                }
+            ),
+            400,
+        )
+
+    after = None
+    if request.args.get("after"):
+        # The cursor is "<stock_count>,<product_id>"
+        try:
+            stock_count, product_id = request.args["after"].split(",")
+            after = (int(stock_count), int(product_id))
+        except ValueError:
+            return (
+                jsonify(
+                    {
+                        "error": "Invalid Query",
+                        "message": "after must be the next_after of the previous page",
+                    }
+                ),
+                400,
+            )
+
+    limit = request.args.get("limit", DEFAULT_LOW_STOCK_PAGE_SIZE, type=int)
+    if not 1 <= limit <= MAX_LOW_STOCK_PAGE_SIZE:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Query",
+                    "message": f"limit must be between 1 and {MAX_LOW_STOCK_PAGE_SIZE}",
+                }
+            ),
+            400,
+        )
+
+    try:
+        products = inventory_service.low_stock(threshold, after, limit)
+    except ValueError as err:
+        return jsonify({"error": "Retrieval Error", "message": str(err)}), 500
+
+    next_after = None
+    if len(products) == limit:
+        next_after = f"{products[-1]['stock_count']},{products[-1]['product_id']}"
+    return (
+        jsonify(
+            {"threshold": threshold, "products": products, "next_after": next_after}
+        ),
+        200,
+    )
+
+
+@inventory_bp.route("/low-stock/events", methods=["GET"])
+def list_low_stock_events():
+    """
+    Retrieve the stock threshold-crossing events, oldest first
+
+    Query parameters:
+        after: The sequence number of the last event already seen (next_after of
+            the previous call); defaults to 0.
+        limit: The number of events, at most MAX_LOW_STOCK_PAGE_SIZE.
+    """
+    after = request.args.get("after", 0, type=int)
+    limit = request.args.get("limit", DEFAULT_LOW_STOCK_PAGE_SIZE, type=int)
+    if not 1 <= limit <= MAX_LOW_STOCK_PAGE_SIZE:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Query",
+                    "message": f"limit must be between 1 and {MAX_LOW_STOCK_PAGE_SIZE}",
+                }
+            ),
+            400,
+        )
+
+    events = inventory_service.low_stock_events(after, limit)
+    next_after = events[-1]["sequence"] if events else after
+    return jsonify({"events": events, "next_after": next_after}), 200
+
+
+@inventory_bp.route("/low-stock/stats", methods=["GET"])
+def get_low_stock_stats():
+    """
+    Retrieve the state and counters of the low-stock watcher
+    """
+    return jsonify({"low_stock": inventory_service.low_stock_stats()}), 200
+
+
+@inventory_bp.route("/search", methods=["GET"])
+def search_products():
+    """
+    Search the product names, categories and descriptions, best match first
+
+    Searches are served by the GIN index of Product.search_vector (or the
+    in-process index of the local backend), within a latency budget of 50 ms at
+    the 99th percentile for a one million product catalogue (see
+    benchmarks/search_latency.py). To stay within it, a search matching more than
+    Config.SEARCH.MAX_MATCHES products only ranks those with the lowest IDs, the
+    same ones on every page, and its pages say so with "truncated".
+
+    Query parameters:
+        q: The search text; on Postgres, quoted phrases, "or" and "-word" are
+            supported, while the local backend matches products containing every
+            word.
+        after: The previous page's next_after.
+        limit: The page size, at most MAX_SEARCH_PAGE_SIZE.
+    """
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", DEFAULT_SEARCH_PAGE_SIZE, type=int)
+    try:
+        if not query:
+            raise ValueError("q must be a non-empty search text")
+        if not 1 <= limit <= MAX_SEARCH_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_SEARCH_PAGE_SIZE}")
+        after = None
+        if request.args.get("after"):
+            # The cursor is "<rank>,<product_id>"
+            try:
+                rank, product_id = request.args["after"].split(",")
+                after = (float(rank), int(product_id))
+            except ValueError:
+                raise ValueError("after must be the next_after of the previous page")
+    except ValueError as err:
+        return jsonify({"error": "Invalid Query", "message": str(err)}), 400
+
+    try:
+        products = inventory_service.search_products(query, after, limit)
+    except ValueError as err:
+        return jsonify({"error": "Search Error", "message": str(err)}), 500
+
+    next_after = None
+    if len(products) == limit:
+        next_after = f"{products[-1]['rank']},{products[-1]['product_id']}"
+    results = [
+        dict(product_schema.dump(product), rank=product["rank"]) for product in products
+    ]
+    truncated = any(product.get("truncated") for product in products)
+    return (
+        jsonify(
+            {"products": results, "next_after": next_after, "truncated": truncated}
+        ),
+        200,
+    )
+
+
+@inventory_bp.route("/search/stats", methods=["GET"])
+def get_search_stats():
+    """
+    Retrieve the state of the product search index
+    """
+    return jsonify({"search": inventory_service.search_stats()}), 200
+
+
+@inventory_bp.route("/<int:product_id>", methods=["GET"])
+def get_product(product_id):
+    """
+    Retrieve a product by its ID
+    """
+    product = inventory_service.get_product_by_id(product_id)
+    if not product:
+        return jsonify({"error": "Not Found", "message": "Product not found"}), 404
+    return jsonify(product_schema.dump(product)), 200
+
+
+@inventory_bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """
+    Retrieve the hit ratio and staleness of the product cache
+    """
+    return jsonify({"cache": inventory_service.cache_stats()}), 200
@@ -0,0 +1,41 @@
+from marshmallow import Schema, fields, validate
+
+from config import Config
+
+
+class ReservationSchema(Schema):
+    """
+    ReservationSchema is a Marshmallow schema for serializing and deserializing stock reservations.
+
+    Attributes:
+        reservation_id (int): The ID of the reservation. Read-only.
+        product_id (int): The ID of the product whose units are held.
+        quantity (int): The number of units held. Must be at least 1.
+        ttl (float): The lifetime of the hold in seconds, up to Config.RESERVATION.MAX_TTL. Optional.
+        status (str): "held", "confirmed", "released" or "expired". Read-only.
+        expires_at (str): When the hold expires unless it is confirmed or released. Read-only.
+        created_at (str): When the hold was taken. Read-only.
+    """
+
+    reservation_id = fields.Int(dump_only=True)
+    product_id = fields.Int(required=True, strict=True)
+    quantity = fields.Int(
+        required=True,
+        strict=True,
+        validate=validate.Range(min=1, error="Quantity must be a positive integer"),
+    )
+    ttl = fields.Float(
+        load_only=True,
+        validate=validate.Range(
+            min=1,
+            max=Config.RESERVATION.MAX_TTL,
+            error="TTL must be between {min} and {max} seconds",
+        ),
+    )
+    status = fields.Str(dump_only=True)
+    expires_at = fields.Str(dump_only=True)
+    created_at = fields.Str(dump_only=True)
+
+
+# Create schema instances
+reservation_schema = ReservationSchema()
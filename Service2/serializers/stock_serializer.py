@@ -0,0 +1,23 @@
+from marshmallow import Schema, fields, validate
+
+
+class StockAdjustmentSchema(Schema):
+    """
+    StockAdjustmentSchema is a Marshmallow schema for deserializing the items of a bulk stock adjustment.
+
+    Attributes:
+        product_id (int): The ID of the product whose stock is adjusted.
+        delta (int): The number of units to add (positive) or remove (negative). Must not be 0.
+    """
+
+    product_id = fields.Int(required=True, strict=True)
+    delta = fields.Int(
+        required=True,
+        strict=True,
+        validate=validate.NoneOf([0]),
+        error_messages={"validator_failed": "Delta must be a non-zero integer"},
+    )
+
+
+# Create schema instances
+stock_adjustments_schema = StockAdjustmentSchema(many=True)
@@ -0,0 +1,276 @@
+import bisect
+import collections
+import logging
+import threading
+from datetime import datetime, timezone
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LowStockWatcher:
+    """
+    An in-process watch of the products whose stock is low.
+
+    The watcher keeps the products whose ``stock_count`` is at or below the
+    highest of ``thresholds`` in a set sorted by stock count, so the low-stock
+    products are listed in O(result) instead of by scanning the product table.
+    The inventory service reports the stock count each of its writes returns;
+    when a count crosses a threshold, the watcher records a threshold-crossing
+    event (and logs it), which operations poll to raise alerts.
+
+    The set is warmed in a background thread with one range scan of the
+    ``product_stock_count`` index, and the same scan is repeated every
+    ``refresh_interval`` seconds to pick up the stock changes the service did not
+    see: holds taken and released through reservations, and writes made by other
+    processes. Changes found by a refresh raise their events too, late by at most
+    the refresh interval. No event is raised before the set is warm, since the
+    previous stock of a product is unknown until then.
+
+    Attributes:
+        load_pages (callable): Called with the highest threshold, returns an iterable
+            of pages of {"product_id", "stock_count"} rows at or below it.
+        thresholds (tuple): The stock thresholds, in increasing order.
+        refresh_interval (float): Seconds between two refreshes of the set; 0 warms
+            the set once and never refreshes it.
+        ready (threading.Event): Set once the set holds every low-stock product.
+        refreshes (int): The number of refreshes run.
+    """
+
+    def __init__(
+        self, load_pages, thresholds=None, refresh_interval=None, max_events=None
+    ):
+        if thresholds is None:
+            thresholds = Config.LOW_STOCK.THRESHOLDS
+        if refresh_interval is None:
+            refresh_interval = Config.LOW_STOCK.REFRESH_INTERVAL
+        if max_events is None:
+            max_events = Config.LOW_STOCK.MAX_EVENTS
+        self.load_pages = load_pages
+        self.thresholds = tuple(sorted(set(thresholds)))
+        self.refresh_interval = refresh_interval
+        self.ready = threading.Event()
+        self.refreshes = 0
+        # product_id -> stock_count of the low-stock products, and the same
+        # products as sorted (stock_count, product_id) keys
+        self._stock = {}
+        self._sorted = []
+        self._events = collections.deque(maxlen=max_events)
+        self._sequence = 0
+        # Products written while a refresh reads the table; the refresh keeps
+        # their newer stock counts
+        self._touched = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def observe(self, product_id, stock_count):
+        """
+        Record the new stock count of a product, raising an event for each threshold
+        it crosses.
+        """
+        self.start_watching()
+        with self._lock:
+            if self._touched is not None:
+                self._touched.add(product_id)
+            self._set(product_id, stock_count)
+
+    def observe_rows(self, rows):
+        """
+        Record the new stock count of each {"product_id", "stock_count"} row.
+        """
+        for row in rows:
+            self.observe(row["product_id"], row["stock_count"])
+
+    def low_stock(self, threshold=None, after=None, limit=100):
+        """
+        List the products at or below a threshold, lowest stock first.
+
+        The set is warmed in the calling thread if it is not warm yet.
+
+        Args:
+            threshold (int): The stock threshold; defaults to the highest threshold,
+                which it cannot exceed.
+            after (tuple): The (stock_count, product_id) of the last product of the
+                previous page.
+            limit (int): The maximum number of products.
+
+        Returns:
+            list: The {"product_id", "stock_count"} of the products, by increasing
+            stock count then product ID.
+        """
+        if threshold is None:
+            threshold = self.thresholds[-1]
+        if threshold > self.thresholds[-1]:
+            raise ValueError(
+                f"Threshold must be at most {self.thresholds[-1]}, "
+                "the highest watched threshold"
+            )
+        if not self.ready.is_set():
+            self.refresh()
+        self.start_watching()
+        with self._lock:
+            start = 0 if after is None else bisect.bisect_right(self._sorted, after)
+            end = bisect.bisect_right(self._sorted, (threshold, float("inf")))
+            keys = self._sorted[start : min(end, start + limit)]
+        return [
+            {"product_id": product_id, "stock_count": stock_count}
+            for stock_count, product_id in keys
+        ]
+
+    def events(self, after=0, limit=100):
+        """
+        Return the threshold-crossing events after a sequence number, oldest first.
+
+        Only the last ``max_events`` events are kept.
+
+        Args:
+            after (int): The sequence number of the last event already seen.
+            limit (int): The maximum number of events.
+
+        Returns:
+            list: The events, each with its "sequence", "product_id", "threshold",
+            "direction" ("down" or "up"), "stock_count", "previous_stock_count"
+            and "time".
+        """
+        with self._lock:
+            first = self._sequence - len(self._events) + 1
+            start = max(after + 1 - first, 0)
+            end = min(start + limit, len(self._events))
+            return [self._events[index] for index in range(start, end)]
+
+    def refresh(self):
+        """
+        Reload the low-stock products from the product table, raising the events
+        of the threshold crossings found.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                self._touched = set()
+            try:
+                loaded = {}
+                for page in self.load_pages(self.thresholds[-1]):
+                    for row in page:
+                        loaded[row["product_id"]] = row["stock_count"]
+            except Exception:
+                with self._lock:
+                    self._touched = None
+                raise
+            with self._lock:
+                for product_id in sorted(
+                    (set(self._stock) | set(loaded)) - self._touched
+                ):
+                    self._set(product_id, loaded.get(product_id))
+                self._touched = None
+                self.refreshes += 1
+            self.ready.set()
+
+    def start_watching(self):
+        """
+        Start warming and refreshing the set in a background thread, unless already
+        started.
+        """
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._run, daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """
+        Stop the background refreshes.
+        """
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def stats(self):
+        """
+        Return the state and counters of the watcher.
+
+        Returns:
+            dict: Whether the set is warm, the watched thresholds, the number of
+            low-stock products, the number of events raised and of refreshes run.
+        """
+        with self._lock:
+            return {
+                "ready": self.ready.is_set(),
+                "thresholds": list(self.thresholds),
+                "low_stock_products": len(self._stock),
+                "events": self._sequence,
+                "refreshes": self.refreshes,
+                "refresh_interval": self.refresh_interval,
+            }
+
+    def _band(self, stock_count):
+        # The number of thresholds below the stock count; a product above every
+        # threshold (or not watched) is in the top band
+        if stock_count is None:
+            return len(self.thresholds)
+        return bisect.bisect_left(self.thresholds, stock_count)
+
+    def _set(self, product_id, stock_count):
+        # Only the products at or below the highest threshold are kept; None
+        # stands for a product above it whose stock is not known
+        previous = self._stock.get(product_id)
+        watched = stock_count
+        if watched is not None and watched > self.thresholds[-1]:
+            watched = None
+        if watched == previous:
+            return
+        if previous is not None:
+            del self._sorted[bisect.bisect_left(self._sorted, (previous, product_id))]
+            del self._stock[product_id]
+        if watched is not None:
+            bisect.insort(self._sorted, (watched, product_id))
+            self._stock[product_id] = watched
+
+        if not self.ready.is_set():
+            return
+        old_band, new_band = self._band(previous), self._band(watched)
+        if new_band < old_band:
+            crossed = [
+                ("down", threshold)
+                for threshold in reversed(self.thresholds[new_band:old_band])
+            ]
+        else:
+            crossed = [
+                ("up", threshold) for threshold in self.thresholds[old_band:new_band]
+            ]
+        for direction, threshold in crossed:
+            self._sequence += 1
+            self._events.append(
+                {
+                    "sequence": self._sequence,
+                    "product_id": product_id,
+                    "threshold": threshold,
+                    "direction": direction,
+                    "stock_count": stock_count,
+                    "previous_stock_count": previous,
+                    "time": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+            log = logger.warning if direction == "down" else logger.info
+            log(
+                "Stock of product %s went %s through %s (now %s)",
+                product_id,
+                direction,
+                threshold,
+                "above" if stock_count is None else stock_count,
+            )
+
+    def _run(self):
+        try:
+            if not self.ready.is_set():
+                self.refresh()
+        except Exception:
+            logger.exception("Warming the low-stock watcher failed")
+        if self.refresh_interval <= 0:
+            return
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing the low-stock watcher failed")
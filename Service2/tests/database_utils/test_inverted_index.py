@@ -0,0 +1,93 @@
+from database_utils.inverted_index import InvertedIndex, tokenize
+
+WEIGHTS = {"name": 1.0, "description": 0.2}
+
+
+def test_tokenize():
+    """
+    Test splitting a text into terms.
+
+    Asserts:
+        - Words are lowercased and stop words are dropped.
+        - A trailing plural "s" is stripped, but not from short words or "ss".
+        - A missing text has no terms.
+    """
+    assert tokenize("The Laptops and a Bus, for Glass") == ["laptop", "bus", "glass"]
+    assert tokenize(None) == []
+
+
+def test_search_ranks_heavier_fields_first():
+    """
+    Test that matches are ranked by field weight and term frequency.
+
+    Asserts:
+        - Only documents containing every query term are returned.
+        - Name matches rank above description matches, and equal ranks are
+          ordered by document ID.
+        - A term also found in a lighter field, or repeated there, ranks higher.
+    """
+    index = InvertedIndex(WEIGHTS)
+    index.add(1, {"name": "Red Chair", "description": "Wooden"})
+    index.add(2, {"name": "Lamp", "description": "For a red chair"})
+    index.add(3, {"name": "Chair", "description": "Chair chair, red"})
+    index.add(4, {"name": "Blue Chair", "description": None})
+    index.add(5, {"name": "Red Chair", "description": "Wooden"})
+
+    matches, truncated = index.search("red chair")
+    assert [doc_id for _, doc_id in matches] == [1, 5, 3, 2]
+    assert not truncated
+    assert index.search("chair", limit=1)[0][0][1] == 3
+    assert index.search("sofa") == ([], False)
+    assert index.search("the") == ([], False)
+
+
+def test_search_pagination_and_max_matches():
+    """
+    Test keyset pagination and the cap on ranked matches.
+
+    Asserts:
+        - Pages continue after the (rank, doc_id) of the previous page without gaps.
+        - Only the max_matches documents with the lowest IDs are ranked when more
+          match, whatever order they were indexed in, and the search is reported
+          as truncated.
+    """
+    index = InvertedIndex(WEIGHTS)
+    for doc_id in range(10):
+        index.add(doc_id, {"name": "chair", "description": "chair " * (doc_id % 3)})
+
+    results = []
+    after = None
+    while True:
+        page, _ = index.search("chair", after, limit=3)
+        results.extend(page)
+        if len(page) < 3:
+            break
+        after = page[-1]
+    assert results == index.search("chair", limit=10)[0]
+    assert len(results) == 10
+
+    index.add(0, {"name": "chair"})
+    matches, truncated = index.search("chair", limit=10, max_matches=4)
+    assert sorted(doc_id for _, doc_id in matches) == [0, 1, 2, 3]
+    assert truncated
+    assert not index.search("chair", limit=10, max_matches=10)[1]
+
+
+def test_add_replaces_and_remove():
+    """
+    Test updating and removing documents.
+
+    Asserts:
+        - Re-adding a document replaces its previous terms.
+        - A removed document is no longer found.
+    """
+    index = InvertedIndex(WEIGHTS)
+    index.add(1, {"name": "Chair"})
+    index.add(1, {"name": "Lamp"})
+    assert index.search("chair") == ([], False)
+    assert [doc_id for _, doc_id in index.search("lamp")[0]] == [1]
+    assert len(index) == 1
+
+    index.remove(1)
+    assert index.search("lamp") == ([], False)
+    assert len(index) == 0
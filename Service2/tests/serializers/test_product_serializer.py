@@ -144,3 +144,27 @@ def test_product_schema_optional_description(valid_product_data):
     result = schema.load(valid_product_data)
     assert isinstance(result, Product)
     assert result.description is None
+
+
+def test_product_schema_sku(valid_product_data):
+    """
+    Test that the ProductSchema accepts an optional SKU of at most 64 characters.
+
+    Args:
+        valid_product_data (dict): A dictionary containing valid product data.
+
+    Asserts:
+        - A product without a SKU has its 'sku' attribute set to None.
+        - A given SKU is loaded.
+        - A SKU longer than 64 characters raises a ValidationError.
+    """
+    schema = ProductSchema()
+    assert schema.load(valid_product_data).sku is None
+
+    valid_product_data["sku"] = "SUP-0001"
+    assert schema.load(valid_product_data).sku == "SUP-0001"
+
+    valid_product_data["sku"] = "x" * 65
+    with pytest.raises(ValidationError) as excinfo:
+        schema.load(valid_product_data)
+    assert "sku" in excinfo.value.messages
@@ -0,0 +1,64 @@
+import pytest
+from marshmallow import ValidationError
+
+from config import Config
+from serializers.reservation_serializer import ReservationSchema
+
+
+def test_valid_reservation():
+    """
+    Test that a valid reservation request is deserialized and a reservation is serialized.
+
+    Asserts:
+        - The request is loaded as a dictionary, with or without a TTL.
+        - The read-only fields are dumped and the TTL is not.
+    """
+    schema = ReservationSchema()
+    assert schema.load({"product_id": 1, "quantity": 2, "ttl": 60}) == {
+        "product_id": 1,
+        "quantity": 2,
+        "ttl": 60.0,
+    }
+    assert schema.load({"product_id": 1, "quantity": 2}) == {
+        "product_id": 1,
+        "quantity": 2,
+    }
+
+    dumped = schema.dump(
+        {
+            "reservation_id": 7,
+            "product_id": 1,
+            "quantity": 2,
+            "status": "held",
+            "expires_at": "2024-01-01T00:15:00",
+            "created_at": "2024-01-01T00:00:00",
+        }
+    )
+    assert dumped["reservation_id"] == 7
+    assert dumped["status"] == "held"
+    assert "ttl" not in dumped
+
+
+def test_invalid_reservation():
+    """
+    Test that invalid reservation requests are rejected.
+
+    Asserts:
+        - A zero quantity, a fractional quantity and a missing product ID are rejected.
+        - A TTL above Config.RESERVATION.MAX_TTL is rejected.
+    """
+    schema = ReservationSchema()
+    with pytest.raises(ValidationError) as excinfo:
+        schema.load({"product_id": 1, "quantity": 0})
+    assert "quantity" in excinfo.value.messages
+    with pytest.raises(ValidationError) as excinfo:
+        schema.load({"product_id": 1, "quantity": 1.5})
+    assert "quantity" in excinfo.value.messages
+    with pytest.raises(ValidationError) as excinfo:
+        schema.load({"quantity": 1})
+    assert "product_id" in excinfo.value.messages
+    with pytest.raises(ValidationError) as excinfo:
+        schema.load(
+            {"product_id": 1, "quantity": 1, "ttl": Config.RESERVATION.MAX_TTL + 1}
+        )
+    assert "ttl" in excinfo.value.messages
@@ -0,0 +1,41 @@
+import pytest
+from marshmallow import ValidationError
+
+from serializers.stock_serializer import StockAdjustmentSchema
+
+
+def test_valid_stock_adjustments():
+    """
+    Test that a batch of valid stock adjustments is deserialized.
+
+    Asserts:
+        - The items are loaded as dictionaries, with positive and negative deltas.
+    """
+    items = StockAdjustmentSchema(many=True).load(
+        [{"product_id": 1, "delta": 5}, {"product_id": 2, "delta": -3}]
+    )
+    assert items == [{"product_id": 1, "delta": 5}, {"product_id": 2, "delta": -3}]
+
+
+def test_invalid_stock_adjustments():
+    """
+    Test that invalid stock adjustments are reported by their position.
+
+    Asserts:
+        - A zero delta, a fractional delta and a missing product ID are rejected.
+        - The valid item is kept in the valid data.
+    """
+    with pytest.raises(ValidationError) as excinfo:
+        StockAdjustmentSchema(many=True).load(
+            [
+                {"product_id": 1, "delta": 0},
+                {"product_id": 1, "delta": 1.5},
+                {"delta": 2},
+                {"product_id": 4, "delta": -1},
+            ]
+        )
+    assert set(excinfo.value.messages) == {0, 1, 2}
+    assert "delta" in excinfo.value.messages[0]
+    assert "delta" in excinfo.value.messages[1]
+    assert "product_id" in excinfo.value.messages[2]
+    assert excinfo.value.valid_data[3] == {"product_id": 4, "delta": -1}
@@ -0,0 +1,157 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from ingest import ingest_products, read_products, validate_products
+
+
+def product(sku, **fields):
+    """
+    Build a valid product row with the given SKU.
+    """
+    return dict(
+        {"sku": sku, "name": "Desk", "category": "Office", "price": 80.0},
+        stock_count=3,
+        **fields,
+    )
+
+
+@pytest.fixture
+def service():
+    """
+    Fixture providing a mocked inventory service that upserts every product.
+
+    Returns:
+        MagicMock: The service, recording the batches it was given.
+    """
+    service = MagicMock()
+    service.upsert_products.side_effect = lambda products: {
+        "upserted": len(products),
+        "superseded": [],
+        "errors": {},
+    }
+    return service
+
+
+def test_read_products(tmp_path):
+    """
+    Test streaming the rows of JSONL and CSV files.
+
+    Asserts:
+        - Blank JSONL lines are skipped.
+        - Empty CSV cells are read as missing values.
+    """
+    jsonl = tmp_path / "catalog.jsonl"
+    jsonl.write_text('{"sku": "A1", "name": "Desk"}\n\n{"sku": "A2"}\n')
+    assert list(read_products(str(jsonl))) == [
+        {"sku": "A1", "name": "Desk"},
+        {"sku": "A2"},
+    ]
+
+    feed = tmp_path / "catalog.csv"
+    feed.write_text("sku,name,description\nA1,Desk,\nA2,Lamp,Bright\n")
+    assert list(read_products(str(feed))) == [
+        {"sku": "A1", "name": "Desk"},
+        {"sku": "A2", "name": "Lamp", "description": "Bright"},
+    ]
+
+
+def test_validate_products():
+    """
+    Test validating a chunk of rows.
+
+    Asserts:
+        - Valid rows are returned with their position and their loaded values.
+        - Rejected rows are reported by position with their validation messages.
+    """
+    valid, errors = validate_products(
+        [product("A1"), product("A2", price=-1), {**product("A3"), "price": "9.5"}]
+    )
+    assert [position for position, _ in valid] == [0, 2]
+    assert valid[1][1]["price"] == 9.5
+    assert list(errors) == [1]
+    assert "price" in errors[1]
+
+
+@pytest.mark.parametrize("pipeline_depth", [0, 2])
+def test_ingest_products(service, pipeline_depth):
+    """
+    Test ingesting rows in chunks, sequentially and pipelined.
+
+    Asserts:
+        - The valid rows are upserted in chunk order, in batches of at most chunk_size.
+        - Validation and upsert errors are reported with their row number.
+        - The totals count every row, and the rows superseded by a later row with
+          the same SKU are not counted as upserted.
+    """
+    service.upsert_products.side_effect = lambda products: {
+        "upserted": len(products) - (len(products) == 2) - (len(products) == 3),
+        "superseded": [0] if len(products) == 3 else [],
+        "errors": {1: "Error upserting product"} if len(products) == 2 else {},
+    }
+    rows = [product(f"A{i}") for i in range(7)]
+    rows[3]["stock_count"] = -1
+    errors = []
+    progress = []
+
+    totals = ingest_products(
+        iter(rows),
+        service,
+        chunk_size=3,
+        pipeline_depth=pipeline_depth,
+        on_error=lambda row, messages: errors.append((row, messages)),
+        on_progress=progress.append,
+    )
+
+    batches = [call.args[0] for call in service.upsert_products.call_args_list]
+    assert [[row["sku"] for row in batch] for batch in batches] == [
+        ["A0", "A1", "A2"],
+        ["A4", "A5"],
+        ["A6"],
+    ]
+    assert [row for row, _ in errors] == [4, 6]
+    assert errors[1][1] == ["Error upserting product"]
+    assert totals["received"] == 7
+    assert totals["upserted"] == 4
+    assert totals["superseded"] == 1
+    assert totals["failed"] == 2
+    assert [step["received"] for step in progress] == [3, 6, 7]
+
+
+def test_ingest_products_stops_on_read_error(service):
+    """
+    Test that an unreadable row aborts a pipelined ingest.
+
+    Asserts:
+        - The error raised while reading is raised by ingest_products.
+        - The chunks read before it were upserted.
+    """
+
+    def rows():
+        yield product("A1")
+        yield product("A2")
+        raise ValueError("Malformed row")
+
+    with pytest.raises(ValueError, match="Malformed row"):
+        ingest_products(rows(), service, chunk_size=1, pipeline_depth=2)
+    assert service.upsert_products.call_count == 2
+
+
+def test_ingest_products_stops_on_write_error(service):
+    """
+    Test that a failing upsert stops the producer thread of a pipelined ingest.
+
+    Asserts:
+        - The upsert error is raised by ingest_products.
+        - No more chunks are upserted after it.
+    """
+    service.upsert_products.side_effect = ValueError("Database unavailable")
+
+    with pytest.raises(ValueError, match="Database unavailable"):
+        ingest_products(
+            (product(f"A{i}") for i in range(100)),
+            service,
+            chunk_size=1,
+            pipeline_depth=2,
+        )
+    assert service.upsert_products.call_count == 1
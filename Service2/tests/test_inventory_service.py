@@ -76,73 +76,97 @@ def test_add_goods_failure(inventory_service):
 def test_deduct_goods_success(inventory_service):
     """
     Test the deduct_goods method of the inventory_service to ensure it successfully deducts goods from the inventory.
-    This test mocks the get_product_by_id method to return a product with a stock count of 10.
-    It also mocks the update method of the supabase table to return the updated product data with a stock count of 9.
+    This test mocks the `deduct_stock` RPC to return the updated product data with a stock count of 9.
     The test then calls the deduct_goods method with the product_id and asserts that the result matches the updated product data.
     Args:
         inventory_service (InventoryService): The inventory service instance to be tested.
     Asserts:
         The result of deduct_goods matches the updated product data with the decremented stock count.
+        The RPC was called once with a quantity of 1.
     """
     product_id = 1
-    product_data = {"product_id": 1, "name": "Test Product", "stock_count": 10}
     updated_product_data = {"product_id": 1, "name": "Test Product", "stock_count": 9}
 
-    inventory_service.get_product_by_id = MagicMock(return_value=product_data)
-    inventory_service.supabase.table().update().eq().execute.return_value = MagicMock(
+    inventory_service.supabase.rpc.return_value.execute.return_value = MagicMock(
         data=[updated_product_data]
     )
 
     result = inventory_service.deduct_goods(product_id)
 
     assert result == updated_product_data
+    inventory_service.supabase.rpc.assert_called_once_with(
+        "deduct_stock", {"p_product_id": product_id, "p_quantity": 1}
+    )
+
+
+def test_deduct_goods_multiple_units(inventory_service):
+    """
+    Test that deducting several units of a product is a single RPC call.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        The result of deduct_goods matches the updated product data.
+        The RPC was called exactly once with the requested quantity.
+    """
+    product_id = 1
+    updated_product_data = {"product_id": 1, "name": "Test Product", "stock_count": 0}
+
+    inventory_service.supabase.rpc.return_value.execute.return_value = MagicMock(
+        data=[updated_product_data]
+    )
+
+    result = inventory_service.deduct_goods(product_id, 10)
+
+    assert result == updated_product_data
+    inventory_service.supabase.rpc.assert_called_once_with(
+        "deduct_stock", {"p_product_id": product_id, "p_quantity": 10}
+    )
 
 
 def test_deduct_goods_failure_no_product(inventory_service):
     """
     Test case for deducting goods from inventory when the product does not exist.
     This test verifies that the `deduct_goods` method of the `inventory_service`
-    raises a `ValueError` with the message "Product not found" when attempting to
-    deduct goods for a product ID that does not exist in the inventory.
+    raises a `ValueError` with the message "Product not found" when the `deduct_stock`
+    database function reports that the product does not exist.
     Args:
         inventory_service (InventoryService): The inventory service instance being tested.
     Setup:
-        - Mocks the `get_product_by_id` method of the `inventory_service` to return `None`,
-          simulating a non-existent product.
+        - Mocks the `deduct_stock` RPC to raise the "Product not found" database error.
     Test Steps:
         1. Define a product ID that does not exist in the inventory.
-        2. Mock the `get_product_by_id` method to return `None` for the given product ID.
-        3. Use `pytest.raises` to assert that calling `deduct_goods` with the non-existent
+        2. Use `pytest.raises` to assert that calling `deduct_goods` with the non-existent
            product ID raises a `ValueError` with the expected error message.
     """
     product_id = 1
-    inventory_service.get_product_by_id = MagicMock(return_value=None)
+    inventory_service.supabase.rpc.return_value.execute.side_effect = Exception(
+        "Product not found"
+    )
 
     with pytest.raises(ValueError, match="Product not found"):
         inventory_service.deduct_goods(product_id)
 
 
-def test_deduct_goods_failure_stock_zero(inventory_service):
+def test_deduct_goods_failure_insufficient_stock(inventory_service):
     """
-    Test the `deduct_goods` method of the `inventory_service` when the stock count is zero.
+    Test the `deduct_goods` method of the `inventory_service` when there is not enough stock.
     This test verifies that the `deduct_goods` method raises a `ValueError` with the appropriate
-    error message when attempting to deduct goods from a product whose stock count is already zero.
+    error message when the `deduct_stock` database function rejects the deduction.
     Args:
         inventory_service (InventoryService): The inventory service instance to be tested.
     Setup:
-        - Mocks the `get_product_by_id` method of the `inventory_service` to return a product
-          with a stock count of zero.
+        - Mocks the `deduct_stock` RPC to raise the "Insufficient stock" database error.
     Test:
-        - Calls the `deduct_goods` method with a product ID.
-        - Asserts that a `ValueError` is raised with the message "Stock count is already zero".
+        - Calls the `deduct_goods` method with a product ID and a quantity.
+        - Asserts that a `ValueError` is raised with the message "Insufficient stock".
     """
     product_id = 1
-    product_data = {"product_id": 1, "name": "Test Product", "stock_count": 0}
+    inventory_service.supabase.rpc.return_value.execute.side_effect = Exception(
+        "Insufficient stock"
+    )
 
-    inventory_service.get_product_by_id = MagicMock(return_value=product_data)
-
-    with pytest.raises(ValueError, match="Stock count is already zero"):
-        inventory_service.deduct_goods(product_id)
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        inventory_service.deduct_goods(product_id, 5)
 
 
 def test_update_goods_success(inventory_service):
@@ -251,3 +275,347 @@ def test_get_product_by_id_failure(inventory_service):
     result = inventory_service.get_product_by_id(product_id)
 
     assert result is None
+
+
+def test_get_product_by_id_uses_cache(inventory_service):
+    """
+    Test that a product is read from the database once and then served from the cache.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - The second lookup does not query the database.
+        - The returned product is a copy the caller may modify.
+    """
+    product_data = {"product_id": 1, "name": "Test Product", "stock_count": 10}
+    execute = inventory_service.supabase.table().select().eq().execute
+    execute.return_value = MagicMock(data=[product_data])
+
+    first = inventory_service.get_product_by_id(1)
+    first["stock_count"] = 0
+    second = inventory_service.get_product_by_id(1)
+
+    assert second == product_data
+    assert execute.call_count == 1
+    assert inventory_service.cache_stats()["hits"] == 1
+
+
+def test_writes_update_cached_product(inventory_service):
+    """
+    Test that add_goods, deduct_goods and update_goods write through the product cache.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - The cached product is the row returned by the latest write.
+        - A failed write drops the cached product.
+    """
+    product = {"product_id": 1, "name": "Test Product", "stock_count": 10}
+    inventory_service.supabase.table().insert().execute.return_value = MagicMock(
+        data=[product]
+    )
+    inventory_service.add_goods(product)
+    assert inventory_service.cache.get("1") == product
+
+    deducted = dict(product, stock_count=8)
+    inventory_service.supabase.rpc().execute.return_value = MagicMock(data=[deducted])
+    inventory_service.deduct_goods(1, 2)
+    assert inventory_service.cache.get("1") == deducted
+
+    updated = dict(deducted, name="Renamed Product")
+    inventory_service.supabase.table().update().eq().execute.return_value = MagicMock(
+        data=[updated]
+    )
+    inventory_service.update_goods(1, {"name": "Renamed Product"})
+    assert inventory_service.get_product_by_id(1) == updated
+
+    inventory_service.supabase.rpc().execute.side_effect = Exception("Not enough stock")
+    with pytest.raises(ValueError):
+        inventory_service.deduct_goods(1, 100)
+    assert inventory_service.cache.get("1") is None
+
+
+def test_list_products(inventory_service):
+    """
+    Test that list_products calls the list_products database function with the filters and cursor.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - The filters, sort order, cursor and page size are passed as function arguments.
+        - The rows returned by the function are returned.
+    """
+    products = [{"product_id": 7, "name": "Test Product", "price": 5.0}]
+    inventory_service.supabase.rpc.return_value.execute.return_value = MagicMock(
+        data=products
+    )
+
+    result = inventory_service.list_products(
+        category="fruit", in_stock=True, sort="price", after=(4.5, 3), limit=10
+    )
+
+    assert result == products
+    inventory_service.supabase.rpc.assert_called_with(
+        "list_products",
+        {
+            "p_category": "fruit",
+            "p_min_price": None,
+            "p_max_price": None,
+            "p_in_stock": True,
+            "p_sort": "price",
+            "p_after_price": 4.5,
+            "p_after_id": 3,
+            "p_limit": 10,
+        },
+    )
+
+
+def test_list_products_failure(inventory_service):
+    """
+    Test that a failing product listing raises a ValueError.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - A ValueError with the error message is raised.
+    """
+    inventory_service.supabase.rpc.return_value.execute.side_effect = Exception(
+        "Database error"
+    )
+
+    with pytest.raises(ValueError, match="Error retrieving products: Database error"):
+        inventory_service.list_products()
+
+
+def test_search_products_calls_database_function(inventory_service):
+    """
+    Test that search_products calls the search_products database function.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - The search text, cursor, page size and match cap are passed as function arguments.
+        - The rows returned by the function are returned.
+    """
+    products = [{"product_id": 7, "name": "Desk", "rank": 0.6}]
+    inventory_service.supabase.rpc.return_value.execute.return_value = MagicMock(
+        data=products
+    )
+
+    result = inventory_service.search_products("desk", after=(0.8, 3), limit=10)
+
+    assert result == products
+    inventory_service.supabase.rpc.assert_called_with(
+        "search_products",
+        {
+            "p_query": "desk",
+            "p_after_rank": 0.8,
+            "p_after_id": 3,
+            "p_limit": 10,
+            "p_max_matches": inventory_service.search_max_matches,
+        },
+    )
+    assert inventory_service.search_stats() == {"index": "database"}
+
+
+def test_search_products_uses_warm_index(inventory_service):
+    """
+    Test that search_products reads the ranked matches of a warm in-process index.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - The matched products are selected by ID and returned in rank order.
+        - A product deleted since it was indexed is left out.
+        - Each product says whether the search was truncated.
+    """
+    inventory_service.search_index = MagicMock()
+    inventory_service.search_index.search.return_value = (
+        [(1.5, 2), (1.0, 1), (0.5, 9)],
+        True,
+    )
+    inventory_service.supabase.table().select().in_().execute.return_value = MagicMock(
+        data=[{"product_id": 1}, {"product_id": 2}]
+    )
+
+    result = inventory_service.search_products("desk")
+
+    assert result == [
+        {"product_id": 2, "rank": 1.5, "truncated": True},
+        {"product_id": 1, "rank": 1.0, "truncated": True},
+    ]
+    inventory_service.supabase.table().select().in_.assert_called_with(
+        "product_id", [2, 1, 9]
+    )
+    inventory_service.supabase.rpc.assert_not_called()
+
+
+def test_search_products_failure(inventory_service):
+    """
+    Test that a failing search raises a ValueError.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - A ValueError with the error message is raised.
+    """
+    inventory_service.supabase.rpc.return_value.execute.side_effect = Exception(
+        "Database error"
+    )
+
+    with pytest.raises(ValueError, match="Error searching products: Database error"):
+        inventory_service.search_products("desk")
+
+
+def test_upsert_products(inventory_service):
+    """
+    Test that upsert_products writes a batch with one upsert on the SKU.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - Products without a SKU are rejected by their position in the batch.
+        - A SKU repeated in the batch keeps its last row, and its earlier rows are
+          reported as superseded rather than counted as written.
+        - The written products are dropped from the cache.
+    """
+    products = [
+        {"sku": "A1", "name": "Desk", "price": 80.0},
+        {"name": "No SKU"},
+        {"sku": "A2", "name": "Lamp", "price": 12.5},
+        {"sku": "A1", "name": "Desk v2", "price": 90.0},
+    ]
+    inventory_service.cache.set("1", {"product_id": 1, "name": "Desk"})
+    upsert = inventory_service.supabase.table.return_value.upsert
+    upsert.return_value.execute.return_value = MagicMock(
+        data=[{"product_id": 2, "sku": "A2"}, {"product_id": 1, "sku": "A1"}]
+    )
+
+    result = inventory_service.upsert_products(products)
+
+    assert result == {
+        "upserted": 2,
+        "superseded": [0],
+        "errors": {1: "SKU is required"},
+    }
+    rows = upsert.call_args.args[0]
+    assert [(row["sku"], row["name"]) for row in rows] == [
+        ("A2", "Lamp"),
+        ("A1", "Desk v2"),
+    ]
+    assert rows[0]["description"] is None
+    assert upsert.call_args.kwargs == {"on_conflict": "sku"}
+    assert inventory_service.cache.get("1") is None
+
+
+def test_upsert_products_retries_rows_one_by_one(inventory_service):
+    """
+    Test that a rejected batch is written row by row.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - Only the rows rejected on their own are reported, with the database error.
+    """
+    upsert = inventory_service.supabase.table.return_value.upsert
+    upsert.return_value.execute.side_effect = [
+        Exception("value too long"),
+        MagicMock(data=[{"product_id": 1, "sku": "A1"}]),
+        Exception("value too long"),
+    ]
+
+    result = inventory_service.upsert_products(
+        [{"sku": "A1", "name": "Desk"}, {"sku": "A2", "name": "x" * 300}]
+    )
+
+    assert result == {
+        "upserted": 1,
+        "superseded": [],
+        "errors": {1: "Error upserting product: value too long"},
+    }
+    assert upsert.call_count == 3
+
+
+def test_adjust_stock_bulk(inventory_service):
+    """
+    Test that adjust_stock_bulk applies the batch with one database function call.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - The items are passed to the adjust_stock_bulk function.
+        - The per-item results are returned.
+        - The adjusted products are dropped from the cache.
+    """
+    adjustments = [{"product_id": 1, "delta": 5}, {"product_id": 2, "delta": -1}]
+    results = [
+        {"item_index": 0, "product_id": 1, "stock_count": 15, "error": None},
+        {
+            "item_index": 1,
+            "product_id": 2,
+            "stock_count": None,
+            "error": "Insufficient stock",
+        },
+    ]
+    inventory_service.cache.set("1", {"product_id": 1, "stock_count": 10})
+    inventory_service.supabase.rpc.return_value.execute.return_value = MagicMock(
+        data=results
+    )
+
+    assert inventory_service.adjust_stock_bulk(adjustments) == results
+    inventory_service.supabase.rpc.assert_called_with(
+        "adjust_stock_bulk", {"p_adjustments": adjustments}
+    )
+    assert inventory_service.cache.get("1") is None
+
+
+def test_adjust_stock_bulk_failure(inventory_service):
+    """
+    Test that a failing bulk stock adjustment raises a ValueError.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - A ValueError with the error message is raised.
+        - An empty batch makes no database call.
+    """
+    assert inventory_service.adjust_stock_bulk([]) == []
+    inventory_service.supabase.rpc.assert_not_called()
+
+    inventory_service.supabase.rpc.return_value.execute.side_effect = Exception(
+        "Database error"
+    )
+    with pytest.raises(ValueError, match="Error adjusting stock: Database error"):
+        inventory_service.adjust_stock_bulk([{"product_id": 1, "delta": 1}])
+
+
+def test_stock_writes_feed_low_stock_watcher(inventory_service):
+    """
+    Test that the stock counts returned by writes reach the low-stock watcher.
+    Args:
+        inventory_service (InventoryService): The inventory service instance to be tested.
+    Asserts:
+        - A deduction leaving 2 units lists the product as low on stock and
+          raises a "down" event through the threshold of 10.
+        - A bulk adjustment emptying it raises a "down" event through 0.
+        - A failed bulk item is not reported to the watcher.
+    """
+    inventory_service.stock_watcher.refresh()
+    execute = inventory_service.supabase.rpc.return_value.execute
+    execute.return_value = MagicMock(data=[{"product_id": 1, "stock_count": 2}])
+
+    inventory_service.deduct_goods(1, 8)
+    assert inventory_service.low_stock() == [{"product_id": 1, "stock_count": 2}]
+
+    execute.return_value = MagicMock(
+        data=[
+            {"item_index": 0, "product_id": 1, "stock_count": 0, "error": None},
+            {
+                "item_index": 1,
+                "product_id": 2,
+                "stock_count": None,
+                "error": "Product not found",
+            },
+        ]
+    )
+    inventory_service.adjust_stock_bulk(
+        [{"product_id": 1, "delta": -2}, {"product_id": 2, "delta": -1}]
+    )
+
+    events = inventory_service.low_stock_events()
+    assert [
+        (event["product_id"], event["direction"], event["threshold"])
+        for event in events
+    ] == [(1, "down", 10), (1, "down", 0)]
+    assert inventory_service.low_stock(threshold=0) == [
+        {"product_id": 1, "stock_count": 0}
+    ]
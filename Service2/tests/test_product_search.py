@@ -0,0 +1,59 @@
+from product_search import ProductSearchIndex
+
+
+def test_search_waits_for_warm_index():
+    """
+    Test that the index answers searches only once warmed.
+
+    Asserts:
+        - A search before warming returns None and starts warming.
+        - Once warmed, searches are answered from every loaded page.
+        - The statistics count the indexed products and the searches answered.
+    """
+    pages = [
+        [{"product_id": 1, "name": "Desk Lamp", "category": "Home"}],
+        [{"product_id": 2, "name": "Desk", "category": "Office"}],
+    ]
+    index = ProductSearchIndex(lambda: iter(pages))
+
+    assert index.search("desk") is None
+    assert index.ready.wait(5)
+    assert [product_id for _, product_id in index.search("desk")[0]] == [1, 2]
+    assert index.stats() == {"ready": True, "products": 2, "searches": 1}
+
+
+def test_added_products_are_searchable():
+    """
+    Test that created and updated products are indexed.
+
+    Asserts:
+        - An added product is found by its new name only.
+    """
+    index = ProductSearchIndex(lambda: iter([]))
+    index.warm()
+    index.add({"product_id": 1, "name": "Chair"})
+    index.add({"product_id": 1, "name": "Armchair"})
+    assert index.search("chair") == ([], False)
+    assert [product_id for _, product_id in index.search("armchair")[0]] == [1]
+
+
+def test_failed_warm_up_can_be_retried():
+    """
+    Test that a failing warm-up leaves the index not ready.
+
+    Asserts:
+        - The index is not ready after a failed warm-up and can be warmed again.
+    """
+    calls = []
+
+    def load_pages():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("Database unavailable")
+        return iter([[{"product_id": 1, "name": "Chair"}]])
+
+    index = ProductSearchIndex(load_pages)
+    index.warm()
+    assert not index.ready.is_set()
+    index.warm()
+    assert index.search("chair") == ([(1.0, 1)], False)
@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from database_utils.cache import TTLCache
+from database_utils.sqlite import SQLiteClient
+from reservation_service import ReservationService
+from stock_watcher import LowStockWatcher
+
+
+@pytest.fixture
+def client():
+    """
+    Fixture providing a SQLiteClient holding one product with 10 units in stock.
+
+    Yields:
+        SQLiteClient: The database client.
+    """
+    client = SQLiteClient()
+    client.table("product").insert({"name": "Laptop", "stock_count": 10}).execute()
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def reservations(client):
+    """
+    Fixture providing a ReservationService without background sweeping.
+
+    Returns:
+        ReservationService: The service under test.
+    """
+    return ReservationService(
+        client, TTLCache(100, 60), sweep_interval=0, sweep_batch_size=2
+    )
+
+
+def stock(client):
+    return (
+        client.table("product").select("stock_count").execute().data[0]["stock_count"]
+    )
+
+
+def test_reserve_confirm_and_release(client, reservations):
+    """
+    Test that holds take units out of the stock until they are released.
+
+    Asserts:
+        - A hold takes its units at once and a confirmed hold keeps them.
+        - A released hold returns its units and cannot be confirmed afterwards.
+        - A hold larger than the stock is rejected with "Insufficient stock".
+        - The cached product is invalidated by each stock change.
+    """
+    reservations.cache.set("1", {"product_id": 1, "stock_count": 10})
+    confirmed = reservations.reserve(1, 3, ttl=60)
+    released = reservations.reserve(1, 4, ttl=60)
+    assert reservations.cache.get("1") is None
+    assert stock(client) == 3
+
+    assert reservations.confirm(confirmed["reservation_id"])["status"] == "confirmed"
+    assert reservations.release(released["reservation_id"])["status"] == "released"
+    assert stock(client) == 7
+
+    with pytest.raises(ValueError, match="Reservation is released"):
+        reservations.confirm(released["reservation_id"])
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        reservations.reserve(1, 8)
+    assert stock(client) == 7
+
+
+def test_sweep_expires_stale_holds_in_batches(client, reservations):
+    """
+    Test that a sweep expires every stale hold, batch by batch.
+
+    Asserts:
+        - All 5 expired holds are swept with a batch size of 2, and their units
+          return to the stock; the live hold is kept.
+        - An expired hold cannot be confirmed, and the counters record the sweep.
+    """
+    expired = [reservations.reserve(1, 1, ttl=0) for _ in range(5)]
+    live = reservations.reserve(1, 2, ttl=600)
+    assert stock(client) == 3
+
+    assert reservations.sweep() == 5
+    assert stock(client) == 8
+    assert reservations.sweep() == 0
+    assert reservations.get_reservation(live["reservation_id"])["status"] == "held"
+    with pytest.raises(ValueError, match="Reservation is expired"):
+        reservations.confirm(expired[0]["reservation_id"])
+
+    assert reservations.stats()["sweeps"] == 2
+    assert reservations.stats()["expired_holds"] == 5
+    assert reservations.stats()["restocked_units"] == 5
+
+
+def test_holds_notify_stock_watcher(client):
+    """
+    Test that the low-stock watcher is told the stock left by holds and releases.
+
+    Asserts:
+        - A hold taking the stock below a threshold raises an event at once.
+        - Releasing the hold raises the event of the stock crossing back.
+    """
+    watcher = LowStockWatcher(lambda threshold: [], (5,), refresh_interval=0)
+    watcher.refresh()
+    reservations = ReservationService(client, sweep_interval=0, stock_watcher=watcher)
+
+    def crossings():
+        return [
+            (event["direction"], event["stock_count"]) for event in watcher.events()
+        ]
+
+    hold = reservations.reserve(1, 6, ttl=60)
+    assert crossings() == [("down", 4)]
+    reservations.release(hold["reservation_id"])
+    assert crossings() == [("down", 4), ("up", 10)]
+
+
+def test_background_sweeper(client):
+    """
+    Test that the background sweeper expires holds without being called.
+
+    Asserts:
+        - The sweeper starts with the first hold and expires it, then stops.
+    """
+    reservations = ReservationService(client, sweep_interval=0.01)
+    reservations.reserve(1, 4, ttl=0)
+    try:
+        for _ in range(500):
+            if reservations.stats()["expired_holds"]:
+                break
+            time.sleep(0.01)
+    finally:
+        reservations.stop()
+    assert reservations.stats()["expired_holds"] == 1
+    assert stock(client) == 10
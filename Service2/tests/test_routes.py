@@ -93,6 +93,44 @@ def test_deduct_goods(mock_dump, mock_deduct_goods, client):
     }
 
 
+@patch("Service2.routes.inventory_service.deduct_goods")
+@patch("Service2.routes.product_schema.dump")
+def test_deduct_goods_with_quantity(mock_dump, mock_deduct_goods, client):
+    """
+    Test the deduct_goods endpoint with a quantity in the request body.
+    Args:
+        mock_dump (Mock): Mock object for the dump function.
+        mock_deduct_goods (Mock): Mock object for the deduct_goods function.
+        client (FlaskClient): Test client for making requests to the application.
+    Asserts:
+        - The response status code is 200.
+        - The service was called once with the requested quantity.
+    """
+    mock_deduct_goods.return_value = {"id": 1, "name": "Test Product"}
+    mock_dump.return_value = {"id": 1, "name": "Test Product"}
+
+    response = client.post("/deduct/1", json={"quantity": 10})
+    assert response.status_code == 200
+    mock_deduct_goods.assert_called_once_with(1, 10)
+
+
+@patch("Service2.routes.inventory_service.deduct_goods")
+def test_deduct_goods_invalid_quantity(mock_deduct_goods, client):
+    """
+    Test the deduct_goods endpoint with a quantity that is not a positive integer.
+    Args:
+        mock_deduct_goods (Mock): Mock object for the deduct_goods function.
+        client (FlaskClient): Test client for making requests to the application.
+    Asserts:
+        - The response status code is 400 with an "Invalid Quantity" error.
+        - The service is never called.
+    """
+    response = client.post("/deduct/1", json={"quantity": 0})
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid Quantity"
+    mock_deduct_goods.assert_not_called()
+
+
 @patch("Service2.routes.inventory_service.update_goods")
 @patch("Service2.routes.product_schema.dump")
 def test_update_goods(mock_dump, mock_update_goods, client):
@@ -232,3 +270,418 @@ def test_update_goods_value_error(mock_update_goods, client):
     response = client.put("/update/1", json={"name": "Test Product"})
     assert response.status_code == 400
     assert "Update Error" in response.json["error"]
+
+
+@patch("Service2.routes.inventory_service.get_product_by_id")
+def test_get_product(mock_get_product_by_id, client):
+    """
+    Test the get_product endpoint.
+    Args:
+        mock_get_product_by_id (Mock): Mock object for the get_product_by_id function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends GET requests to the /1 and /2 endpoints.
+        - Asserts that an existing product is returned with status 200.
+        - Asserts that a missing product returns status 404.
+    """
+    mock_get_product_by_id.side_effect = lambda product_id: (
+        {"product_id": 1, "name": "Test Product"} if product_id == 1 else None
+    )
+
+    response = client.get("/1")
+    assert response.status_code == 200
+    assert response.json == {"product_id": 1, "name": "Test Product"}
+
+    response = client.get("/2")
+    assert response.status_code == 404
+    assert response.json["message"] == "Product not found"
+
+
+@patch("Service2.routes.inventory_service.cache_stats")
+def test_get_cache_stats(mock_cache_stats, client):
+    """
+    Test the get_cache_stats endpoint.
+    Args:
+        mock_cache_stats (Mock): Mock object for the cache_stats function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a GET request to the /cache/stats endpoint.
+        - Asserts that the cache statistics are returned with status 200.
+    """
+    mock_cache_stats.return_value = {"hits": 3, "misses": 1, "hit_ratio": 0.75}
+
+    response = client.get("/cache/stats")
+    assert response.status_code == 200
+    assert response.json == {"cache": {"hits": 3, "misses": 1, "hit_ratio": 0.75}}
+
+
+@patch("Service2.routes.inventory_service.list_products")
+def test_list_products(mock_list_products, client):
+    """
+    Test the list_products endpoint.
+    Args:
+        mock_list_products (Mock): Mock object for the list_products function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a GET request to the /products endpoint with filters, a price sort and a cursor.
+        - Asserts that the query parameters are passed to the service.
+        - Asserts that a full page returns the cursor of its last product.
+    """
+    mock_list_products.return_value = [
+        {"product_id": 4, "name": "Apple", "price": 1.5},
+        {"product_id": 9, "name": "Pear", "price": 2.0},
+    ]
+
+    response = client.get(
+        "/products?category=fruit&min_price=1&in_stock=true&sort=price"
+        "&after=1.25,3&limit=2"
+    )
+    assert response.status_code == 200
+    assert [product["name"] for product in response.json["products"]] == [
+        "Apple",
+        "Pear",
+    ]
+    assert response.json["next_after"] == "2.0,9"
+    mock_list_products.assert_called_once_with(
+        category="fruit",
+        min_price=1.0,
+        max_price=None,
+        in_stock=True,
+        sort="price",
+        after=(1.25, 3),
+        limit=2,
+    )
+
+    response = client.get("/products?after=9")
+    assert response.json["next_after"] is None
+    assert mock_list_products.call_args.kwargs["after"] == (None, 9)
+
+
+@patch("Service2.routes.inventory_service.list_products")
+def test_list_products_invalid_query(mock_list_products, client):
+    """
+    Test the list_products endpoint with invalid query parameters.
+    Args:
+        mock_list_products (Mock): Mock object for the list_products function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends GET requests with an unknown sort, a malformed cursor, a bad price and a bad limit.
+        - Asserts that each returns status 400 without querying the database.
+    """
+    for query in (
+        "sort=name",
+        "sort=price&after=3",
+        "after=abc",
+        "min_price=cheap",
+        "limit=0",
+    ):
+        response = client.get(f"/products?{query}")
+        assert response.status_code == 400, query
+        assert response.json["error"] == "Invalid Query"
+    mock_list_products.assert_not_called()
+
+
+@patch("Service2.routes.inventory_service.search_products")
+def test_search_products(mock_search_products, client):
+    """
+    Test the search_products endpoint.
+    Args:
+        mock_search_products (Mock): Mock object for the search_products function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a GET request to the /search endpoint with a query, a cursor and a page size.
+        - Asserts that the response status code is 200 and the ranked products are returned.
+        - Asserts that next_after is the cursor of the last product of a full page.
+        - Asserts that a truncated search is reported as such.
+    """
+    mock_search_products.return_value = [
+        {
+            "product_id": 4,
+            "name": "Desk",
+            "price": 80.0,
+            "rank": 0.6,
+            "truncated": True,
+        },
+        {
+            "product_id": 2,
+            "name": "Desk Lamp",
+            "price": 20.0,
+            "rank": 0.6,
+            "truncated": True,
+        },
+    ]
+
+    response = client.get("/search?q=desk&after=0.9,3&limit=2")
+
+    assert response.status_code == 200
+    assert [product["name"] for product in response.json["products"]] == [
+        "Desk",
+        "Desk Lamp",
+    ]
+    assert response.json["products"][0]["rank"] == 0.6
+    assert response.json["next_after"] == "0.6,2"
+    assert response.json["truncated"] is True
+    assert "truncated" not in response.json["products"][0]
+    mock_search_products.assert_called_once_with("desk", (0.9, 3), 2)
+
+
+@patch("Service2.routes.inventory_service.search_products")
+def test_search_products_invalid_query(mock_search_products, client):
+    """
+    Test the search_products endpoint with invalid query parameters.
+    Args:
+        mock_search_products (Mock): Mock object for the search_products function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends GET requests without a search text, with a malformed cursor and a bad limit.
+        - Asserts that each returns status 400 without searching.
+    """
+    for query in ("", "q=%20", "q=desk&after=abc", "q=desk&limit=101"):
+        response = client.get(f"/search?{query}")
+        assert response.status_code == 400, query
+        assert response.json["error"] == "Invalid Query"
+    mock_search_products.assert_not_called()
+
+
+@patch("Service2.routes.inventory_service.search_stats")
+def test_get_search_stats(mock_search_stats, client):
+    """
+    Test the search stats endpoint.
+    Args:
+        mock_search_stats (Mock): Mock object for the search_stats function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a GET request to the /search/stats endpoint.
+        - Asserts that the response status code is 200 and the statistics are returned.
+    """
+    mock_search_stats.return_value = {"index": "database"}
+
+    response = client.get("/search/stats")
+
+    assert response.status_code == 200
+    assert response.json == {"search": {"index": "database"}}
+
+
+@patch("Service2.routes.inventory_service.adjust_stock_bulk")
+def test_adjust_stock_bulk(mock_adjust_stock_bulk, client):
+    """
+    Test the bulk stock adjustment endpoint.
+    Args:
+        mock_adjust_stock_bulk (Mock): Mock object for the adjust_stock_bulk function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a POST request to the /stock/bulk endpoint with valid and invalid items.
+        - Asserts that only the valid items are applied.
+        - Asserts that each item's new stock count or error is reported by its position.
+    """
+    mock_adjust_stock_bulk.return_value = [
+        {"item_index": 0, "product_id": 1, "stock_count": 15, "error": None},
+        {
+            "item_index": 1,
+            "product_id": 9,
+            "stock_count": None,
+            "error": "Product not found",
+        },
+    ]
+
+    response = client.post(
+        "/stock/bulk",
+        json={
+            "adjustments": [
+                {"product_id": 1, "delta": 5},
+                {"product_id": 2, "delta": 0},
+                {"product_id": 9, "delta": -1},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json["applied"] == 1
+    assert response.json["failed"] == 2
+    assert response.json["results"][0] == {
+        "index": 0,
+        "product_id": 1,
+        "stock_count": 15,
+    }
+    assert response.json["results"][1]["error"] == "Validation Error"
+    assert response.json["results"][2] == {
+        "index": 2,
+        "product_id": 9,
+        "error": "Product not found",
+    }
+    mock_adjust_stock_bulk.assert_called_once_with(
+        [{"product_id": 1, "delta": 5}, {"product_id": 9, "delta": -1}]
+    )
+
+
+@patch("Service2.routes.inventory_service.adjust_stock_bulk")
+def test_adjust_stock_bulk_invalid_request(mock_adjust_stock_bulk, client):
+    """
+    Test the bulk stock adjustment endpoint with a malformed body.
+    Args:
+        mock_adjust_stock_bulk (Mock): Mock object for the adjust_stock_bulk function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a POST request whose adjustments are not a list.
+        - Asserts that it returns status 400 without adjusting any stock.
+    """
+    response = client.post("/stock/bulk", json={"adjustments": "all"})
+
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid Request"
+    mock_adjust_stock_bulk.assert_not_called()
+
+
+@patch("Service2.routes.inventory_service.reserve_stock")
+def test_reserve_stock(mock_reserve_stock, client):
+    """
+    Test the stock reservation endpoint.
+    Args:
+        mock_reserve_stock (Mock): Mock object for the reserve_stock function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a POST request holding 2 units for 60 seconds.
+        - Asserts that it returns status 201 with the held reservation.
+        - Asserts that an invalid quantity is rejected with status 400 and that
+          insufficient stock is reported as a reservation error.
+    """
+    mock_reserve_stock.return_value = {
+        "reservation_id": 7,
+        "product_id": 1,
+        "quantity": 2,
+        "status": "held",
+        "expires_at": "2024-01-01T00:01:00",
+        "created_at": "2024-01-01T00:00:00",
+    }
+
+    response = client.post(
+        "/reservations", json={"product_id": 1, "quantity": 2, "ttl": 60}
+    )
+    assert response.status_code == 201
+    assert response.json["reservation"]["reservation_id"] == 7
+    assert response.json["reservation"]["status"] == "held"
+    mock_reserve_stock.assert_called_once_with(1, 2, 60.0)
+
+    response = client.post("/reservations", json={"product_id": 1, "quantity": 0})
+    assert response.status_code == 400
+    assert response.json["error"] == "Validation Error"
+
+    mock_reserve_stock.side_effect = ValueError(
+        "Error reserving stock: Insufficient stock"
+    )
+    response = client.post("/reservations", json={"product_id": 1, "quantity": 5})
+    assert response.status_code == 400
+    assert response.json["error"] == "Reservation Error"
+    mock_reserve_stock.assert_called_with(1, 5, None)
+
+
+@patch("Service2.routes.inventory_service.release_reservation")
+@patch("Service2.routes.inventory_service.confirm_reservation")
+def test_confirm_and_release_reservation(
+    mock_confirm_reservation, mock_release_reservation, client
+):
+    """
+    Test the reservation confirmation and release endpoints.
+    Args:
+        mock_confirm_reservation (Mock): Mock object for the confirm_reservation function.
+        mock_release_reservation (Mock): Mock object for the release_reservation function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Asserts that confirming a hold returns status 200 with the confirmed reservation.
+        - Asserts that releasing an expired hold returns status 400.
+    """
+    mock_confirm_reservation.return_value = {
+        "reservation_id": 7,
+        "product_id": 1,
+        "quantity": 2,
+        "status": "confirmed",
+    }
+    mock_release_reservation.side_effect = ValueError(
+        "Error releasing reservation: Reservation is expired"
+    )
+
+    response = client.post("/reservations/7/confirm")
+    assert response.status_code == 200
+    assert response.json["reservation"]["status"] == "confirmed"
+    mock_confirm_reservation.assert_called_once_with(7)
+
+    response = client.post("/reservations/8/release")
+    assert response.status_code == 400
+    assert response.json["error"] == "Release Error"
+    mock_release_reservation.assert_called_once_with(8)
+
+
+@patch("Service2.routes.inventory_service.reservation_stats")
+def test_get_reservation_stats(mock_reservation_stats, client):
+    """
+    Test the reservation stats endpoint.
+    Args:
+        mock_reservation_stats (Mock): Mock object for the reservation_stats function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Asserts that the sweeper counters are returned with status 200.
+    """
+    mock_reservation_stats.return_value = {"sweeps": 3, "expired_holds": 12}
+
+    response = client.get("/reservations/stats")
+
+    assert response.status_code == 200
+    assert response.json == {"reservations": {"sweeps": 3, "expired_holds": 12}}
+
+
+@patch("Service2.routes.inventory_service.low_stock")
+def test_list_low_stock(mock_low_stock, client):
+    """
+    Test the low-stock listing endpoint.
+    Args:
+        mock_low_stock (Mock): Mock object for the low_stock function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Sends a GET request for the products at or below 5 units, 2 per page.
+        - Asserts that the cursor is parsed and the next page's cursor returned.
+        - Asserts that a threshold above the watched thresholds is rejected.
+    """
+    mock_low_stock.return_value = [
+        {"product_id": 3, "stock_count": 0},
+        {"product_id": 1, "stock_count": 4},
+    ]
+
+    response = client.get("/low-stock?threshold=5&after=0,2&limit=2")
+
+    assert response.status_code == 200
+    assert response.json["products"] == mock_low_stock.return_value
+    assert response.json["next_after"] == "4,1"
+    mock_low_stock.assert_called_once_with(5, (0, 2), 2)
+
+    response = client.get("/low-stock?threshold=100000")
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid Query"
+    response = client.get("/low-stock?after=abc")
+    assert response.status_code == 400
+    assert mock_low_stock.call_count == 1
+
+
+@patch("Service2.routes.inventory_service.low_stock_events")
+def test_list_low_stock_events(mock_low_stock_events, client):
+    """
+    Test the low-stock events endpoint.
+    Args:
+        mock_low_stock_events (Mock): Mock object for the low_stock_events function.
+        client (FlaskClient): Test client for making requests to the application.
+    Test:
+        - Asserts that the events after a sequence number are returned with the
+          sequence number to poll from next, which stays put without new events.
+    """
+    mock_low_stock_events.return_value = [
+        {"sequence": 8, "product_id": 1, "threshold": 10, "direction": "down"}
+    ]
+
+    response = client.get("/low-stock/events?after=7")
+
+    assert response.status_code == 200
+    assert response.json["next_after"] == 8
+    mock_low_stock_events.assert_called_once_with(7, 100)
+
+    mock_low_stock_events.return_value = []
+    response = client.get("/low-stock/events?after=8")
+    assert response.json == {"events": [], "next_after": 8}
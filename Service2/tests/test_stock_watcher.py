@@ -0,0 +1,115 @@
+import pytest
+
+from stock_watcher import LowStockWatcher
+
+
+@pytest.fixture
+def products():
+    """
+    Fixture providing the stock count of each product, as the watcher loads them.
+
+    Returns:
+        dict: The stock count of each product, by product ID.
+    """
+    return {1: 3, 2: 50, 3: 0, 4: 10, 5: None}
+
+
+@pytest.fixture
+def watcher(products):
+    """
+    Fixture providing a warm LowStockWatcher with thresholds 0 and 10, without
+    background refreshes.
+
+    Returns:
+        LowStockWatcher: The watcher under test.
+    """
+
+    def load_pages(threshold):
+        rows = [
+            {"product_id": product_id, "stock_count": stock_count}
+            for product_id, stock_count in sorted(products.items())
+            if stock_count is not None and stock_count <= threshold
+        ]
+        return [rows[:2], rows[2:]]
+
+    watcher = LowStockWatcher(load_pages, (10, 0), refresh_interval=0)
+    watcher.refresh()
+    return watcher
+
+
+def test_low_stock_pages(watcher):
+    """
+    Test that the low-stock products are listed lowest stock first, page by page.
+
+    Asserts:
+        - The products at or below each threshold are listed by stock then ID.
+        - The (stock_count, product_id) cursor continues after the previous page.
+        - A threshold above the highest watched threshold is rejected.
+        - Warming the set raises no event.
+    """
+    assert watcher.low_stock() == [
+        {"product_id": 3, "stock_count": 0},
+        {"product_id": 1, "stock_count": 3},
+        {"product_id": 4, "stock_count": 10},
+    ]
+    assert watcher.low_stock(threshold=5) == [
+        {"product_id": 3, "stock_count": 0},
+        {"product_id": 1, "stock_count": 3},
+    ]
+    assert watcher.low_stock(after=(0, 3), limit=1) == [
+        {"product_id": 1, "stock_count": 3}
+    ]
+    with pytest.raises(ValueError, match="at most 10"):
+        watcher.low_stock(threshold=11)
+    assert watcher.events() == []
+
+
+def test_observe_raises_threshold_crossings(watcher):
+    """
+    Test that stock changes raise one event per threshold crossed.
+
+    Asserts:
+        - A drop from 50 to 0 crosses 10 then 0, and a rise back crosses 0 then 10.
+        - A change within a band raises no event but moves the product in the set.
+        - Events are read after a sequence number.
+    """
+    watcher.observe(2, 0)
+    watcher.observe(1, 2)
+    watcher.observe(2, 12)
+
+    events = watcher.events()
+    assert [
+        (event["product_id"], event["direction"], event["threshold"])
+        for event in events
+    ] == [(2, "down", 10), (2, "down", 0), (2, "up", 0), (2, "up", 10)]
+    assert events[0]["previous_stock_count"] is None
+    assert events[3]["stock_count"] == 12
+    assert [event["sequence"] for event in watcher.events(after=2)] == [3, 4]
+    assert watcher.low_stock(limit=2) == [
+        {"product_id": 3, "stock_count": 0},
+        {"product_id": 1, "stock_count": 2},
+    ]
+
+
+def test_refresh_finds_changes_made_elsewhere(products, watcher):
+    """
+    Test that a refresh picks up the stock changes the watcher was not told about.
+
+    Asserts:
+        - A product restocked elsewhere leaves the set with an "up" event, and a
+          product sold elsewhere joins it with a "down" event.
+        - The stats count the low-stock products, events and refreshes.
+    """
+    products[4] = 40
+    products[2] = 7
+    watcher.refresh()
+
+    assert [
+        (event["product_id"], event["direction"], event["threshold"])
+        for event in watcher.events()
+    ] == [(2, "down", 10), (4, "up", 10)]
+    assert [product["product_id"] for product in watcher.low_stock()] == [3, 1, 2]
+    stats = watcher.stats()
+    assert stats["low_stock_products"] == 3
+    assert stats["events"] == 2
+    assert stats["refreshes"] == 2
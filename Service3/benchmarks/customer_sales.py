@@ -0,0 +1,198 @@
+"""
+Customer sales lookup benchmark for the sales service.
+
+This script builds two copies of a sales table of ``--rows`` generated sales in a
+scratch schema of the Postgres database configured for the service:
+
+- before: the Sale table as ``TABLES`` creates it, with its primary key only.
+- after: the Sale table as ``POSTGRES_SCHEMA`` turns it, range-partitioned by
+  month with the ``(customer_id, sale_date)`` and ``(product_id, sale_date)``
+  indexes.
+
+It then times, on each table, the query PostgREST runs for
+``GET /api/sales/customer/<id>`` (every sale of a customer) and the same query
+limited to the last month, for ``--queries`` random customers, and reports the
+median and 95th percentile latencies.
+
+Usage:
+    python benchmarks/customer_sales.py --rows 50000000 --customers 1000000
+
+The sales are spread over ``--months`` months. The scratch schema is dropped when
+done, unless ``--keep`` is given (a later run with ``--reuse`` then skips the
+build).
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from config import Config  # noqa: E402
+
+SCHEMA = "sale_benchmark"
+CHUNK_ROWS = 1000000
+
+
+def build(cursor, rows, customers, products, months):
+    """
+    Create and fill the before and after tables with the same generated sales.
+    """
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    cursor.execute(
+        f"""
+        CREATE TABLE {SCHEMA}.sale_before (
+            sale_id SERIAL PRIMARY KEY,
+            customer_id INT,
+            product_id INT,
+            sale_date DATE,
+            quantity INT,
+            total_price DECIMAL(10, 2)
+        )
+        """
+    )
+    cursor.execute(
+        f"""
+        CREATE TABLE {SCHEMA}.sale_after (
+            LIKE {SCHEMA}.sale_before INCLUDING DEFAULTS,
+            PRIMARY KEY (sale_id, sale_date)
+        ) PARTITION BY RANGE (sale_date)
+        """
+    )
+    first = date(date.today().year - (months - 1) // 12 - 1, 1, 1)
+    cursor.execute(
+        f"""
+        DO $$
+        DECLARE
+            v_month DATE;
+        BEGIN
+            FOR v_month IN
+                SELECT generate_series(
+                    %s::DATE, %s::DATE + %s * INTERVAL '1 month', INTERVAL '1 month'
+                )::DATE
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE {SCHEMA}.%%I PARTITION OF {SCHEMA}.sale_after '
+                    'FOR VALUES FROM (%%L) TO (%%L)',
+                    'sale_' || to_char(v_month, 'YYYY_MM'),
+                    v_month,
+                    v_month + INTERVAL '1 month'
+                );
+            END LOOP;
+        END;
+        $$
+        """,
+        (first, first, months),
+    )
+
+    start = time.perf_counter()
+    for offset in range(0, rows, CHUNK_ROWS):
+        cursor.execute(
+            f"""
+            INSERT INTO {SCHEMA}.sale_before
+            (customer_id, product_id, sale_date, quantity, total_price)
+            SELECT
+                1 + (random() * (%(customers)s - 1))::INT,
+                1 + (random() * (%(products)s - 1))::INT,
+                %(first)s::DATE + (random() * (%(days)s - 1))::INT,
+                quantity,
+                quantity * 9.99
+            FROM (
+                SELECT 1 + (random() * 4)::INT AS quantity
+                FROM generate_series(1, %(count)s)
+            ) generated
+            """,
+            {
+                "customers": customers,
+                "products": products,
+                "first": first,
+                "days": months * 30,
+                "count": min(CHUNK_ROWS, rows - offset),
+            },
+        )
+        print(f"  {min(offset + CHUNK_ROWS, rows):>12,} rows", end="\r", flush=True)
+    cursor.execute(
+        f"INSERT INTO {SCHEMA}.sale_after SELECT * FROM {SCHEMA}.sale_before"
+    )
+    cursor.execute(f"CREATE INDEX ON {SCHEMA}.sale_after (customer_id, sale_date)")
+    cursor.execute(f"CREATE INDEX ON {SCHEMA}.sale_after (product_id, sale_date)")
+    cursor.execute(f"ANALYZE {SCHEMA}.sale_before")
+    cursor.execute(f"ANALYZE {SCHEMA}.sale_after")
+    print(f"built {rows:,} rows twice in {time.perf_counter() - start:.0f}s")
+
+
+def time_queries(cursor, table, customer_ids, since=None):
+    """
+    Time the sales query of each customer on a table.
+
+    Returns:
+        list: The latency of each query in milliseconds.
+    """
+    query = f"SELECT * FROM {SCHEMA}.{table} WHERE customer_id = %s"
+    if since is not None:
+        query += " AND sale_date >= %s"
+    latencies = []
+    for customer_id in customer_ids:
+        start = time.perf_counter()
+        cursor.execute(query, (customer_id, since) if since else (customer_id,))
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    """
+    Parse the command line arguments, build the tables and time both layouts.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50000000)
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--reuse", action="store_true")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(
+        host=Config.DATABASE.HOST,
+        port=Config.DATABASE.PORT,
+        dbname=Config.DATABASE.NAME,
+        user=Config.DATABASE.USER,
+        password=Config.DATABASE.PASSWORD,
+    )
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        if not args.reuse:
+            build(cursor, args.rows, args.customers, args.products, args.months)
+        cursor.execute(f"SELECT MAX(sale_date) FROM {SCHEMA}.sale_before")
+        last = cursor.fetchone()[0]
+        since = last.replace(day=1)
+
+        rng = random.Random(42)
+        customer_ids = [rng.randint(1, args.customers) for _ in range(args.queries)]
+        print(f"rows={args.rows:,} customers={args.customers:,} queries={args.queries}")
+        for label, filter_since in (("all sales", None), ("last month", since)):
+            for table in ("sale_before", "sale_after"):
+                latencies = time_queries(cursor, table, customer_ids, filter_since)
+                print(
+                    f"{label:<12}{table:<14}"
+                    f"p50 {statistics.median(latencies):9.2f} ms  "
+                    f"p95 {sorted(latencies)[int(len(latencies) * 0.95) - 1]:9.2f} ms"
+                )
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
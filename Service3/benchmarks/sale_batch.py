@@ -0,0 +1,157 @@
+"""
+Batch sale submission benchmark for the sales app.
+
+This script serves the sales app on a local threaded WSGI server, creates a
+throwaway customer and product, and submits ``--sales`` sales of them twice, to
+compare:
+
+- loop: one ``POST /api/sales/submit`` per sale, sent by ``--callers``
+  concurrent callers, as the POS integration uploads a shift today.
+- batch: ``POST /api/sales/batch`` with ``--batch-size`` sales per request,
+  inserted with one multi-row insert per chunk of the service's
+  ``insert_chunk_size`` sales.
+
+It reports the wall-clock duration and the throughput of each mode in rows per
+second, and checks that every sale was recorded.
+
+Usage:
+    python benchmarks/sale_batch.py --sales 20000 --callers 8 --batch-size 5000
+
+The benchmark runs against the database configured for the service (set
+``DATABASE_BACKEND=sqlite`` for an in-process database) and deletes the rows it
+created when done.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import create_app  # noqa: E402
+from routes import sale_service  # noqa: E402
+
+
+def submit_loop(http, sales, callers):
+    """
+    Submit every sale with one request per sale.
+
+    Returns:
+        float: The wall-clock duration in seconds.
+    """
+
+    def submit(sale):
+        response = http.post("/api/sales/submit", json=sale)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(pool.map(submit, sales))
+    return time.perf_counter() - start
+
+
+def submit_batch(http, sales, batch_size):
+    """
+    Submit every sale with batch requests of ``batch_size`` sales.
+
+    Returns:
+        float: The wall-clock duration in seconds.
+    """
+    start = time.perf_counter()
+    for offset in range(0, len(sales), batch_size):
+        response = http.post(
+            "/api/sales/batch", json=sales[offset : offset + batch_size]
+        )
+        response.raise_for_status()
+        assert response.json()["failed"] == 0, response.json()["results"][:3]
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark both modes.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sales", type=int, default=20000)
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    supabase = sale_service.supabase
+    customer_id = (
+        supabase.table("customer")
+        .insert(
+            {
+                "full_name": "Benchmark Customer",
+                "username": f"bench_{uuid.uuid4().hex[:8]}",
+                "password": "not-a-real-hash",
+                "age": 30,
+            }
+        )
+        .execute()
+        .data[0]["customer_id"]
+    )
+    product_id = (
+        supabase.table("product")
+        .insert({"name": "Benchmark Product", "price": 9.99, "stock_count": 0})
+        .execute()
+        .data[0]["product_id"]
+    )
+    today = date.today().isoformat()
+    sales = [
+        {
+            "customer_id": customer_id,
+            "product_id": product_id,
+            "sale_date": today,
+            "quantity": 1 + index % 5,
+            "total_price": round((1 + index % 5) * 9.99, 2),
+        }
+        for index in range(args.sales)
+    ]
+
+    limits = httpx.Limits(max_connections=args.callers)
+    try:
+        with httpx.Client(base_url=base_url, limits=limits, timeout=300) as http:
+            loop = submit_loop(http, sales, args.callers)
+            batch = submit_batch(http, sales, args.batch_size)
+
+        recorded = sum(
+            len(page)
+            for page in sale_service.iter_sale_pages(
+                columns=("sale_id",), customer_id=customer_id
+            )
+        )
+        print(
+            f"sales={args.sales} chunk={sale_service.insert_chunk_size}\n"
+            f"loop   callers={args.callers:<5} {loop:7.2f}s "
+            f"{args.sales / loop:8.0f} rows/s\n"
+            f"batch  size={args.batch_size:<7} {batch:7.2f}s "
+            f"{args.sales / batch:8.0f} rows/s ({loop / batch:.1f}x)\n"
+            f"recorded={recorded} of {2 * args.sales}"
+        )
+    finally:
+        supabase.table(sale_service.sales_table).delete().eq(
+            "customer_id", customer_id
+        ).execute()
+        supabase.table("customer").delete().eq("customer_id", customer_id).execute()
+        supabase.table("product").delete().eq("product_id", product_id).execute()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
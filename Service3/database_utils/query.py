@@ -0,0 +1,372 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_OPERATORS = {
+    "eq": "=",
+    "neq": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+
+
+def quote_identifier(name):
+    """
+    Quote a table, column or function name for use in a SQL statement.
+
+    Args:
+        name (str): The identifier to quote.
+
+    Returns:
+        str: The double-quoted identifier.
+
+    Raises:
+        ValueError: If the name is not a plain SQL identifier.
+    """
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name}")
+    return f'"{name}"'
+
+
+def to_json_value(value):
+    """
+    Convert a value read from the database to what PostgREST would return for it.
+
+    Decimals become floats and dates and timestamps become ISO 8601 strings, so the
+    services see the same values whichever backend they run on.
+
+    Args:
+        value: The value read from the database.
+
+    Returns:
+        The JSON-compatible value.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def to_json_row(row):
+    """
+    Convert a database row to a dictionary of JSON-compatible values.
+
+    Args:
+        row (Mapping): The row read from the database.
+
+    Returns:
+        dict: The converted row.
+    """
+    return {key: to_json_value(value) for key, value in row.items()}
+
+
+class QueryResponse:
+    """
+    The result of an executed query, shaped like the PostgREST ``APIResponse``.
+
+    Attributes:
+        data: The rows returned by the query, or the value returned by a function.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+
+@lru_cache(maxsize=512)
+def _compile(
+    placeholder, operation, table, columns, rows, filters, ordering, limit, conflict
+):
+    """
+    Build the SQL text for a query shape.
+
+    The text only depends on the shape of the query (never on the values, which
+    are always bound as parameters), so it is cached and reused for every query
+    with the same shape.
+    """
+    table = quote_identifier(table)
+    if operation == "select":
+        if columns == ("*",):
+            projection = "*"
+        else:
+            projection = ", ".join(quote_identifier(column) for column in columns)
+        sql = f"SELECT {projection} FROM {table}"
+    elif operation in ("insert", "upsert"):
+        names = ", ".join(quote_identifier(column) for column in columns)
+        values = ", ".join(
+            "("
+            + ", ".join(placeholder if present else "DEFAULT" for present in row)
+            + ")"
+            for row in rows
+        )
+        sql = f"INSERT INTO {table} ({names}) VALUES {values}"
+        if operation == "upsert":
+            targets = ", ".join(quote_identifier(column) for column in conflict)
+            updates = ", ".join(
+                f"{quote_identifier(column)} = excluded.{quote_identifier(column)}"
+                for column in columns
+                if column not in conflict
+            )
+            action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            sql += f" ON CONFLICT ({targets}) {action}"
+    elif operation == "update":
+        assignments = ", ".join(
+            f"{quote_identifier(column)} = {placeholder}" for column in columns
+        )
+        sql = f"UPDATE {table} SET {assignments}"
+    else:
+        sql = f"DELETE FROM {table}"
+
+    conditions = []
+    for column, operator, size in filters:
+        if operator == "in":
+            if size == 0:
+                conditions.append("1 = 0")
+                continue
+            values = ", ".join([placeholder] * size)
+            conditions.append(f"{quote_identifier(column)} IN ({values})")
+        else:
+            conditions.append(
+                f"{quote_identifier(column)} {_OPERATORS[operator]} {placeholder}"
+            )
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+
+    if operation == "select":
+        if ordering:
+            sql += " ORDER BY " + ", ".join(
+                f"{quote_identifier(column)} {'DESC' if desc else 'ASC'}"
+                for column, desc in ordering
+            )
+        if limit:
+            sql += f" LIMIT {placeholder}"
+    else:
+        sql += " RETURNING *"
+    return sql
+
+
+class QueryBuilder:
+    """
+    A table query supporting the subset of the PostgREST query-builder API used by the services.
+
+    The builder records the operation, filters, ordering and limit, and compiles
+    them into one parameterised SQL statement when executed, so the services can
+    run unchanged on a SQL backend.
+
+    Methods:
+        select(*columns): Selects the given columns (all columns by default).
+        insert(json): Inserts one row (dict) or several rows (list of dicts).
+        upsert(json, on_conflict): Inserts rows, updating the ones that conflict on the given columns.
+        update(json): Updates the matching rows with the given values.
+        delete(): Deletes the matching rows.
+        eq/neq/gt/gte/lt/lte(column, value): Adds a comparison filter.
+        in_(column, values): Adds a membership filter.
+        order(column, desc=False): Adds a sort key.
+        limit(size): Limits the number of rows returned.
+        execute(): Runs the query and returns a QueryResponse.
+    """
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.columns = ("*",)
+        self.rows = []
+        self.values = {}
+        self.conflict = ()
+        self.filters = []
+        self.ordering = []
+        self.row_limit = None
+
+    def select(self, *columns):
+        names = [name.strip() for column in columns for name in column.split(",")]
+        self.operation = "select"
+        self.columns = tuple(name for name in names if name) or ("*",)
+        return self
+
+    def insert(self, json):
+        self.operation = "insert"
+        self.rows = [json] if isinstance(json, dict) else list(json)
+        return self
+
+    def upsert(self, json, on_conflict=""):
+        if not on_conflict:
+            raise ValueError("on_conflict is required for upserts")
+        self.insert(json)
+        self.operation = "upsert"
+        self.conflict = tuple(column.strip() for column in on_conflict.split(","))
+        return self
+
+    def update(self, json):
+        self.operation = "update"
+        self.values = dict(json)
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    def _filter(self, column, operator, value):
+        self.filters.append((column, operator, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self.row_limit = size
+        return self
+
+    def to_sql(self):
+        """
+        Compile the query into SQL text and its parameters.
+
+        Returns:
+            tuple: The SQL text and the list of parameters to bind.
+        """
+        params = []
+        columns, rows = self.columns, ()
+        if self.operation in ("insert", "upsert"):
+            columns = tuple(dict.fromkeys(key for row in self.rows for key in row))
+            rows = tuple(
+                tuple(column in row for column in columns) for row in self.rows
+            )
+            for row in self.rows:
+                params.extend(row[column] for column in columns if column in row)
+        elif self.operation == "update":
+            columns = tuple(self.values)
+            params.extend(self.values.values())
+
+        filters = []
+        for column, operator, value in self.filters:
+            if operator == "in":
+                filters.append((column, operator, len(value)))
+                params.extend(value)
+            else:
+                filters.append((column, operator, None))
+                params.append(value)
+
+        if self.operation == "select" and self.row_limit:
+            params.append(self.row_limit)
+
+        sql = _compile(
+            self.client.placeholder,
+            self.operation,
+            self.table,
+            columns,
+            rows,
+            tuple(filters),
+            tuple(self.ordering),
+            bool(self.row_limit),
+            self.conflict,
+        )
+        return sql, params
+
+    def execute(self):
+        return self.client.execute(self)
+
+
+class SQLClient:
+    """
+    Base class of the SQL backends the services can run on instead of Supabase.
+
+    A backend exposes the ``table(...)`` and ``rpc(...)`` query-builder API of the
+    Supabase client, which is the only data-access interface the services use, and
+    runs the compiled statements itself. Subclasses set the parameter placeholder
+    of their driver and implement ``execute`` and ``call``.
+
+    Attributes:
+        placeholder (str): The parameter placeholder of the database driver.
+    """
+
+    placeholder = "?"
+
+    def table(self, table_name):
+        return QueryBuilder(self, table_name)
+
+    def rpc(self, fn, params):
+        return RpcBuilder(self, fn, params)
+
+    def execute(self, query):
+        """
+        Run a table query.
+
+        Args:
+            query (QueryBuilder): The query to run.
+
+        Returns:
+            QueryResponse: The rows selected, inserted, updated or deleted.
+        """
+        raise NotImplementedError
+
+    def call(self, rpc):
+        """
+        Call a database function, shaping the result the way PostgREST does.
+
+        Args:
+            rpc (RpcBuilder): The function call to run.
+
+        Returns:
+            QueryResponse: The result of the function.
+        """
+        raise NotImplementedError
+
+
+class RpcBuilder:
+    """
+    A database function call, shaped like the PostgREST RPC builder.
+
+    Attributes:
+        client: The backend client executing the call.
+        function (str): The name of the database function.
+        params (dict): The named arguments of the call.
+    """
+
+    def __init__(self, client, function, params):
+        self.client = client
+        self.function = function
+        self.params = dict(params or {})
+
+    def to_sql(self):
+        """
+        Compile the call into SQL text and its parameters, using named arguments.
+
+        Returns:
+            tuple: The SQL text and the list of parameters to bind.
+        """
+        placeholder = self.client.placeholder
+        arguments = ", ".join(
+            f"{quote_identifier(name)} => {placeholder}" for name in self.params
+        )
+        sql = f"SELECT * FROM {quote_identifier(self.function)}({arguments})"
+        return sql, list(self.params.values())
+
+    def execute(self):
+        return self.client.call(self)
@@ -0,0 +1,185 @@
+import copy
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+
+from postgrest.exceptions import APIError
+
+from database_utils.query import QueryResponse, SQLClient, to_json_row
+from database_utils.schema import TABLES
+from database_utils.sqlite_functions import FUNCTIONS
+
+_SERIAL_KEY = re.compile(r"\b(?:BIG)?SERIAL\s+PRIMARY\s+KEY\b", re.IGNORECASE)
+
+# SQLite error messages mapped to the Postgres error codes PostgREST reports
+_INTEGRITY_CODES = {
+    "UNIQUE constraint failed": "23505",
+    "FOREIGN KEY constraint failed": "23503",
+    "CHECK constraint failed": "23514",
+    "NOT NULL constraint failed": "23502",
+}
+
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, datetime.isoformat)
+sqlite3.register_converter("DECIMAL", lambda value: float(value))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter(
+    "TIMESTAMP", lambda value: datetime.fromisoformat(value.decode())
+)
+
+
+def translate_ddl(statement):
+    """
+    Translate a Postgres table definition from ``database_utils.schema`` to SQLite.
+
+    Args:
+        statement (str): The Postgres ``CREATE TABLE`` statement.
+
+    Returns:
+        str: The equivalent SQLite statement.
+    """
+    return _SERIAL_KEY.sub("INTEGER PRIMARY KEY AUTOINCREMENT", statement)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteClient(SQLClient):
+    """
+    An in-process database client running the e-commerce schema on SQLite.
+
+    The client exposes the same ``table(...)`` and ``rpc(...)`` query-builder API as the
+    Supabase client, so a service or a whole Flask app can run and be load-tested
+    without a network or a Supabase project. The schema is created from the table
+    definitions in ``database_utils.schema``, database functions are implemented in
+    Python (``database_utils.sqlite_functions``), rows are returned with the same
+    JSON-compatible values PostgREST returns, and errors are raised as PostgREST
+    ``APIError`` instances with the matching Postgres error codes.
+
+    A single connection is shared by every thread and each statement or function
+    call runs in its own transaction under a lock, as SQLite allows one writer at a
+    time anyway.
+
+    Attributes:
+        placeholder (str): The parameter placeholder of the sqlite3 driver.
+        path (str): The database file, or ":memory:" for a private in-memory database.
+        functions (dict): The Python implementations of the database functions, by name.
+    """
+
+    placeholder = "?"
+
+    def __init__(self, path=":memory:", tables=TABLES, functions=FUNCTIONS):
+        self.path = path
+        self.functions = functions
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        self._connection.row_factory = _dict_row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+        with self._transaction() as cursor:
+            for statement in tables:
+                cursor.execute(translate_ddl(statement))
+
+    def execute(self, query):
+        """
+        Run a table query.
+
+        SQLite has no ``DEFAULT`` keyword inside a multi-row ``VALUES`` list, so an
+        insert whose rows set different columns runs as one statement per row, in
+        the same transaction.
+
+        Args:
+            query (QueryBuilder): The query to run.
+
+        Returns:
+            QueryResponse: The rows selected, inserted, updated or deleted.
+        """
+        queries = [query]
+        if query.operation in ("insert", "upsert"):
+            if not query.rows:
+                return QueryResponse([])
+            if len({tuple(row) for row in query.rows}) > 1:
+                queries = []
+                for row in query.rows:
+                    single = copy.copy(query)
+                    single.rows = [row]
+                    queries.append(single)
+
+        rows = []
+        with self._transaction() as cursor:
+            for single in queries:
+                sql, params = single.to_sql()
+                rows.extend(cursor.execute(sql, params).fetchall())
+        return QueryResponse([to_json_row(row) for row in rows])
+
+    def call(self, rpc):
+        """
+        Call a database function implemented in ``database_utils.sqlite_functions``.
+
+        Args:
+            rpc (RpcBuilder): The function call to run.
+
+        Returns:
+            QueryResponse: The result of the function.
+
+        Raises:
+            APIError: If the function does not exist or raises an error.
+        """
+        function = self.functions.get(rpc.function)
+        if function is None:
+            raise APIError(
+                {"message": f"Function {rpc.function} not found", "code": "42883"}
+            )
+        with self._transaction() as cursor:
+            return QueryResponse(function(cursor, **rpc.params))
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK")
+                raise self._api_error(e) from e
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            else:
+                cursor.execute("COMMIT")
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _api_error(error):
+        message = str(error)
+        code = None
+        if isinstance(error, sqlite3.IntegrityError):
+            code = next(
+                (
+                    code
+                    for prefix, code in _INTEGRITY_CODES.items()
+                    if message.startswith(prefix)
+                ),
+                "23000",
+            )
+        return APIError({"message": message, "code": code})
@@ -0,0 +1,599 @@
+"""
+Python implementations of the database functions for the SQLite backend.
+
+SQLite has no stored procedures, so every function in ``database_utils.schema``
+that the services call through ``rpc(...)`` is mirrored here. Each function runs
+inside the transaction opened by ``SQLiteClient.call``, receives its cursor and
+the named arguments of the call, and returns the value PostgREST would return:
+a list of rows for set-returning functions and a plain value otherwise. Errors
+are raised the way ``RAISE EXCEPTION`` surfaces them through PostgREST.
+"""
+
+import json
+
+from postgrest.exceptions import APIError
+
+from database_utils.query import to_json_row
+
+# Weights of the product fields in a search, those ts_rank gives the A, B and C
+# weights of Product.search_vector
+PRODUCT_SEARCH_WEIGHTS = {"name": 1.0, "category": 0.4, "description": 0.2}
+
+
+def raise_exception(message):
+    """
+    Raise an error like a plpgsql ``RAISE EXCEPTION`` seen through PostgREST.
+
+    Args:
+        message (str): The error message.
+
+    Raises:
+        APIError: Always, with the ``P0001`` (raise_exception) error code.
+    """
+    raise APIError({"message": message, "code": "P0001"})
+
+
+def _exists(cursor, table, column, value):
+    return (
+        cursor.execute(f"SELECT 1 FROM {table} WHERE {column} = ?", (value,)).fetchone()
+        is not None
+    )
+
+
+def charge_wallet(cursor, p_username, p_amount):
+    row = cursor.execute(
+        """
+        UPDATE Customer
+        SET wallet_balance = ROUND(COALESCE(wallet_balance, 0) + ?, 2)
+        WHERE username = ?
+        RETURNING wallet_balance
+        """,
+        (p_amount, p_username),
+    ).fetchone()
+    if row is None:
+        raise_exception("Customer not found")
+    return float(row["wallet_balance"])
+
+
+def deduct_wallet(cursor, p_username, p_amount):
+    row = cursor.execute(
+        """
+        UPDATE Customer
+        SET wallet_balance = ROUND(wallet_balance - ?, 2)
+        WHERE username = ? AND wallet_balance >= ?
+        RETURNING wallet_balance
+        """,
+        (p_amount, p_username, p_amount),
+    ).fetchone()
+    if row is None:
+        if _exists(cursor, "Customer", "username", p_username):
+            raise_exception("Insufficient funds")
+        raise_exception("Customer not found")
+    return float(row["wallet_balance"])
+
+
+def wallet_ledger_balance(cursor, p_customer_id):
+    row = cursor.execute(
+        """
+        SELECT ROUND(COALESCE(c.wallet_balance, 0) + COALESCE(
+            (
+                SELECT SUM(l.amount)
+                FROM WalletLedger l
+                WHERE l.customer_id = c.customer_id
+                AND l.entry_id > c.wallet_ledger_position
+            ),
+            0
+        ), 2) AS balance
+        FROM Customer c
+        WHERE c.customer_id = ?
+        """,
+        (p_customer_id,),
+    ).fetchone()
+    return float(row["balance"]) if row else None
+
+
+def wallet_ledger_balances(cursor, p_customer_ids):
+    placeholders = ", ".join("?" * len(p_customer_ids))
+    rows = cursor.execute(
+        f"""
+        SELECT c.customer_id,
+            ROUND(COALESCE(c.wallet_balance, 0) + COALESCE(SUM(l.amount), 0), 2)
+                AS wallet_balance
+        FROM Customer c
+        LEFT JOIN WalletLedger l
+            ON l.customer_id = c.customer_id
+            AND l.entry_id > c.wallet_ledger_position
+        WHERE c.customer_id IN ({placeholders})
+        GROUP BY c.customer_id
+        """,
+        list(p_customer_ids),
+    ).fetchall()
+    return [to_json_row(row) for row in rows]
+
+
+def _ledger_customer_id(cursor, username):
+    row = cursor.execute(
+        "SELECT customer_id FROM Customer WHERE username = ?", (username,)
+    ).fetchone()
+    if row is None:
+        raise_exception("Customer not found")
+    return row["customer_id"]
+
+
+# The advisory locks of the Postgres functions are not needed here: every call
+# runs in its own BEGIN IMMEDIATE transaction, which already serialises writers
+
+
+def ledger_charge_wallet(cursor, p_username, p_amount):
+    customer_id = _ledger_customer_id(cursor, p_username)
+    cursor.execute(
+        "INSERT INTO WalletLedger (customer_id, amount) VALUES (?, ?)",
+        (customer_id, p_amount),
+    )
+    balance = wallet_ledger_balance(cursor, customer_id)
+    return [{"customer_id": customer_id, "wallet_balance": balance}]
+
+
+def ledger_deduct_wallet(cursor, p_username, p_amount):
+    customer_id = _ledger_customer_id(cursor, p_username)
+    balance = wallet_ledger_balance(cursor, customer_id)
+    if balance < p_amount:
+        raise_exception("Insufficient funds")
+    cursor.execute(
+        "INSERT INTO WalletLedger (customer_id, amount) VALUES (?, ?)",
+        (customer_id, -p_amount),
+    )
+    return [
+        {"customer_id": customer_id, "wallet_balance": round(balance - p_amount, 2)}
+    ]
+
+
+def compact_wallet_ledger(cursor, p_customer_ids):
+    compacted = 0
+    for customer_id in sorted(set(p_customer_ids)):
+        row = cursor.execute(
+            """
+            SELECT SUM(l.amount) AS total, MAX(l.entry_id) AS last_entry
+            FROM WalletLedger l
+            JOIN Customer c ON c.customer_id = l.customer_id
+            WHERE l.customer_id = ? AND l.entry_id > c.wallet_ledger_position
+            """,
+            (customer_id,),
+        ).fetchone()
+        if row["last_entry"] is None:
+            continue
+        cursor.execute(
+            """
+            UPDATE Customer
+            SET wallet_balance = ROUND(COALESCE(wallet_balance, 0) + ?, 2),
+                wallet_ledger_position = ?
+            WHERE customer_id = ?
+            """,
+            (row["total"], row["last_entry"], customer_id),
+        )
+        compacted += 1
+    return compacted
+
+
+def _apply_wallet_batch(entries, apply):
+    # The single-entry functions raise before writing anything, so a failed entry
+    # leaves the transaction as it was and is reported instead of raised
+    results = []
+    for index, entry in enumerate(entries):
+        result = {"entry_index": index, "customer_id": None, "new_balance": None}
+        try:
+            result.update(apply(entry["username"], entry["amount"], entry["op"]))
+            result["error"] = None
+        except APIError as e:
+            result["error"] = e.message
+        results.append(result)
+    return results
+
+
+def apply_wallet_batch(cursor, p_entries):
+    def apply(username, amount, op):
+        function = deduct_wallet if op == "deduct" else charge_wallet
+        return {"new_balance": function(cursor, username, amount)}
+
+    return _apply_wallet_batch(p_entries, apply)
+
+
+def ledger_apply_wallet_batch(cursor, p_entries):
+    def apply(username, amount, op):
+        function = ledger_deduct_wallet if op == "deduct" else ledger_charge_wallet
+        row = function(cursor, username, amount)[0]
+        return {"customer_id": row["customer_id"], "new_balance": row["wallet_balance"]}
+
+    return _apply_wallet_batch(p_entries, apply)
+
+
+def deduct_stock(cursor, p_product_id, p_quantity):
+    rows = cursor.execute(
+        """
+        UPDATE Product
+        SET stock_count = stock_count - ?
+        WHERE product_id = ? AND stock_count >= ?
+        RETURNING *
+        """,
+        (p_quantity, p_product_id, p_quantity),
+    ).fetchall()
+    if not rows:
+        if _exists(cursor, "Product", "product_id", p_product_id):
+            raise_exception("Insufficient stock")
+        raise_exception("Product not found")
+    return [to_json_row(row) for row in rows]
+
+
+def adjust_stock_bulk(cursor, p_adjustments):
+    # SQLite transactions are serialized, so no row locks are needed; the summed
+    # deltas are applied by one UPDATE ... FROM, as on Postgres
+    rows = cursor.execute(
+        """
+        UPDATE Product
+        SET stock_count = COALESCE(stock_count, 0) + totals.delta
+        FROM (
+            SELECT json_extract(value, '$.product_id') AS target_id,
+                SUM(json_extract(value, '$.delta')) AS delta
+            FROM json_each(?)
+            GROUP BY target_id
+        ) AS totals
+        WHERE product_id = totals.target_id
+        AND COALESCE(stock_count, 0) + totals.delta >= 0
+        RETURNING product_id, stock_count
+        """,
+        (json.dumps(p_adjustments),),
+    ).fetchall()
+    updated = {row["product_id"]: row["stock_count"] for row in rows}
+    missing = {item["product_id"] for item in p_adjustments} - set(updated)
+    existing = {
+        row["product_id"]
+        for row in cursor.execute(
+            "SELECT product_id FROM Product "
+            "WHERE product_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(sorted(missing)),),
+        )
+    }
+    results = []
+    for index, item in enumerate(p_adjustments):
+        product_id = item["product_id"]
+        error = None
+        if product_id not in updated:
+            error = (
+                "Insufficient stock" if product_id in existing else "Product not found"
+            )
+        results.append(
+            {
+                "item_index": index,
+                "product_id": product_id,
+                "stock_count": updated.get(product_id),
+                "error": error,
+            }
+        )
+    return results
+
+
+def _reservation_error(cursor, p_reservation_id, expired_if_held=False):
+    row = cursor.execute(
+        "SELECT status FROM Reservation WHERE reservation_id = ?", (p_reservation_id,)
+    ).fetchone()
+    if row is None:
+        raise_exception("Reservation not found")
+    if expired_if_held and row["status"] == "held":
+        raise_exception("Reservation expired")
+    raise_exception(f"Reservation is {row['status']}")
+
+
+def reserve_stock(cursor, p_product_id, p_quantity, p_ttl_seconds):
+    deduct_stock(cursor, p_product_id, p_quantity)
+    rows = cursor.execute(
+        """
+        INSERT INTO Reservation (product_id, quantity, expires_at)
+        VALUES (?, ?, datetime('now', ?))
+        RETURNING *
+        """,
+        (p_product_id, p_quantity, f"{int(p_ttl_seconds):+d} seconds"),
+    ).fetchall()
+    return [to_json_row(row) for row in rows]
+
+
+def confirm_reservation(cursor, p_reservation_id):
+    rows = cursor.execute(
+        """
+        UPDATE Reservation
+        SET status = 'confirmed'
+        WHERE reservation_id = ? AND status = 'held' AND expires_at > datetime('now')
+        RETURNING *
+        """,
+        (p_reservation_id,),
+    ).fetchall()
+    if not rows:
+        _reservation_error(cursor, p_reservation_id, expired_if_held=True)
+    return [to_json_row(row) for row in rows]
+
+
+def release_reservation(cursor, p_reservation_id):
+    rows = cursor.execute(
+        """
+        UPDATE Reservation
+        SET status = 'released'
+        WHERE reservation_id = ? AND status = 'held'
+        RETURNING *
+        """,
+        (p_reservation_id,),
+    ).fetchall()
+    if not rows:
+        _reservation_error(cursor, p_reservation_id)
+    cursor.execute(
+        "UPDATE Product SET stock_count = COALESCE(stock_count, 0) + ? "
+        "WHERE product_id = ?",
+        (rows[0]["quantity"], rows[0]["product_id"]),
+    )
+    return [to_json_row(row) for row in rows]
+
+
+def expire_reservations(cursor, p_limit):
+    # SQLite transactions are serialized, so the claimed holds need no row locks
+    ids = [
+        row["reservation_id"]
+        for row in cursor.execute(
+            """
+            SELECT reservation_id FROM Reservation
+            WHERE status = 'held' AND expires_at <= datetime('now')
+            ORDER BY expires_at
+            LIMIT ?
+            """,
+            (p_limit,),
+        )
+    ]
+    if not ids:
+        return []
+    held = cursor.execute(
+        """
+        SELECT product_id, COUNT(*) AS holds, SUM(quantity) AS quantity
+        FROM Reservation
+        WHERE reservation_id IN (SELECT value FROM json_each(?))
+        GROUP BY product_id
+        ORDER BY product_id
+        """,
+        (json.dumps(ids),),
+    ).fetchall()
+    cursor.execute(
+        "UPDATE Reservation SET status = 'expired' "
+        "WHERE reservation_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(ids),),
+    )
+    for row in held:
+        row["stock_count"] = cursor.execute(
+            "UPDATE Product SET stock_count = COALESCE(stock_count, 0) + ? "
+            "WHERE product_id = ? RETURNING stock_count",
+            (row["quantity"], row["product_id"]),
+        ).fetchone()["stock_count"]
+    return held
+
+
+def checkout(
+    cursor,
+    p_customer_id,
+    p_product_id,
+    p_quantity,
+    p_wallet_mode="balance",
+    p_reservation_id=None,
+):
+    # The steps share the call's transaction, so an error in any of them rolls
+    # back the others, as on Postgres
+    if p_reservation_id is None:
+        product = deduct_stock(cursor, p_product_id, p_quantity)[0]
+    else:
+        reservation = confirm_reservation(cursor, p_reservation_id)[0]
+        if (reservation["product_id"], reservation["quantity"]) != (
+            p_product_id,
+            p_quantity,
+        ):
+            raise_exception("Reservation does not match the sale")
+        product = cursor.execute(
+            "SELECT price, stock_count FROM Product WHERE product_id = ?",
+            (p_product_id,),
+        ).fetchone()
+    total = round((product["price"] or 0) * p_quantity, 2)
+
+    row = cursor.execute(
+        "SELECT username FROM Customer WHERE customer_id = ?", (p_customer_id,)
+    ).fetchone()
+    if row is None:
+        raise_exception("Customer not found")
+    if p_wallet_mode == "ledger":
+        if total > 0:
+            balance = ledger_deduct_wallet(cursor, row["username"], total)[0][
+                "wallet_balance"
+            ]
+        else:
+            balance = wallet_ledger_balance(cursor, p_customer_id)
+    else:
+        balance = deduct_wallet(cursor, row["username"], total)
+
+    sale = cursor.execute(
+        """
+        INSERT INTO Sale (customer_id, product_id, sale_date, quantity, total_price)
+        VALUES (?, ?, date('now'), ?, ?)
+        RETURNING *
+        """,
+        (p_customer_id, p_product_id, p_quantity, total),
+    ).fetchone()
+    return [
+        to_json_row(
+            dict(sale, wallet_balance=balance, stock_count=product["stock_count"])
+        )
+    ]
+
+
+# Sort orders of list_products: the ORDER BY clause and the keyset condition
+_PRODUCT_SORTS = {
+    "product_id": ("product_id", "product_id > :after_id"),
+    "-product_id": ("product_id DESC", "product_id < :after_id"),
+    "price": ("price, product_id", "(price, product_id) > (:after_price, :after_id)"),
+    "-price": (
+        "price DESC, product_id DESC",
+        "(price, product_id) < (:after_price, :after_id)",
+    ),
+}
+
+
+def list_products(
+    cursor,
+    p_category=None,
+    p_min_price=None,
+    p_max_price=None,
+    p_in_stock=False,
+    p_sort="product_id",
+    p_after_price=None,
+    p_after_id=None,
+    p_limit=100,
+):
+    if p_sort not in _PRODUCT_SORTS:
+        raise_exception(f"Unknown sort order: {p_sort}")
+    ordering, keyset = _PRODUCT_SORTS[p_sort]
+    conditions = ["1"]
+    if p_category is not None:
+        conditions.append("category = :category")
+    if p_min_price is not None:
+        conditions.append("price >= :min_price")
+    if p_max_price is not None:
+        conditions.append("price <= :max_price")
+    if p_in_stock:
+        conditions.append("stock_count > 0")
+    if p_sort in ("price", "-price"):
+        conditions.append("price IS NOT NULL")
+    if p_after_id is not None:
+        conditions.append(keyset)
+    rows = cursor.execute(
+        f"SELECT * FROM Product WHERE {' AND '.join(conditions)} "
+        f"ORDER BY {ordering} LIMIT :limit",
+        {
+            "category": p_category,
+            "min_price": p_min_price,
+            "max_price": p_max_price,
+            "after_price": p_after_price,
+            "after_id": p_after_id,
+            "limit": p_limit,
+        },
+    ).fetchall()
+    return [to_json_row(row) for row in rows]
+
+
+def search_products(
+    cursor,
+    p_query,
+    p_after_rank=None,
+    p_after_id=None,
+    p_limit=20,
+    p_max_matches=2000,
+):
+    # The index ships with the inventory service only, the one caller of this
+    # function
+    from database_utils.inverted_index import InvertedIndex
+
+    # Without a search column, every call indexes the whole table; the inventory
+    # service keeps an in-process index to avoid this scan
+    index = InvertedIndex(PRODUCT_SEARCH_WEIGHTS)
+    products = {}
+    for row in cursor.execute("SELECT * FROM Product"):
+        product = to_json_row(row)
+        products[product["product_id"]] = product
+        index.add(product["product_id"], product)
+    after = (p_after_rank, p_after_id) if p_after_id is not None else None
+    matches, truncated = index.search(p_query, after, p_limit, p_max_matches)
+    return [
+        dict(products[product_id], rank=rank, truncated=truncated)
+        for rank, product_id in matches
+    ]
+
+
+def create_sale_partitions(cursor, p_months_ahead=3, p_from=None):
+    # The SQLite Sale table is not partitioned
+    return 0
+
+
+def _sales_range(p_from, p_to):
+    # The conditions of an inclusive day range with open ends
+    conditions = ["sale_date IS NOT NULL"]
+    if p_from is not None:
+        conditions.append("sale_date >= :from")
+    if p_to is not None:
+        conditions.append("sale_date <= :to")
+    return conditions
+
+
+def _sales_totals(cursor, key, conditions, params, ordering, limit=-1):
+    # Without the rollup tables, the statistics are aggregated from the sales
+    rows = cursor.execute(
+        f"""
+        SELECT {key}, SUM(COALESCE(quantity, 0)) AS units,
+            ROUND(SUM(COALESCE(total_price, 0)), 2) AS revenue, COUNT(*) AS sales
+        FROM Sale
+        WHERE {' AND '.join(conditions)}
+        GROUP BY {key}
+        ORDER BY {ordering}
+        LIMIT :limit
+        """,
+        dict(params, limit=limit),
+    ).fetchall()
+    return [to_json_row(row) for row in rows]
+
+
+def sales_by_day(cursor, p_from=None, p_to=None, p_product_id=None, p_customer_id=None):
+    if p_product_id is not None and p_customer_id is not None:
+        raise_exception("Sales are rolled up by product or by customer, not both")
+    conditions = _sales_range(p_from, p_to)
+    if p_product_id is not None:
+        conditions.append("product_id = :product_id")
+    if p_customer_id is not None:
+        conditions.append("customer_id = :customer_id")
+    params = {
+        "from": p_from,
+        "to": p_to,
+        "product_id": p_product_id,
+        "customer_id": p_customer_id,
+    }
+    return _sales_totals(cursor, "sale_date", conditions, params, "sale_date")
+
+
+def sales_by_product(cursor, p_from=None, p_to=None, p_limit=100):
+    conditions = _sales_range(p_from, p_to) + ["product_id IS NOT NULL"]
+    params = {"from": p_from, "to": p_to}
+    return _sales_totals(
+        cursor, "product_id", conditions, params, "revenue DESC, product_id", p_limit
+    )
+
+
+def sales_by_customer(cursor, p_from=None, p_to=None, p_limit=100):
+    conditions = _sales_range(p_from, p_to) + ["customer_id IS NOT NULL"]
+    params = {"from": p_from, "to": p_to}
+    return _sales_totals(
+        cursor, "customer_id", conditions, params, "revenue DESC, customer_id", p_limit
+    )
+
+
+FUNCTIONS = {
+    "charge_wallet": charge_wallet,
+    "deduct_wallet": deduct_wallet,
+    "wallet_ledger_balance": wallet_ledger_balance,
+    "wallet_ledger_balances": wallet_ledger_balances,
+    "ledger_charge_wallet": ledger_charge_wallet,
+    "ledger_deduct_wallet": ledger_deduct_wallet,
+    "compact_wallet_ledger": compact_wallet_ledger,
+    "apply_wallet_batch": apply_wallet_batch,
+    "ledger_apply_wallet_batch": ledger_apply_wallet_batch,
+    "deduct_stock": deduct_stock,
+    "adjust_stock_bulk": adjust_stock_bulk,
+    "reserve_stock": reserve_stock,
+    "confirm_reservation": confirm_reservation,
+    "release_reservation": release_reservation,
+    "expire_reservations": expire_reservations,
+    "checkout": checkout,
+    "create_sale_partitions": create_sale_partitions,
+    "list_products": list_products,
+    "search_products": search_products,
+    "sales_by_day": sales_by_day,
+    "sales_by_product": sales_by_product,
+    "sales_by_customer": sales_by_customer,
+}
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+
+class IdempotencyConflict(Exception):
+    """
+    Raised when a request cannot be run or replayed under its idempotency key.
+
+    Attributes:
+        status (int): The HTTP status of the refusal: 422 when the key was used for
+            a different request, 409 when the request holding it is still running,
+            503 when the store is full of requests still running.
+    """
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class _Entry:
+    # A key's request fingerprint, and its response once the request is done;
+    # slots keep an entry to a few dozen bytes besides the response
+    __slots__ = ("fingerprint", "status", "body", "expires_at", "done")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.status = None
+        self.body = None
+        self.expires_at = None
+        self.done = threading.Event()
+
+
+class IdempotencyStore:
+    """
+    A bounded in-process store of the responses of requests sent with an
+    ``Idempotency-Key``, replayed to the retries of the same request.
+
+    The first request with a key runs, and its response is kept for ``ttl``
+    seconds if it succeeded; a retry carrying the key gets that response back
+    without running again, so it never touches the database. A request that
+    failed is forgotten, since it left nothing to replay, and its retry runs
+    afresh. A retry sent while the first request still runs waits for it (up to
+    ``wait_timeout`` seconds) and then gets its response. A key sent with a
+    different request body is refused.
+
+    Keys and request bodies are stored as 16-byte BLAKE2 digests and responses as
+    their serialised JSON, so an entry costs about the size of its response. The
+    entries are kept in the order their requests finished, which is the order they
+    expire in, so expired entries are dropped from the front in O(1) each, and
+    the oldest finished entries make room when ``max_keys`` is reached. The key of
+    a request still running is never evicted, as its retry would then run the
+    request a second time; a new key is refused instead while every key kept is
+    still running.
+
+    The store is per process: a retry routed to another service process is not
+    recognised, so the processes behind a load balancer should be chosen by a
+    hash of the key for retries to be deduplicated.
+
+    Attributes:
+        ttl (float): The number of seconds a response is replayed.
+        max_keys (int): The maximum number of keys kept.
+        wait_timeout (float): The number of seconds a retry waits for the request
+            in progress with its key.
+        replays (int): The number of responses replayed.
+        conflicts (int): The number of requests refused.
+        evictions (int): The number of finished keys forgotten to respect max_keys.
+    """
+
+    def __init__(
+        self, ttl=None, max_keys=None, wait_timeout=None, clock=time.monotonic
+    ):
+        if ttl is None:
+            ttl = Config.IDEMPOTENCY.TTL
+        if max_keys is None:
+            max_keys = Config.IDEMPOTENCY.MAX_KEYS
+        if wait_timeout is None:
+            wait_timeout = Config.IDEMPOTENCY.WAIT_TIMEOUT
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.wait_timeout = wait_timeout
+        self.replays = 0
+        self.conflicts = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key, request, handler):
+        """
+        Run a request once per idempotency key, replaying its response to retries.
+
+        Args:
+            key (str): The idempotency key sent by the client.
+            request: The JSON body of the request; a retry must send the same one.
+            handler (callable): Called with no arguments to run the request; returns
+                the response body (a JSON-serialisable value) and its HTTP status.
+                Only responses with a 2xx status are kept.
+
+        Returns:
+            tuple: The JSON-serialised response body, its status, and whether it is
+            a replay.
+
+        Raises:
+            IdempotencyConflict: If the key was used with a different request, if
+                the request holding it is still running after the wait timeout, or
+                if the store is full of requests still running.
+            Exception: Whatever the handler raises; the key is released.
+        """
+        digest = self._digest(key)
+        fingerprint = self._digest(json.dumps(request, sort_keys=True, default=str))
+        deadline = self._clock() + self.wait_timeout
+        while True:
+            with self._lock:
+                self._expire()
+                entry = self._entries.get(digest)
+                if entry is None:
+                    if not self._evict(self.max_keys - 1):
+                        self.conflicts += 1
+                        raise IdempotencyConflict(
+                            "Too many requests with an Idempotency-Key are in "
+                            "progress",
+                            503,
+                        )
+                    entry = _Entry(fingerprint)
+                    self._entries[digest] = entry
+                    break
+                if entry.fingerprint != fingerprint:
+                    self.conflicts += 1
+                    raise IdempotencyConflict(
+                        "Idempotency-Key was already used for a different request", 422
+                    )
+                if entry.done.is_set():
+                    self.replays += 1
+                    return entry.body, entry.status, True
+            # The first request with the key is still running
+            if not entry.done.wait(max(deadline - self._clock(), 0)):
+                with self._lock:
+                    self.conflicts += 1
+                raise IdempotencyConflict(
+                    "A request with this Idempotency-Key is in progress", 409
+                )
+
+        try:
+            body, status = handler()
+            body = json.dumps(body, sort_keys=True)
+        except BaseException:
+            self._release(digest, entry)
+            raise
+        if not 200 <= status < 300:
+            self._release(digest, entry)
+            return body, status, False
+
+        with self._lock:
+            entry.body = body
+            entry.status = status
+            entry.expires_at = self._clock() + self.ttl
+            if self._entries.get(digest) is entry:
+                self._entries.move_to_end(digest)
+            entry.done.set()
+        return body, status, False
+
+    def stats(self):
+        """
+        Return the size and the counters of the store.
+
+        Returns:
+            dict: The number of keys kept, the bounds of the store and the number
+            of replays, refusals and evictions.
+        """
+        with self._lock:
+            return {
+                "keys": len(self._entries),
+                "max_keys": self.max_keys,
+                "ttl": self.ttl,
+                "replays": self.replays,
+                "conflicts": self.conflicts,
+                "evictions": self.evictions,
+            }
+
+    @staticmethod
+    def _digest(value):
+        return hashlib.blake2b(value.encode(), digest_size=16).digest()
+
+    def _release(self, digest, entry):
+        # Forget a key whose request failed, and wake the retries waiting on it,
+        # which then run the request themselves
+        with self._lock:
+            if self._entries.get(digest) is entry:
+                del self._entries[digest]
+            entry.done.set()
+
+    def _expire(self):
+        # Finished entries are in expiry order; the requests still running are
+        # moved behind them when they finish
+        now = self._clock()
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if not entry.done.is_set() or entry.expires_at > now:
+                return
+            self._entries.popitem(last=False)
+
+    def _evict(self, limit):
+        # Forget the oldest finished entries until at most limit keys are kept,
+        # skipping the requests still running; returns whether that was possible
+        excess = len(self._entries) - limit
+        if excess <= 0:
+            return True
+        finished = []
+        for digest, entry in self._entries.items():
+            if entry.done.is_set():
+                finished.append(digest)
+                if len(finished) == excess:
+                    break
+        for digest in finished:
+            del self._entries[digest]
+        self.evictions += len(finished)
+        return len(finished) == excess
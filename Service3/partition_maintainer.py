@@ -0,0 +1,112 @@
+import logging
+import threading
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SalePartitionMaintainer:
+    """
+    Keeps the monthly partitions of the Sale table created ahead of the sales.
+
+    On Postgres, Sale is range-partitioned by month on ``sale_date``. A sale dated
+    in a month without a partition still lands in the default partition, so no
+    sale is ever refused, but the reports over its month then read the default
+    partition too. The maintainer calls ``create_sale_partitions`` in a background
+    thread every ``interval`` seconds, which creates the partitions of the current
+    month and of the ``months_ahead`` months after it, and moves the sales kept in
+    the default partition into the partitions of their months. Creating a
+    partition takes a short lock on the table, so it is done in advance rather
+    than when the first sale of a month is written. Applying the schema creates
+    the same partitions, so the first check only runs one interval after the
+    maintainer starts.
+
+    The function serialises its callers with an advisory lock, so several service
+    processes can maintain the partitions side by side. It runs with the rights of
+    the owner of Sale, which attaching a partition needs, and only the service
+    role may call it, so the service must connect with the service role key.
+
+    Attributes:
+        supabase: The database client.
+        months_ahead (int): The number of months whose partitions are created ahead.
+        interval (float): Seconds between two checks; 0 disables the background
+            check.
+        runs (int): The number of checks run.
+        created (int): The number of partitions created by the checks.
+    """
+
+    def __init__(self, supabase, months_ahead=None, interval=None):
+        if months_ahead is None:
+            months_ahead = Config.SALE_PARTITIONS.MONTHS_AHEAD
+        if interval is None:
+            interval = Config.SALE_PARTITIONS.INTERVAL
+        self.supabase = supabase
+        self.months_ahead = months_ahead
+        self.interval = interval
+        self.runs = 0
+        self.created = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._maintainer = None
+
+    def maintain(self):
+        """
+        Create the missing partitions and return how many were created.
+        """
+        try:
+            response = self.supabase.rpc(
+                "create_sale_partitions", {"p_months_ahead": self.months_ahead}
+            ).execute()
+        except Exception as e:
+            raise ValueError(f"Error creating sale partitions: {str(e)}")
+        created = response.data or 0
+        with self._lock:
+            self.runs += 1
+            self.created += created
+        if created:
+            logger.info("Created %s sale partitions", created)
+        return created
+
+    def start(self):
+        """
+        Start checking the partitions in a background thread, unless already started.
+        """
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._maintainer is not None:
+                return
+            self._maintainer = threading.Thread(target=self._run, daemon=True)
+        self._maintainer.start()
+
+    def stop(self):
+        """
+        Stop the background checks.
+        """
+        self._stop.set()
+        if self._maintainer is not None:
+            self._maintainer.join()
+
+    def stats(self):
+        """
+        Return the counters of the maintainer.
+
+        Returns:
+            dict: The number of checks run, the number of partitions they created,
+            and the months ahead and interval of the checks.
+        """
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "created_partitions": self.created,
+                "months_ahead": self.months_ahead,
+                "interval": self.interval,
+            }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.maintain()
+            except Exception:
+                logger.exception("Creating the sale partitions failed")
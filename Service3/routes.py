@@ -1,10 +1,24 @@
-from datetime import datetime
+import json
+from datetime import date, datetime
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+from idempotency import IdempotencyConflict, IdempotencyStore
 from marshmallow import ValidationError
 from sale_service import SaleService
 
-from serializers.sales_serializer import sale_list_schema, sale_schema
+from serializers.checkout_serializer import checkout_schema
+from serializers.sales_serializer import SaleSchema, sale_list_schema, sale_schema
+from serializers.stats_serializer import sales_stats_query_schema
+
+# Page sizes accepted by the sales listing
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Number of sales accepted by one batch submission
+MAX_SALE_BATCH = 10000
+
+# Longest Idempotency-Key accepted on sale submission
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
 
 # Create a blueprint for sales routes
 sales_bp = Blueprint("sales", __name__)
@@ -12,22 +26,161 @@ sales_bp = Blueprint("sales", __name__)
 # Initialize sale service
 sale_service = SaleService()
 
+# Responses of the sale submissions sent with an Idempotency-Key
+idempotency_store = IdempotencyStore()
+
 
 @sales_bp.route("/submit", methods=["POST"])
 def submit_sale():
     """
     Submit a new sale
+
+    A request sent with an ``Idempotency-Key`` header is run once per key: a retry
+    with the same key and body gets the first response back, with an
+    ``Idempotent-Replayed: true`` header, and records no second sale.
+    """
+    key = request.headers.get("Idempotency-Key")
+    if key is None:
+        body, status = _submit_sale(request.json)
+        return jsonify(body), status
+    if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        return (
+            jsonify(
+                {
+                    "error": "Idempotency-Key must be 1 to "
+                    f"{MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+                }
+            ),
+            400,
+        )
+    data = request.json
+    try:
+        body, status, replayed = idempotency_store.run(
+            key, data, lambda: _submit_sale(data)
+        )
+    except IdempotencyConflict as err:
+        return jsonify({"error": str(err)}), err.status
+    response = Response(body, status=status, mimetype="application/json")
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+@sales_bp.route("/batch", methods=["POST"])
+def submit_sales():
+    """
+    Submit a batch of sales, reporting each sale's result
+    """
+    rows = request.json
+    if isinstance(rows, dict):
+        rows = rows.get("sales")
+    if not isinstance(rows, list) or len(rows) > MAX_SALE_BATCH:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid Request",
+                    "message": f"Expected a list of at most {MAX_SALE_BATCH} sales",
+                }
+            ),
+            400,
+        )
+
+    # Validate the whole batch, submitting only the sales that passed
+    try:
+        loaded = [vars(sale) for sale in sale_list_schema.load(rows)]
+        validation_errors = {}
+    except ValidationError as err:
+        loaded = err.valid_data
+        validation_errors = err.messages
+    valid = [index for index in range(len(rows)) if index not in validation_errors]
+    sales = [
+        {
+            "customer_id": loaded[index]["customer_id"],
+            "product_id": loaded[index]["product_id"],
+            "sale_date": loaded[index]["sale_date"].isoformat(),
+            "quantity": loaded[index]["quantity"],
+            "total_price": loaded[index]["total_price"],
+        }
+        for index in valid
+    ]
+
+    result = sale_service.submit_sales(sales)
+    results = [
+        {"index": index, "error": "Validation Error", "messages": messages}
+        for index, messages in validation_errors.items()
+    ]
+    for position, index in enumerate(valid):
+        if position in result["errors"]:
+            results.append({"index": index, "error": result["errors"][position]})
+        else:
+            sale = dict(result["sales"][position])
+            sale["sale_date"] = datetime.strptime(sale["sale_date"], "%Y-%m-%d")
+            results.append({"index": index, "sale": sale_schema.dump(sale)})
+    results.sort(key=lambda result: result["index"])
+
+    failed = len(results) - len(result["sales"])
+    return (
+        jsonify(
+            {
+                "submitted": len(result["sales"]),
+                "failed": failed,
+                "results": results,
+            }
+        ),
+        200,
+    )
+
+
+@sales_bp.route("/idempotency/stats", methods=["GET"])
+def get_idempotency_stats():
+    """
+    Retrieve the size and counters of the idempotency key store
+    """
+    return jsonify({"idempotency": idempotency_store.stats()}), 200
+
+
+def _submit_sale(data):
+    """
+    Validate and record a sale, returning the response body and status
     """
     try:
         # Validate request data using the schema
-        sale_schema.load(request.json)
-        sale = sale_service.submit_sale(request.json)
+        sale_schema.load(data)
+        sale = sale_service.submit_sale(data)
+        sale["sale_date"] = datetime.strptime(sale["sale_date"], "%Y-%m-%d")
+        return {
+            "message": "Sale submitted successfully",
+            "sale": sale_schema.dump(sale),
+        }, 201
+    except ValidationError as err:
+        return {"error": "Validation Error", "messages": err.messages}, 400
+    except ValueError as err:
+        return {"error": str(err)}, 400
+
+
+@sales_bp.route("/checkout", methods=["POST"])
+def checkout():
+    """
+    Buy a product: debit the wallet, take the stock and record the sale in one call
+    """
+    try:
+        data = checkout_schema.load(request.get_json(silent=True) or {})
+        sale = sale_service.checkout(
+            data["customer_id"],
+            data["product_id"],
+            data["quantity"],
+            data["reservation_id"],
+        )
+        wallet_balance = sale.pop("wallet_balance")
+        stock_count = sale.pop("stock_count")
         sale["sale_date"] = datetime.strptime(sale["sale_date"], "%Y-%m-%d")
         return (
             jsonify(
                 {
-                    "message": "Sale submitted successfully",
+                    "message": "Checkout completed successfully",
                     "sale": sale_schema.dump(sale),
+                    "wallet_balance": wallet_balance,
+                    "stock_count": stock_count,
                 }
             ),
             201,
@@ -93,18 +246,157 @@ def get_customer_sales(customer_id):
     """
     try:
         sales = sale_service.get_customer_sales(customer_id)
-        return jsonify({"sales": sale_list_schema.dump(sales)})
+        return jsonify({"sales": _dump_sales(sales, sale_list_schema)})
     except ValueError as err:
         return jsonify({"error": str(err)}), 400
 
 
+def _dump_sales(sales, schema):
+    """
+    Serialize sales read from the database, whose dates come back as ISO strings
+    """
+    for sale in sales:
+        if isinstance(sale.get("sale_date"), str):
+            sale["sale_date"] = date.fromisoformat(sale["sale_date"])
+    return schema.dump(sales)
+
+
+def _parse_listing_args(args):
+    """
+    Validate the pagination, filter, projection and streaming query parameters
+    """
+    after = args.get("after", type=int)
+    limit = args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if after is not None and after < 0:
+        raise ValueError("after must be a non-negative sale ID")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    # A filter that does not parse is refused rather than ignored
+    filters = {}
+    for name, key, parse, expected in (
+        ("product_id", "product_id", int, "an integer"),
+        ("customer_id", "customer_id", int, "an integer"),
+        ("date_from", "from", date.fromisoformat, "a date in the YYYY-MM-DD format"),
+        ("date_to", "to", date.fromisoformat, "a date in the YYYY-MM-DD format"),
+    ):
+        try:
+            filters[name] = parse(args[key]) if args.get(key) else None
+        except ValueError:
+            raise ValueError(f"{key} must be {expected}")
+    if filters["date_from"] and filters["date_to"]:
+        if filters["date_to"] < filters["date_from"]:
+            raise ValueError("The range cannot end before it starts")
+
+    fields = None
+    if args.get("fields"):
+        fields = [name.strip() for name in args["fields"].split(",") if name.strip()]
+        unknown = set(fields) - set(sale_service.columns)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    stream = args.get("stream", "").lower() in ("1", "true") or (
+        request.accept_mimetypes.best == "application/x-ndjson"
+    )
+    return after, limit, filters, fields, stream
+
+
 @sales_bp.route("/goods", methods=["GET"])
 def get_available_goods():
     """
-    Retrieve all available goods
+    Retrieve sales one page at a time, or stream all of them as NDJSON
+
+    Query parameters:
+        after: Only return sales whose ID is greater (the previous page's next_after).
+        limit: The page size, at most MAX_PAGE_SIZE.
+        from, to: Only return sales made within this range of days (inclusive).
+        product_id, customer_id: Only return the sales of this product or customer.
+        fields: A comma-separated list of the columns to return.
+        stream: When true (or with ``Accept: application/x-ndjson``), stream every
+            matching sale after ``after`` as newline-delimited JSON, reading
+            ``limit`` sales from the database at a time.
+    """
+    try:
+        after, limit, filters, fields, stream = _parse_listing_args(request.args)
+    except ValueError as err:
+        return jsonify({"error": "Invalid Query", "message": str(err)}), 400
+
+    schema = SaleSchema(many=True, only=fields)
+    if stream:
+
+        def generate():
+            # One chunk per database page keeps memory bounded by the page size
+            pages = sale_service.iter_sale_pages(after, fields, limit, **filters)
+            for page in pages:
+                yield "".join(
+                    json.dumps(row) + "\n" for row in _dump_sales(page, schema)
+                )
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    try:
+        goods = sale_service.get_sales_page(after, limit, fields, **filters)
+        next_after = goods[-1]["sale_id"] if len(goods) == limit else None
+        return jsonify({"goods": _dump_sales(goods, schema), "next_after": next_after})
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+
+@sales_bp.route("/stats", methods=["GET"])
+def get_sales_stats():
+    """
+    Retrieve the units, revenue and number of sales of each day of a range, with
+    their totals, for every sale or for one product or customer
     """
     try:
-        goods = sale_service.get_available_goods()
-        return jsonify({"goods": sale_list_schema.dump(goods)})
+        query = sales_stats_query_schema.load(request.args)
+        days = sale_service.get_sales_by_day(
+            query["date_from"],
+            query["date_to"],
+            query["product_id"],
+            query["customer_id"],
+        )
+        totals = {
+            "units": sum(day["units"] for day in days),
+            "revenue": round(sum(day["revenue"] for day in days), 2),
+            "sales": sum(day["sales"] for day in days),
+        }
+        return jsonify({"totals": totals, "days": days})
+    except ValidationError as err:
+        return jsonify({"error": "Validation Error", "messages": err.messages}), 400
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+
+@sales_bp.route("/stats/products", methods=["GET"])
+def get_sales_stats_by_product():
+    """
+    Retrieve the products with the highest revenue over a range of days
+    """
+    try:
+        query = sales_stats_query_schema.load(request.args)
+        products = sale_service.get_sales_by_product(
+            query["date_from"], query["date_to"], query["limit"]
+        )
+        return jsonify({"products": products})
+    except ValidationError as err:
+        return jsonify({"error": "Validation Error", "messages": err.messages}), 400
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+
+@sales_bp.route("/stats/customers", methods=["GET"])
+def get_sales_stats_by_customer():
+    """
+    Retrieve the customers who spent the most over a range of days
+    """
+    try:
+        query = sales_stats_query_schema.load(request.args)
+        customers = sale_service.get_sales_by_customer(
+            query["date_from"], query["date_to"], query["limit"]
+        )
+        return jsonify({"customers": customers})
+    except ValidationError as err:
+        return jsonify({"error": "Validation Error", "messages": err.messages}), 400
     except ValueError as err:
         return jsonify({"error": str(err)}), 400
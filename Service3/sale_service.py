@@ -1,4 +1,7 @@
+from config import Config
 from database_utils.connect import get_supabase_client
+from database_utils.pagination import iter_pages
+from partition_maintainer import SalePartitionMaintainer
 
 
 class SaleService:
@@ -15,6 +18,25 @@ class SaleService:
                 dict: The submitted sale data if successful, None otherwise.
             Raises:
                 ValueError: If there is an error submitting the sale.
+        submit_sales(sales):
+            Submits a batch of validated sales with multi-row inserts.
+            Args:
+                sales (list): The data of the sales to be submitted.
+            Returns:
+                dict: The submitted sales and the error message of each rejected sale, by its
+                position in the batch.
+        checkout(customer_id, product_id, quantity, reservation_id=None):
+            Debits the customer's wallet, takes the product's stock and records the sale in one transaction.
+            Args:
+                customer_id (int): The ID of the buying customer.
+                product_id (int): The ID of the product bought.
+                quantity (int): The number of units bought.
+                reservation_id (int): A stock hold covering the units, confirmed instead of taking the stock. Optional.
+            Returns:
+                dict: The sale, with the customer's new wallet balance and the product's stock count.
+            Raises:
+                ValueError: If the customer or product is not found, the stock or the wallet balance is
+                insufficient, the reservation cannot be confirmed, or there is an error checking out.
         update_sale(sale_id, update_data):
             Updates an existing sale in the sales table.
             Args:
@@ -46,6 +68,45 @@ class SaleService:
                 list: A list of all available goods data.
             Raises:
                 ValueError: If there is an error retrieving the available goods.
+        get_sales_page(after=None, limit=100, columns=None, date_from=None, date_to=None, product_id=None, customer_id=None):
+            Retrieves one page of sales ordered by sale ID, matching the filters.
+            Args:
+                after (int): Only return sales with a greater ID (the last ID of the previous page). Optional.
+                limit (int): The maximum number of sales returned.
+                columns (list): The columns to return; the sale ID is always returned. Optional.
+                date_from (date): Only return sales made on or after this day. Optional.
+                date_to (date): Only return sales made on or before this day. Optional.
+                product_id (int): Only return the sales of this product. Optional.
+                customer_id (int): Only return the purchases of this customer. Optional.
+            Returns:
+                list: The sales of the page.
+            Raises:
+                ValueError: If there is an error retrieving the sales.
+        iter_sale_pages(after=None, columns=None, page_size=1000, **filters):
+            Yields every page of sales after the given ID that matches the filters, reading them lazily.
+        get_sales_by_day(date_from=None, date_to=None, product_id=None, customer_id=None):
+            Retrieves the units, revenue and number of sales of each day of a range.
+            Args:
+                date_from (date): The first day of the range. Optional.
+                date_to (date): The last day of the range. Optional.
+                product_id (int): Only count the sales of this product. Optional.
+                customer_id (int): Only count the purchases of this customer. Optional.
+            Returns:
+                list: The totals of each day with sales, oldest first.
+            Raises:
+                ValueError: If there is an error retrieving the statistics.
+        get_sales_by_product(date_from=None, date_to=None, limit=100):
+            Retrieves the products with the highest revenue over a range of days.
+            Returns:
+                list: The units, revenue and number of sales of each product, best first.
+            Raises:
+                ValueError: If there is an error retrieving the statistics.
+        get_sales_by_customer(date_from=None, date_to=None, limit=100):
+            Retrieves the customers who spent the most over a range of days.
+            Returns:
+                list: The units, revenue and number of sales of each customer, best first.
+            Raises:
+                ValueError: If there is an error retrieving the statistics.
     """
 
     def __init__(self):
@@ -58,20 +119,102 @@ class SaleService:
         Attributes:
             supabase: The Supabase client instance.
             sales_table (str): The name of the sales table in the database.
+            columns (tuple): The columns of a sale that can be listed.
+            insert_chunk_size (int): The maximum number of sales inserted per statement
+                by a batch submission.
+            partitions (SalePartitionMaintainer): Creates the monthly partitions of the
+                sales table ahead of the sales, from the first sale written.
+            wallet_mode (str): How the customer service keeps wallets, "balance" or
+                "ledger" (Config.WALLET.MODE); checkout debits the wallet the same way.
         """
         self.supabase = get_supabase_client()
         self.sales_table = "sale"
+        self.columns = (
+            "sale_id",
+            "customer_id",
+            "product_id",
+            "sale_date",
+            "quantity",
+            "total_price",
+        )
+        self.insert_chunk_size = 1000
+        self.wallet_mode = Config.WALLET.MODE
+        self.partitions = SalePartitionMaintainer(self.supabase)
 
     def submit_sale(self, sale_data):
         """
         Submit a new sale
         """
+        self.partitions.start()
         try:
             response = self.supabase.table(self.sales_table).insert(sale_data).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             raise ValueError(f"Error submitting sale: {str(e)}")
 
+    def submit_sales(self, sales):
+        """
+        Submit a batch of validated sales
+
+        The sales are inserted with one multi-row insert per ``insert_chunk_size``
+        sales, each returning the rows it created. If the database rejects a chunk,
+        as it does when one of its sales names a missing customer or product, the
+        chunk's sales are inserted one by one so only the failing sales are rejected.
+
+        Returns a dict with the submitted sales and the error message of each
+        rejected sale, both by the sale's position in the batch.
+        """
+        if sales:
+            self.partitions.start()
+        submitted = {}
+        errors = {}
+        for offset in range(0, len(sales), self.insert_chunk_size):
+            chunk = sales[offset : offset + self.insert_chunk_size]
+            try:
+                response = self.supabase.table(self.sales_table).insert(chunk).execute()
+                submitted.update(enumerate(response.data, offset))
+            except Exception:
+                for index, sale in enumerate(chunk, offset):
+                    try:
+                        response = (
+                            self.supabase.table(self.sales_table).insert(sale).execute()
+                        )
+                        submitted[index] = response.data[0]
+                    except Exception as e:
+                        if getattr(e, "code", None) == "23503":
+                            errors[index] = "Customer or product not found"
+                        else:
+                            errors[index] = f"Error submitting sale: {str(e)}"
+        return {"sales": submitted, "errors": errors}
+
+    def checkout(self, customer_id, product_id, quantity, reservation_id=None):
+        """
+        Debit the customer's wallet, take the product's stock and record the sale in
+        one database transaction
+
+        The ``checkout`` database function runs the same steps as the wallet and
+        inventory services (``deduct_stock`` or ``confirm_reservation``, then
+        ``deduct_wallet`` or ``ledger_deduct_wallet``) and inserts the sale, priced
+        from the product; an error in any step rolls back the others. A client
+        buying a product makes one call instead of three, and no failure can leave
+        the stock taken without the payment, or the payment without the sale.
+        """
+        self.partitions.start()
+        try:
+            response = self.supabase.rpc(
+                "checkout",
+                {
+                    "p_customer_id": customer_id,
+                    "p_product_id": product_id,
+                    "p_quantity": quantity,
+                    "p_wallet_mode": self.wallet_mode,
+                    "p_reservation_id": reservation_id,
+                },
+            ).execute()
+            return response.data[0]
+        except Exception as e:
+            raise ValueError(f"Error checking out: {str(e)}")
+
     def update_sale(self, sale_id, update_data):
         """
         Update an existing sale
@@ -126,3 +269,91 @@ class SaleService:
             return response.data
         except Exception as e:
             raise ValueError(f"Error retrieving available goods: {str(e)}")
+
+    def get_sales_page(
+        self,
+        after=None,
+        limit=100,
+        columns=None,
+        date_from=None,
+        date_to=None,
+        product_id=None,
+        customer_id=None,
+    ):
+        """
+        Retrieve one page of sales ordered by sale_id, after the given ID
+        """
+        columns = list(columns or self.columns)
+        if "sale_id" not in columns:
+            columns.insert(0, "sale_id")
+        try:
+            query = self.supabase.table(self.sales_table).select(",".join(columns))
+            if after is not None:
+                query = query.gt("sale_id", after)
+            if date_from is not None:
+                query = query.gte("sale_date", date_from.isoformat())
+            if date_to is not None:
+                query = query.lte("sale_date", date_to.isoformat())
+            if product_id is not None:
+                query = query.eq("product_id", product_id)
+            if customer_id is not None:
+                query = query.eq("customer_id", customer_id)
+            response = query.order("sale_id").limit(limit).execute()
+            return response.data
+        except Exception as e:
+            raise ValueError(f"Error retrieving sales: {str(e)}")
+
+    def iter_sale_pages(self, after=None, columns=None, page_size=1000, **filters):
+        """
+        Yield every page of sales after the given ID, reading them lazily
+        """
+        return iter_pages(
+            lambda after, limit: self.get_sales_page(after, limit, columns, **filters),
+            lambda sale: sale["sale_id"],
+            after,
+            page_size,
+        )
+
+    def get_sales_by_day(
+        self, date_from=None, date_to=None, product_id=None, customer_id=None
+    ):
+        """
+        Retrieve the daily sales totals of a range of days
+
+        The totals are read from the daily rollup tables, which triggers on the
+        sales table keep up to date as sales are submitted, updated and deleted, so
+        the cost of a report grows with the days it covers, not with the sales.
+        """
+        return self._sales_stats(
+            "sales_by_day",
+            date_from,
+            date_to,
+            p_product_id=product_id,
+            p_customer_id=customer_id,
+        )
+
+    def get_sales_by_product(self, date_from=None, date_to=None, limit=100):
+        """
+        Retrieve the products with the highest revenue over a range of days
+        """
+        return self._sales_stats("sales_by_product", date_from, date_to, p_limit=limit)
+
+    def get_sales_by_customer(self, date_from=None, date_to=None, limit=100):
+        """
+        Retrieve the customers who spent the most over a range of days
+        """
+        return self._sales_stats("sales_by_customer", date_from, date_to, p_limit=limit)
+
+    def _sales_stats(self, function, date_from, date_to, **params):
+        try:
+            response = self.supabase.rpc(
+                function,
+                {
+                    "p_from": date_from.isoformat() if date_from else None,
+                    "p_to": date_to.isoformat() if date_to else None,
+                    **params,
+                },
+            ).execute()
+            return response.data
+        except Exception as e:
+            raise ValueError(f"Error retrieving sales statistics: {str(e)}")
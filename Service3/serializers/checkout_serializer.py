@@ -0,0 +1,27 @@
+from marshmallow import Schema, fields, validate
+
+
+class CheckoutSchema(Schema):
+    """
+    CheckoutSchema is a Marshmallow schema for deserializing checkout requests.
+
+    Attributes:
+        customer_id (int): The unique identifier for the buying customer. This field is required.
+        product_id (int): The unique identifier for the product bought. This field is required.
+        quantity (int): The number of units bought. This field is required and must be at least 1.
+        reservation_id (int): A stock reservation holding the units, confirmed by the checkout. This field is optional.
+    """
+
+    customer_id = fields.Int(required=True, strict=True)
+    product_id = fields.Int(required=True, strict=True)
+    quantity = fields.Int(
+        required=True,
+        strict=True,
+        validate=validate.Range(min=1),
+        error_messages={"validator_failed": "Quantity must be at least 1"},
+    )
+    reservation_id = fields.Int(strict=True, load_default=None)
+
+
+# Create an instance for easy access
+checkout_schema = CheckoutSchema()
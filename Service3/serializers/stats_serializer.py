@@ -0,0 +1,41 @@
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
+
+
+class SalesStatsQuerySchema(Schema):
+    """
+    SalesStatsQuerySchema is a Marshmallow schema for deserializing the query string of the sales statistics.
+
+    Attributes:
+        date_from (date): The first day of the range, read from "from". This field is optional.
+        date_to (date): The last day of the range, read from "to". This field is optional and cannot be before "from".
+        product_id (int): The product whose sales are totalled by day. This field is optional.
+        customer_id (int): The customer whose purchases are totalled by day. This field is optional.
+        limit (int): The maximum number of products or customers ranked. Defaults to 100, at most 1000.
+    """
+
+    date_from = fields.Date(data_key="from", load_default=None)
+    date_to = fields.Date(data_key="to", load_default=None)
+    product_id = fields.Int(load_default=None)
+    customer_id = fields.Int(load_default=None)
+    limit = fields.Int(load_default=100, validate=validate.Range(min=1, max=1000))
+
+    @validates_schema
+    def validate_range(self, data, **kwargs):
+        """
+        Check that the range does not end before it starts, and that the days are
+        not totalled for a product and a customer at once.
+        """
+        if (
+            data["date_from"]
+            and data["date_to"]
+            and data["date_to"] < data["date_from"]
+        ):
+            raise ValidationError("The range cannot end before it starts", "to")
+        if data["product_id"] is not None and data["customer_id"] is not None:
+            raise ValidationError(
+                "Filter by product or by customer, not both", "customer_id"
+            )
+
+
+# Create an instance for easy access
+sales_stats_query_schema = SalesStatsQuerySchema()
@@ -0,0 +1,32 @@
+from database_utils.pagination import iter_pages
+
+
+def test_iter_pages():
+    """
+    Test reading a keyset-paginated listing page by page.
+
+    Asserts:
+        - Each page is read after the key of the last row of the previous page.
+        - Reading stops at the first short page, and an empty page is not yielded.
+    """
+    rows = [{"id": index} for index in range(1, 8)]
+    calls = []
+
+    def fetch_page(after, limit):
+        calls.append((after, limit))
+        return [row for row in rows if after is None or row["id"] > after][:limit]
+
+    pages = list(iter_pages(fetch_page, lambda row: row["id"], page_size=3))
+
+    assert [[row["id"] for row in page] for page in pages] == [
+        [1, 2, 3],
+        [4, 5, 6],
+        [7],
+    ]
+    assert calls == [(None, 3), (3, 3), (6, 3)]
+
+    calls.clear()
+    assert list(
+        iter_pages(fetch_page, lambda row: row["id"], after=6, page_size=1)
+    ) == [[{"id": 7}]]
+    assert calls == [(6, 1), (7, 1)]
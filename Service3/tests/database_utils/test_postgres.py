@@ -0,0 +1,122 @@
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+from postgrest.exceptions import APIError
+
+from database_utils.postgres import PostgresClient
+
+
+@pytest.fixture
+def cursor():
+    """
+    Fixture providing the mock cursor used by the pooled connection.
+
+    Returns:
+        MagicMock: The mock cursor.
+    """
+    return MagicMock()
+
+
+@pytest.fixture
+def pool(cursor):
+    """
+    Fixture replacing the psycopg2 ThreadedConnectionPool with a mock.
+
+    Args:
+        cursor (MagicMock): The cursor returned by the pooled connection.
+
+    Yields:
+        MagicMock: The mock pool instance.
+    """
+    with patch("database_utils.postgres.ThreadedConnectionPool") as pool_class:
+        connection = pool_class.return_value.getconn.return_value
+        connection.closed = 0
+        connection.cursor.return_value.__enter__.return_value = cursor
+        yield pool_class.return_value
+
+
+@pytest.fixture
+def client(pool):
+    """
+    Fixture providing a PostgresClient backed by the mock pool.
+
+    Returns:
+        PostgresClient: The client under test.
+    """
+    return PostgresClient({"host": "localhost"}, max_connections=2)
+
+
+def test_execute_returns_json_rows(client, pool, cursor):
+    """
+    Test that a table query runs one statement and returns PostgREST-shaped rows.
+
+    Asserts:
+        - The compiled SQL and parameters are executed.
+        - Decimal values are returned as floats.
+        - The connection is returned to the pool.
+    """
+    from decimal import Decimal
+
+    cursor.fetchall.return_value = [{"product_id": 1, "price": Decimal("2.50")}]
+
+    response = client.table("product").select("*").eq("product_id", 1).execute()
+
+    cursor.execute.assert_called_once_with(
+        'SELECT * FROM "product" WHERE "product_id" = %s', [1]
+    )
+    assert response.data == [{"product_id": 1, "price": 2.5}]
+    pool.putconn.assert_called_once()
+
+
+def test_rpc_returns_scalar_for_scalar_functions(client, cursor):
+    """
+    Test that calling a function returning a scalar gives the value, like PostgREST.
+
+    Asserts:
+        The response data is the scalar returned by the function.
+    """
+    cursor.fetchall.side_effect = [
+        [{"returns_set": False, "type_kind": "b"}],
+        [{"charge_wallet": 150}],
+    ]
+
+    response = client.rpc(
+        "charge_wallet", {"p_username": "testuser", "p_amount": 50}
+    ).execute()
+
+    assert response.data == 150
+
+
+def test_rpc_returns_rows_for_set_returning_functions(client, cursor):
+    """
+    Test that calling a set-returning function gives the list of rows.
+
+    Asserts:
+        The response data is the list of rows returned by the function.
+    """
+    cursor.fetchall.side_effect = [
+        [{"returns_set": True, "type_kind": "c"}],
+        [{"product_id": 1, "stock_count": 9}],
+    ]
+
+    response = client.rpc(
+        "deduct_stock", {"p_product_id": 1, "p_quantity": 1}
+    ).execute()
+
+    assert response.data == [{"product_id": 1, "stock_count": 9}]
+
+
+def test_database_errors_are_raised_as_api_errors(client, pool, cursor):
+    """
+    Test that psycopg2 errors surface as PostgREST APIError instances.
+
+    Asserts:
+        - An APIError is raised.
+        - The connection is still returned to the pool.
+    """
+    cursor.execute.side_effect = psycopg2.Error("boom")
+
+    with pytest.raises(APIError):
+        client.table("customer").select("*").execute()
+    pool.putconn.assert_called_once()
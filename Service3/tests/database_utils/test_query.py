@@ -0,0 +1,135 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from database_utils.query import QueryBuilder, RpcBuilder, to_json_row
+
+
+@pytest.fixture
+def client():
+    """
+    Fixture providing a mock backend client using the psycopg2 parameter placeholder.
+
+    Returns:
+        MagicMock: A mock client with a `placeholder` attribute.
+    """
+    client = MagicMock()
+    client.placeholder = "%s"
+    return client
+
+
+def test_select_with_filters_order_and_limit(client):
+    """
+    Test that a select query compiles to one parameterised statement.
+
+    Asserts:
+        - The projection, filters, ordering and limit are rendered in the SQL text.
+        - The values are bound as parameters in order.
+    """
+    sql, params = (
+        QueryBuilder(client, "customer")
+        .select("customer_id, username")
+        .gt("customer_id", 10)
+        .order("customer_id")
+        .limit(50)
+        .to_sql()
+    )
+
+    assert sql == (
+        'SELECT "customer_id", "username" FROM "customer" '
+        'WHERE "customer_id" > %s ORDER BY "customer_id" ASC LIMIT %s'
+    )
+    assert params == [10, 50]
+
+
+def test_insert_uses_default_for_missing_columns(client):
+    """
+    Test that a multi-row insert fills the columns missing from a row with DEFAULT.
+
+    Asserts:
+        - Every row gets a VALUES tuple and the missing column is DEFAULT.
+        - Only the provided values are bound as parameters.
+    """
+    sql, params = (
+        QueryBuilder(client, "product")
+        .insert([{"name": "A", "price": 1.0}, {"name": "B"}])
+        .to_sql()
+    )
+
+    assert sql == (
+        'INSERT INTO "product" ("name", "price") VALUES (%s, %s), (%s, DEFAULT) '
+        "RETURNING *"
+    )
+    assert params == ["A", 1.0, "B"]
+
+
+def test_update_and_upsert(client):
+    """
+    Test the update and upsert statements.
+
+    Asserts:
+        - An update binds the new values before the filter values.
+        - An upsert updates every non-key column on conflict.
+    """
+    sql, params = (
+        QueryBuilder(client, "product")
+        .update({"stock_count": 5})
+        .eq("product_id", 1)
+        .to_sql()
+    )
+    assert sql == (
+        'UPDATE "product" SET "stock_count" = %s WHERE "product_id" = %s RETURNING *'
+    )
+    assert params == [5, 1]
+
+    sql, _ = (
+        QueryBuilder(client, "product")
+        .upsert({"sku": "A-1", "price": 2.0}, on_conflict="sku")
+        .to_sql()
+    )
+    assert sql.endswith(
+        'ON CONFLICT ("sku") DO UPDATE SET "price" = excluded."price" RETURNING *'
+    )
+
+
+def test_rejects_invalid_identifiers(client):
+    """
+    Test that identifiers which are not plain SQL names are rejected.
+
+    Asserts:
+        A ValueError is raised for a column name containing SQL.
+    """
+    with pytest.raises(ValueError, match="Invalid identifier"):
+        QueryBuilder(client, "customer").select("username; DROP TABLE").to_sql()
+
+
+def test_rpc_uses_named_arguments(client):
+    """
+    Test that a function call binds its parameters as named arguments.
+
+    Asserts:
+        The SQL calls the function with named arguments and binds the values in order.
+    """
+    sql, params = RpcBuilder(
+        client, "deduct_stock", {"p_product_id": 1, "p_quantity": 2}
+    ).to_sql()
+
+    assert sql == (
+        'SELECT * FROM "deduct_stock"("p_product_id" => %s, "p_quantity" => %s)'
+    )
+    assert params == [1, 2]
+
+
+def test_to_json_row_matches_postgrest_values():
+    """
+    Test that database values are converted to the values PostgREST returns.
+
+    Asserts:
+        Decimals become floats and dates become ISO 8601 strings.
+    """
+    from datetime import date
+    from decimal import Decimal
+
+    row = to_json_row({"price": Decimal("9.99"), "sale_date": date(2024, 1, 2)})
+
+    assert row == {"price": 9.99, "sale_date": "2024-01-02"}
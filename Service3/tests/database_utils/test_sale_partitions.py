@@ -0,0 +1,102 @@
+import psycopg2
+import pytest
+
+from config import Config
+from database_utils.schema import POSTGRES_SCHEMA
+
+
+def _statement(fragment):
+    return next(statement for statement in POSTGRES_SCHEMA if fragment in statement)
+
+
+@pytest.fixture
+def cursor():
+    """
+    Fixture providing a cursor on the configured Postgres database, in a
+    transaction rolled back after the test.
+
+    The test is skipped when the database cannot be reached or its Sale table is
+    not partitioned yet.
+
+    Yields:
+        cursor: The psycopg2 cursor.
+    """
+    try:
+        conn = psycopg2.connect(
+            host=Config.DATABASE.HOST,
+            port=Config.DATABASE.PORT,
+            dbname=Config.DATABASE.NAME,
+            user=Config.DATABASE.USER,
+            password=Config.DATABASE.PASSWORD,
+            connect_timeout=2,
+        )
+    except psycopg2.Error:
+        pytest.skip("No Postgres database to apply the schema to")
+    cursor = conn.cursor()
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('sale')")
+    if cursor.fetchone() != ("p",):
+        conn.close()
+        pytest.skip("The Postgres schema has not been applied")
+    yield cursor
+    conn.rollback()
+    conn.close()
+
+
+def test_create_sale_partitions_runs_as_owner():
+    """
+    Test that the partition function runs with its owner's rights and is not
+    callable by every role.
+
+    Asserts:
+        - The function is SECURITY DEFINER with a fixed search_path.
+        - Its EXECUTE right is taken back from PUBLIC and granted to the service
+          role only.
+    """
+    function = _statement("CREATE OR REPLACE FUNCTION create_sale_partitions(")
+    assert "SECURITY DEFINER SET search_path = public" in function
+    grants = _statement("REVOKE EXECUTE ON FUNCTION create_sale_partitions")
+    assert "FROM PUBLIC" in grants
+    assert "TO service_role" in grants
+
+
+def test_create_sale_partitions_as_api_role(cursor):
+    """
+    Test that a role that does not own Sale creates the partitions once granted
+    the function, as the sales service does through PostgREST.
+
+    Asserts:
+        - A role without the EXECUTE grant is refused.
+        - A role with it creates the missing partitions, owned by the owner of Sale.
+    """
+    cursor.execute("CREATE ROLE sale_partition_caller NOLOGIN")
+    cursor.execute("GRANT USAGE ON SCHEMA public TO sale_partition_caller")
+
+    cursor.execute("SAVEPOINT refused")
+    cursor.execute("SET ROLE sale_partition_caller")
+    with pytest.raises(psycopg2.errors.InsufficientPrivilege):
+        cursor.execute("SELECT create_sale_partitions()")
+    cursor.execute("ROLLBACK TO SAVEPOINT refused")
+    cursor.execute("RESET ROLE")
+
+    cursor.execute(
+        "GRANT EXECUTE ON FUNCTION create_sale_partitions(INT, DATE) "
+        "TO sale_partition_caller"
+    )
+    cursor.execute("SET ROLE sale_partition_caller")
+    cursor.execute("SELECT create_sale_partitions(p_months_ahead => 120)")
+    assert cursor.fetchone()[0] > 0
+    cursor.execute("RESET ROLE")
+
+    cursor.execute(
+        "SELECT pg_get_userbyid(relowner) FROM pg_class WHERE oid = 'sale'::regclass"
+    )
+    owner = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        SELECT pg_get_userbyid(child.relowner)
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'sale'::regclass
+        """
+    )
+    assert {row[0] for row in cursor.fetchall()} == {owner}
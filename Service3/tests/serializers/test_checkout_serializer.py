@@ -0,0 +1,38 @@
+import pytest
+from marshmallow import ValidationError
+
+from serializers.checkout_serializer import CheckoutSchema
+
+
+def test_valid_checkout():
+    """
+    Test that a valid checkout request is deserialized.
+
+    Asserts:
+        - The request is loaded as a dictionary, without a reservation by default.
+    """
+    assert CheckoutSchema().load(
+        {"customer_id": 1, "product_id": 2, "quantity": 3}
+    ) == {
+        "customer_id": 1,
+        "product_id": 2,
+        "quantity": 3,
+        "reservation_id": None,
+    }
+    data = CheckoutSchema().load(
+        {"customer_id": 1, "product_id": 2, "quantity": 1, "reservation_id": 7}
+    )
+    assert data["reservation_id"] == 7
+
+
+def test_invalid_checkout():
+    """
+    Test that invalid checkout requests are rejected.
+
+    Asserts:
+        - A zero quantity and a missing customer ID are rejected.
+    """
+    with pytest.raises(ValidationError) as excinfo:
+        CheckoutSchema().load({"product_id": 2, "quantity": 0})
+    assert "quantity" in excinfo.value.messages
+    assert "customer_id" in excinfo.value.messages
@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+from marshmallow import ValidationError
+
+from serializers.stats_serializer import SalesStatsQuerySchema
+
+
+def test_valid_stats_query():
+    """
+    Test that a sales statistics query string is deserialized.
+
+    Asserts:
+        - The range is read as dates from "from" and "to", with a default limit.
+    """
+    assert SalesStatsQuerySchema().load(
+        {"from": "2024-01-01", "to": "2024-01-31", "product_id": "3"}
+    ) == {
+        "date_from": date(2024, 1, 1),
+        "date_to": date(2024, 1, 31),
+        "product_id": 3,
+        "customer_id": None,
+        "limit": 100,
+    }
+
+
+def test_invalid_stats_query():
+    """
+    Test that invalid sales statistics queries are rejected.
+
+    Asserts:
+        - A range ending before it starts, a limit above 1000 and a filter on both
+          a product and a customer are rejected.
+    """
+    with pytest.raises(ValidationError) as excinfo:
+        SalesStatsQuerySchema().load({"from": "2024-02-01", "to": "2024-01-01"})
+    assert "to" in excinfo.value.messages
+    with pytest.raises(ValidationError) as excinfo:
+        SalesStatsQuerySchema().load({"limit": "5000"})
+    assert "limit" in excinfo.value.messages
+    with pytest.raises(ValidationError) as excinfo:
+        SalesStatsQuerySchema().load({"product_id": "1", "customer_id": "2"})
+    assert "customer_id" in excinfo.value.messages
@@ -0,0 +1,212 @@
+import json
+import threading
+
+import pytest
+
+from idempotency import IdempotencyConflict, IdempotencyStore
+
+
+class FakeClock:
+    """
+    A clock the tests move by hand.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """
+    Fixture providing a hand-moved clock.
+
+    Returns:
+        FakeClock: The clock, starting at 0.
+    """
+    return FakeClock()
+
+
+def test_replay(clock):
+    """
+    Test that a retry with the same key and body replays the first response.
+
+    Asserts:
+        - The handler runs once, and the retry gets its response as a replay.
+        - The same key with a different body is refused with a 422.
+        - Another key runs the handler again.
+    """
+    store = IdempotencyStore(ttl=60, max_keys=10, wait_timeout=1, clock=clock)
+    calls = []
+
+    def handler():
+        calls.append(1)
+        return {"sale_id": len(calls)}, 201
+
+    request = {"customer_id": 1, "product_id": 2, "quantity": 3}
+    assert store.run("key-1", request, handler) == ('{"sale_id": 1}', 201, False)
+    assert store.run("key-1", dict(reversed(list(request.items()))), handler) == (
+        '{"sale_id": 1}',
+        201,
+        True,
+    )
+    assert len(calls) == 1
+
+    with pytest.raises(IdempotencyConflict) as err:
+        store.run("key-1", {**request, "quantity": 4}, handler)
+    assert err.value.status == 422
+
+    assert store.run("key-2", request, handler)[0] == '{"sale_id": 2}'
+    stats = store.stats()
+    assert stats["keys"] == 2
+    assert stats["replays"] == 1
+    assert stats["conflicts"] == 1
+
+
+def test_ttl_and_max_keys(clock):
+    """
+    Test that responses are forgotten once expired, and the oldest ones when the
+    store is full.
+
+    Asserts:
+        - An expired key runs the handler again.
+        - The oldest key is evicted beyond max_keys, and the newer ones replay.
+    """
+    store = IdempotencyStore(ttl=60, max_keys=2, wait_timeout=1, clock=clock)
+    calls = []
+
+    def handler():
+        calls.append(1)
+        return {"call": len(calls)}, 201
+
+    store.run("a", {}, handler)
+    clock.now = 59
+    assert store.run("a", {}, handler)[2] is True
+    clock.now = 61
+    assert store.run("a", {}, handler) == ('{"call": 2}', 201, False)
+
+    store.run("b", {}, handler)
+    store.run("c", {}, handler)
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["keys"] == 2
+    assert store.run("b", {}, handler)[2] is True
+    assert store.run("c", {}, handler)[2] is True
+    assert store.run("a", {}, handler) == ('{"call": 5}', 201, False)
+
+
+def test_running_keys_are_not_evicted(clock):
+    """
+    Test that the key of a request still running is not evicted to make room.
+
+    Asserts:
+        - A new key is refused with a 503 while every key kept is still running.
+        - The retry of the running request waits for it instead of running again.
+        - Once the request finished, its key is evicted for a new one.
+    """
+    store = IdempotencyStore(ttl=60, max_keys=1, wait_timeout=5, clock=clock)
+    started = threading.Event()
+    finish = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("slow")
+        started.set()
+        finish.wait(5)
+        return {"sale_id": 1}, 201
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(store.run("a", {}, slow)))
+    first.start()
+    started.wait(5)
+    with pytest.raises(IdempotencyConflict) as err:
+        store.run("b", {}, lambda: ({"sale_id": 2}, 201))
+    assert err.value.status == 503
+
+    retry = threading.Thread(target=lambda: results.append(store.run("a", {}, slow)))
+    retry.start()
+    finish.set()
+    first.join()
+    retry.join()
+    assert calls == ["slow"]
+    assert sorted(replayed for _, _, replayed in results) == [False, True]
+
+    assert store.run("b", {}, lambda: ({"sale_id": 2}, 201))[2] is False
+    assert store.stats()["evictions"] == 1
+
+
+def test_failure_releases_key(clock):
+    """
+    Test that a failed request is not replayed.
+
+    Asserts:
+        - A non-2xx response is returned but not kept.
+        - An exception from the handler propagates and releases the key.
+        - The retry runs the handler and its success is kept.
+    """
+    store = IdempotencyStore(ttl=60, max_keys=10, wait_timeout=1, clock=clock)
+    assert store.run("key", {}, lambda: ({"error": "out of stock"}, 400)) == (
+        '{"error": "out of stock"}',
+        400,
+        False,
+    )
+
+    def failing():
+        raise RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError):
+        store.run("key", {}, failing)
+    assert store.stats()["keys"] == 0
+
+    assert store.run("key", {}, lambda: ({"ok": True}, 201))[2] is False
+    assert store.run("key", {}, failing)[2] is True
+
+
+def test_concurrent_retry_waits():
+    """
+    Test that a retry sent while the first request runs waits for its response.
+
+    Asserts:
+        - The retry gets the first response as a replay, and the handler runs once.
+        - A retry that waits longer than the wait timeout is refused with a 409.
+    """
+    store = IdempotencyStore(ttl=60, max_keys=10, wait_timeout=5)
+    started = threading.Event()
+    finish = threading.Event()
+    calls = []
+
+    def handler():
+        calls.append(1)
+        started.set()
+        finish.wait(5)
+        return {"sale_id": 1}, 201
+
+    results = []
+    first = threading.Thread(
+        target=lambda: results.append(store.run("key", {}, handler))
+    )
+    first.start()
+    started.wait(5)
+    retry = threading.Thread(
+        target=lambda: results.append(store.run("key", {}, handler))
+    )
+    retry.start()
+    finish.set()
+    first.join()
+    retry.join()
+    assert len(calls) == 1
+    assert sorted(replayed for _, _, replayed in results) == [False, True]
+    assert {json.loads(body)["sale_id"] for body, _, _ in results} == {1}
+
+    impatient = IdempotencyStore(ttl=60, max_keys=10, wait_timeout=0.01)
+    started.clear()
+    finish.clear()
+    first = threading.Thread(target=lambda: impatient.run("key", {}, handler))
+    first.start()
+    started.wait(5)
+    with pytest.raises(IdempotencyConflict) as err:
+        impatient.run("key", {}, handler)
+    assert err.value.status == 409
+    finish.set()
+    first.join()
@@ -0,0 +1,62 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from partition_maintainer import SalePartitionMaintainer
+
+
+@pytest.fixture
+def supabase():
+    """
+    Fixture providing a mocked database client whose partition function creates
+    two partitions.
+
+    Returns:
+        MagicMock: The database client.
+    """
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.return_value = MagicMock(data=2)
+    return supabase
+
+
+def test_maintain(supabase):
+    """
+    Test that a check creates the partitions of the months ahead.
+
+    Asserts:
+        - The partition function is called with the months ahead, and the
+          partitions it created are counted.
+        - A failing call raises a ValueError with the database error.
+    """
+    maintainer = SalePartitionMaintainer(supabase, months_ahead=6, interval=0)
+    assert maintainer.maintain() == 2
+    supabase.rpc.assert_called_once_with(
+        "create_sale_partitions", {"p_months_ahead": 6}
+    )
+    assert maintainer.stats()["created_partitions"] == 2
+
+    supabase.rpc.return_value.execute.side_effect = Exception("lock timeout")
+    with pytest.raises(ValueError, match="Error creating sale partitions"):
+        maintainer.maintain()
+
+
+def test_background_checks(supabase):
+    """
+    Test that the partitions are checked in the background once started.
+
+    Asserts:
+        - Nothing is checked before the maintainer starts, and it checks every
+          interval once started, until stopped.
+    """
+    maintainer = SalePartitionMaintainer(supabase, interval=0.01)
+    assert maintainer.stats()["runs"] == 0
+    maintainer.start()
+    try:
+        for _ in range(500):
+            if maintainer.stats()["runs"] >= 2:
+                break
+            time.sleep(0.01)
+    finally:
+        maintainer.stop()
+    assert maintainer.stats()["runs"] >= 2
@@ -1,3 +1,4 @@
+from datetime import date
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -151,3 +152,172 @@ def test_get_available_goods(sale_service):
     result = sale_service.get_available_goods()
 
     assert result == goods_data
+
+
+def test_checkout(sale_service):
+    """
+    Test that checkout runs as one call of the checkout database function.
+    Args:
+        sale_service (SaleService): An instance of the SaleService class.
+    Asserts:
+        - The customer, product, quantity, wallet mode and reservation are passed
+          to the function, and the sale it records is returned.
+        - A failing checkout raises a ValueError with the database error.
+    """
+    sale = {
+        "sale_id": 1,
+        "customer_id": 2,
+        "product_id": 3,
+        "sale_date": "2024-01-01",
+        "quantity": 2,
+        "total_price": 25.0,
+        "wallet_balance": 75.0,
+        "stock_count": 8,
+    }
+    sale_service.wallet_mode = "ledger"
+    sale_service.supabase.rpc.return_value.execute.return_value = MagicMock(data=[sale])
+
+    assert sale_service.checkout(2, 3, 2) == sale
+    sale_service.supabase.rpc.assert_called_once_with(
+        "checkout",
+        {
+            "p_customer_id": 2,
+            "p_product_id": 3,
+            "p_quantity": 2,
+            "p_wallet_mode": "ledger",
+            "p_reservation_id": None,
+        },
+    )
+
+    sale_service.supabase.rpc.return_value.execute.side_effect = Exception(
+        "Insufficient funds"
+    )
+    with pytest.raises(ValueError, match="Error checking out: Insufficient funds"):
+        sale_service.checkout(2, 3, 2)
+
+
+def test_get_sales_stats(sale_service):
+    """
+    Test that the sales statistics are read from the rollup database functions.
+    Args:
+        sale_service (SaleService): An instance of the SaleService class.
+    Asserts:
+        - The range is passed as ISO dates, with the filters or the limit.
+        - A failing call raises a ValueError with the database error.
+    """
+    days = [{"sale_date": "2024-01-01", "units": 3, "revenue": 30.0, "sales": 2}]
+    sale_service.supabase.rpc.return_value.execute.return_value = MagicMock(data=days)
+
+    assert sale_service.get_sales_by_day(date(2024, 1, 1), product_id=3) == days
+    sale_service.supabase.rpc.assert_called_with(
+        "sales_by_day",
+        {
+            "p_from": "2024-01-01",
+            "p_to": None,
+            "p_product_id": 3,
+            "p_customer_id": None,
+        },
+    )
+    sale_service.get_sales_by_customer(date_to=date(2024, 1, 31), limit=5)
+    sale_service.supabase.rpc.assert_called_with(
+        "sales_by_customer", {"p_from": None, "p_to": "2024-01-31", "p_limit": 5}
+    )
+
+    sale_service.supabase.rpc.return_value.execute.side_effect = Exception("timeout")
+    with pytest.raises(ValueError, match="Error retrieving sales statistics: timeout"):
+        sale_service.get_sales_by_product()
+
+
+def test_get_sales_page(sale_service):
+    """
+    Test reading one page of sales after a cursor, with filters.
+    Args:
+        sale_service (SaleService): An instance of the SaleService class.
+    Asserts:
+        - The sale ID is always selected with the requested columns.
+        - Sales are filtered after the cursor and by the range and product,
+          ordered by ID and limited to the page size.
+    """
+    query = sale_service.supabase.table().select()
+    page = query.gt().gte().lte().eq().order().limit().execute.return_value
+    page.data = [{"sale_id": 11, "quantity": 2}]
+
+    result = sale_service.get_sales_page(
+        10,
+        50,
+        ["quantity"],
+        date_from=date(2024, 1, 1),
+        date_to=date(2024, 1, 31),
+        product_id=3,
+    )
+
+    assert result == [{"sale_id": 11, "quantity": 2}]
+    sale_service.supabase.table().select.assert_called_with("sale_id,quantity")
+    query.gt.assert_called_with("sale_id", 10)
+    query.gt().gte.assert_called_with("sale_date", "2024-01-01")
+    query.gt().gte().lte.assert_called_with("sale_date", "2024-01-31")
+    query.gt().gte().lte().eq.assert_called_with("product_id", 3)
+    query.gt().gte().lte().eq().order.assert_called_with("sale_id")
+    query.gt().gte().lte().eq().order().limit.assert_called_with(50)
+
+
+def test_iter_sale_pages(sale_service):
+    """
+    Test that the sale pages are read one at a time until a short page.
+    Args:
+        sale_service (SaleService): An instance of the SaleService class.
+    Asserts:
+        - Each page starts after the last sale of the previous page, with the
+          same filters.
+    """
+    pages = [[{"sale_id": 1}, {"sale_id": 2}], [{"sale_id": 3}]]
+    with patch.object(sale_service, "get_sales_page", side_effect=pages) as mock_page:
+        assert list(sale_service.iter_sale_pages(page_size=2, customer_id=7)) == pages
+
+    assert [call.args[0] for call in mock_page.call_args_list] == [None, 2]
+    assert mock_page.call_args.kwargs == {"customer_id": 7}
+
+
+def test_submit_sales(sale_service):
+    """
+    Test that a batch of sales is inserted in chunks, falling back to one insert
+    per sale for a rejected chunk.
+    Args:
+        sale_service (SaleService): An instance of the SaleService class.
+    Asserts:
+        - Each chunk is inserted with one multi-row insert.
+        - A rejected chunk is retried sale by sale, and only its failing sale is
+          reported, with a missing customer or product named as such.
+    """
+    sales = [{"customer_id": index, "product_id": 1} for index in range(5)]
+    fk_error = Exception("violates foreign key constraint")
+    fk_error.code = "23503"
+    insert = sale_service.supabase.table.return_value.insert
+    insert.return_value.execute.side_effect = [
+        MagicMock(data=[{"sale_id": 1}, {"sale_id": 2}]),
+        fk_error,
+        MagicMock(data=[{"sale_id": 3}]),
+        fk_error,
+        MagicMock(data=[{"sale_id": 4}]),
+    ]
+    sale_service.insert_chunk_size = 2
+    sale_service.partitions = MagicMock()
+
+    result = sale_service.submit_sales(sales)
+
+    assert result == {
+        "sales": {
+            0: {"sale_id": 1},
+            1: {"sale_id": 2},
+            2: {"sale_id": 3},
+            4: {"sale_id": 4},
+        },
+        "errors": {3: "Customer or product not found"},
+    }
+    assert [call.args[0] for call in insert.call_args_list] == [
+        sales[0:2],
+        sales[2:4],
+        sales[2],
+        sales[3],
+        sales[4:5],
+    ]
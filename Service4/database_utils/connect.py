@@ -1,6 +1,13 @@
-from supabase import create_client
+import os
+import threading
+
+from httpx import Limits, Timeout
+from postgrest.utils import SyncClient
+from supabase import ClientOptions, create_client
 
 from config import Config
+from database_utils.postgres import PostgresClient
+from database_utils.sqlite import SQLiteClient
 
 
 class DatabaseConnection:
@@ -8,33 +15,107 @@ class DatabaseConnection:
     A singleton class to manage the database connection using Supabase.
 
     This class ensures that only one instance of the database connection is created
-    and reused throughout the application.
+    and reused throughout the application. Config.DATABASE.BACKEND selects the client:
+    "supabase" (the default) talks to PostgREST over HTTP, "postgres" runs SQL
+    directly over a psycopg2 connection pool, and "sqlite" runs the schema in an
+    in-process SQLite database for local benchmarks. The instance is safe to share between the
+    threads of a multi-threaded WSGI server: it is created under a lock, and its
+    PostgREST HTTP session is a single thread-safe connection pool. After a fork (for
+    example in a pre-forking WSGI server) the child process builds its own instance
+    instead of sharing the parent's sockets.
 
     Attributes:
         _instance (SupabaseClient): The single instance of the database connection.
+        _lock (threading.Lock): Guards the creation of the instance.
 
     Methods:
         get_instance():
             Returns the single instance of the database connection. If the instance
-            does not exist, it creates one using the Supabase URL and KEY from the
-            configuration.
+            does not exist, it creates one for the configured backend: a Supabase
+            client using the URL and KEY from the configuration, with the HTTP pool
+            configured from Config.SUPABASE, or a PostgresClient or SQLiteClient using
+            Config.DATABASE.
+
+        reset():
+            Drops the current instance so the next call to get_instance() creates a new one.
     """
+
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            url = Config.SUPABASE.URL
-            key = Config.SUPABASE.KEY
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls._create_client()
 
-            if not url or not key:
-                raise ValueError(
-                    "Supabase URL or KEY not found in environment variables"
-                )
+        return cls._instance
 
-            cls._instance = create_client(url, key)
+    @classmethod
+    def reset(cls):
+        cls._instance = None
+        cls._lock = threading.Lock()
 
-        return cls._instance
+    @staticmethod
+    def _create_client():
+        if Config.DATABASE.BACKEND == "postgres":
+            return DatabaseConnection._create_postgres_client()
+        if Config.DATABASE.BACKEND == "sqlite":
+            return SQLiteClient(Config.DATABASE.SQLITE_PATH)
+        return DatabaseConnection._create_supabase_client()
+
+    @staticmethod
+    def _create_postgres_client():
+        return PostgresClient(
+            {
+                "host": Config.DATABASE.HOST,
+                "port": Config.DATABASE.PORT,
+                "database": Config.DATABASE.NAME,
+                "user": Config.DATABASE.USER,
+                "password": Config.DATABASE.PASSWORD,
+            },
+            min_connections=Config.DATABASE.POOL_MIN_CONNECTIONS,
+            max_connections=Config.DATABASE.POOL_MAX_CONNECTIONS,
+        )
+
+    @staticmethod
+    def _create_supabase_client():
+        url = Config.SUPABASE.URL
+        key = Config.SUPABASE.KEY
+
+        if not url or not key:
+            raise ValueError("Supabase URL or KEY not found in environment variables")
+
+        timeout = Timeout(
+            Config.SUPABASE.TIMEOUT, connect=Config.SUPABASE.CONNECT_TIMEOUT
+        )
+        client = create_client(
+            url, key, options=ClientOptions(postgrest_client_timeout=timeout)
+        )
+
+        # Replace the default PostgREST session with one using the configured pool
+        postgrest = client.postgrest
+        default_session = postgrest.session
+        postgrest.session = SyncClient(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=timeout,
+            limits=Limits(
+                max_connections=Config.SUPABASE.POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.SUPABASE.POOL_MAX_KEEPALIVE,
+                keepalive_expiry=Config.SUPABASE.KEEPALIVE_EXPIRY,
+            ),
+            http2=Config.SUPABASE.HTTP2,
+            follow_redirects=True,
+        )
+        default_session.close()
+
+        return client
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DatabaseConnection.reset)
 
 
 def get_supabase_client():
@@ -0,0 +1,152 @@
+import os
+import threading
+
+import psycopg2
+from postgrest.exceptions import APIError
+from psycopg2.extras import Json, RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+
+from database_utils.query import QueryResponse, SQLClient, to_json_row
+
+_FUNCTION_KIND_SQL = """
+    SELECT p.proretset AS returns_set, t.typtype AS type_kind
+    FROM pg_proc p JOIN pg_type t ON t.oid = p.prorettype
+    WHERE p.proname = %s
+    LIMIT 1
+"""
+
+
+def _is_json_argument(value):
+    return isinstance(value, dict) or (
+        isinstance(value, list) and any(isinstance(item, dict) for item in value)
+    )
+
+
+class PostgresClient(SQLClient):
+    """
+    A database client running parameterised SQL over a psycopg2 ThreadedConnectionPool.
+
+    The client exposes the same ``table(...)`` and ``rpc(...)`` query-builder API as the
+    Supabase client, so the services can use it as a drop-in replacement that skips the
+    PostgREST HTTP hop. Rows are returned with the same JSON-compatible values PostgREST
+    returns, and database errors are raised as PostgREST ``APIError`` instances.
+
+    The pool is opened lazily on the first query and re-opened in a forked child
+    process, so the client can be created at import time and shared by the threads of
+    a multi-threaded WSGI server. Callers block while all pooled connections are in use.
+
+    Attributes:
+        placeholder (str): The parameter placeholder of the psycopg2 driver.
+        connection_params (dict): The keyword arguments passed to psycopg2.connect.
+        min_connections (int): The number of connections opened with the pool.
+        max_connections (int): The maximum number of connections in the pool.
+    """
+
+    placeholder = "%s"
+
+    def __init__(self, connection_params, min_connections=1, max_connections=20):
+        self.connection_params = connection_params
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._function_kinds = {}
+
+    def execute(self, query):
+        """
+        Run a table query.
+
+        Args:
+            query (QueryBuilder): The query to run.
+
+        Returns:
+            QueryResponse: The rows selected, inserted, updated or deleted.
+        """
+        sql, params = query.to_sql()
+        return QueryResponse([to_json_row(row) for row in self._run(sql, params)])
+
+    def call(self, rpc):
+        """
+        Call a database function, shaping the result the way PostgREST does.
+
+        Set-returning functions return a list of rows, functions returning a row type
+        return that row, and functions returning a scalar return the value.
+
+        Args:
+            rpc (RpcBuilder): The function call to run.
+
+        Returns:
+            QueryResponse: The result of the function.
+        """
+        sql, params = rpc.to_sql()
+        # JSON arguments (objects, or arrays of objects) are sent as json/jsonb
+        params = [
+            Json(value) if _is_json_argument(value) else value for value in params
+        ]
+        returns_set, type_kind = self._function_kind(rpc.function)
+        rows = [to_json_row(row) for row in self._run(sql, params)]
+        if returns_set:
+            return QueryResponse(rows)
+        if type_kind == "c":
+            return QueryResponse(rows[0] if rows else None)
+        if not rows or type_kind == "p":
+            return QueryResponse(None)
+        return QueryResponse(next(iter(rows[0].values())))
+
+    def close(self):
+        """
+        Close every connection of the pool.
+        """
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+
+    def _function_kind(self, function):
+        if function not in self._function_kinds:
+            rows = self._run(_FUNCTION_KIND_SQL, [function])
+            if not rows:
+                raise APIError(
+                    {"message": f"Function {function} not found", "code": "42883"}
+                )
+            self._function_kinds[function] = (
+                rows[0]["returns_set"],
+                rows[0]["type_kind"],
+            )
+        return self._function_kinds[function]
+
+    def _get_pool(self):
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    # Connections inherited from a parent process are left untouched
+                    self._pool = ThreadedConnectionPool(
+                        self.min_connections,
+                        self.max_connections,
+                        **self.connection_params,
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    def _run(self, sql, params):
+        with self._slots:
+            pool = self._get_pool()
+            connection = pool.getconn()
+            try:
+                with connection:
+                    with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                        cursor.execute(sql, params)
+                        return cursor.fetchall() if cursor.description else []
+            except psycopg2.Error as e:
+                raise APIError(
+                    {
+                        "message": e.diag.message_primary or str(e),
+                        "code": e.pgcode,
+                        "hint": e.diag.message_hint,
+                        "details": e.diag.message_detail,
+                    }
+                )
+            finally:
+                pool.putconn(connection, close=bool(connection.closed))
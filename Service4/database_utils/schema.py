@@ -0,0 +1,1205 @@
+"""
+Schema of the e-commerce database.
+
+TABLES holds the table definitions and FUNCTIONS the Postgres functions called
+through the PostgREST RPC endpoint. The table definitions are written in the
+Postgres dialect; the SQLite backend translates them when it creates its schema
+and implements FUNCTIONS in Python (see ``database_utils.sqlite_functions``).
+MIGRATIONS holds the Postgres statements that bring a database created by an
+earlier version of TABLES up to date; a fresh SQLite schema does not need them.
+POSTGRES_SCHEMA holds the Postgres-only columns, indexes, partitions, rollup
+tables and triggers that SQLite has no equivalent for; the SQLite functions work
+without them.
+"""
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS Customer (
+        customer_id SERIAL PRIMARY KEY,
+        full_name VARCHAR(100) NOT NULL,
+        username VARCHAR(50) NOT NULL,
+        password VARCHAR(255) NOT NULL,  -- Password length can be more than 50 characters to meet validation requirements
+        age INT NOT NULL CHECK (age >= 18 AND age <= 120),
+        address VARCHAR(200),
+        gender VARCHAR(10) CHECK (gender IN ('Male', 'Female', 'Other')),
+        wallet_balance DECIMAL(10, 2) DEFAULT 0.00,
+        wallet_ledger_position BIGINT NOT NULL DEFAULT 0,  -- Last ledger entry compacted into wallet_balance
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # Usernames are unique; registration relies on this as the final check
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS customer_username_key ON Customer (username);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Product (
+        product_id SERIAL PRIMARY KEY,
+        name VARCHAR(255),
+        category VARCHAR(255),
+        price DECIMAL(10, 2),
+        description TEXT,
+        stock_count INT,
+        sku VARCHAR(64) UNIQUE  -- Supplier stock keeping unit, the key of catalogue ingests
+    );
+    """,
+    # Product listing: category filter with price order, price order, and stock
+    # thresholds; product_id breaks price ties for keyset pagination
+    """
+    CREATE INDEX IF NOT EXISTS product_category_price
+    ON Product (category, price, product_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS product_price ON Product (price, product_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS product_stock_count ON Product (stock_count);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Review (
+        review_id SERIAL PRIMARY KEY,
+        customer_id INT REFERENCES Customer(customer_id),
+        product_id INT REFERENCES Product(product_id),
+        rating INT CHECK (rating >= 1 AND rating <= 5),
+        comment TEXT,
+        review_date DATE,
+        status VARCHAR(50)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Sale (
+        sale_id SERIAL PRIMARY KEY,
+        customer_id INT REFERENCES Customer(customer_id),
+        product_id INT REFERENCES Product(product_id),
+        sale_date DATE,
+        quantity INT,
+        total_price DECIMAL(10, 2)
+    );
+    """,
+    # Append-only wallet transactions; the balance is the compacted snapshot in
+    # Customer.wallet_balance plus the entries after Customer.wallet_ledger_position
+    """
+    CREATE TABLE IF NOT EXISTS WalletLedger (
+        entry_id BIGSERIAL PRIMARY KEY,
+        customer_id INT NOT NULL REFERENCES Customer(customer_id) ON DELETE CASCADE,
+        amount DECIMAL(10, 2) NOT NULL CHECK (amount <> 0),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS wallet_ledger_customer_entry
+    ON WalletLedger (customer_id, entry_id);
+    """,
+    # Stock holds of carts: the held units leave Product.stock_count when the hold
+    # is taken and come back when it is released or expires
+    """
+    CREATE TABLE IF NOT EXISTS Reservation (
+        reservation_id SERIAL PRIMARY KEY,
+        product_id INT NOT NULL REFERENCES Product(product_id) ON DELETE CASCADE,
+        quantity INT NOT NULL CHECK (quantity > 0),
+        status VARCHAR(20) NOT NULL DEFAULT 'held'
+            CHECK (status IN ('held', 'confirmed', 'released', 'expired')),
+        expires_at TIMESTAMP NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # The sweeper reads the held reservations by expiry; the others are left out
+    # of the index, so it stays as small as the number of open holds
+    """
+    CREATE INDEX IF NOT EXISTS reservation_held_expiry
+    ON Reservation (expires_at) WHERE status = 'held';
+    """,
+]
+
+MIGRATIONS = [
+    """
+    ALTER TABLE Customer
+    ADD COLUMN IF NOT EXISTS wallet_ledger_position BIGINT NOT NULL DEFAULT 0;
+    """,
+    """
+    ALTER TABLE Product ADD COLUMN IF NOT EXISTS sku VARCHAR(64) UNIQUE;
+    """,
+]
+
+POSTGRES_SCHEMA = [
+    # Full-text search document of a product: name first, then category, then
+    # description; stored so search ranks rows without re-parsing their text
+    """
+    ALTER TABLE Product
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(name, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(category, '')), 'B')
+        || setweight(to_tsvector('english', COALESCE(description, '')), 'C')
+    ) STORED;
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS product_search ON Product USING GIN (search_vector);
+    """,
+    # Sale is range-partitioned by month on sale_date, so the reports over a range
+    # of days only read the partitions of its months, and old months can be
+    # detached or dropped whole. A sale dated outside the months created so far
+    # is kept in the default partition; creating its month's partition moves it.
+    """
+    CREATE OR REPLACE FUNCTION create_sale_partitions(
+        p_months_ahead INT DEFAULT 3,
+        p_from DATE DEFAULT NULL
+    )
+    RETURNS INT AS $$
+    DECLARE
+        v_month DATE;
+        v_name TEXT;
+        v_created INT := 0;
+    BEGIN
+        -- One creator at a time, so two processes never create the same month
+        PERFORM pg_advisory_xact_lock(hashtext('create_sale_partitions'));
+        -- The months from p_from (or the current one) to the months ahead, and
+        -- the months of the sales kept in the default partition
+        FOR v_month IN
+            SELECT generate_series(
+                date_trunc('month', COALESCE(p_from, CURRENT_DATE)),
+                date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead),
+                INTERVAL '1 month'
+            )::DATE
+            UNION
+            SELECT DISTINCT date_trunc('month', sale_date)::DATE FROM sale_default
+            ORDER BY 1
+        LOOP
+            v_name := 'sale_' || to_char(v_month, 'YYYY_MM');
+            CONTINUE WHEN to_regclass(v_name) IS NOT NULL;
+            EXECUTE format('CREATE TABLE %I (LIKE Sale INCLUDING DEFAULTS)', v_name);
+            EXECUTE format(
+                'WITH moved AS ('
+                '    DELETE FROM sale_default'
+                '    WHERE sale_date >= %L AND sale_date < %L RETURNING *'
+                ') INSERT INTO %I SELECT * FROM moved',
+                v_month, v_month + INTERVAL '1 month', v_name
+            );
+            EXECUTE format(
+                'ALTER TABLE Sale ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_month, v_month + INTERVAL '1 month'
+            );
+            v_created := v_created + 1;
+        END LOOP;
+        RETURN v_created;
+    END;
+    $$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+    """,
+    # Attaching a partition needs the ownership of Sale, so the function runs with
+    # the rights of its owner; only the service role, which the sales service
+    # connects with, may call it. Supabase grants new functions to its API roles
+    # by default, so these grants are taken back too.
+    """
+    DO $$
+    DECLARE
+        v_role TEXT;
+    BEGIN
+        REVOKE EXECUTE ON FUNCTION create_sale_partitions(INT, DATE) FROM PUBLIC;
+        FOR v_role IN
+            SELECT rolname FROM pg_roles WHERE rolname IN ('anon', 'authenticated')
+        LOOP
+            EXECUTE format(
+                'REVOKE EXECUTE ON FUNCTION create_sale_partitions(INT, DATE) FROM %I',
+                v_role
+            );
+        END LOOP;
+        IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+            GRANT EXECUTE ON FUNCTION create_sale_partitions(INT, DATE) TO service_role;
+        END IF;
+    END;
+    $$;
+    """,
+    # Converts a Sale table created by TABLES (or by an earlier version) into the
+    # partitioned table once: the rows are copied into the partitions of their
+    # months and the sale_id sequence is kept. The partition key is part of the
+    # primary key, so every sale needs a sale_date.
+    """
+    DO $$
+    DECLARE
+        v_first DATE;
+    BEGIN
+        IF (SELECT relkind FROM pg_class WHERE oid = 'sale'::regclass) = 'p' THEN
+            RETURN;
+        END IF;
+        LOCK TABLE Sale IN ACCESS EXCLUSIVE MODE;
+        IF EXISTS (SELECT 1 FROM Sale WHERE sale_date IS NULL) THEN
+            RAISE EXCEPTION 'Sale has rows without a sale_date; date them before partitioning';
+        END IF;
+
+        ALTER TABLE Sale RENAME TO sale_unpartitioned;
+        ALTER INDEX sale_pkey RENAME TO sale_unpartitioned_pkey;
+        CREATE TABLE Sale (
+            LIKE sale_unpartitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (sale_id, sale_date)
+        ) PARTITION BY RANGE (sale_date);
+        ALTER TABLE Sale ALTER COLUMN sale_date SET DEFAULT CURRENT_DATE;
+        CREATE TABLE sale_default PARTITION OF Sale DEFAULT;
+        EXECUTE format(
+            'ALTER SEQUENCE %s OWNED BY Sale.sale_id',
+            pg_get_serial_sequence('sale_unpartitioned', 'sale_id')
+        );
+
+        -- The months of the existing sales, up to the months ahead of today
+        SELECT MIN(sale_date) INTO v_first FROM sale_unpartitioned;
+        PERFORM create_sale_partitions(p_from => v_first);
+        INSERT INTO Sale SELECT * FROM sale_unpartitioned;
+        DROP TABLE sale_unpartitioned;
+
+        -- Checked once over the copied rows rather than row by row
+        ALTER TABLE Sale
+        ADD FOREIGN KEY (customer_id) REFERENCES Customer(customer_id),
+        ADD FOREIGN KEY (product_id) REFERENCES Product(product_id);
+    END;
+    $$;
+    """,
+    # Creates the months ahead, and the months of any sale left in the default
+    # partition, each time the schema is applied
+    """
+    SELECT create_sale_partitions();
+    """,
+    # The sales of a customer and of a product are read by these indexes, in date
+    # order, instead of by a scan of every sale
+    """
+    CREATE INDEX IF NOT EXISTS sale_customer_date ON Sale (customer_id, sale_date);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS sale_product_date ON Sale (product_id, sale_date);
+    """,
+    # Daily sales rollups, kept up to date by the triggers on Sale below, so the
+    # sales statistics read one row per day and product (or customer) instead of
+    # every sale. A day's totals are striped over 16 rows by product, so
+    # concurrent sales of different products do not queue on one row lock.
+    """
+    CREATE TABLE IF NOT EXISTS SaleDailyProduct (
+        sale_date DATE NOT NULL,
+        product_id INT NOT NULL,
+        units BIGINT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        sales INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_date, product_id)
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS sale_daily_product_product
+    ON SaleDailyProduct (product_id, sale_date);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS SaleDailyCustomer (
+        sale_date DATE NOT NULL,
+        customer_id INT NOT NULL,
+        units BIGINT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        sales INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_date, customer_id)
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS sale_daily_customer_customer
+    ON SaleDailyCustomer (customer_id, sale_date);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS SaleDailyTotal (
+        sale_date DATE NOT NULL,
+        stripe SMALLINT NOT NULL,
+        units BIGINT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        sales INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_date, stripe)
+    );
+    """,
+    # Statement-level triggers: the rows a statement added count positively and
+    # the rows it removed negatively (an update removes the old version of each
+    # row and adds the new one), and each rollup row they touch is updated once
+    # per statement, however many sales the statement wrote. The rows are upserted
+    # in key order, so concurrent statements lock them in the same order.
+    """
+    CREATE OR REPLACE FUNCTION sale_rollup()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        v_added Sale[] := '{}';
+        v_removed Sale[] := '{}';
+    BEGIN
+        -- A transition table only exists for the events it is declared for
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT COALESCE(array_agg(n), '{}') INTO v_added FROM new_sales n;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            SELECT COALESCE(array_agg(o), '{}') INTO v_removed FROM old_sales o;
+        END IF;
+
+        WITH delta AS (
+            SELECT
+                a.sale_date,
+                a.product_id,
+                a.customer_id,
+                COALESCE(a.quantity, 0) AS units,
+                COALESCE(a.total_price, 0) AS revenue,
+                1 AS sales
+            FROM unnest(v_added) a
+            UNION ALL
+            SELECT
+                r.sale_date,
+                r.product_id,
+                r.customer_id,
+                -COALESCE(r.quantity, 0),
+                -COALESCE(r.total_price, 0),
+                -1
+            FROM unnest(v_removed) r
+        ),
+        by_product AS (
+            INSERT INTO SaleDailyProduct AS t (sale_date, product_id, units, revenue, sales)
+            SELECT d.sale_date, d.product_id, SUM(d.units), SUM(d.revenue), SUM(d.sales)
+            FROM delta d
+            WHERE d.sale_date IS NOT NULL AND d.product_id IS NOT NULL
+            GROUP BY 1, 2
+            HAVING SUM(d.units) <> 0 OR SUM(d.revenue) <> 0 OR SUM(d.sales) <> 0
+            ORDER BY 1, 2
+            ON CONFLICT (sale_date, product_id) DO UPDATE
+            SET units = t.units + EXCLUDED.units,
+                revenue = t.revenue + EXCLUDED.revenue,
+                sales = t.sales + EXCLUDED.sales
+        ),
+        by_customer AS (
+            INSERT INTO SaleDailyCustomer AS t (sale_date, customer_id, units, revenue, sales)
+            SELECT d.sale_date, d.customer_id, SUM(d.units), SUM(d.revenue), SUM(d.sales)
+            FROM delta d
+            WHERE d.sale_date IS NOT NULL AND d.customer_id IS NOT NULL
+            GROUP BY 1, 2
+            HAVING SUM(d.units) <> 0 OR SUM(d.revenue) <> 0 OR SUM(d.sales) <> 0
+            ORDER BY 1, 2
+            ON CONFLICT (sale_date, customer_id) DO UPDATE
+            SET units = t.units + EXCLUDED.units,
+                revenue = t.revenue + EXCLUDED.revenue,
+                sales = t.sales + EXCLUDED.sales
+        )
+        INSERT INTO SaleDailyTotal AS t (sale_date, stripe, units, revenue, sales)
+        SELECT
+            d.sale_date,
+            COALESCE(d.product_id, 0) % 16,
+            SUM(d.units),
+            SUM(d.revenue),
+            SUM(d.sales)
+        FROM delta d
+        WHERE d.sale_date IS NOT NULL
+        GROUP BY 1, 2
+        HAVING SUM(d.units) <> 0 OR SUM(d.revenue) <> 0 OR SUM(d.sales) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (sale_date, stripe) DO UPDATE
+        SET units = t.units + EXCLUDED.units,
+            revenue = t.revenue + EXCLUDED.revenue,
+            sales = t.sales + EXCLUDED.sales;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE TRIGGER sale_rollup_insert
+    AFTER INSERT ON Sale REFERENCING NEW TABLE AS new_sales
+    FOR EACH STATEMENT EXECUTE FUNCTION sale_rollup();
+    """,
+    """
+    CREATE OR REPLACE TRIGGER sale_rollup_update
+    AFTER UPDATE ON Sale REFERENCING OLD TABLE AS old_sales NEW TABLE AS new_sales
+    FOR EACH STATEMENT EXECUTE FUNCTION sale_rollup();
+    """,
+    """
+    CREATE OR REPLACE TRIGGER sale_rollup_delete
+    AFTER DELETE ON Sale REFERENCING OLD TABLE AS old_sales
+    FOR EACH STATEMENT EXECUTE FUNCTION sale_rollup();
+    """,
+    # Rebuild the rollups from the sales, which fills them in for the sales made
+    # before the triggers existed; the lock keeps sales from being written while
+    # they are rebuilt
+    """
+    LOCK TABLE Sale IN SHARE MODE;
+    DELETE FROM SaleDailyProduct;
+    DELETE FROM SaleDailyCustomer;
+    DELETE FROM SaleDailyTotal;
+    INSERT INTO SaleDailyProduct (sale_date, product_id, units, revenue, sales)
+    SELECT sale_date, product_id, SUM(COALESCE(quantity, 0)),
+        SUM(COALESCE(total_price, 0)), COUNT(*)
+    FROM Sale
+    WHERE sale_date IS NOT NULL AND product_id IS NOT NULL
+    GROUP BY 1, 2;
+    INSERT INTO SaleDailyCustomer (sale_date, customer_id, units, revenue, sales)
+    SELECT sale_date, customer_id, SUM(COALESCE(quantity, 0)),
+        SUM(COALESCE(total_price, 0)), COUNT(*)
+    FROM Sale
+    WHERE sale_date IS NOT NULL AND customer_id IS NOT NULL
+    GROUP BY 1, 2;
+    INSERT INTO SaleDailyTotal (sale_date, stripe, units, revenue, sales)
+    SELECT sale_date, COALESCE(product_id, 0) % 16, SUM(COALESCE(quantity, 0)),
+        SUM(COALESCE(total_price, 0)), COUNT(*)
+    FROM Sale
+    WHERE sale_date IS NOT NULL
+    GROUP BY 1, 2;
+    """,
+]
+
+FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION charge_wallet(p_username VARCHAR, p_amount DECIMAL)
+    RETURNS DECIMAL AS $$
+    DECLARE
+        new_balance DECIMAL;
+    BEGIN
+        -- Single conditional UPDATE: the row lock serialises concurrent charges
+        UPDATE Customer
+        SET wallet_balance = COALESCE(wallet_balance, 0) + p_amount
+        WHERE username = p_username
+        RETURNING wallet_balance INTO new_balance;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Customer not found';
+        END IF;
+
+        RETURN new_balance;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION deduct_wallet(p_username VARCHAR, p_amount DECIMAL)
+    RETURNS DECIMAL AS $$
+    DECLARE
+        new_balance DECIMAL;
+    BEGIN
+        -- The balance check is part of the UPDATE, so it can never overdraw
+        UPDATE Customer
+        SET wallet_balance = wallet_balance - p_amount
+        WHERE username = p_username AND wallet_balance >= p_amount
+        RETURNING wallet_balance INTO new_balance;
+
+        IF NOT FOUND THEN
+            IF EXISTS (SELECT 1 FROM Customer WHERE username = p_username) THEN
+                RAISE EXCEPTION 'Insufficient funds';
+            END IF;
+            RAISE EXCEPTION 'Customer not found';
+        END IF;
+
+        RETURN new_balance;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION wallet_ledger_balance(p_customer_id INT)
+    RETURNS DECIMAL AS $$
+        -- The compacted snapshot plus the entries appended since
+        SELECT COALESCE(c.wallet_balance, 0) + COALESCE(
+            (
+                SELECT SUM(l.amount)
+                FROM WalletLedger l
+                WHERE l.customer_id = c.customer_id
+                AND l.entry_id > c.wallet_ledger_position
+            ),
+            0
+        )
+        FROM Customer c
+        WHERE c.customer_id = p_customer_id;
+    $$ LANGUAGE sql STABLE;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION wallet_ledger_balances(p_customer_ids INT[])
+    RETURNS TABLE (customer_id INT, wallet_balance DECIMAL) AS $$
+        -- wallet_ledger_balance for a page of customers, in one grouped scan of
+        -- their new ledger entries
+        SELECT c.customer_id, COALESCE(c.wallet_balance, 0) + COALESCE(SUM(l.amount), 0)
+        FROM Customer c
+        LEFT JOIN WalletLedger l
+            ON l.customer_id = c.customer_id
+            AND l.entry_id > c.wallet_ledger_position
+        WHERE c.customer_id = ANY(p_customer_ids)
+        GROUP BY c.customer_id;
+    $$ LANGUAGE sql STABLE;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION ledger_charge_wallet(p_username VARCHAR, p_amount DECIMAL)
+    RETURNS TABLE (customer_id INT, wallet_balance DECIMAL) AS $$
+    DECLARE
+        v_customer_id INT;
+    BEGIN
+        SELECT c.customer_id INTO v_customer_id
+        FROM Customer c
+        WHERE c.username = p_username;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Customer not found';
+        END IF;
+
+        -- Credits share the customer's ledger lock: they never wait for each other,
+        -- only for a debit or a compaction of the same customer
+        PERFORM pg_advisory_xact_lock_shared('WalletLedger'::regclass::int, v_customer_id);
+        INSERT INTO WalletLedger (customer_id, amount) VALUES (v_customer_id, p_amount);
+
+        RETURN QUERY SELECT v_customer_id, wallet_ledger_balance(v_customer_id);
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION ledger_deduct_wallet(p_username VARCHAR, p_amount DECIMAL)
+    RETURNS TABLE (customer_id INT, wallet_balance DECIMAL) AS $$
+    DECLARE
+        v_customer_id INT;
+        v_balance DECIMAL;
+    BEGIN
+        SELECT c.customer_id INTO v_customer_id
+        FROM Customer c
+        WHERE c.username = p_username;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Customer not found';
+        END IF;
+
+        -- Debits of a customer are serialised, so two of them cannot spend the
+        -- same funds; the Customer row itself is not locked
+        PERFORM pg_advisory_xact_lock('WalletLedger'::regclass::int, v_customer_id);
+        v_balance := wallet_ledger_balance(v_customer_id);
+        IF v_balance < p_amount THEN
+            RAISE EXCEPTION 'Insufficient funds';
+        END IF;
+        INSERT INTO WalletLedger (customer_id, amount) VALUES (v_customer_id, -p_amount);
+
+        RETURN QUERY SELECT v_customer_id, v_balance - p_amount;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION compact_wallet_ledger(p_customer_ids INT[])
+    RETURNS INT AS $$
+    DECLARE
+        v_customer_id INT;
+        v_compacted INT := 0;
+    BEGIN
+        -- Locks are taken in customer order, so concurrent compactions cannot
+        -- deadlock; holding the exclusive lock means no credit is in flight
+        FOR v_customer_id IN
+            SELECT DISTINCT id FROM unnest(p_customer_ids) AS id ORDER BY id
+        LOOP
+            PERFORM pg_advisory_xact_lock('WalletLedger'::regclass::int, v_customer_id);
+
+            UPDATE Customer c
+            SET wallet_balance = COALESCE(c.wallet_balance, 0) + d.total,
+                wallet_ledger_position = d.last_entry
+            FROM (
+                SELECT SUM(l.amount) AS total, MAX(l.entry_id) AS last_entry
+                FROM WalletLedger l
+                JOIN Customer lc ON lc.customer_id = l.customer_id
+                WHERE l.customer_id = v_customer_id
+                AND l.entry_id > lc.wallet_ledger_position
+            ) d
+            WHERE c.customer_id = v_customer_id AND d.last_entry IS NOT NULL;
+
+            IF FOUND THEN
+                v_compacted := v_compacted + 1;
+            END IF;
+        END LOOP;
+
+        RETURN v_compacted;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION apply_wallet_batch(p_entries JSONB)
+    RETURNS TABLE (entry_index INT, customer_id INT, new_balance DECIMAL, error TEXT) AS $$
+    DECLARE
+        v_entry RECORD;
+    BEGIN
+        -- Lock the batch's customers up front, in customer order, so concurrent
+        -- batches cannot deadlock
+        PERFORM 1
+        FROM Customer c
+        WHERE c.username IN (
+            SELECT t.e->>'username' FROM jsonb_array_elements(p_entries) AS t(e)
+        )
+        ORDER BY c.customer_id
+        FOR UPDATE;
+
+        -- Entries are applied in order; a failed entry is reported, not raised
+        FOR v_entry IN
+            SELECT (t.ordinality - 1)::INT AS idx,
+                t.e->>'username' AS username,
+                (t.e->>'amount')::DECIMAL AS amount,
+                t.e->>'op' AS op
+            FROM jsonb_array_elements(p_entries) WITH ORDINALITY AS t(e, ordinality)
+            ORDER BY t.ordinality
+        LOOP
+            entry_index := v_entry.idx;
+            customer_id := NULL;
+            new_balance := NULL;
+            error := NULL;
+
+            IF v_entry.op = 'deduct' THEN
+                UPDATE Customer c
+                SET wallet_balance = c.wallet_balance - v_entry.amount
+                WHERE c.username = v_entry.username
+                AND c.wallet_balance >= v_entry.amount
+                RETURNING c.customer_id, c.wallet_balance INTO customer_id, new_balance;
+            ELSE
+                UPDATE Customer c
+                SET wallet_balance = COALESCE(c.wallet_balance, 0) + v_entry.amount
+                WHERE c.username = v_entry.username
+                RETURNING c.customer_id, c.wallet_balance INTO customer_id, new_balance;
+            END IF;
+
+            IF NOT FOUND THEN
+                IF EXISTS (SELECT 1 FROM Customer c WHERE c.username = v_entry.username) THEN
+                    error := 'Insufficient funds';
+                ELSE
+                    error := 'Customer not found';
+                END IF;
+            END IF;
+            RETURN NEXT;
+        END LOOP;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION ledger_apply_wallet_batch(p_entries JSONB)
+    RETURNS TABLE (entry_index INT, customer_id INT, new_balance DECIMAL, error TEXT) AS $$
+    DECLARE
+        v_entry RECORD;
+        v_customer_id INT;
+        v_balance DECIMAL;
+    BEGIN
+        -- Take the ledger lock of the batch's customers up front, in customer
+        -- order, so concurrent batches and compactions cannot deadlock
+        FOR v_customer_id IN
+            SELECT c.customer_id
+            FROM Customer c
+            WHERE c.username IN (
+                SELECT t.e->>'username' FROM jsonb_array_elements(p_entries) AS t(e)
+            )
+            ORDER BY c.customer_id
+        LOOP
+            PERFORM pg_advisory_xact_lock('WalletLedger'::regclass::int, v_customer_id);
+        END LOOP;
+
+        -- Entries are applied in order; a failed entry is reported, not raised
+        FOR v_entry IN
+            SELECT (t.ordinality - 1)::INT AS idx,
+                t.e->>'username' AS username,
+                (t.e->>'amount')::DECIMAL AS amount,
+                t.e->>'op' AS op
+            FROM jsonb_array_elements(p_entries) WITH ORDINALITY AS t(e, ordinality)
+            ORDER BY t.ordinality
+        LOOP
+            entry_index := v_entry.idx;
+            new_balance := NULL;
+            error := NULL;
+
+            SELECT c.customer_id INTO customer_id
+            FROM Customer c
+            WHERE c.username = v_entry.username;
+
+            IF NOT FOUND THEN
+                customer_id := NULL;
+                error := 'Customer not found';
+            ELSE
+                v_balance := wallet_ledger_balance(customer_id);
+                IF v_entry.op = 'deduct' AND v_balance < v_entry.amount THEN
+                    error := 'Insufficient funds';
+                ELSE
+                    IF v_entry.op = 'deduct' THEN
+                        v_entry.amount := -v_entry.amount;
+                    END IF;
+                    INSERT INTO WalletLedger (customer_id, amount)
+                    VALUES (customer_id, v_entry.amount);
+                    new_balance := v_balance + v_entry.amount;
+                END IF;
+            END IF;
+            RETURN NEXT;
+        END LOOP;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION deduct_stock(p_product_id INT, p_quantity INT)
+    RETURNS SETOF Product AS $$
+    BEGIN
+        -- The stock check is part of the UPDATE, so stock can never be oversold
+        RETURN QUERY
+        UPDATE Product
+        SET stock_count = stock_count - p_quantity
+        WHERE product_id = p_product_id AND stock_count >= p_quantity
+        RETURNING *;
+
+        IF NOT FOUND THEN
+            IF EXISTS (SELECT 1 FROM Product WHERE product_id = p_product_id) THEN
+                RAISE EXCEPTION 'Insufficient stock';
+            END IF;
+            RAISE EXCEPTION 'Product not found';
+        END IF;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION adjust_stock_bulk(p_adjustments JSONB)
+    RETURNS TABLE (item_index INT, product_id INT, stock_count INT, error TEXT) AS $$
+    BEGIN
+        -- Lock the batch's products up front, in product order, so concurrent
+        -- batches cannot deadlock
+        PERFORM 1
+        FROM Product p
+        WHERE p.product_id IN (
+            SELECT (t.a->>'product_id')::INT FROM jsonb_array_elements(p_adjustments) AS t(a)
+        )
+        ORDER BY p.product_id
+        FOR UPDATE;
+
+        -- One set-based UPDATE applies the summed deltas of each product; the
+        -- stock check is part of it, so a product whose stock would go negative
+        -- is left unchanged and all of its items fail
+        RETURN QUERY
+        WITH items AS (
+            SELECT (t.ordinality - 1)::INT AS idx,
+                (t.a->>'product_id')::INT AS id,
+                (t.a->>'delta')::INT AS delta
+            FROM jsonb_array_elements(p_adjustments) WITH ORDINALITY AS t(a, ordinality)
+        ),
+        totals AS (
+            SELECT i.id, SUM(i.delta) AS delta FROM items i GROUP BY i.id
+        ),
+        updated AS (
+            UPDATE Product p
+            SET stock_count = COALESCE(p.stock_count, 0) + t.delta
+            FROM totals t
+            WHERE p.product_id = t.id AND COALESCE(p.stock_count, 0) + t.delta >= 0
+            RETURNING p.product_id AS id, p.stock_count AS stock
+        )
+        SELECT i.idx, i.id, u.stock,
+            CASE
+                WHEN u.id IS NOT NULL THEN NULL
+                WHEN EXISTS (SELECT 1 FROM Product p WHERE p.product_id = i.id)
+                    THEN 'Insufficient stock'
+                ELSE 'Product not found'
+            END
+        FROM items i
+        LEFT JOIN updated u ON u.id = i.id
+        ORDER BY i.idx;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION reserve_stock(
+        p_product_id INT, p_quantity INT, p_ttl_seconds INT
+    )
+    RETURNS SETOF Reservation AS $$
+    BEGIN
+        -- The held units leave the stock with the same conditional UPDATE as
+        -- deduct_stock, so concurrent holds can never oversell a product
+        UPDATE Product
+        SET stock_count = stock_count - p_quantity
+        WHERE product_id = p_product_id AND stock_count >= p_quantity;
+
+        IF NOT FOUND THEN
+            IF EXISTS (SELECT 1 FROM Product WHERE product_id = p_product_id) THEN
+                RAISE EXCEPTION 'Insufficient stock';
+            END IF;
+            RAISE EXCEPTION 'Product not found';
+        END IF;
+
+        RETURN QUERY
+        INSERT INTO Reservation (product_id, quantity, expires_at)
+        VALUES (
+            p_product_id,
+            p_quantity,
+            LOCALTIMESTAMP + make_interval(secs => p_ttl_seconds)
+        )
+        RETURNING *;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION confirm_reservation(p_reservation_id INT)
+    RETURNS SETOF Reservation AS $$
+    DECLARE
+        v_status VARCHAR;
+    BEGIN
+        -- The held units already left the stock, so confirming only closes the hold
+        RETURN QUERY
+        UPDATE Reservation
+        SET status = 'confirmed'
+        WHERE reservation_id = p_reservation_id
+        AND status = 'held'
+        AND expires_at > LOCALTIMESTAMP
+        RETURNING *;
+
+        IF NOT FOUND THEN
+            SELECT status INTO v_status
+            FROM Reservation
+            WHERE reservation_id = p_reservation_id;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Reservation not found';
+            END IF;
+            IF v_status = 'held' THEN
+                RAISE EXCEPTION 'Reservation expired';
+            END IF;
+            RAISE EXCEPTION 'Reservation is %', v_status;
+        END IF;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION release_reservation(p_reservation_id INT)
+    RETURNS SETOF Reservation AS $$
+    DECLARE
+        v_status VARCHAR;
+    BEGIN
+        -- Closing the hold and returning its units is one statement, so the units
+        -- come back exactly once even when the sweeper races the release
+        RETURN QUERY
+        WITH released AS (
+            UPDATE Reservation r
+            SET status = 'released'
+            WHERE r.reservation_id = p_reservation_id AND r.status = 'held'
+            RETURNING r.*
+        ),
+        restocked AS (
+            UPDATE Product p
+            SET stock_count = COALESCE(p.stock_count, 0) + r.quantity
+            FROM released r
+            WHERE p.product_id = r.product_id
+        )
+        SELECT * FROM released;
+
+        IF NOT FOUND THEN
+            SELECT status INTO v_status
+            FROM Reservation
+            WHERE reservation_id = p_reservation_id;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Reservation not found';
+            END IF;
+            RAISE EXCEPTION 'Reservation is %', v_status;
+        END IF;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION expire_reservations(p_limit INT)
+    RETURNS TABLE (product_id INT, holds INT, quantity INT, stock_count INT) AS $$
+    DECLARE
+        v_ids INT[];
+    BEGIN
+        -- Claim the oldest expired holds; SKIP LOCKED lets sweepers run side by
+        -- side and never waits on a hold being confirmed or released
+        SELECT array_agg(e.reservation_id) INTO v_ids
+        FROM (
+            SELECT r.reservation_id
+            FROM Reservation r
+            WHERE r.status = 'held' AND r.expires_at <= LOCALTIMESTAMP
+            ORDER BY r.expires_at
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        ) e;
+
+        IF v_ids IS NULL THEN
+            RETURN;
+        END IF;
+
+        -- Lock their products in product order, as adjust_stock_bulk does, so
+        -- concurrent stock updates cannot deadlock
+        PERFORM 1
+        FROM Product p
+        WHERE p.product_id IN (
+            SELECT r.product_id FROM Reservation r WHERE r.reservation_id = ANY (v_ids)
+        )
+        ORDER BY p.product_id
+        FOR UPDATE;
+
+        UPDATE Reservation r SET status = 'expired' WHERE r.reservation_id = ANY (v_ids);
+
+        -- Return the held units of each product with one set-based UPDATE
+        RETURN QUERY
+        UPDATE Product p
+        SET stock_count = COALESCE(p.stock_count, 0) + h.quantity
+        FROM (
+            SELECT r.product_id AS id, COUNT(*)::INT AS holds,
+                SUM(r.quantity)::INT AS quantity
+            FROM Reservation r
+            WHERE r.reservation_id = ANY (v_ids)
+            GROUP BY r.product_id
+        ) h
+        WHERE p.product_id = h.id
+        RETURNING p.product_id, h.holds, h.quantity, p.stock_count;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION checkout(
+        p_customer_id INT,
+        p_product_id INT,
+        p_quantity INT,
+        p_wallet_mode VARCHAR DEFAULT 'balance',
+        p_reservation_id INT DEFAULT NULL
+    )
+    RETURNS TABLE (
+        sale_id INT,
+        customer_id INT,
+        product_id INT,
+        sale_date DATE,
+        quantity INT,
+        total_price DECIMAL,
+        wallet_balance DECIMAL,
+        stock_count INT
+    ) AS $$
+    DECLARE
+        v_price DECIMAL;
+        v_stock INT;
+        v_total DECIMAL;
+        v_username VARCHAR;
+        v_balance DECIMAL;
+    BEGIN
+        -- Every step raises on failure, which rolls back the steps before it: the
+        -- stock, the wallet and the sale change together or not at all. The
+        -- product is locked before the customer, in every checkout
+        IF p_reservation_id IS NULL THEN
+            SELECT d.price, d.stock_count INTO v_price, v_stock
+            FROM deduct_stock(p_product_id, p_quantity) d;
+        ELSE
+            -- The held units already left the stock; the hold must cover the sale
+            PERFORM 1
+            FROM confirm_reservation(p_reservation_id) r
+            WHERE r.product_id = p_product_id AND r.quantity = p_quantity;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Reservation does not match the sale';
+            END IF;
+            SELECT p.price, p.stock_count INTO v_price, v_stock
+            FROM Product p
+            WHERE p.product_id = p_product_id;
+        END IF;
+        v_total := ROUND(COALESCE(v_price, 0) * p_quantity, 2);
+
+        SELECT c.username INTO v_username
+        FROM Customer c
+        WHERE c.customer_id = p_customer_id;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Customer not found';
+        END IF;
+
+        IF p_wallet_mode = 'ledger' THEN
+            IF v_total > 0 THEN
+                SELECT l.wallet_balance INTO v_balance
+                FROM ledger_deduct_wallet(v_username, v_total) l;
+            ELSE
+                v_balance := wallet_ledger_balance(p_customer_id);
+            END IF;
+        ELSE
+            v_balance := deduct_wallet(v_username, v_total);
+        END IF;
+
+        RETURN QUERY
+        INSERT INTO Sale AS s (customer_id, product_id, sale_date, quantity, total_price)
+        VALUES (p_customer_id, p_product_id, CURRENT_DATE, p_quantity, v_total)
+        RETURNING s.sale_id, s.customer_id, s.product_id, s.sale_date, s.quantity,
+            s.total_price, v_balance, v_stock;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION list_products(
+        p_category VARCHAR DEFAULT NULL,
+        p_min_price DECIMAL DEFAULT NULL,
+        p_max_price DECIMAL DEFAULT NULL,
+        p_in_stock BOOLEAN DEFAULT FALSE,
+        p_sort TEXT DEFAULT 'product_id',
+        p_after_price DECIMAL DEFAULT NULL,
+        p_after_id INT DEFAULT NULL,
+        p_limit INT DEFAULT 100
+    )
+    RETURNS SETOF Product AS $$
+    DECLARE
+        conditions TEXT[] := ARRAY['TRUE'];
+        ordering TEXT;
+    BEGIN
+        -- Only the filters given are part of the query, so the planner can pick
+        -- the index matching them; the keyset condition is a row comparison in
+        -- the index order, so every page is an index range scan
+        IF p_category IS NOT NULL THEN
+            conditions := array_append(conditions, 'category = $1');
+        END IF;
+        IF p_min_price IS NOT NULL THEN
+            conditions := array_append(conditions, 'price >= $2');
+        END IF;
+        IF p_max_price IS NOT NULL THEN
+            conditions := array_append(conditions, 'price <= $3');
+        END IF;
+        IF p_in_stock THEN
+            conditions := array_append(conditions, 'stock_count > 0');
+        END IF;
+
+        IF p_sort = 'product_id' THEN
+            IF p_after_id IS NOT NULL THEN
+                conditions := array_append(conditions, 'product_id > $5');
+            END IF;
+            ordering := 'product_id';
+        ELSIF p_sort = '-product_id' THEN
+            IF p_after_id IS NOT NULL THEN
+                conditions := array_append(conditions, 'product_id < $5');
+            END IF;
+            ordering := 'product_id DESC';
+        ELSIF p_sort IN ('price', '-price') THEN
+            -- Products without a price have no place in a price order
+            conditions := array_append(conditions, 'price IS NOT NULL');
+            IF p_sort = 'price' THEN
+                IF p_after_id IS NOT NULL THEN
+                    conditions := array_append(
+                        conditions, '(price, product_id) > ($4, $5)'
+                    );
+                END IF;
+                ordering := 'price, product_id';
+            ELSE
+                IF p_after_id IS NOT NULL THEN
+                    conditions := array_append(
+                        conditions, '(price, product_id) < ($4, $5)'
+                    );
+                END IF;
+                ordering := 'price DESC, product_id DESC';
+            END IF;
+        ELSE
+            RAISE EXCEPTION 'Unknown sort order: %', p_sort;
+        END IF;
+
+        RETURN QUERY EXECUTE format(
+            'SELECT * FROM Product WHERE %s ORDER BY %s LIMIT $6',
+            array_to_string(conditions, ' AND '),
+            ordering
+        )
+        USING p_category, p_min_price, p_max_price, p_after_price, p_after_id, p_limit;
+    END;
+    $$ LANGUAGE plpgsql STABLE;
+    """,
+    # Full-text product search, best match first. A search matching more than
+    # p_max_matches products ranks the p_max_matches with the lowest IDs, so every
+    # page ranks the same products, and its rows are flagged as truncated
+    """
+    DROP FUNCTION IF EXISTS search_products(TEXT, REAL, INT, INT, INT);
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_products(
+        p_query TEXT,
+        p_after_rank REAL DEFAULT NULL,
+        p_after_id INT DEFAULT NULL,
+        p_limit INT DEFAULT 20,
+        p_max_matches INT DEFAULT 2000
+    )
+    RETURNS TABLE (
+        product_id INT,
+        name VARCHAR,
+        category VARCHAR,
+        price DECIMAL,
+        description TEXT,
+        stock_count INT,
+        rank REAL,
+        truncated BOOLEAN
+    ) AS $$
+        -- The GIN index finds the matches; one more than the cap is read to tell
+        -- whether the search was truncated, and only the capped ones are ranked
+        WITH matches AS (
+            SELECT
+                p.product_id,
+                p.name,
+                p.category,
+                p.price,
+                p.description,
+                p.stock_count,
+                ts_rank(p.search_vector, q) AS rank,
+                COUNT(*) OVER () > p_max_matches AS truncated,
+                row_number() OVER (ORDER BY p.product_id) AS position
+            FROM websearch_to_tsquery('english', p_query) AS q,
+            LATERAL (
+                SELECT * FROM Product
+                WHERE search_vector @@ q
+                ORDER BY product_id
+                LIMIT p_max_matches + 1
+            ) p
+        )
+        SELECT
+            product_id, name, category, price, description, stock_count, rank,
+            COALESCE(truncated, FALSE)
+        FROM matches
+        WHERE (p_max_matches IS NULL OR position <= p_max_matches)
+        AND (
+            p_after_id IS NULL
+            OR matches.rank < p_after_rank
+            OR (matches.rank = p_after_rank AND matches.product_id > p_after_id)
+        )
+        ORDER BY matches.rank DESC, matches.product_id
+        LIMIT p_limit;
+    $$ LANGUAGE sql STABLE;
+    """,
+    # The sales statistics, read from the daily rollups; a day range is inclusive
+    # and either end may be left open
+    """
+    CREATE OR REPLACE FUNCTION sales_by_day(
+        p_from DATE DEFAULT NULL,
+        p_to DATE DEFAULT NULL,
+        p_product_id INT DEFAULT NULL,
+        p_customer_id INT DEFAULT NULL
+    )
+    RETURNS TABLE (sale_date DATE, units BIGINT, revenue DECIMAL, sales BIGINT) AS $$
+    BEGIN
+        IF p_product_id IS NOT NULL AND p_customer_id IS NOT NULL THEN
+            RAISE EXCEPTION 'Sales are rolled up by product or by customer, not both';
+        END IF;
+
+        IF p_product_id IS NOT NULL THEN
+            RETURN QUERY
+            SELECT r.sale_date, r.units, r.revenue, r.sales::BIGINT
+            FROM SaleDailyProduct r
+            WHERE r.product_id = p_product_id
+            AND r.sale_date BETWEEN COALESCE(p_from, '-infinity') AND COALESCE(p_to, 'infinity')
+            AND r.sales <> 0
+            ORDER BY r.sale_date;
+        ELSIF p_customer_id IS NOT NULL THEN
+            RETURN QUERY
+            SELECT r.sale_date, r.units, r.revenue, r.sales::BIGINT
+            FROM SaleDailyCustomer r
+            WHERE r.customer_id = p_customer_id
+            AND r.sale_date BETWEEN COALESCE(p_from, '-infinity') AND COALESCE(p_to, 'infinity')
+            AND r.sales <> 0
+            ORDER BY r.sale_date;
+        ELSE
+            RETURN QUERY
+            SELECT r.sale_date, SUM(r.units)::BIGINT, SUM(r.revenue), SUM(r.sales)::BIGINT
+            FROM SaleDailyTotal r
+            WHERE r.sale_date BETWEEN COALESCE(p_from, '-infinity') AND COALESCE(p_to, 'infinity')
+            GROUP BY r.sale_date
+            HAVING SUM(r.sales) <> 0
+            ORDER BY r.sale_date;
+        END IF;
+    END;
+    $$ LANGUAGE plpgsql STABLE;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION sales_by_product(
+        p_from DATE DEFAULT NULL,
+        p_to DATE DEFAULT NULL,
+        p_limit INT DEFAULT 100
+    )
+    RETURNS TABLE (product_id INT, units BIGINT, revenue DECIMAL, sales BIGINT) AS $$
+        -- The best sellers by revenue first
+        SELECT r.product_id, SUM(r.units)::BIGINT, SUM(r.revenue), SUM(r.sales)::BIGINT
+        FROM SaleDailyProduct r
+        WHERE r.sale_date BETWEEN COALESCE(p_from, '-infinity') AND COALESCE(p_to, 'infinity')
+        GROUP BY r.product_id
+        HAVING SUM(r.sales) <> 0
+        ORDER BY 3 DESC, 1
+        LIMIT p_limit;
+    $$ LANGUAGE sql STABLE;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION sales_by_customer(
+        p_from DATE DEFAULT NULL,
+        p_to DATE DEFAULT NULL,
+        p_limit INT DEFAULT 100
+    )
+    RETURNS TABLE (customer_id INT, units BIGINT, revenue DECIMAL, sales BIGINT) AS $$
+        -- The biggest spenders first
+        SELECT r.customer_id, SUM(r.units)::BIGINT, SUM(r.revenue), SUM(r.sales)::BIGINT
+        FROM SaleDailyCustomer r
+        WHERE r.sale_date BETWEEN COALESCE(p_from, '-infinity') AND COALESCE(p_to, 'infinity')
+        GROUP BY r.customer_id
+        HAVING SUM(r.sales) <> 0
+        ORDER BY 3 DESC, 1
+        LIMIT p_limit;
+    $$ LANGUAGE sql STABLE;
+    """,
+]
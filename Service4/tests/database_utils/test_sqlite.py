@@ -0,0 +1,514 @@
+import pytest
+from postgrest.exceptions import APIError
+
+from database_utils.sqlite import SQLiteClient, translate_ddl
+
+
+@pytest.fixture
+def client():
+    """
+    Fixture providing a SQLiteClient on a fresh in-memory database.
+
+    Yields:
+        SQLiteClient: The client under test.
+    """
+    client = SQLiteClient()
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def customer(client):
+    """
+    Fixture inserting a customer with an empty wallet.
+
+    Returns:
+        dict: The inserted customer row.
+    """
+    return (
+        client.table("customer")
+        .insert(
+            {
+                "full_name": "John Doe",
+                "username": "johndoe",
+                "password": "hashed_password",
+                "age": 30,
+            }
+        )
+        .execute()
+        .data[0]
+    )
+
+
+def test_translate_ddl():
+    """
+    Test that serial primary keys are translated to SQLite autoincrement keys.
+
+    Asserts:
+        - SERIAL PRIMARY KEY becomes INTEGER PRIMARY KEY AUTOINCREMENT.
+    """
+    statement = "CREATE TABLE t (id SERIAL PRIMARY KEY, name TEXT)"
+    assert translate_ddl(statement) == (
+        "CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT)"
+    )
+
+
+def test_insert_returns_postgrest_row(customer):
+    """
+    Test that an insert returns the new row the way PostgREST does.
+
+    Asserts:
+        - The generated key and column defaults are returned.
+        - Decimals are returned as floats and timestamps as ISO 8601 strings.
+    """
+    assert customer["customer_id"] == 1
+    assert customer["wallet_balance"] == 0.0
+    assert isinstance(customer["created_at"], str)
+    assert "T" in customer["created_at"]
+
+
+def test_select_update_delete(client, customer):
+    """
+    Test filtered selects, updates and deletes.
+
+    Asserts:
+        - The select returns only the projected columns of the matching rows.
+        - The update and delete return the affected rows.
+    """
+    rows = (
+        client.table("customer")
+        .select("username, age")
+        .eq("username", "johndoe")
+        .execute()
+        .data
+    )
+    assert rows == [{"username": "johndoe", "age": 30}]
+
+    updated = client.table("customer").update({"age": 31}).eq("customer_id", 1)
+    assert updated.execute().data[0]["age"] == 31
+
+    deleted = client.table("customer").delete().eq("username", "johndoe").execute()
+    assert len(deleted.data) == 1
+    assert client.table("customer").select("*").execute().data == []
+
+
+def test_insert_rows_with_different_columns(client):
+    """
+    Test inserting several rows that set different columns.
+
+    Asserts:
+        - Every row is inserted and missing columns take their defaults.
+    """
+    rows = (
+        client.table("product")
+        .insert([{"name": "Apple", "price": 1.5}, {"name": "Pear", "stock_count": 3}])
+        .execute()
+        .data
+    )
+    assert [row["name"] for row in rows] == ["Apple", "Pear"]
+    assert rows[0]["stock_count"] is None
+    assert rows[1]["stock_count"] == 3
+
+
+def test_constraint_violation_raises_api_error(client, customer):
+    """
+    Test that constraint violations are raised with the Postgres error codes.
+
+    Asserts:
+        - A CHECK violation raises an APIError with code 23514.
+        - A foreign key violation raises an APIError with code 23503.
+        - A duplicate username raises an APIError with code 23505.
+    """
+    with pytest.raises(APIError) as excinfo:
+        client.table("customer").update({"age": 10}).eq("customer_id", 1).execute()
+    assert excinfo.value.code == "23514"
+
+    with pytest.raises(APIError) as excinfo:
+        client.table("sale").insert({"customer_id": 1, "product_id": 99}).execute()
+    assert excinfo.value.code == "23503"
+
+    duplicate = dict(customer, customer_id=2)
+    with pytest.raises(APIError) as excinfo:
+        client.table("customer").insert(duplicate).execute()
+    assert excinfo.value.code == "23505"
+
+
+def test_rpc_runs_python_function(client, customer):
+    """
+    Test that database functions are called like PostgREST RPCs.
+
+    Asserts:
+        - charge_wallet and deduct_wallet return the new balance.
+        - An error raised by the function is an APIError with code P0001.
+        - An unknown function raises an APIError.
+    """
+    params = {"p_username": "johndoe", "p_amount": 10.1}
+    assert client.rpc("charge_wallet", params).execute().data == 10.1
+    params["p_amount"] = 0.2
+    assert client.rpc("deduct_wallet", params).execute().data == 9.9
+
+    params["p_amount"] = 100
+    with pytest.raises(APIError) as excinfo:
+        client.rpc("deduct_wallet", params).execute()
+    assert excinfo.value.code == "P0001"
+    assert excinfo.value.message == "Insufficient funds"
+
+    with pytest.raises(APIError):
+        client.rpc("missing_function", {}).execute()
+
+
+def test_wallet_ledger_functions(client, customer):
+    """
+    Test the wallet ledger functions.
+
+    Asserts:
+        - Credits and debits return the customer and the new balance.
+        - A debit larger than the balance raises "Insufficient funds".
+        - Compaction moves the balance snapshot without changing the balance.
+    """
+    params = {"p_username": "johndoe", "p_amount": 10}
+    assert client.rpc("ledger_charge_wallet", params).execute().data == [
+        {"customer_id": 1, "wallet_balance": 10.0}
+    ]
+    params["p_amount"] = 2.5
+    assert client.rpc("ledger_deduct_wallet", params).execute().data == [
+        {"customer_id": 1, "wallet_balance": 7.5}
+    ]
+
+    params["p_amount"] = 100
+    with pytest.raises(APIError) as excinfo:
+        client.rpc("ledger_deduct_wallet", params).execute()
+    assert excinfo.value.message == "Insufficient funds"
+
+    compact = client.rpc("compact_wallet_ledger", {"p_customer_ids": [1, 1]})
+    assert compact.execute().data == 1
+    row = client.table("customer").select("*").execute().data[0]
+    assert (row["wallet_balance"], row["wallet_ledger_position"]) == (7.5, 2)
+    balance = client.rpc("wallet_ledger_balance", {"p_customer_id": 1})
+    assert balance.execute().data == 7.5
+    balances = client.rpc("wallet_ledger_balances", {"p_customer_ids": [1, 2]})
+    assert balances.execute().data == [{"customer_id": 1, "wallet_balance": 7.5}]
+
+
+def test_apply_wallet_batch(client, customer):
+    """
+    Test applying a batch of wallet operations in one call.
+
+    Asserts:
+        - Entries are applied in order, each returning the new balance.
+        - Unknown customers and uncovered debits are reported without failing the batch.
+        - The ledger variant returns the same results.
+    """
+    entries = [
+        {"username": "johndoe", "amount": 10, "op": "charge"},
+        {"username": "johndoe", "amount": 4, "op": "deduct"},
+        {"username": "nobody", "amount": 1, "op": "charge"},
+        {"username": "johndoe", "amount": 50, "op": "deduct"},
+    ]
+    for function, balance in (
+        ("apply_wallet_batch", 6.0),
+        ("ledger_apply_wallet_batch", 12.0),
+    ):
+        results = client.rpc(function, {"p_entries": entries}).execute().data
+        assert [result["entry_index"] for result in results] == [0, 1, 2, 3]
+        assert results[1]["new_balance"] == balance
+        assert [result["error"] for result in results] == [
+            None,
+            None,
+            "Customer not found",
+            "Insufficient funds",
+        ]
+
+
+def test_list_products(client):
+    """
+    Test listing products with filters, sort orders and keyset pagination.
+
+    Asserts:
+        - The category, price range and stock filters are applied.
+        - Price orders skip products without a price and break ties by ID.
+        - Each page continues after the cursor of the previous one.
+        - An unknown sort order raises an APIError.
+    """
+    client.table("product").insert(
+        [
+            {"name": "A", "category": "fruit", "price": 2.0, "stock_count": 5},
+            {"name": "B", "category": "fruit", "price": 1.0, "stock_count": 0},
+            {"name": "C", "category": "fruit", "price": 2.0, "stock_count": 1},
+            {"name": "D", "category": "dairy", "price": 3.0, "stock_count": 2},
+            {"name": "E", "category": "fruit", "price": None, "stock_count": 4},
+        ]
+    ).execute()
+
+    def names(**params):
+        rows = client.rpc("list_products", params).execute().data
+        return [row["name"] for row in rows]
+
+    assert names() == ["A", "B", "C", "D", "E"]
+    assert names(p_sort="-product_id", p_limit=2) == ["E", "D"]
+    assert names(p_category="fruit", p_sort="price") == ["B", "A", "C"]
+    assert names(p_category="fruit", p_sort="-price", p_in_stock=True) == ["C", "A"]
+    assert names(p_min_price=1.5, p_max_price=2.5) == ["A", "C"]
+    assert names(p_sort="price", p_after_price=2.0, p_after_id=1) == ["C", "D"]
+    assert names(p_after_id=4) == ["E"]
+
+    with pytest.raises(APIError) as excinfo:
+        client.rpc("list_products", {"p_sort": "name"}).execute()
+    assert excinfo.value.message == "Unknown sort order: name"
+
+
+def test_search_products(client):
+    """
+    Test searching products by name, category and description.
+
+    Asserts:
+        - Only products containing every search word are returned.
+        - A match in the name ranks above a match in the description.
+        - Each page continues after the cursor of the previous one.
+        - Plural and singular words match each other.
+        - A search matching more than p_max_matches products ranks those with the
+          lowest IDs and is reported as truncated.
+    """
+    # Only the inventory service has the search index
+    pytest.importorskip("database_utils.inverted_index")
+    client.table("product").insert(
+        [
+            {"name": "Desk Lamp", "category": "Home", "description": "A lamp"},
+            {"name": "Chair", "category": "Home", "description": "Fits any desk"},
+            {"name": "Desk", "category": "Office", "description": "Oak desks"},
+            {"name": "Mug", "category": "Kitchen", "description": None},
+        ]
+    ).execute()
+
+    def search(**params):
+        return client.rpc("search_products", params).execute().data
+
+    assert [row["name"] for row in search(p_query="desk")] == [
+        "Desk",
+        "Desk Lamp",
+        "Chair",
+    ]
+    assert [row["name"] for row in search(p_query="home desk")] == [
+        "Desk Lamp",
+        "Chair",
+    ]
+    assert search(p_query="lamps")[0]["name"] == "Desk Lamp"
+    assert search(p_query="sofa") == []
+
+    first_page = search(p_query="desk", p_limit=2)
+    last = first_page[-1]
+    assert [row["name"] for row in first_page] == ["Desk", "Desk Lamp"]
+    assert [
+        row["name"]
+        for row in search(
+            p_query="desk", p_after_rank=last["rank"], p_after_id=last["product_id"]
+        )
+    ] == ["Chair"]
+
+    capped = search(p_query="desk", p_max_matches=2)
+    assert [row["name"] for row in capped] == ["Desk Lamp", "Chair"]
+    assert all(row["truncated"] for row in capped)
+    assert not any(row["truncated"] for row in search(p_query="desk"))
+
+
+def test_adjust_stock_bulk(client):
+    """
+    Test adjusting the stock of several products in one call.
+
+    Asserts:
+        - The deltas of a product are summed and applied together.
+        - A product whose stock would go negative is left unchanged and all of
+          its items fail; unknown products are reported.
+        - Products without a stock count start from zero.
+    """
+    client.table("product").insert(
+        [
+            {"name": "A", "stock_count": 5},
+            {"name": "B", "stock_count": 1},
+            {"name": "C", "stock_count": None},
+        ]
+    ).execute()
+
+    results = (
+        client.rpc(
+            "adjust_stock_bulk",
+            {
+                "p_adjustments": [
+                    {"product_id": 1, "delta": -3},
+                    {"product_id": 2, "delta": -2},
+                    {"product_id": 1, "delta": 1},
+                    {"product_id": 9, "delta": 1},
+                    {"product_id": 3, "delta": 4},
+                    {"product_id": 2, "delta": -1},
+                ]
+            },
+        )
+        .execute()
+        .data
+    )
+
+    assert [
+        (row["item_index"], row["stock_count"], row["error"]) for row in results
+    ] == [
+        (0, 3, None),
+        (1, None, "Insufficient stock"),
+        (2, 3, None),
+        (3, None, "Product not found"),
+        (4, 4, None),
+        (5, None, "Insufficient stock"),
+    ]
+    stock = client.table("product").select("product_id", "stock_count").execute().data
+    assert sorted((row["product_id"], row["stock_count"]) for row in stock) == [
+        (1, 3),
+        (2, 1),
+        (3, 4),
+    ]
+
+
+def test_reservation_functions(client):
+    """
+    Test holding, confirming, releasing and expiring stock reservations.
+
+    Asserts:
+        - A hold takes its units out of the stock and cannot oversell it.
+        - A confirmed hold keeps its units and a released hold gives them back.
+        - Expiring returns the units of the expired holds only, grouped by product.
+        - A hold that was confirmed, released or expired cannot be settled again.
+    """
+    client.table("product").insert({"name": "A", "stock_count": 5}).execute()
+
+    def call(function, **params):
+        return client.rpc(function, params).execute().data
+
+    held = call("reserve_stock", p_product_id=1, p_quantity=2, p_ttl_seconds=600)[0]
+    assert held["status"] == "held"
+    call("reserve_stock", p_product_id=1, p_quantity=1, p_ttl_seconds=0)
+    call("reserve_stock", p_product_id=1, p_quantity=1, p_ttl_seconds=0)
+    with pytest.raises(APIError, match="Insufficient stock"):
+        call("reserve_stock", p_product_id=1, p_quantity=2, p_ttl_seconds=600)
+    with pytest.raises(APIError, match="Product not found"):
+        call("reserve_stock", p_product_id=9, p_quantity=1, p_ttl_seconds=600)
+
+    assert call("expire_reservations", p_limit=10) == [
+        {"product_id": 1, "holds": 2, "quantity": 2, "stock_count": 3}
+    ]
+    assert call("expire_reservations", p_limit=10) == []
+    with pytest.raises(APIError, match="Reservation is expired"):
+        call("confirm_reservation", p_reservation_id=2)
+
+    assert call("confirm_reservation", p_reservation_id=1)[0]["status"] == "confirmed"
+    with pytest.raises(APIError, match="Reservation is confirmed"):
+        call("release_reservation", p_reservation_id=1)
+
+    call("reserve_stock", p_product_id=1, p_quantity=3, p_ttl_seconds=600)
+    assert call("release_reservation", p_reservation_id=4)[0]["status"] == "released"
+    with pytest.raises(APIError, match="Reservation not found"):
+        call("release_reservation", p_reservation_id=9)
+    stock = client.table("product").select("stock_count").execute().data
+    assert stock == [{"stock_count": 3}]
+
+
+def test_checkout(client, customer):
+    """
+    Test that checkout takes the stock, debits the wallet and records the sale together.
+
+    Asserts:
+        - The sale is priced from the product, with the new balance and stock.
+        - A checkout the wallet does not cover leaves the stock untouched.
+        - A reservation covering the sale is confirmed instead of taking stock,
+          and the ledger wallet mode debits the wallet ledger.
+    """
+    client.table("product").insert(
+        {"name": "Lamp", "price": 12.5, "stock_count": 5}
+    ).execute()
+    client.rpc("charge_wallet", {"p_username": "johndoe", "p_amount": 30}).execute()
+    customer_id = customer["customer_id"]
+
+    def checkout(quantity, **params):
+        return (
+            client.rpc(
+                "checkout",
+                dict(
+                    p_customer_id=customer_id,
+                    p_product_id=1,
+                    p_quantity=quantity,
+                    **params,
+                ),
+            )
+            .execute()
+            .data[0]
+        )
+
+    sale = checkout(2)
+    assert (sale["total_price"], sale["wallet_balance"], sale["stock_count"]) == (
+        25.0,
+        5.0,
+        3,
+    )
+    with pytest.raises(APIError, match="Insufficient funds"):
+        checkout(1)
+    stock = client.table("product").select("stock_count").execute().data
+    assert stock == [{"stock_count": 3}]
+
+    client.rpc(
+        "ledger_charge_wallet", {"p_username": "johndoe", "p_amount": 20}
+    ).execute()
+    client.rpc(
+        "reserve_stock", {"p_product_id": 1, "p_quantity": 1, "p_ttl_seconds": 60}
+    ).execute()
+    with pytest.raises(APIError, match="does not match"):
+        checkout(2, p_wallet_mode="ledger", p_reservation_id=1)
+    sale = checkout(1, p_wallet_mode="ledger", p_reservation_id=1)
+    assert (sale["wallet_balance"], sale["stock_count"]) == (12.5, 2)
+    assert len(client.table("sale").select("*").execute().data) == 2
+
+
+def test_sales_stats(client, customer):
+    """
+    Test that the sales statistics total the sales by day, product and customer.
+
+    Asserts:
+        - The days of a range are totalled, for every sale or one product's.
+        - Products and customers are ranked by revenue, up to the limit.
+        - Filtering by product and customer together is refused.
+    """
+    client.table("product").insert([{"name": "Lamp"}, {"name": "Desk"}]).execute()
+    client.table("sale").insert(
+        [
+            {
+                "customer_id": customer["customer_id"],
+                "product_id": product_id,
+                "sale_date": sale_date,
+                "quantity": quantity,
+                "total_price": quantity * 2.5,
+            }
+            for product_id, sale_date, quantity in [
+                (1, "2026-01-01", 1),
+                (2, "2026-01-01", 4),
+                (1, "2026-01-02", 2),
+                (1, "2026-01-05", 3),
+            ]
+        ]
+    ).execute()
+
+    def stats(function, **params):
+        return client.rpc(function, params).execute().data
+
+    assert stats("sales_by_day", p_to="2026-01-02") == [
+        {"sale_date": "2026-01-01", "units": 5, "revenue": 12.5, "sales": 2},
+        {"sale_date": "2026-01-02", "units": 2, "revenue": 5.0, "sales": 1},
+    ]
+    assert [day["units"] for day in stats("sales_by_day", p_product_id=1)] == [1, 2, 3]
+    assert stats("sales_by_product", p_from="2026-01-02", p_limit=1) == [
+        {"product_id": 1, "units": 5, "revenue": 12.5, "sales": 2}
+    ]
+    assert stats("sales_by_customer") == [
+        {
+            "customer_id": customer["customer_id"],
+            "units": 10,
+            "revenue": 25.0,
+            "sales": 4,
+        }
+    ]
+    with pytest.raises(APIError, match="not both"):
+        stats("sales_by_day", p_product_id=1, p_customer_id=1)
@@ -0,0 +1,240 @@
+"""
+Full-app throughput benchmark for the services.
+
+This script serves one service's Flask app on a local threaded WSGI server,
+seeds customers and products through the service's data-access client, drives a
+mixed read/write workload over HTTP from concurrent callers and reports the
+requests per second and latency percentiles for every backend given:
+
+- sqlite: an in-process SQLite database, no network or Supabase project needed.
+- postgres: SQL over the psycopg2 connection pool (``Config.DATABASE``).
+- supabase: PostgREST over HTTP (``Config.SUPABASE``).
+
+Usage:
+    python benchmarks/app_throughput.py --service Service1 --backends sqlite,postgres
+
+The client is chosen from ``DATABASE_BACKEND`` when the service modules are
+imported, so every backend runs in a fresh interpreter with the same app, the
+same workload and the same number of callers. Rows seeded on a shared database
+are deleted when the run finishes.
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SERVICES = ["Service1", "Service2", "Service3", "Service4"]
+
+BACKENDS = ["sqlite", "postgres", "supabase"]
+
+
+def customer_requests(seeded, i):
+    username = seeded["customers"][i % len(seeded["customers"])]["username"]
+    if i % 4 == 2:
+        return "POST", f"/api/customers/charge/{username}", {"amount": 1}
+    if i % 4 == 3:
+        return "POST", f"/api/customers/deduct/{username}", {"amount": 1}
+    return "GET", f"/api/customers/{username}", None
+
+
+def inventory_requests(seeded, i):
+    product_id = seeded["products"][i % len(seeded["products"])]["product_id"]
+    if i % 2:
+        return "PUT", f"/api/inventory/update/{product_id}", {"price": 10 + i % 5}
+    return "POST", f"/api/inventory/deduct/{product_id}", {"quantity": 1}
+
+
+def sale_requests(seeded, i):
+    customer = seeded["customers"][i % len(seeded["customers"])]
+    product = seeded["products"][i % len(seeded["products"])]
+    sale = {
+        "customer_id": customer["customer_id"],
+        "product_id": product["product_id"],
+        "sale_date": date.today().isoformat(),
+        "quantity": 1,
+        "total_price": product["price"],
+    }
+    return "POST", "/api/sales/submit", sale
+
+
+def review_requests(seeded, i):
+    customer = seeded["customers"][i % len(seeded["customers"])]
+    product = seeded["products"][i % len(seeded["products"])]
+    if i % 2:
+        return "GET", f"/api/reviews/product/{product['product_id']}", None
+    review = {
+        "customer_id": customer["customer_id"],
+        "product_id": product["product_id"],
+        "rating": 1 + i % 5,
+        "comment": "Benchmark review",
+        "review_date": date.today().isoformat(),
+        "status": "Pending",
+    }
+    return "POST", "/api/reviews/submit", review
+
+
+WORKLOADS = {
+    "Service1": customer_requests,
+    "Service2": inventory_requests,
+    "Service3": sale_requests,
+    "Service4": review_requests,
+}
+
+
+def seed(client, rows):
+    """
+    Insert the customers and products the workload operates on.
+
+    Args:
+        client: The service's data-access client.
+        rows (int): The number of customers and of products to insert.
+
+    Returns:
+        dict: The inserted "customers" and "products" rows.
+    """
+    tag = f"bench{os.getpid()}"
+    customers = [
+        {
+            "full_name": "Benchmark Customer",
+            "username": f"{tag}_{i}",
+            "password": "benchmark-password-hash",
+            "age": 30,
+            "wallet_balance": 1000,
+        }
+        for i in range(rows)
+    ]
+    products = [
+        {
+            "name": f"{tag} product {i}",
+            "category": "benchmark",
+            "price": 10.0,
+            "description": "Benchmark product",
+            "stock_count": 1000000,
+        }
+        for i in range(rows)
+    ]
+    return {
+        "customers": client.table("customer").insert(customers).execute().data,
+        "products": client.table("product").insert(products).execute().data,
+    }
+
+
+def cleanup(client, seeded):
+    """
+    Delete the seeded rows and every sale and review referencing them.
+    """
+    customer_ids = [row["customer_id"] for row in seeded["customers"]]
+    product_ids = [row["product_id"] for row in seeded["products"]]
+    for table in ("sale", "review"):
+        client.table(table).delete().in_("customer_id", customer_ids).execute()
+    client.table("product").delete().in_("product_id", product_ids).execute()
+    client.table("customer").delete().in_("customer_id", customer_ids).execute()
+
+
+def run(service, callers, requests, rows):
+    """
+    Benchmark the app of one service on the backend configured in the environment.
+
+    Args:
+        service (str): The service directory, e.g. "Service1".
+        callers (int): The number of concurrent HTTP callers.
+        requests (int): The total number of requests.
+        rows (int): The number of customers and of products to seed.
+
+    Returns:
+        tuple: The list of per-request latencies in milliseconds, the wall-clock
+        duration in seconds and the number of failed requests.
+    """
+    sys.path.insert(0, os.path.join(ROOT, service))
+    from werkzeug.serving import make_server
+
+    from app import create_app
+    from database_utils.connect import get_supabase_client
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    client = get_supabase_client()
+    workload = WORKLOADS[service]
+    seeded = seed(client, rows)
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    limits = httpx.Limits(max_connections=callers, max_keepalive_connections=callers)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with httpx.Client(base_url=base_url, limits=limits) as http:
+
+            def call(i):
+                method, path, body = workload(seeded, i)
+                start = time.perf_counter()
+                response = http.request(method, path, json=body)
+                return (time.perf_counter() - start) * 1000, response.status_code
+
+            with ThreadPoolExecutor(max_workers=callers) as pool:
+                # Warm up so connection establishment is not part of the measurement
+                list(pool.map(call, range(callers)))
+                started = time.perf_counter()
+                results = list(pool.map(call, range(requests)))
+                elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        cleanup(client, seeded)
+
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, status in results if status >= 400)
+    return latencies, elapsed, errors
+
+
+def main():
+    """
+    Parse the command line arguments and benchmark each backend in a subprocess.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--service", choices=SERVICES, default="Service1")
+    parser.add_argument("--backends", default="sqlite")
+    parser.add_argument("--callers", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # Some routes print every row they return
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            latencies, elapsed, errors = run(
+                args.service, args.callers, args.requests, args.rows
+            )
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{args.service} {os.environ['DATABASE_BACKEND']:<9} "
+            f"callers={args.callers} requests={args.requests} "
+            f"rps={args.requests / elapsed:.0f} "
+            f"p50={quantiles[49]:.1f}ms p99={quantiles[98]:.1f}ms errors={errors}",
+            flush=True,
+        )
+        return
+
+    for backend in args.backends.split(","):
+        if backend not in BACKENDS:
+            parser.error(f"unknown backend: {backend}")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run", *sys.argv[1:]],
+            env={**os.environ, "DATABASE_BACKEND": backend},
+            cwd=os.path.join(ROOT, args.service),
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
+import argparse
+import csv
+import itertools
+import json
 import subprocess
+import sys
+import time
+from typing import Iterator, Optional
+
+import httpx
 
 
 def clean(files: list[str] = ["."]) -> None:
@@ -30,5 +39,107 @@ def clean(files: list[str] = ["."]) -> None:
     subprocess.run(["mypy", *files])
 
 
+def read_customers(path: str, file_format: str = "auto") -> Iterator[dict]:
+    """
+    Stream the customers of a JSONL or CSV file, one row at a time.
+
+    Empty CSV cells are read as missing values, and blank JSONL lines are skipped.
+
+    Args:
+        path (str): The path of the file.
+        file_format (str): "jsonl", "csv", or "auto" to pick from the file extension.
+
+    Yields:
+        dict: The customer of each row.
+    """
+    if file_format == "auto":
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    with open(path, newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value != ""}
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def import_customers(
+    path: str,
+    url: str = "http://localhost:5000/api/customers",
+    batch_size: int = 1000,
+    file_format: str = "auto",
+) -> None:
+    """
+    Import the customers of a JSONL or CSV file through the bulk import endpoint.
+
+    The file is streamed and sent in batches of ``batch_size`` rows, so files of any
+    size are imported in constant memory. The service validates each batch, hashes
+    the passwords in parallel and inserts the valid rows; rejected rows are reported
+    on stderr with their row number without aborting the import. The progress and
+    the final throughput are printed in rows per second.
+
+    Args:
+        path (str): The path of the file to import.
+        url (str): The base URL of the customer service.
+        batch_size (int): The number of rows sent per request.
+        file_format (str): "jsonl", "csv", or "auto" to pick from the file extension.
+    """
+    rows = read_customers(path, file_format)
+    received = inserted = failed = 0
+    start = time.perf_counter()
+    with httpx.Client(base_url=url, timeout=None) as client:
+        while batch := list(itertools.islice(rows, batch_size)):
+            response = client.post("/bulk", json={"customers": batch})
+            response.raise_for_status()
+            result = response.json()
+            for error in result["errors"]:
+                error["row"] = received + error.pop("index") + 1
+                print(json.dumps(error), file=sys.stderr)
+            received += result["received"]
+            inserted += result["inserted"]
+            failed += result["failed"]
+            elapsed = time.perf_counter() - start
+            print(
+                f"{received} rows, {inserted} inserted, {failed} failed, "
+                f"{received / elapsed:.0f} rows/s"
+            )
+    elapsed = time.perf_counter() - start
+    print(
+        f"Imported {inserted} of {received} customers in {elapsed:.1f}s "
+        f"({received / elapsed if elapsed else 0:.0f} rows/s), {failed} failed"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Run the command given on the command line; ``clean`` when none is given.
+
+    Args:
+        argv (Optional[list[str]]): The command line arguments. Defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Project maintenance commands")
+    commands = parser.add_subparsers(dest="command")
+
+    clean_parser = commands.add_parser("clean", help="Run the code quality tools")
+    clean_parser.add_argument("files", nargs="*", default=["."])
+
+    import_parser = commands.add_parser(
+        "import-customers", help="Bulk import customers from a JSONL or CSV file"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument("--url", default="http://localhost:5000/api/customers")
+    import_parser.add_argument("--batch-size", type=int, default=1000)
+    import_parser.add_argument(
+        "--format", dest="file_format", choices=["auto", "jsonl", "csv"], default="auto"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "import-customers":
+        import_customers(args.path, args.url, args.batch_size, args.file_format)
+    else:
+        clean(getattr(args, "files", ["."]))
+
+
 if __name__ == "__main__":
-    clean()
+    main()
@@ -20,6 +20,48 @@ class Config:
             - URL (str): The URL for the Supabase instance, retrieved from environment variables.
             - USER (str): The username for Supabase authentication, retrieved from environment variables.
             - PASSWORD (str): The password for Supabase authentication, retrieved from environment variables.
+            - POOL_MAX_CONNECTIONS, POOL_MAX_KEEPALIVE, KEEPALIVE_EXPIRY, HTTP2, TIMEOUT, CONNECT_TIMEOUT:
+              HTTP connection pool settings of the PostgREST client.
+
+        DATABASE: Contains the data-access backend settings.
+            - BACKEND (str): "supabase", "postgres" or "sqlite".
+            - HOST, PORT, NAME, USER, PASSWORD: Connection settings of the Postgres server.
+            - POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS: Size of the psycopg2 connection pool.
+            - SQLITE_PATH (str): The database file of the SQLite backend.
+
+        CACHE: Contains the settings of the in-process read-through caches.
+            - CUSTOMER_MAX_SIZE, CUSTOMER_TTL: Size and time-to-live of the customer cache.
+            - USERNAME_FILTER_CAPACITY, USERNAME_FILTER_ERROR_RATE: Sizing of the username Bloom filter.
+            - PRODUCT_MAX_SIZE, PRODUCT_TTL: Size and time-to-live of the product cache.
+            - SHARED_URL, SHARED_TIMEOUT: Address and request timeout of the optional shared cache tier.
+
+        PASSWORD: Contains the password hashing settings.
+            - HASH_METHOD (str): The werkzeug hashing method and cost.
+            - HASH_WORKERS, HASH_MAX_PENDING: Size and queue bound of the hashing process pool.
+
+        WALLET: Contains the wallet settings.
+            - MODE (str): "balance" (update the balance in place) or "ledger" (append to the wallet ledger).
+            - COMPACT_INTERVAL, COMPACT_BATCH_SIZE: How often and how many customers' ledgers are compacted.
+
+        RESERVATION: Contains the stock reservation settings.
+            - DEFAULT_TTL, MAX_TTL: Default and maximum lifetime of a stock hold, in seconds.
+            - SWEEP_INTERVAL, SWEEP_BATCH_SIZE: How often and how many expired holds are released.
+
+        SEARCH: Contains the product search settings.
+            - MAX_MATCHES (int): The number of matches ranked per search.
+
+        LOW_STOCK: Contains the low-stock watcher settings.
+            - THRESHOLDS (tuple): The stock counts whose crossing raises an event.
+            - REFRESH_INTERVAL, MAX_EVENTS: How often the low-stock set is reloaded and how many events are kept.
+
+        SALE_PARTITIONS: Contains the settings of the monthly Sale partitions.
+            - MONTHS_AHEAD (int): How many months of partitions are kept created ahead of the current one.
+            - INTERVAL (float): How often the partitions are checked, in seconds.
+
+        IDEMPOTENCY: Contains the settings of the idempotency keys of sale submissions.
+            - TTL (float): How long a submission is remembered under its key, in seconds.
+            - MAX_KEYS (int): The maximum number of keys remembered.
+            - WAIT_TIMEOUT (float): How long a retry waits for the request in progress with its key.
     """
     class APP:
         """
@@ -43,8 +85,180 @@ class Config:
             URL (str): The URL for the Supabase instance, retrieved from environment variables.
             USER (str): The username for Supabase, retrieved from environment variables.
             PASSWORD (str): The password for Supabase, retrieved from environment variables.
+            POOL_MAX_CONNECTIONS (int): The maximum number of HTTP connections kept by the PostgREST client.
+            POOL_MAX_KEEPALIVE (int): The maximum number of idle connections kept alive for reuse.
+            KEEPALIVE_EXPIRY (float): The number of seconds an idle connection is kept alive.
+            HTTP2 (bool): Whether the PostgREST client negotiates HTTP/2.
+            TIMEOUT (float): The read, write and pool timeout of PostgREST requests, in seconds.
+            CONNECT_TIMEOUT (float): The timeout for establishing a connection, in seconds.
         """
         KEY = os.getenv("SUPABASE_KEY")
         URL = os.getenv("SUPABASE_URL")
         USER = os.getenv("SUPABASE_USER")
         PASSWORD = os.getenv("SUPABASE_PASSWORD")
+        POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "100"))
+        POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "50"))
+        KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "60"))
+        HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+        TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+        CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+
+    class DATABASE:
+        """
+        A configuration class for the data-access backend.
+
+        Attributes:
+            BACKEND (str): The client used by the services: "supabase" (PostgREST over HTTP),
+                "postgres" (SQL over a psycopg2 connection pool) or "sqlite" (an in-process
+                SQLite database, for local benchmarks and development).
+            HOST (str): The host of the Postgres server.
+            PORT (int): The port of the Postgres server.
+            NAME (str): The name of the database.
+            USER (str): The database user, defaulting to the Supabase user.
+            PASSWORD (str): The database password, defaulting to the Supabase password.
+            POOL_MIN_CONNECTIONS (int): The number of connections opened with the pool.
+            POOL_MAX_CONNECTIONS (int): The maximum number of pooled connections.
+            SQLITE_PATH (str): The database file of the SQLite backend, ":memory:" by default.
+        """
+        BACKEND = os.getenv("DATABASE_BACKEND", "supabase")
+        HOST = os.getenv("DATABASE_HOST", "aws-0-us-east-1.pooler.supabase.com")
+        PORT = int(os.getenv("DATABASE_PORT", "6543"))
+        NAME = os.getenv("DATABASE_NAME", "postgres")
+        USER = os.getenv("DATABASE_USER", os.getenv("SUPABASE_USER"))
+        PASSWORD = os.getenv("DATABASE_PASSWORD", os.getenv("SUPABASE_PASSWORD"))
+        POOL_MIN_CONNECTIONS = int(os.getenv("DATABASE_POOL_MIN_CONNECTIONS", "1"))
+        POOL_MAX_CONNECTIONS = int(os.getenv("DATABASE_POOL_MAX_CONNECTIONS", "20"))
+        SQLITE_PATH = os.getenv("DATABASE_SQLITE_PATH", ":memory:")
+
+    class CACHE:
+        """
+        A configuration class for the in-process read-through caches.
+
+        Attributes:
+            CUSTOMER_MAX_SIZE (int): The maximum number of customers cached by username; 0 disables the cache.
+            CUSTOMER_TTL (float): The number of seconds a cached customer stays valid. A lookup
+                may serve a wallet balance this old when the wallet was changed by another
+                service process or by a checkout, so the default is kept short.
+            USERNAME_FILTER_CAPACITY (int): The number of usernames the Bloom filter of existing
+                usernames is sized for; 0 disables the filter.
+            USERNAME_FILTER_ERROR_RATE (float): The target false positive rate of the filter.
+            PRODUCT_MAX_SIZE (int): The maximum number of products cached by ID; 0 disables the cache.
+            PRODUCT_TTL (float): The number of seconds a cached product stays valid.
+            SHARED_URL (str): The URL of the shared cache server used as a second cache tier;
+                empty (the default) disables the shared tier.
+            SHARED_TIMEOUT (float): The timeout of shared cache requests, in seconds.
+        """
+        CUSTOMER_MAX_SIZE = int(os.getenv("CACHE_CUSTOMER_MAX_SIZE", "10000"))
+        CUSTOMER_TTL = float(os.getenv("CACHE_CUSTOMER_TTL", "5"))
+        USERNAME_FILTER_CAPACITY = int(
+            os.getenv("CACHE_USERNAME_FILTER_CAPACITY", "1000000")
+        )
+        USERNAME_FILTER_ERROR_RATE = float(
+            os.getenv("CACHE_USERNAME_FILTER_ERROR_RATE", "0.01")
+        )
+        PRODUCT_MAX_SIZE = int(os.getenv("CACHE_PRODUCT_MAX_SIZE", "10000"))
+        PRODUCT_TTL = float(os.getenv("CACHE_PRODUCT_TTL", "30"))
+        SHARED_URL = os.getenv("CACHE_SHARED_URL", "")
+        SHARED_TIMEOUT = float(os.getenv("CACHE_SHARED_TIMEOUT", "0.1"))
+
+    class PASSWORD:
+        """
+        A configuration class for password hashing.
+
+        Attributes:
+            HASH_METHOD (str): The werkzeug hashing method and its cost parameters, e.g.
+                "scrypt:32768:8:1" or "pbkdf2:sha256:600000".
+            HASH_WORKERS (int): The number of processes hashing passwords; 0 hashes in the request thread.
+            HASH_MAX_PENDING (int): The maximum number of hashes queued in the pool at once.
+        """
+        HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+        HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+    class WALLET:
+        """
+        A configuration class for customer wallets.
+
+        Attributes:
+            MODE (str): How wallet operations are stored: "balance" updates Customer.wallet_balance
+                in place, "ledger" appends credits and debits to the WalletLedger table and
+                periodically compacts them into Customer.wallet_balance.
+            COMPACT_INTERVAL (float): The number of seconds between two compactions of the ledger.
+            COMPACT_BATCH_SIZE (int): The maximum number of customers compacted per database call.
+        """
+        MODE = os.getenv("WALLET_MODE", "balance")
+        COMPACT_INTERVAL = float(os.getenv("WALLET_COMPACT_INTERVAL", "5"))
+        COMPACT_BATCH_SIZE = int(os.getenv("WALLET_COMPACT_BATCH_SIZE", "500"))
+
+    class RESERVATION:
+        """
+        A configuration class for stock reservations.
+
+        Attributes:
+            DEFAULT_TTL (float): The number of seconds a stock hold lasts when the caller gives no TTL.
+            MAX_TTL (float): The longest TTL a caller may ask for, in seconds.
+            SWEEP_INTERVAL (float): The number of seconds between two sweeps of the expired holds;
+                0 disables the background sweeper.
+            SWEEP_BATCH_SIZE (int): The maximum number of expired holds released per database call.
+        """
+        DEFAULT_TTL = float(os.getenv("RESERVATION_DEFAULT_TTL", "900"))
+        MAX_TTL = float(os.getenv("RESERVATION_MAX_TTL", "3600"))
+        SWEEP_INTERVAL = float(os.getenv("RESERVATION_SWEEP_INTERVAL", "5"))
+        SWEEP_BATCH_SIZE = int(os.getenv("RESERVATION_SWEEP_BATCH_SIZE", "500"))
+
+    class SEARCH:
+        """
+        A configuration class for product search.
+
+        Attributes:
+            MAX_MATCHES (int): The number of matches ranked per search. A search matching more products
+                only ranks those with the lowest product IDs, which bounds its latency however common
+                its words are, and reports its results as truncated.
+        """
+        MAX_MATCHES = int(os.getenv("SEARCH_MAX_MATCHES", "2000"))
+
+    class LOW_STOCK:
+        """
+        A configuration class for the low-stock watcher.
+
+        Attributes:
+            THRESHOLDS (tuple): The stock counts watched, as a comma-separated list; an event is
+                raised when the stock of a product falls to or below one of them, or rises above it.
+            REFRESH_INTERVAL (float): The number of seconds between two reloads of the low-stock
+                products, which picks up the stock changes made outside the watcher.
+            MAX_EVENTS (int): The number of threshold-crossing events kept.
+        """
+        THRESHOLDS = tuple(
+            int(value) for value in os.getenv("LOW_STOCK_THRESHOLDS", "0,10").split(",")
+        )
+        REFRESH_INTERVAL = float(os.getenv("LOW_STOCK_REFRESH_INTERVAL", "30"))
+        MAX_EVENTS = int(os.getenv("LOW_STOCK_MAX_EVENTS", "10000"))
+
+    class SALE_PARTITIONS:
+        """
+        A configuration class for the monthly partitions of the Sale table.
+
+        Attributes:
+            MONTHS_AHEAD (int): The number of months after the current one whose partitions are
+                created in advance; a sale dated past them is kept in the default partition until
+                its month's partition is created.
+            INTERVAL (float): The number of seconds between two checks of the partitions;
+                0 disables the background check.
+        """
+        MONTHS_AHEAD = int(os.getenv("SALE_PARTITIONS_MONTHS_AHEAD", "3"))
+        INTERVAL = float(os.getenv("SALE_PARTITIONS_INTERVAL", "3600"))
+
+    class IDEMPOTENCY:
+        """
+        A configuration class for the idempotency keys of sale submissions.
+
+        Attributes:
+            TTL (float): The number of seconds a successful submission is replayed to the requests
+                carrying its Idempotency-Key.
+            MAX_KEYS (int): The maximum number of keys remembered; the oldest are forgotten first.
+            WAIT_TIMEOUT (float): The number of seconds a request waits for the request in progress
+                with the same key before it is refused.
+        """
+        TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+        MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+        WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "10"))
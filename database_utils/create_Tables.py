@@ -2,6 +2,7 @@ import psycopg2
 from supabase import Client, create_client
 
 from config import Config
+from database_utils.schema import FUNCTIONS, MIGRATIONS, POSTGRES_SCHEMA, TABLES
 
 url: str = Config.SUPABASE.URL
 key: str = Config.SUPABASE.KEY
@@ -9,11 +10,11 @@ supabase: Client = create_client(url, key)
 
 
 db_params = {
-    "host": "aws-0-us-east-1.pooler.supabase.com",
-    "database": "postgres",
-    "user": Config.SUPABASE.USER,
-    "password": Config.SUPABASE.PASSWORD,
-    "port": 6543,
+    "host": Config.DATABASE.HOST,
+    "database": Config.DATABASE.NAME,
+    "user": Config.DATABASE.USER,
+    "password": Config.DATABASE.PASSWORD,
+    "port": Config.DATABASE.PORT,
 }
 
 
@@ -23,9 +24,41 @@ def create_tables():
 
     The following tables are created:
     - Customer: Stores customer information including id, name, username, password, age, address, gender, wallet balance, and creation timestamp.
-    - Product: Stores product information including id, name, category, price, description, and stock count.
+    - Product: Stores product information including id, name, category, price, description, stock count, and unique supplier SKU.
     - Review: Stores reviews given by customers for products including review id, customer id, product id, rating, comment, review date, and status.
     - Sale: Stores sales transactions including sale id, customer id, product id, sale date, quantity, and total price.
+    - WalletLedger: Stores the append-only wallet credits and debits of each customer, compacted into the customer's wallet balance.
+    - Reservation: Stores the expiring stock holds of carts including reservation id, product id, quantity, status, expiry and creation timestamp.
+    - SaleDailyProduct, SaleDailyCustomer, SaleDailyTotal: Store the units, revenue and number of sales of each day by product, by customer and in total.
+
+    The following indexes are created on Product for the product listing: (category, price, product_id), (price, product_id) and (stock_count).
+    Product also gets a generated full-text search column, search_vector, with a GIN index.
+    Reservation gets a partial index on the expiry of the held reservations, read by the sweeper.
+    Sale is range-partitioned by month on sale_date, with a default partition, and gets (customer_id, sale_date) and (product_id, sale_date) indexes;
+    a Sale table created without partitions is converted once, its rows copied into the partitions of their months.
+    create_sale_partitions runs with its owner's rights and can only be called by the service role.
+    Sale gets statement-level triggers that keep the daily sales rollups up to date; the rollups are rebuilt from the sales each time the schema is applied.
+
+    The following functions are created (called through the PostgREST RPC endpoint):
+    - charge_wallet: Atomically adds an amount to a customer's wallet and returns the new balance.
+    - deduct_wallet: Atomically deducts an amount from a customer's wallet if the balance covers it.
+    - wallet_ledger_balance: Returns a customer's compacted wallet balance plus the ledger entries appended since.
+    - wallet_ledger_balances: Returns the same balance for a list of customers in one query.
+    - ledger_charge_wallet, ledger_deduct_wallet: Append a credit or a covered debit to a customer's wallet ledger.
+    - compact_wallet_ledger: Folds the new ledger entries of some customers into their wallet balance.
+    - apply_wallet_batch, ledger_apply_wallet_batch: Apply a batch of wallet charges and deductions in one transaction.
+    - deduct_stock: Atomically removes a quantity of a product from stock if enough units are left.
+    - adjust_stock_bulk: Applies the summed stock deltas of a batch of products in one statement, skipping products whose stock would go negative.
+    - reserve_stock, confirm_reservation, release_reservation: Hold units of a product until the hold expires, then confirm it or give the units back.
+    - expire_reservations: Expires a batch of stale holds and returns their units to stock.
+    - checkout: Takes a product's stock (or confirms its reservation), debits the customer's wallet and records the sale in one transaction.
+    - list_products: Returns one keyset-paginated page of the products matching a category, price range and stock filter.
+    - search_products: Returns one page of the products matching a full-text search, best match first.
+    - create_sale_partitions: Creates the monthly Sale partitions up to some months ahead, moving the sales kept in the default partition into them.
+    - sales_by_day, sales_by_product, sales_by_customer: Return the sales totals of a range of days by day, or the best-selling products and top customers, from the rollups.
+
+    The statements are defined in `database_utils.schema`, which the services' local SQLite backend shares.
+    The migrations defined there bring databases created by earlier versions up to date before the functions are created.
 
     The function connects to the PostgreSQL database using the provided connection parameters, executes the table creation queries, 
     and handles any exceptions that occur during the process.
@@ -36,52 +69,7 @@ def create_tables():
     Note:
         The connection parameters should be provided in the `db_params` dictionary.
     """
-    queries = [
-        """
-        CREATE TABLE IF NOT EXISTS Customer (
-            customer_id SERIAL PRIMARY KEY,
-            full_name VARCHAR(100) NOT NULL,
-            username VARCHAR(50) NOT NULL,
-            password VARCHAR(255) NOT NULL,  -- Password length can be more than 50 characters to meet validation requirements
-            age INT NOT NULL CHECK (age >= 18 AND age <= 120),
-            address VARCHAR(200),
-            gender VARCHAR(10) CHECK (gender IN ('Male', 'Female', 'Other')),
-            wallet_balance DECIMAL(10, 2) DEFAULT 0.00,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS Product (
-            product_id SERIAL PRIMARY KEY,
-            name VARCHAR(255),
-            category VARCHAR(255),
-            price DECIMAL(10, 2),
-            description TEXT,
-            stock_count INT
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS Review (
-            review_id SERIAL PRIMARY KEY,
-            customer_id INT REFERENCES Customer(customer_id),
-            product_id INT REFERENCES Product(product_id),
-            rating INT CHECK (rating >= 1 AND rating <= 5),
-            comment TEXT,
-            review_date DATE,
-            status VARCHAR(50)
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS Sale (
-            sale_id SERIAL PRIMARY KEY,
-            customer_id INT REFERENCES Customer(customer_id),
-            product_id INT REFERENCES Product(product_id),
-            sale_date DATE,
-            quantity INT,
-            total_price DECIMAL(10, 2)
-        );
-        """,
-    ]
+    queries = [*TABLES, *MIGRATIONS, *POSTGRES_SCHEMA, *FUNCTIONS]
 
     try:
         conn = psycopg2.connect(**db_params)
@@ -15,14 +15,23 @@ class Product:
         Description of the product (default is None).
     stock_count : int, optional
         Number of items available in stock (default is 0).
+    sku : str, optional
+        Supplier stock keeping unit, unique across products (default is None).
 
     Methods:
-    __init__(self, name, category, price, description=None, stock_count=0, product_id=None):
+    __init__(self, name, category, price, description=None, stock_count=0, product_id=None, sku=None):
         Initializes the Product with the given attributes.
     """
 
     def __init__(
-        self, name, category, price, description=None, stock_count=0, product_id=None
+        self,
+        name,
+        category,
+        price,
+        description=None,
+        stock_count=0,
+        product_id=None,
+        sku=None,
     ):
         self.product_id = product_id
         self.name = name
@@ -30,3 +39,4 @@ class Product:
         self.price = price
         self.description = description
         self.stock_count = stock_count
+        self.sku = sku
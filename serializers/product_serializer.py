@@ -14,6 +14,7 @@ class ProductSchema(Schema):
         price (fields.Float): The price of the product. This field is required and must be non-negative.
         description (fields.Str): The description of the product. This field is optional and can be None.
         stock_count (fields.Int): The number of items in stock. This field is required and must be non-negative.
+        sku (fields.Str): The supplier stock keeping unit. This field is optional, unique across products and at most 64 characters.
 
     Methods:
         make_product(data, **kwargs): A post-load method that creates a Product instance from the deserialized data.
@@ -44,6 +45,11 @@ class ProductSchema(Schema):
         validate=validate.Range(min=0),
         error_messages={"validator_failed": "Stock count must be non-negative"},
     )
+    sku = fields.Str(
+        allow_none=True,
+        validate=validate.Length(min=1, max=64),
+        error_messages={"validator_failed": "SKU must be between 1 and 64 characters"},
+    )
 
     @post_load
     def make_product(self, data, **kwargs):